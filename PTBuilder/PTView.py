@@ -7,6 +7,7 @@ from functools import partial
 import os
 import pandas as pd
 from functools import partial
+from uiGenerator.models import directory_index
 
 __version__ = '0.2'
 __author__ = 'Christian Dewey'
@@ -334,7 +335,9 @@ class PTView(QWidget):
 					self.periodicTable[element].setStyleSheet(self._getElementStyle('available'))
 					attr[3] = 0
 			else:
-				self.periodicTable[element].setToolTip(f"{element_name}\nNot in data file")
+				self.periodicTable[element].setToolTip(
+					f"{element_name}\nNot in data file" + self._directoryNote(element_symbol)
+				)
 				self.periodicTable[element].setEnabled(False)
 				self.periodicTable[element].setStyleSheet(self._getElementStyle('unavailable'))
 				attr[3] = 0
@@ -344,6 +347,15 @@ class PTView(QWidget):
 		# Add buttonsLayout to the general layout
 		self.topLayout.addLayout(ptLayout)
 
+	def _directoryNote(self, symbol):
+		"""Tooltip line naming the runs in the directory that hold this element."""
+		counts = getattr(self._mainview, 'directoryAnalytes', {})
+		found = [
+			f"{analyte} ({n} runs)" for analyte, n in sorted(counts.items())
+			if directory_index.element_symbol(analyte) == symbol
+		]
+		return f"\nIn directory: {', '.join(found)}" if found else ""
+
 	def updateElementButton(self, element):
 		"""Update a single element button's appearance based on current state."""
 		if element not in self.periodicTable:
@@ -25,13 +25,12 @@ hiddenimports = [
     'pandas',
     'matplotlib',
     'seaborn',
-    'sklearn',
     'scipy',
+    'pypdf',
 ]
 
 # Collect all submodules from key packages
 hiddenimports += collect_submodules('pyqtgraph')
-hiddenimports += collect_submodules('sklearn')
 
 # Collect data files
 datas = []
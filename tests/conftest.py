@@ -1,9 +1,14 @@
 """Pytest configuration and fixtures."""
 
+import os
+import time
+
 import pytest
 import pandas as pd
 import numpy as np
 
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
 
 @pytest.fixture
 def sample_icpms_data():
@@ -17,3 +22,59 @@ def sample_icpms_data():
         '63Cu': np.random.randint(100, 1000, 100),
     }
     return pd.DataFrame(data)
+
+
+@pytest.fixture
+def write_run():
+    """``write_run(path, signals, time, stamp=None)``: write a run in the
+    instrument layout, a ``Time <analyte>`` column before each analyte, and
+    return it as a DataFrame. ``time`` is shared by every analyte or a
+    {analyte: times} dict; ``stamp`` adds an ``Acquired:`` line above the
+    header."""
+    def write(path, signals, time, stamp=None):
+        columns = {}
+        for analyte, values in signals.items():
+            columns[f'Time {analyte}'] = time[analyte] if isinstance(time, dict) else time
+            columns[analyte] = values
+        df = pd.DataFrame(columns)
+        with open(path, 'w', newline='') as f:
+            if stamp is not None:
+                f.write(f'Acquired: {stamp}\n')
+            df.to_csv(f, index=False)
+        return df
+    return write
+
+
+@pytest.fixture(autouse=True)
+def isolated_run_cache(tmp_path, monkeypatch):
+    """Point the process-wide run cache at a per-test directory and start
+    each test with an empty dataset registry. Spawned pool workers find
+    their cache through the environment."""
+    from uiGenerator.models import run_cache, dataset_registry
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    cache = run_cache.RunCache(root=str(tmp_path / 'run_cache'))
+    monkeypatch.setattr(run_cache, '_default_cache', cache)
+    monkeypatch.setattr(dataset_registry, '_registry', None)
+    return cache
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    """The QApplication for tests of Qt objects (offscreen)."""
+    from PyQt6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def wait_for(qapp):
+    """``wait_for(predicate, timeout=5.0)``: process Qt events until
+    ``predicate()`` is true; returns False if it times out."""
+    def wait(predicate, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            qapp.processEvents()
+            if predicate():
+                return True
+            time.sleep(0.01)
+        return False
+    return wait
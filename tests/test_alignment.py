@@ -0,0 +1,46 @@
+"""Tests for retention-time alignment of comparison runs."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from uiGenerator.models.alignment import align_windows, estimate_shifts
+from uiGenerator.models.compact_run import CompactRun
+
+
+def _run(shift, step=1.0, element='56Fe', seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(0, 1500, step)
+    y = (50 + rng.normal(0, 3, t.size)
+         + 5000 * np.exp(-((t - 400 - shift) / 12) ** 2)
+         + 2000 * np.exp(-((t - 900 - shift) / 25) ** 2))
+    return CompactRun.from_frame(pd.DataFrame({f'Time {element}': t, element: y}))
+
+
+class TestAlignment:
+    """Test suite for estimate_shifts and align_windows."""
+
+    def test_recovers_shifts(self):
+        """Shifts are found to a fraction of a sample, whatever the sampling step."""
+        true = [0.0, 7.3, -12.6, 25.0]
+        runs = [_run(s, step=0.9 if i % 2 else 1.0, seed=i) for i, s in enumerate(true)]
+        np.testing.assert_allclose(estimate_shifts(runs, '56Fe'), true, atol=0.2)
+
+        relative = estimate_shifts(runs, '56Fe', reference=1)
+        np.testing.assert_allclose(relative, np.array(true) - 7.3, atol=0.2)
+
+        # Shifts beyond max_shift are not searched.
+        assert abs(estimate_shifts(runs, '56Fe', max_shift=10)[3]) <= 10
+
+    def test_missing_analyte_and_windows(self):
+        """Runs without the analyte get NaN and keep the reference window."""
+        runs = [_run(0), _run(5.0), _run(0, element='63Cu')]
+        shifts = estimate_shifts(runs, '56Fe')
+        assert np.isnan(shifts[2])
+        windows = align_windows((350.0, 450.0), shifts)
+        assert windows.shape == (3, 2)
+        np.testing.assert_allclose(windows[[0, 2]], [[350, 450], [350, 450]])
+        assert windows[1] == pytest.approx([355, 455], abs=0.2)
+
+        with pytest.raises(ValueError):
+            estimate_shifts(runs, '56Fe', reference=2)
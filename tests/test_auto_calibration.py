@@ -0,0 +1,85 @@
+"""Tests for automatic calibration from a directory of standards."""
+
+import numpy as np
+import pytest
+
+from uiGenerator.models.auto_calibration import integrate_standard, normalize_standards, suggest_window
+from uiGenerator.models.dataset_registry import get_registry
+from uiGenerator.utils.auto_calibration import AutoCalibrationThread
+
+TIME = np.arange(0, 1200, 2.0)  # s
+
+
+def _write_standard(path, conc, indium=1e5):
+    """Run with a 56Fe peak at 8 min scaled by ``conc`` and a flat 115In."""
+    fe = 100 + conc * 1e3 * np.exp(-0.5 * ((TIME - 480) / 20) ** 2)
+    with open(path, 'w') as f:
+        f.write('Time 56Fe,56Fe,Time 115In,115In\n')
+        for t, v in zip(TIME, fe):
+            f.write(f'{t},{v},{t},{indium}\n')
+
+
+class TestAutoCalibration:
+    """Test suite for models.auto_calibration and AutoCalibrationThread."""
+
+    def test_window_and_integration(self, tmp_path):
+        """The window spans the peak; areas and 115In come from one load."""
+        path = str(tmp_path / '50ppb.csv')
+        _write_standard(path, 50, indium=2e5)
+        run = get_registry().load(path).data
+        start, stop = suggest_window(run, ['56Fe', '115In'])
+        assert 6.5 < start < 7.5 and 8.5 < stop < 9.5
+
+        result = integrate_standard(path, ['56Fe'], (6.0, 10.0))
+        assert result['avg_in'] == pytest.approx(2e5)
+        assert result['in_col'] == '115In'
+        peak = 50e3 * 20 * np.sqrt(2 * np.pi)
+        assert result['areas']['56Fe'] == pytest.approx(peak + 100 * 240, rel=1e-4)
+
+    def test_normalize_standards(self):
+        """Areas scale by blank/standard 115In; standards without 115In are skipped."""
+        standards = [
+            {'name': 'Blank', 'filename': 'blank.csv', 'concentration': 0.0,
+             'areas': {'56Fe': 10.0}, 'avg_in': 100.0, 'in_col': '115In'},
+            {'name': 'Std 5', 'filename': '5ppb.csv', 'concentration': 5.0,
+             'areas': {'56Fe': 500.0}, 'avg_in': 50.0, 'in_col': '115In'},
+            {'name': 'Std 10', 'filename': '10ppb.csv', 'concentration': 10.0,
+             'areas': {'56Fe': 900.0}, 'avg_in': None, 'in_col': None},
+            {'name': 'Std 20', 'filename': '20ppb.csv', 'concentration': 20.0,
+             'areas': None, 'avg_in': None, 'in_col': None},
+        ]
+        areas, details = normalize_standards(standards)
+        assert areas == [{'56Fe': 10.0}, {'56Fe': 1000.0}, {'56Fe': 900.0}, None]
+        assert details['blank_name'] == 'Blank' and details['blank_avg_in'] == 100.0
+        assert [r['factor'] for r in details['results']] == [1.0, 2.0]
+        assert details['skipped'] == ['Std 10 (10ppb.csv): no 115In signal']
+
+        standards[0]['avg_in'] = None
+        assert normalize_standards(standards)[1] is None
+
+    def test_thread_in_input_order(self, wait_for, tmp_path):
+        """Results come back in input order; failing files are reported, not fatal."""
+        paths = []
+        for conc in (0, 10, 20):
+            path = tmp_path / f'{conc}ppb.csv'
+            _write_standard(path, conc, indium=1e5 * (1 + conc / 100))
+            paths.append(str(path))
+        bad = tmp_path / 'bad.csv'
+        bad.write_text('no header\n')
+        paths.insert(1, str(bad))
+
+        thread = AutoCalibrationThread(paths, ['56Fe'], (6.0, 10.0), processes=2)
+        progress, finished = [], []
+        thread.standard_done.connect(lambda done, total, path, error: progress.append(done))
+        thread.standards_finished.connect(lambda *args: finished.append(args))
+        thread.start()
+        assert wait_for(lambda: finished, timeout=60)
+        thread.wait()
+
+        results, errors, cancelled = finished[0]
+        assert progress == [1, 2, 3, 4]
+        assert not cancelled
+        assert list(errors) == [str(bad)] and results[1] is None
+        for path, result in zip(paths, results):
+            if result is not None:
+                assert result == integrate_standard(path, ['56Fe'], (6.0, 10.0))
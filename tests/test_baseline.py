@@ -0,0 +1,86 @@
+"""Tests for the baseline models and their per-run cache."""
+
+import csv
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.integrate import trapezoid
+
+from uiGenerator.models.baseline import baseline_model, baseline_trace, model_key
+from uiGenerator.models.compact_run import CompactRun
+from uiGenerator.models.integration import integrator_for
+from uiGenerator.models.peak_table import build_peak_table
+from uiGenerator.models.results import save_integration_csv
+
+
+T = np.arange(0, 1800, 1.0)  # seconds
+DRIFT = 200 + 0.1 * T
+PEAK = 1e4 * np.exp(-((T - 600) / 20) ** 2)
+
+
+def _run():
+    rng = np.random.default_rng(1)
+    return CompactRun.from_frame(pd.DataFrame({
+        'Time 56Fe': T, '56Fe': DRIFT + PEAK + rng.normal(0, 5, T.size),
+    }), 'float64')
+
+
+class TestBaselineModels:
+    """Test suite for models.baseline and RunIntegrator.baselines."""
+
+    @pytest.mark.parametrize('model', [
+        baseline_model('rolling_min'),
+        baseline_model('als'),
+        baseline_model('polynomial', regions=[(1, 8), (12, 25)]),
+    ], ids=['rolling_min', 'als', 'polynomial'])
+    def test_recovers_drifting_baseline(self, model):
+        """Under a drifting background the peak area after subtraction is the peak's."""
+        integrator = integrator_for(_run())
+        window = [(480.0, 720.0)]
+        area = integrator.areas(['56Fe'], window)[0, 0]
+        baseline = integrator.baselines(['56Fe'], window, model)[0, 0]
+        true_peak = trapezoid(PEAK[480:721], T[480:721])
+        assert area - baseline == pytest.approx(true_peak, rel=0.02)
+
+    def test_cached_per_model(self):
+        """Each (analyte, model) curve is built once per run; the trapezoid is unchanged."""
+        run = _run()
+        integrator = integrator_for(run)
+        als = baseline_model('als')
+        curve = integrator.baseline('56Fe', als)
+        assert integrator_for(run).baseline('56Fe', baseline_model('als')) is curve
+        assert integrator.baseline('56Fe', baseline_model('als', p=0.05)) is not curve
+
+        windows = [(100.0, 200.0), (500.0, 700.0)]
+        trapezoid = integrator.baselines(['56Fe'], windows, baseline_model())
+        np.testing.assert_allclose(trapezoid, integrator.baselines(['56Fe'], windows))
+
+        regions = baseline_model('polynomial', regions=[[12, 25], (1, 8)])
+        assert model_key(regions) == model_key(baseline_model('polynomial', regions=[(1, 8), (12, 25)]))
+
+    def test_invalid_models(self):
+        """Unknown methods or parameters and unusable regions are rejected."""
+        with pytest.raises(ValueError):
+            baseline_model('spline')
+        with pytest.raises(ValueError):
+            baseline_model('als', window=10)
+        with pytest.raises(ValueError):
+            baseline_model('als', iterations=0)
+        with pytest.raises(ValueError):
+            baseline_model('polynomial', regions=[(5, 2)])
+        with pytest.raises(ValueError):
+            baseline_trace(T, DRIFT, baseline_model('polynomial'))
+        with pytest.raises(ValueError):
+            baseline_trace(T, DRIFT, baseline_model())
+
+    def test_peak_table_reports_method(self, tmp_path):
+        """Peak tables subtract the model's baseline and name it in the CSV."""
+        table = build_peak_table(
+            [_run()], ['a.csv'], [('Fe', 8.0, 12.0)], ['56Fe'], baseline=baseline_model('als'),
+        )
+        assert table.areas[0, 0, 0] == pytest.approx(trapezoid(PEAK, T), rel=0.02)
+        path = tmp_path / 'out.csv'
+        save_integration_csv(table.results(), str(path))
+        row = next(csv.DictReader(open(path)))
+        assert row['baseline_subtracted'] == 'als'
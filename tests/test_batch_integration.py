@@ -0,0 +1,44 @@
+"""Tests for multi-file integration in worker processes."""
+
+import numpy as np
+
+from uiGenerator.models.batch import integrate_run, integration_settings
+from uiGenerator.utils.batch_integration import BatchIntegrationThread
+
+
+class TestBatchIntegration:
+    """Test suite for BatchIntegrationThread."""
+
+    def test_results_in_selection_order(self, wait_for, write_run, tmp_path):
+        """Records come back in input order; failing files are reported, not fatal."""
+        # Spawned workers find their run cache through the environment.
+        t = np.arange(600)
+        paths = []
+        for i in range(5):
+            path = tmp_path / f'run_{i}.csv'
+            write_run(path, {'56Fe': (i + 1) * (10 + t % 7)}, t)
+            paths.append(str(path))
+        bad = tmp_path / 'bad.csv'
+        bad.write_text('no header\n')
+        paths.insert(2, str(bad))
+
+        settings = integration_settings([('', 1.0, 5.0)], analytes=['56Fe'], named_windows=False)
+        thread = BatchIntegrationThread(paths, settings, processes=2)
+        progress, finished = [], []
+        thread.run_done.connect(lambda done, total, path, error: progress.append(done))
+        thread.batch_finished.connect(lambda *args: finished.append(args))
+        thread.start()
+        assert wait_for(lambda: finished, timeout=60)
+        thread.wait()
+
+        results, errors, cancelled = finished[0]
+        assert progress == [1, 2, 3, 4, 5, 6]
+        assert not cancelled
+        assert list(errors) == [str(bad)]
+        assert list(results.column('file')) == [f'run_{i}.csv' for i in range(5)]
+        assert not results.has_windows
+        expected = [integrate_run(p, settings).results(0)['56Fe']['peak_area']
+                    for p in paths if p != str(bad)]
+        np.testing.assert_allclose(
+            results.metric('peak_area')[:, results.analytes.index('56Fe')], expected,
+        )
@@ -0,0 +1,76 @@
+"""Tests for the vectorized calibration fits."""
+
+import numpy as np
+import pytest
+
+from uiGenerator.models.calibration_fit import concentration, concentrations, fit_calibrations
+
+CONCS = np.array([0.0, 1.0, 5.0, 10.0, 50.0, 100.0])
+
+
+def _reference(x, y, w, powers):
+    """Per-analyte weighted least squares for comparison."""
+    design = np.stack([x ** p for p in powers], axis=1) * np.sqrt(w)[:, None]
+    return np.linalg.lstsq(design, y * np.sqrt(w), rcond=None)[0]
+
+
+class TestFitCalibrations:
+    """Test suite for fit_calibrations."""
+
+    @pytest.mark.parametrize('model, powers', [
+        ('origin', (1,)), ('linear', (0, 1)), ('quadratic', (0, 1, 2)),
+    ])
+    @pytest.mark.parametrize('weighting, weights', [
+        ('none', lambda c: np.ones_like(c)), ('1/x', lambda c: 1 / c), ('1/x2', lambda c: 1 / c ** 2),
+    ])
+    def test_matches_per_analyte_least_squares(self, model, powers, weighting, weights):
+        """Stacked fits equal one least-squares solve per analyte, gaps included."""
+        rng = np.random.default_rng(1)
+        areas = np.c_[
+            CONCS * 2e4 + rng.normal(0, 3e3, 6),
+            CONCS * 5e3 + 30 * CONCS ** 2 + rng.normal(0, 1e3, 6),
+        ]
+        areas[2, 0] = np.nan
+        fits = fit_calibrations(areas, CONCS, ['56Fe', '63Cu'], model, weighting)
+        for j in range(2):
+            used = np.isfinite(areas[:, j]) & (CONCS > 0)
+            beta = _reference(areas[used, j], CONCS[used], weights(CONCS[used]), powers)
+            expected = dict(zip(powers, beta))
+            np.testing.assert_allclose(
+                [fits.intercept[j], fits.slope[j], fits.curvature[j]],
+                [expected.get(0, 0.0), expected[1], expected.get(2, 0.0)], rtol=1e-6, atol=1e-9,
+            )
+        assert list(fits.n) == [4, 5]
+        assert (fits.slope_se > 0).all() and (fits.lod > 0).all()
+        np.testing.assert_allclose(fits.loq / fits.lod, 10 / 3.3)
+
+    def test_statistics_and_evaluation(self):
+        """R², MSE and the curve dict agree with a direct computation."""
+        areas = (CONCS * 1e4 + np.array([0, 50, -80, 120, -300, 200]))[:, None]
+        fits = fit_calibrations(areas, CONCS, ['56Fe'])
+        used = CONCS > 0
+        predicted = fits.slope[0] * areas[used, 0]
+        residuals = CONCS[used] - predicted
+        assert fits.mse[0] == pytest.approx(np.mean(residuals ** 2))
+        total = np.sum((CONCS[used] - CONCS[used].mean()) ** 2)
+        assert fits.r2[0] == pytest.approx(1 - np.sum(residuals ** 2) / total)
+        assert fits.lod[0] == pytest.approx(3.3 * np.sqrt(np.sum(residuals ** 2) / 4))
+
+        curve = fits.curve(0)
+        assert curve['b'] == 0 and 'q' not in curve and curve['model'] == 'origin'
+        assert concentration(curve, 2e5) == pytest.approx(fits.slope[0] * 2e5)
+        np.testing.assert_allclose(
+            concentrations(areas, (fits.slope, fits.intercept, [56.0])), fits.predict(areas),
+        )
+
+    def test_unfittable_analytes(self):
+        """Too few standards or no spread leave NaN; unknown options raise."""
+        areas = np.c_[CONCS * 1e4, np.r_[np.full(5, np.nan), 1e5], np.full(6, 3e4)]
+        fits = fit_calibrations(areas, CONCS, model='linear')
+        assert list(fits.fitted) == [True, False, False]
+        assert np.isnan(fits.lod[1:]).all()
+
+        with pytest.raises(ValueError):
+            fit_calibrations(areas, CONCS, model='cubic')
+        with pytest.raises(ValueError):
+            fit_calibrations(areas, CONCS, weighting='1/y')
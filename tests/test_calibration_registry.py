@@ -0,0 +1,85 @@
+"""Tests for the calibration registry."""
+
+import json
+from datetime import datetime
+import os
+
+from uiGenerator.models.calibration_registry import REGISTRY_FILENAME, CalibrationRegistry
+
+
+def _calib(path, mtime, **curves):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({k: dict(v, m=1e-4, b=0.0) for k, v in curves.items()}, f)
+    os.utime(path, (mtime, mtime))
+
+
+class TestCalibrationRegistry:
+    """Test suite for CalibrationRegistry."""
+
+    def test_index_latest_and_reports(self, tmp_path):
+        """The tree is indexed once; the newest entry and paired reports are tracked."""
+        old = 1_700_000_000
+        stamp = datetime.fromtimestamp(old - 5).strftime('%Y%m%d_%H%M%S')
+        (tmp_path / 'cal').mkdir()
+        (tmp_path / 'cal' / f'calibration_report_{stamp}.pdf').write_bytes(b'%PDF')
+        _calib(str(tmp_path / 'cal' / 'calibration_curve_x.calib'), old, **{'56Fe': {'r2': 0.99}})
+        _calib(str(tmp_path / 'a' / 'b' / 'calibration_curve.calib'), old + 100,
+               **{'56Fe': {'r2': 0.98, 'model': 'linear'}, '63Cu': {'r2': 0.96, 'model': 'linear'}})
+        _calib(str(tmp_path / '.hidden' / 'skip.calib'), old + 200)
+
+        registry = CalibrationRegistry(str(tmp_path))
+        assert sorted(registry.update()) == [
+            os.path.join('a', 'b', 'calibration_curve.calib'),
+            os.path.join('cal', 'calibration_curve_x.calib'),
+        ]
+        name, latest = registry.latest()
+        assert name == os.path.join('a', 'b', 'calibration_curve.calib')
+        assert latest.analytes == ['56Fe', '63Cu'] and latest.model == 'linear'
+        assert abs(latest.mean_r2() - 0.97) < 1e-12
+        old_name = os.path.join('cal', 'calibration_curve_x.calib')
+        assert registry.get(old_name).report == f'calibration_report_{stamp}.pdf'
+        assert [n for n, _ in registry.entries()] == [name, old_name]
+
+        # Unchanged files are not re-read; the sidecar restores the index.
+        assert registry.update() == []
+        assert (tmp_path / REGISTRY_FILENAME).exists()
+        assert CalibrationRegistry(str(tmp_path)).latest()[0] == name
+
+    def test_add_and_remove(self, tmp_path):
+        """Registered files become the latest; deleting the latest falls back."""
+        first = str(tmp_path / 'calibration_curve_1.calib')
+        _calib(first, 1_700_000_000, **{'56Fe': {}})
+        registry = CalibrationRegistry(str(tmp_path))
+        registry.update()
+
+        newer = str(tmp_path / 'calibration_curve.calib')
+        _calib(newer, 1_700_000_500, **{'56Fe': {}})
+        assert registry.add(newer, report='calibration_report_x.pdf') == 'calibration_curve.calib'
+        assert registry.latest()[0] == 'calibration_curve.calib'
+        assert registry.report_path('calibration_curve.calib') == str(tmp_path / 'calibration_report_x.pdf')
+
+        os.remove(newer)
+        assert registry.update([newer]) == ['calibration_curve.calib']
+        assert registry.latest()[0] == 'calibration_curve_1.calib'
+
+    def test_changed_only_for_calib_files_and_folders(self, tmp_path):
+        """The sidecar and other files do not ask for a walk; .calib files and folders do."""
+        _calib(str(tmp_path / 'calibration_curve.calib'), 1_700_000_000, **{'56Fe': {}})
+        registry = CalibrationRegistry(str(tmp_path))
+        assert registry.changed()
+        registry.update()
+        assert (tmp_path / REGISTRY_FILENAME).exists() and not registry.changed()
+
+        (tmp_path / 'run.csv').write_text('')
+        (tmp_path / '.hidden').mkdir()
+        assert not registry.changed()
+        _calib(str(tmp_path / 'copied.calib'), 1_700_000_100, **{'56Fe': {}})
+        assert registry.changed()
+        registry.update()
+        (tmp_path / 'day2').mkdir()
+        assert registry.changed()
+        registry.update()
+        # Replaced under the same name.
+        _calib(str(tmp_path / 'copied.calib'), 1_700_000_200, **{'56Fe': {}})
+        assert registry.changed()
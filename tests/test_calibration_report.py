@@ -0,0 +1,42 @@
+"""Tests for the page-by-page calibration PDF report."""
+
+import numpy as np
+from pypdf import PdfReader
+
+from uiGenerator.models.calibration_fit import fit_calibrations
+from uiGenerator.models.calibration_report import (
+    build_report, render_job, report_data, report_pages,
+)
+
+
+def _report(in_norm=None):
+    concs = np.array([0.0, 1.0, 10.0, 100.0])
+    areas = np.c_[concs * 2e4 + 40, concs * 5e3]
+    fits = fit_calibrations(areas[1:], concs[1:], ['56Fe', '63Cu'], 'linear', '1/x')
+    rows = [(m, fits.curve(j), areas[1:, j], concs[1:], 0.0) for j, m in enumerate(fits.analytes)]
+    return report_data(rows, len(concs), 'linear', '1/x', blank_name='Blank', in_norm=in_norm)
+
+
+class TestCalibrationReport:
+    """Test suite for report pages and PDF assembly."""
+
+    def test_pages(self):
+        """Summary, optional normalization page, then one page per element."""
+        assert report_pages(_report()) == [('summary', None), ('element', 0), ('element', 1)]
+        in_norm = {'blank_name': 'Blank', 'blank_avg_in': 1e5, 'results': [
+            {'name': 'Blank', 'is_blank': True, 'avg_in': 1e5, 'factor': 1.0},
+        ]}
+        assert report_pages(_report(in_norm))[1] == ('normalization', None)
+
+        index, pdf, error = render_job((3, _report(), ('element', 1)))
+        assert (index, error) == (3, None) and pdf.startswith(b'%PDF')
+        assert render_job((0, _report(), ('element', 5)))[2].startswith('IndexError')
+
+    def test_build_report(self, tmp_path):
+        """Vector pages are merged into one PDF, moved into place when complete."""
+        path = str(tmp_path / 'report.pdf')
+        assert build_report(_report(), path) == path
+        pages = PdfReader(path).pages
+        assert len(pages) == 3
+        assert 'Calibration Report' in pages[0].extract_text()
+        assert not (tmp_path / 'report.pdf.part').exists()
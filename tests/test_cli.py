@@ -0,0 +1,55 @@
+"""Tests for the headless batch integration command."""
+
+import csv
+import json
+
+import numpy as np
+import pytest
+
+from uiGenerator.cli import find_runs, main, parse_window
+from uiGenerator.models.integration import CumulativeTrace
+
+
+class TestCli:
+    """Test suite for `lcicpms-ui integrate`."""
+
+    def test_parse_window(self):
+        """Windows are [NAME=]START,STOP in minutes."""
+        assert parse_window('Fe peak=1.5,2.5') == ('Fe peak', 1.5, 2.5)
+        assert parse_window('3,5') == ('3-5', 3.0, 5.0)
+        with pytest.raises(Exception):
+            parse_window('3-5')
+
+    def test_find_runs(self, tmp_path):
+        """Directories, globs and files are expanded in order without duplicates."""
+        for name in ('b.csv', 'a.csv', 'notes.txt'):
+            (tmp_path / name).write_text('')
+        runs = find_runs([str(tmp_path), str(tmp_path / '*.csv'), str(tmp_path / 'a.csv')])
+        assert runs == [str(tmp_path / 'a.csv'), str(tmp_path / 'b.csv')]
+
+    def test_integrate_directory(self, write_run, tmp_path):
+        """The pool writes the Save Integration layout with the GUI's math."""
+        runs = tmp_path / 'runs'
+        runs.mkdir()
+        t = np.arange(0, 600, 1.0)
+        traces = []
+        for name, scale in (('r1.csv', 1.0), ('r2.csv', 2.0)):
+            fe = scale * (10 + 1000 * np.exp(-((t - 120) / 10) ** 2))
+            write_run(runs / name, {'56Fe': fe, '115In': np.full_like(t, 1000.0 * scale)}, t)
+            traces.append(fe)
+        calib = tmp_path / 'cal.calib'
+        calib.write_text(json.dumps({'56Fe': {'m': 0.01, 'b': 1.0}}))
+        output = tmp_path / 'out.csv'
+
+        status = main([
+            'integrate', str(runs), '-w', 'Fe=1.5,2.5', '--calib', str(calib),
+            '--indium-average', '1000', '-o', str(output), '-j', '2',
+        ])
+        assert status == 0
+        rows = list(csv.DictReader(open(output)))
+        assert [(r['file'], r['window']) for r in rows] == [('r1.csv', 'Fe'), ('r2.csv', 'Fe')]
+        for row, fe, corr in zip(rows, traces, (1.0, 2.0)):
+            area = float(CumulativeTrace(t, fe).area(90, 150)) / corr
+            assert float(row['115In_correction']) == corr
+            assert float(row['56Fe_peak_area']) == pytest.approx(area, abs=0.1)
+            assert float(row['56Fe_ppb']) == pytest.approx(0.01 * area + 1.0, abs=1e-3)
@@ -0,0 +1,71 @@
+"""Tests for the compact run representation."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from uiGenerator.models.compact_run import CompactRun, trace
+
+
+def _frame(n=200):
+    t = np.arange(n, dtype=float) * 0.25
+    return pd.DataFrame({
+        'Time 56Fe': t,
+        '56Fe': np.linspace(0, 1, n),
+        'Time 63Cu': t,                 # identical axis
+        '63Cu': np.linspace(1, 2, n),
+        'Time 66Zn': t + 0.0125,        # constant dwell offset
+        '66Zn': np.linspace(2, 3, n),
+        'Time 111Cd': t * 1.5,          # genuinely different axis
+        '111Cd': np.linspace(3, 4, n),
+    })
+
+
+class TestCompactRun:
+    """Test suite for CompactRun."""
+
+    def test_time_axes_are_shared(self):
+        """Identical and offset time columns share one stored base."""
+        df = _frame()
+        run = CompactRun.from_frame(df)
+
+        assert run.n_time_bases == 2
+        assert run.nbytes < df.memory_usage(index=False).sum()
+        assert list(run.columns) == list(df.columns)
+        assert run.shape == df.shape
+
+    def test_columns_round_trip(self):
+        """Every column reads back equal to the original."""
+        df = _frame()
+        run = CompactRun.from_frame(df)
+        for col in df.columns:
+            np.testing.assert_allclose(run[col], df[col], rtol=0, atol=1e-9)
+        pd.testing.assert_frame_equal(run.to_frame(), df, check_exact=False)
+
+    def test_arrays_are_read_only(self):
+        """Shared arrays cannot be modified through the run."""
+        run = CompactRun.from_frame(_frame())
+        t, s = trace(run, '56Fe')
+        with pytest.raises(ValueError):
+            s[0] = 5
+        with pytest.raises(ValueError):
+            t[0] = 5
+
+    def test_nan_padding_must_match(self):
+        """A time column with different NaN padding gets its own base."""
+        df = _frame(10)
+        df.loc[8:, 'Time 63Cu'] = np.nan
+        run = CompactRun.from_frame(df)
+        assert run.n_time_bases == 3
+        assert np.isnan(run['Time 63Cu'].iloc[9])
+
+    def test_merged_adds_columns_in_header_order(self):
+        """Merging keeps existing arrays and orders columns by the header."""
+        df = _frame()
+        first = CompactRun.from_frame(df[['Time 63Cu', '63Cu']])
+        second = CompactRun.from_frame(df[['Time 56Fe', '56Fe']])
+        merged = first.merged(second, order=list(df.columns))
+
+        assert list(merged.columns) == ['Time 56Fe', '56Fe', 'Time 63Cu', '63Cu']
+        assert merged.n_time_bases == 1
+        assert '56Fe' not in first
@@ -39,3 +39,100 @@ Time 56Fe;56Fe;Time 60Ni;60Ni
 
         with pytest.raises(FileNotFoundError):
             processor.importData_generic("/nonexistent/file.csv")
+
+    @pytest.mark.parametrize('storage', ['float32', 'counts'])
+    def test_integrate_narrow_storage_matches_float64(self, storage):
+        """Peak areas from float32 / uint32 storage match float64 storage."""
+        from uiGenerator.models.compact_run import CompactRun
+
+        t = np.arange(4000, dtype=float) * 0.5
+        rng = np.random.default_rng(0)
+        peak = 2.5e5 * np.exp(-((t - 900.0) / 40.0) ** 2)
+        df = pd.DataFrame({
+            'Time 56Fe': t,
+            '56Fe': peak + rng.uniform(50, 60, t.size),           # fractional cps
+            'Time 63Cu': t + 0.05,
+            '63Cu': np.round(peak * 0.3 + rng.integers(0, 20, t.size)),  # whole counts
+        })
+        view = Mock(
+            activeElements=['56Fe', '63Cu'], normAvIndium=-999.99,
+            baseSubtract=True, baselineModel=None, calCurves={}, masses={},
+            internalStandard={'isotope': '115In', 'window': 60.0},
+        )
+        processor = LICPMSfunctions(view=view)
+
+        reference = processor.integrate(
+            (10, 20), has_calibration=False,
+            data=CompactRun.from_frame(df, 'float64'), filename='run.csv',
+        ).results(0)
+        narrow_run = CompactRun.from_frame(df, storage)
+        narrow = processor.integrate(
+            (10, 20), has_calibration=False, data=narrow_run, filename='run.csv',
+        ).results(0)
+
+        assert narrow_run.signal('56Fe').dtype == np.float32
+        expected_cu = np.uint32 if storage == 'counts' else np.float32
+        assert narrow_run.signal('63Cu').dtype == expected_cu
+        for element in ('56Fe', '63Cu'):
+            assert narrow[element]['peak_area'] == pytest.approx(
+                reference[element]['peak_area'], rel=1e-6,
+            )
+
+    def test_live_results_match_integrate(self):
+        """The drag readout reports the same areas and concentrations as integrate()."""
+        from uiGenerator.models.compact_run import CompactRun
+
+        t = np.arange(3000, dtype=float) * 0.5
+        df = pd.DataFrame({
+            'Time 56Fe': t,
+            '56Fe': 1e5 * np.exp(-((t - 700.0) / 30.0) ** 2) + 40.0,
+            'Time 115In | 115In': t,
+            '115In | 115In': np.full(t.size, 1000.0),
+        })
+        view = Mock(
+            activeElements=['56Fe', '115In | 115In'], normAvIndium=800.0,
+            baseSubtract=True, baselineModel=None, calCurves={'56Fe': {'m': 2e-5, 'b': 0.1}}, masses={},
+            internalStandard={'isotope': '115In', 'window': 60.0},
+        )
+        processor = LICPMSfunctions(view=view)
+        processor._data = CompactRun.from_frame(df)
+
+        recorded = processor.integrate(
+            (10, 14), has_calibration=True, data=processor._data, filename='run.csv',
+        ).results(0)
+        live = processor.liveResults((10, 14))
+
+        assert list(live) == ['56Fe']
+        for key in ('peak_area', 'conc_ppb', 'conc_uM', 'baseline_area'):
+            assert live['56Fe'][key] == pytest.approx(recorded['56Fe'][key])
+
+    def test_requantify_matches_integrate(self):
+        """Re-quantifying stored results gives what integrating with the new curve gives."""
+        from uiGenerator.models.compact_run import CompactRun
+
+        t = np.arange(3000, dtype=float) * 0.5
+        df = pd.DataFrame({
+            'Time 56Fe': t,
+            '56Fe': 1e5 * np.exp(-((t - 700.0) / 30.0) ** 2) + 40.0,
+            'Time 63Cu': t,
+            '63Cu': 5e4 * np.exp(-((t - 720.0) / 30.0) ** 2) + 10.0,
+        })
+        view = Mock(
+            activeElements=['56Fe', '63Cu'], normAvIndium=-999.99,
+            baseSubtract=True, baselineModel=None, calCurves={}, masses={},
+            internalStandard={'isotope': '115In', 'window': 60.0},
+        )
+        processor = LICPMSfunctions(view=view)
+        run = CompactRun.from_frame(df)
+        stored = processor.integrate((10, 14), has_calibration=False, data=run, filename='run.csv')
+        assert not stored.has_calibration
+
+        view.calCurves = {'56Fe': {'m': 2e-5, 'b': 0.1}}
+        requantified = processor.requantify(stored)
+        fresh = processor.integrate((10, 14), has_calibration=True, data=run, filename='run.csv')
+        np.testing.assert_allclose(requantified.values, fresh.values)
+        assert requantified.has_calibration
+        assert requantified.results(0)['63Cu']['conc_ppb'] is None
+
+        view.calCurves = {}
+        assert np.isnan(processor.requantify(requantified).metric('conc_ppb')).all()
@@ -0,0 +1,81 @@
+"""Tests for the session-wide dataset registry."""
+
+import os
+
+import numpy as np
+
+from uiGenerator.models import dataset_registry
+from uiGenerator.models.dataset_registry import DatasetRegistry
+
+
+class TestDatasetRegistry:
+    """Test suite for DatasetRegistry."""
+
+    def test_same_path_parsed_once(self, write_run, tmp_path, monkeypatch):
+        """Repeated loads of an unchanged file share one parsed run."""
+        src = tmp_path / 'run.csv'
+        write_run(src, {'56Fe': np.ones(100)}, np.arange(100.0))
+        calls = []
+        real_load = dataset_registry.load_run
+
+        def counting_load(path, **kwargs):
+            calls.append(path)
+            return real_load(path, **kwargs)
+
+        monkeypatch.setattr(dataset_registry, 'load_run', counting_load)
+        registry = DatasetRegistry()
+        first = registry.load(str(src))
+        second = registry.load(os.path.join(str(tmp_path), '.', 'run.csv'))
+
+        assert first is second
+        assert len(calls) == 1
+
+    def test_changed_file_is_reloaded(self, write_run, tmp_path):
+        """A file modified on disk is re-parsed on the next load."""
+        src = tmp_path / 'run.csv'
+        write_run(src, {'56Fe': np.ones(100)}, np.arange(100.0))
+        registry = DatasetRegistry()
+        first = registry.load(str(src))
+
+        write_run(src, {'56Fe': np.ones(120)}, np.arange(120.0))
+        st = os.stat(src)
+        os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        second = registry.load(str(src))
+
+        assert second is not first
+        assert len(second.raw_data_df) == 120
+
+    def test_lru_eviction_under_budget(self, write_run, tmp_path):
+        """The least recently used run is dropped once over budget."""
+        paths = []
+        for i in range(3):
+            src = tmp_path / f'run_{i}.csv'
+            write_run(src, {'56Fe': np.ones(100)}, np.arange(100.0))
+            paths.append(str(src))
+
+        registry = DatasetRegistry()
+        one_run = dataset_registry.run_nbytes(registry.load(paths[0]))
+        registry.configure(max_bytes=2 * one_run)
+        registry.load(paths[1])
+        registry.load(paths[0])  # paths[1] is now least recently used
+        registry.load(paths[2])
+
+        assert paths[0] in registry
+        assert paths[2] in registry
+        assert paths[1] not in registry
+
+    def test_projected_load_merges_columns_lazily(self, write_run, tmp_path):
+        """Asking for more analytes parses only the missing columns."""
+        src = tmp_path / 'run.csv'
+        write_run(src, {'56Fe': np.ones(10), '63Cu': np.zeros(10)}, np.arange(10.0))
+        registry = DatasetRegistry()
+
+        first = registry.load(str(src), analytes=['56Fe'])
+        assert first.loaded == ['56Fe']
+        assert '63Cu' not in first.raw_data_df.columns
+        assert registry.load(str(src), analytes=['56Fe']) is first
+
+        second = registry.load(str(src), analytes=['63Cu'])
+        assert second.loaded == ['56Fe', '63Cu']
+        assert second.elements == ['56Fe', '63Cu']
+        assert registry.load(str(src)).is_complete
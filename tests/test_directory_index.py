@@ -0,0 +1,91 @@
+"""Tests for the per-directory run metadata index."""
+
+import os
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from uiGenerator.models import directory_index
+from uiGenerator.models.directory_index import (
+    INDEX_FILENAME, DirectoryIndex, element_symbol, summarize_run,
+)
+
+
+def _signals(analytes=('56Fe', '115In'), n=5):
+    """Signals and per-analyte times for ``write_run``: analyte j counts up
+    from 100 * (j + 1) every 0.5 s, its times offset by 0.01 * j s."""
+    i = np.arange(n)
+    signals = {a: 100 * (j + 1) + i for j, a in enumerate(analytes)}
+    times = {a: np.round(0.5 * i + 0.01 * j, 2) for j, a in enumerate(analytes)}
+    return signals, times
+
+
+class TestDirectoryIndex:
+    """Test suite for DirectoryIndex and summarize_run."""
+
+    def test_summarize_run_reads_header_and_tail(self, write_run, tmp_path):
+        """Analytes, sample count, duration, timestamp and mean 115In."""
+        src = tmp_path / 'run_1.csv'
+        write_run(src, *_signals(n=5), stamp='2025-03-04 10:11:12')
+        summary = summarize_run(str(src))
+
+        assert summary.analytes == ['56Fe', '115In']
+        assert summary.n_samples == 5
+        assert summary.duration == pytest.approx(2.0)
+        assert summary.acquired == datetime(2025, 3, 4, 10, 11, 12).timestamp()
+        assert summary.mean_115in == pytest.approx(202.0)
+
+    def test_summarize_run_without_indium_or_timestamp(self, write_run, tmp_path):
+        """Missing 115In gives None; the acquisition time falls back to mtime."""
+        src = tmp_path / 'run.csv'
+        write_run(src, *_signals(analytes=('63Cu',), n=3))
+        summary = summarize_run(str(src))
+
+        assert summary.mean_115in is None
+        assert summary.acquired == os.stat(src).st_mtime
+        # Without 115In the count comes from the sampling interval alone.
+        assert summary.n_samples == 3
+        assert summary.duration == pytest.approx(1.0)
+
+    def test_update_is_incremental_and_persisted(self, write_run, tmp_path, monkeypatch):
+        """Only new or changed files are summarised; the sidecar survives reloads."""
+        write_run(tmp_path / 'a.csv', *_signals(analytes=('56Fe',)))
+        write_run(tmp_path / 'b.csv', *_signals(analytes=('63Cu', '115In')))
+        (tmp_path / 'notes.txt').write_text('x')
+        index = DirectoryIndex(str(tmp_path))
+        assert sorted(index.update()) == ['a.csv', 'b.csv']
+        assert (tmp_path / INDEX_FILENAME).exists()
+
+        calls = []
+        real = directory_index.summarize_run
+        monkeypatch.setattr(directory_index, 'summarize_run',
+                            lambda p: calls.append(os.path.basename(p)) or real(p))
+        reloaded = DirectoryIndex(str(tmp_path))
+        assert reloaded.get('a.csv').analytes == ['56Fe']
+        assert reloaded.update() == []
+
+        write_run(tmp_path / 'a.csv', *_signals(analytes=('56Fe',), n=8))
+        os.remove(tmp_path / 'b.csv')
+        assert sorted(reloaded.update()) == ['a.csv', 'b.csv']
+        assert calls == ['a.csv']
+        assert reloaded.get('a.csv').n_samples == 8
+        assert 'b.csv' not in reloaded
+
+    def test_queries(self, write_run, tmp_path):
+        """Analyte counts, per-element grouping, filtering and sort keys."""
+        write_run(tmp_path / 'a.csv', *_signals(analytes=('56Fe', '115In')), stamp='2025-01-02 00:00:00')
+        write_run(tmp_path / 'b.csv', *_signals(analytes=('56Fe | 56Fe.16O',)), stamp='2025-01-01 00:00:00')
+        index = DirectoryIndex(str(tmp_path))
+        index.update()
+
+        assert index.analyte_counts() == {'56Fe': 1, '115In': 1, '56Fe | 56Fe.16O': 1}
+        assert index.analytes_by_element() == {
+            'In': ['115In'], 'Fe': ['56Fe', '56Fe | 56Fe.16O'],
+        }
+        assert sorted(index.runs_with('56Fe')) == ['a.csv', 'b.csv']
+        assert index.runs_with('115In') == ['a.csv']
+        assert sorted(['a.csv', 'c.csv', 'b.csv'], key=index.sort_key('acquired')) == [
+            'b.csv', 'a.csv', 'c.csv',
+        ]
+        assert element_symbol('238U | 238U.16O2') == 'U'
@@ -0,0 +1,104 @@
+"""Tests for the background directory listing."""
+
+import os
+
+from PyQt6.QtWidgets import QListWidget
+
+from uiGenerator.utils.directory_scanner import DirectoryListing
+
+
+def _names(listwidget):
+    return [listwidget.item(i).text() for i in range(listwidget.count())]
+
+
+class TestDirectoryListing:
+    """Test suite for DirectoryListing."""
+
+    def test_lists_matching_files_in_order(self, wait_for, tmp_path):
+        """Batches from the scan thread end up sorted, non-matching names skipped."""
+        for name in ['b.csv', 'a.csv', 'c.txt', 'run_10.csv', 'run_2.csv']:
+            (tmp_path / name).write_text('x')
+        listwidget = QListWidget()
+        listing = DirectoryListing(listwidget, match=lambda n: '.csv' in n, batch_size=2)
+        finished = []
+        listing.scan_finished.connect(finished.append)
+
+        listing.setDirectory(str(tmp_path))
+        assert wait_for(lambda: finished)
+        assert _names(listwidget) == ['a.csv', 'b.csv', 'run_10.csv', 'run_2.csv']
+        assert finished == [4]
+
+        listing.setSortKey(lambda n: (len(n), n))
+        assert _names(listwidget) == ['a.csv', 'b.csv', 'run_2.csv', 'run_10.csv']
+        listing.stop()
+
+    def test_rescan_applies_only_differences(self, wait_for, tmp_path):
+        """Added and removed files are inserted / taken without a rebuild."""
+        for name in ['a.csv', 'b.csv']:
+            (tmp_path / name).write_text('x')
+        listwidget = QListWidget()
+        listing = DirectoryListing(listwidget, match=lambda n: n.endswith('.csv'))
+        listing.setDirectory(str(tmp_path))
+        assert wait_for(lambda: listwidget.count() == 2)
+        kept = listwidget.item(0)
+        added, removed = [], []
+        listing.files_added.connect(added.extend)
+        listing.files_removed.connect(removed.extend)
+
+        (tmp_path / 'c.csv').write_text('x')
+        os.remove(tmp_path / 'b.csv')
+        listing.rescan()
+        assert wait_for(lambda: added and removed)
+
+        assert _names(listwidget) == ['a.csv', 'c.csv']
+        assert listwidget.item(0) is kept
+        assert added == ['c.csv'] and removed == ['b.csv']
+        listing.stop()
+
+    def test_watcher_reports_changes_to_unlisted_files(self, wait_for, tmp_path):
+        """Files the list does not show still signal a directory change."""
+        listwidget = QListWidget()
+        listing = DirectoryListing(listwidget, match=lambda n: n.endswith('.csv'))
+        finished, changed = [], []
+        listing.scan_finished.connect(finished.append)
+        listing.directory_changed.connect(lambda: changed.append(True))
+        listing.setDirectory(str(tmp_path))
+        assert wait_for(lambda: finished)
+
+        (tmp_path / 'calibration_curve.calib').write_text('{}')
+        assert wait_for(lambda: changed)
+        assert listwidget.count() == 0
+        listing.stop()
+
+    def test_tooltip_is_lazy_and_select_finds_item(self, wait_for, tmp_path):
+        """Items carry no tooltip until hovered; select() makes a listed name current."""
+        (tmp_path / 'a.csv').write_text('x' * 2048)
+        listwidget = QListWidget()
+        listing = DirectoryListing(listwidget, match=lambda n: n.endswith('.csv'))
+        listing.setDirectory(str(tmp_path))
+        assert wait_for(lambda: listwidget.count() == 1)
+        assert listwidget.item(0).toolTip() == ''
+
+        listing.select('a.csv')
+        assert listwidget.currentRow() == 0
+        listing.stop()
+
+    def test_filter_hides_items_including_later_ones(self, wait_for, tmp_path):
+        """setFilter hides non-matching names, also for files listed afterwards."""
+        for name in ['a.csv', 'b.csv']:
+            (tmp_path / name).write_text('x')
+        listwidget = QListWidget()
+        listing = DirectoryListing(listwidget, match=lambda n: n.endswith('.csv'))
+        listing.setDirectory(str(tmp_path))
+        assert wait_for(lambda: listwidget.count() == 2)
+
+        listing.setFilter(lambda n: n != 'b.csv')
+        (tmp_path / 'c.csv').write_text('x')
+        listing.rescan()
+        assert wait_for(lambda: listwidget.count() == 3)
+        hidden = [listwidget.item(i).isHidden() for i in range(3)]
+        assert hidden == [False, True, False]
+
+        listing.setFilter(None)
+        assert not any(listwidget.item(i).isHidden() for i in range(3))
+        listing.stop()
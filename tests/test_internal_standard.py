@@ -0,0 +1,73 @@
+"""Tests for the time-resolved internal-standard correction."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.integrate import trapezoid
+
+from uiGenerator.models.compact_run import CompactRun
+from uiGenerator.models.integration import integrator_for
+from uiGenerator.models.internal_standard import drift_correction, internal_standard
+from uiGenerator.models.peak_table import build_peak_table
+
+T = np.arange(0, 1800, 0.5)
+# Sensitivity rises by half over the run; the standard and analytes follow it.
+DRIFT = 1 + 0.5 * T / T[-1]
+
+
+def _peak(apex):
+    return 4e4 * np.exp(-((T - apex) / 20) ** 2)
+
+
+def _run(isotope='115In', seed=0):
+    rng = np.random.default_rng(seed)
+    return CompactRun.from_frame(pd.DataFrame({
+        'Time 56Fe': T,
+        '56Fe': DRIFT * (_peak(300) + _peak(1500)),
+        'Time 63Cu': T,
+        '63Cu': DRIFT * _peak(900),
+        f'Time {isotope}': T,
+        isotope: 2000 * DRIFT + rng.normal(0, 40, T.size),
+    }))
+
+
+class TestInternalStandard:
+    """Test suite for drift_correction and corrected integration."""
+
+    def test_corrects_drift(self):
+        """Equal peaks early and late in a drifting run integrate equally."""
+        run = _run()
+        standard = internal_standard(2000.0)
+        windows = [(200, 400), (1400, 1600)]
+        true = trapezoid(_peak(300), T)
+
+        integrator = integrator_for(run)
+        raw = integrator.areas(['56Fe'], windows)[:, 0]
+        corrected = integrator.areas(['56Fe'], windows, standard)[:, 0]
+        assert raw[1] / raw[0] == pytest.approx(DRIFT[3000] / DRIFT[600], rel=0.01)
+        np.testing.assert_allclose(corrected, true, rtol=0.01)
+        np.testing.assert_allclose(
+            integrator.corrections(windows, standard), DRIFT[[600, 3000]], rtol=0.01,
+        )
+
+        # Built once per run and settings; uncorrected integrals are kept.
+        assert integrator.correction(standard) is integrator.correction(internal_standard(2000.0))
+        assert integrator.correction(internal_standard(1000.0)) is not integrator.correction(standard)
+        np.testing.assert_array_equal(integrator.areas(['56Fe'], windows)[:, 0], raw)
+
+    def test_any_isotope_and_missing_standard(self):
+        """Any isotope can be the standard; runs without it stay uncorrected."""
+        run = _run(isotope='103Rh')
+        assert drift_correction(run, internal_standard(2000.0)) is None
+        rhodium = internal_standard(2000.0, isotope='103Rh', window=30.0)
+        assert drift_correction(run, rhodium) is not None
+
+        table = build_peak_table(
+            [run, _run(isotope='103Rh', seed=1)], ['a.csv', 'b.csv'],
+            [('Cu', 13.0, 17.0)], ['63Cu'], internal_standard=rhodium,
+        )
+        np.testing.assert_allclose(table.areas[..., 0], trapezoid(_peak(900), T), rtol=0.01)
+        np.testing.assert_allclose(table.corrections, DRIFT[1800], rtol=0.01)
+
+        with pytest.raises(ValueError):
+            internal_standard(0.0)
@@ -0,0 +1,71 @@
+"""Tests for prominence-based peak detection."""
+
+import numpy as np
+import pandas as pd
+from unittest.mock import Mock
+
+from uiGenerator.models.calibration import CalibrateFunctions
+from uiGenerator.models.compact_run import CompactRun
+from uiGenerator.models.integration import integrator_for
+from uiGenerator.models.peak_detection import detect_peaks, find_trace_peaks, peak_windows
+
+
+def _gauss(t, apex, width, height):
+    return height * np.exp(-((t - apex) / width) ** 2)
+
+
+def _run(seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(0, 1800, 0.5)
+    fe = (100 + rng.normal(0, 5, len(t)) + _gauss(t, 300, 15, 5000)
+          + _gauss(t, 345, 10, 800) + _gauss(t, 900, 30, 3000) + _gauss(t, 1500, 20, 30))
+    cu = 50 + rng.normal(0, 3, len(t)) + _gauss(t, 910, 20, 900)
+    return CompactRun.from_frame(pd.DataFrame({
+        'Time 56Fe': t, '56Fe': fe, 'Time 63Cu': t, '63Cu': cu,
+    }))
+
+
+class TestPeakDetection:
+    """Test suite for find_trace_peaks, detect_peaks and peak_windows."""
+
+    def test_finds_significant_peaks_only(self):
+        """Peaks above the S/N threshold are found with ordered, disjoint bounds."""
+        run = _run()
+        found = find_trace_peaks(run['Time 56Fe'], run['56Fe'])
+        np.testing.assert_allclose(found['apex'], [5.0, 5.75, 15.0], atol=0.05)
+        assert (found['start'] < found['apex']).all() and (found['apex'] < found['stop']).all()
+        assert (found['start'][1:] >= found['stop'][:-1]).all()
+        assert found['snr'][0] > found['snr'][2] > found['snr'][1] > 10
+
+        flat = np.random.default_rng(1).normal(100, 5, 2000)
+        assert len(find_trace_peaks(np.arange(2000.0), flat)['apex']) == 0
+
+    def test_windows_merge_coeluting_peaks(self):
+        """Overlapping peaks of different analytes share one window."""
+        detected = detect_peaks(_run(), ['56Fe', '63Cu', '208Pb'])
+        assert set(detected) == {'56Fe', '63Cu'}
+        windows = peak_windows(detected)
+        assert [name for name, _, _ in windows] == [
+            'peak 1 @ 5.00 min', 'peak 2 @ 5.75 min', 'peak 3 @ 15.00 min',
+        ]
+        cu = detected['63Cu'][0]
+        fe = detected['56Fe'][2]
+        assert windows[2][1:] == (min(cu.start, fe.start), max(cu.stop, fe.stop))
+
+    def test_calibration_integrates_each_elements_peaks(self, tmp_path):
+        """integratePeaks sums each element's areas over its own peak bounds."""
+        run = _run()
+        calview = Mock(elements_in_stdfile=['56Fe', '63Cu'], calibrationDir=str(tmp_path))
+        cal = CalibrateFunctions(calview=calview, mainview=Mock())
+        cal._data = run
+        detected = cal.integratePeaks()
+
+        integrator = integrator_for(run)
+        for element in ('56Fe', '63Cu'):
+            windows = [(p.start * 60, p.stop * 60) for p in detected[element]]
+            expected = integrator.areas([element], windows)[:, 0].sum()
+            assert calview.n_area[element] == expected
+        assert (tmp_path / 'calibration_areas.txt').exists()
+
+        start, stop = cal.suggestIntegrationRange()
+        assert start < 5.0 and 15.0 < stop
@@ -0,0 +1,96 @@
+"""Tests for peak-table integration and the wide/long integration export."""
+
+import csv
+
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import Mock
+
+from uiGenerator.models.compact_run import CompactRun
+from uiGenerator.models.data_processor import LICPMSfunctions
+from uiGenerator.models.peak_table import build_peak_table, read_peak_windows
+
+
+def _run(scale=1.0, copper=True):
+    t = np.arange(0, 600, 1.0)  # seconds
+    columns = {'Time 56Fe': t, '56Fe': scale * (10 + 1000 * np.exp(-((t - 120) / 10) ** 2))}
+    if copper:
+        columns['Time 63Cu'] = t
+        columns['63Cu'] = scale * (5 + 500 * np.exp(-((t - 300) / 15) ** 2))
+    return CompactRun.from_frame(pd.DataFrame(columns))
+
+
+class TestPeakTable:
+    """Test suite for build_peak_table and saveIntegration layouts."""
+
+    def test_read_peak_windows(self, tmp_path):
+        """Header rows are skipped and malformed rows are rejected."""
+        path = tmp_path / 'windows.csv'
+        path.write_text('name,start,stop\nFe peak,1.5,2.5\n\nCu peak,4,6\n')
+        assert read_peak_windows(path) == [('Fe peak', 1.5, 2.5), ('Cu peak', 4.0, 6.0)]
+
+        path.write_text('Fe peak,1.5,2.5\nCu peak,four,6\n')
+        with pytest.raises(ValueError):
+            read_peak_windows(path)
+
+    def test_matches_single_window_integration(self):
+        """Every cell equals the area a one-window integration gives."""
+        runs = [_run(), _run(scale=2.0, copper=False)]
+        windows = [('Fe', 1.5, 2.5), ('Cu', 4.0, 6.0), ('all', 0.0, 9.0)]
+        analytes = ['56Fe', '63Cu']
+        table = build_peak_table(
+            runs, ['a.csv', 'b.csv'], windows, analytes,
+            corrections=[1.0, 2.0], baseline=True,
+            calibration=([0.5, np.nan], [1.0, np.nan], [56.0, 63.0]),
+        )
+        assert table.shape == (2, 3, 2)
+
+        view = Mock(activeElements=analytes, baseSubtract=True, baselineModel=None, normAvIndium=-999.99,
+                    calCurves={}, masses={},
+                    internalStandard={'isotope': '115In', 'window': 60.0})
+        processor = LICPMSfunctions(view=view)
+        for f, run in enumerate(runs):
+            for w, (_, start, stop) in enumerate(windows):
+                live = processor.liveResults((start, stop), data=run)
+                for a, analyte in enumerate(analytes):
+                    if analyte not in live:
+                        assert np.isnan(table.areas[f, w, a])
+                        continue
+                    expected = live[analyte]['peak_area'] / [1.0, 2.0][f]
+                    assert table.areas[f, w, a] == pytest.approx(expected)
+
+        np.testing.assert_allclose(table.conc_ppb[..., 0], 0.5 * table.areas[..., 0] + 1.0)
+        np.testing.assert_allclose(table.conc_uM[..., 0], table.conc_ppb[..., 0] / 56.0)
+        assert np.isnan(table.conc_ppb[..., 1]).all()
+
+        results = table.results()
+        assert results.labels()[:2] == ['a.csv · Fe', 'a.csv · Cu']
+        assert '63Cu' not in results.results(3)
+        assert np.isnan(results.metric('peak_area')[3, 1])
+
+    def test_save_wide_and_long(self, tmp_path):
+        """Peak-table records save as one row per window, or per window and analyte."""
+        table = build_peak_table(
+            [_run(), _run(copper=False)], ['a.csv', 'b.csv'],
+            [('Fe', 1.5, 2.5), ('Cu', 4.0, 6.0)], ['56Fe', '63Cu'],
+        )
+        processor = LICPMSfunctions(view=Mock())
+
+        wide = tmp_path / 'wide.csv'
+        processor.saveIntegration(table.results(), str(wide))
+        rows = list(csv.DictReader(open(wide)))
+        assert len(rows) == 4
+        assert list(rows[0])[:5] == ['file', 'window', 'start_min', 'stop_min', '115In_correction']
+        assert rows[3]['63Cu_peak_area'] == ''
+        assert float(rows[1]['63Cu_peak_area']) == pytest.approx(table.areas[0, 1, 1], rel=1e-3)
+
+        long = tmp_path / 'long.csv'
+        processor.saveIntegration(table.results(), str(long), layout='long')
+        rows = list(csv.DictReader(open(long)))
+        assert len(rows) == 6  # b.csv has no 63Cu
+        assert rows[0]['analyte'] == '56Fe' and rows[0]['window'] == 'Fe'
+        assert 'ppb' not in rows[0]
+
+        with pytest.raises(ValueError):
+            processor.saveIntegration(table.results(), str(long), layout='tall')
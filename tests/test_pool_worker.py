@@ -0,0 +1,48 @@
+"""Tests for the process-pool QThread base."""
+
+import math
+import time
+
+from uiGenerator.utils.pool_worker import PoolWorkerThread
+
+
+class _Thread(PoolWorkerThread):
+    def __init__(self, worker, jobs, processes=1):
+        super().__init__(worker, processes)
+        self._jobs = jobs
+        self.collected = []
+        self.finished_with = None
+
+    def jobs(self):
+        return self._jobs
+
+    def collect(self, result, done, total):
+        self.collected.append((result, done, total))
+
+    def finish(self, cancelled, error):
+        self.finished_with = (cancelled, error)
+
+
+class TestPoolWorkerThread:
+    """Test suite for PoolWorkerThread."""
+
+    def test_collects_every_result(self, qapp):
+        """Each result is collected once with a running count; finish reports no drop."""
+        thread = _Thread(math.sqrt, [1.0, 4.0, 9.0], processes=2)
+        thread.start()
+        assert thread.wait(60000)
+        assert sorted(r for r, _, _ in thread.collected) == [1.0, 2.0, 3.0]
+        assert [(d, t) for _, d, t in thread.collected] == [(1, 3), (2, 3), (3, 3)]
+        assert thread.finished_with == (False, '')
+
+    def test_cancel_drops_queued_jobs(self, qapp):
+        """Cancelling stops polling and terminates the pool."""
+        thread = _Thread(time.sleep, [0.5] * 20)
+        thread.start()
+        time.sleep(0.2)
+        thread.cancel()
+        started = time.monotonic()
+        assert thread.wait(60000)
+        assert time.monotonic() - started < 5
+        assert len(thread.collected) < 20
+        assert thread.finished_with == (True, '')
@@ -0,0 +1,35 @@
+"""Tests for background prefetching of neighbouring runs."""
+
+import numpy as np
+import pandas as pd
+
+from uiGenerator.models.dataset_registry import DatasetRegistry
+from uiGenerator.utils.prefetch import RunPrefetcher
+
+
+class TestRunPrefetcher:
+    """Test suite for RunPrefetcher."""
+
+    def test_neighbour_rows_alternate_and_clip(self):
+        """Neighbours alternate next/previous and stay inside the list."""
+        assert RunPrefetcher.neighbour_rows(5, 10, 2) == [6, 4, 7, 3]
+        assert RunPrefetcher.neighbour_rows(0, 3, 3) == [1, 2]
+        assert RunPrefetcher.neighbour_rows(2, 3, 1) == [1]
+
+    def test_prefetch_fills_registry(self, tmp_path):
+        """Prefetched files are resident in the registry once done."""
+        paths = []
+        for i in range(3):
+            src = tmp_path / f'run_{i}.csv'
+            pd.DataFrame({
+                'Time 56Fe': np.arange(20, dtype=float),
+                '56Fe': np.ones(20),
+            }).to_csv(src, index=False)
+            paths.append(str(src))
+
+        registry = DatasetRegistry()
+        prefetcher = RunPrefetcher(registry=registry)
+        prefetcher.prefetch(paths)
+        assert prefetcher.wait(10000)
+
+        assert all(p in registry for p in paths)
@@ -0,0 +1,65 @@
+"""Tests for the columnar integration result table."""
+
+import csv
+
+import numpy as np
+import pytest
+
+from uiGenerator.models.results import METRICS, ResultTable, save_integration_csv
+
+
+def _table(file, analytes, areas, **columns):
+    values = np.full((len(areas), len(analytes), len(METRICS)), np.nan)
+    values[..., 0] = areas
+    return ResultTable(analytes, values, file=file, start=1.0, stop=2.0, **columns)
+
+
+class TestResultTable:
+    """Test suite for ResultTable and save_integration_csv."""
+
+    def test_extend_unions_analytes(self):
+        """Appended rows are concatenated lazily; missing analytes are NaN."""
+        table = ResultTable()
+        table.extend(_table('a.csv', ['56Fe'], [[10.0]]))
+        table.extend(_table(['b.csv', 'c.csv'], ['63Cu', '56Fe'], [[1.0, 20.0], [2.0, 30.0]]))
+        assert len(table) == 3
+        assert table.analytes == ['56Fe', '63Cu']
+        np.testing.assert_array_equal(table.metric('peak_area'), [[10, np.nan], [20, 1], [30, 2]])
+        assert list(table.column('file')) == ['a.csv', 'b.csv', 'c.csv']
+        assert table.results(0) == {
+            '56Fe': {'peak_area': 10.0, 'baseline_area': None, 'conc_ppb': None, 'conc_uM': None},
+        }
+        assert not table.has_windows and not table.has_baseline
+
+        with pytest.raises(TypeError):
+            ResultTable(['56Fe'], [[[1, 2, 3, 4]]], file='a.csv')  # no start / stop
+
+    def test_sort_and_take(self):
+        """Rows sort by metadata columns and can be selected by mask."""
+        table = _table(['b.csv', 'a.csv', 'a.csv'], ['56Fe'], [[1.0], [2.0], [3.0]],
+                       window=['x', 'z', 'y'])
+        ordered = table.sort('file', 'window')
+        assert ordered.labels() == ['a.csv · y', 'a.csv · z', 'b.csv · x']
+        np.testing.assert_array_equal(ordered.metric('peak_area')[:, 0], [3, 2, 1])
+        assert len(table.take(table.column('file') == 'a.csv')) == 2
+
+    def test_csv_formats_at_export(self, tmp_path):
+        """Numbers keep full precision in the table and are rounded on export."""
+        table = _table(['a.csv', 'b.csv'], ['56Fe', '63Cu'], [[1234.567, np.nan], [5.0, 6.0]],
+                       baseline_method=['trapezoid', 'als'], correction=1.23456)
+        assert table.metric('peak_area')[0, 0] == 1234.567
+
+        path = tmp_path / 'out.csv'
+        assert save_integration_csv(table, str(path)) == [str(path)]
+        rows = list(csv.DictReader(open(path)))
+        assert rows[0]['56Fe_peak_area'] == '1234.6'
+        assert rows[0]['63Cu_peak_area'] == ''
+        assert rows[0]['115In_correction'] == '1.235'
+        assert [r['baseline_subtracted'] for r in rows] == ['yes', 'als']
+        assert 'window' not in rows[0] and '56Fe_ppb' not in rows[0]
+
+        save_integration_csv(table, str(path), layout='long')
+        rows = list(csv.DictReader(open(path)))
+        assert [(r['file'], r['analyte']) for r in rows] == [
+            ('a.csv', '56Fe'), ('b.csv', '56Fe'), ('b.csv', '63Cu'),
+        ]
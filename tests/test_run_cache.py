@@ -0,0 +1,88 @@
+"""Tests for the on-disk parsed-run cache."""
+
+import os
+
+import numpy as np
+import pytest
+
+from uiGenerator.models.run_cache import RunCache, load_run
+
+
+def _signals(n=50):
+    """Signals and per-analyte times for ``write_run``."""
+    t = np.arange(n, dtype=float)
+    return {'56Fe': t * 2, '63Cu': t * 3}, {'56Fe': t, '63Cu': t + 0.1}
+
+
+class TestRunCache:
+    """Test suite for RunCache."""
+
+    def test_put_then_get_round_trips(self, write_run, tmp_path):
+        """A stored run comes back memory-mapped with identical values."""
+        src = tmp_path / 'run.csv'
+        df = write_run(src, *_signals())
+        cache = RunCache(root=str(tmp_path / 'cache'))
+
+        assert cache.get(str(src)) is None
+        assert cache.put(str(src), df, ['56Fe', '63Cu'])
+
+        run = cache.get(str(src))
+        assert run is not None
+        assert run.elements == ['56Fe', '63Cu']
+        assert list(run.raw_data_df.columns) == list(df.columns)
+        np.testing.assert_array_equal(run.raw_data_df['63Cu'], df['63Cu'])
+
+    def test_modified_file_misses(self, write_run, tmp_path):
+        """Changing the source file's size or mtime invalidates the entry."""
+        src = tmp_path / 'run.csv'
+        df = write_run(src, *_signals())
+        cache = RunCache(root=str(tmp_path / 'cache'))
+        cache.put(str(src), df, ['56Fe', '63Cu'])
+
+        write_run(src, *_signals(n=60))
+        st = os.stat(src)
+        os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        assert cache.get(str(src)) is None
+
+    def test_eviction_keeps_cache_under_budget(self, write_run, tmp_path):
+        """Older entries are evicted once the size budget is exceeded."""
+        cache = RunCache(root=str(tmp_path / 'cache'), max_bytes=3000)
+        for i in range(5):
+            src = tmp_path / f'run_{i}.csv'
+            df = write_run(src, *_signals())
+            cache.put(str(src), df, ['56Fe', '63Cu'])
+        assert cache.size_bytes() <= 3000
+        assert cache.get(str(tmp_path / 'run_4.csv')) is not None
+
+    def test_load_run_populates_cache(self, write_run, tmp_path):
+        """load_run parses on a miss and serves the cached copy afterwards."""
+        src = tmp_path / 'run.csv'
+        write_run(src, *_signals())
+        cache = RunCache(root=str(tmp_path / 'cache'))
+
+        first = load_run(str(src), cache=cache)
+        assert cache.get(str(src)) is not None
+        second = load_run(str(src), cache=cache)
+        assert second.elements == first.elements
+        np.testing.assert_array_equal(
+            second.raw_data_df['56Fe'], first.raw_data_df['56Fe'],
+        )
+
+    def test_missing_file_raises(self, tmp_path):
+        """A missing source file raises FileNotFoundError, not a cache miss."""
+        cache = RunCache(root=str(tmp_path / 'cache'))
+        with pytest.raises(FileNotFoundError):
+            load_run(str(tmp_path / 'nope.csv'), cache=cache)
+
+    def test_partial_entries_accumulate_columns(self, write_run, tmp_path):
+        """Projected loads add their columns to the same cache entry."""
+        src = tmp_path / 'run.csv'
+        df = write_run(src, *_signals())
+        cache = RunCache(root=str(tmp_path / 'cache'))
+
+        load_run(str(src), cache=cache, analytes=['56Fe'])
+        load_run(str(src), cache=cache, analytes=['63Cu'])
+
+        run = cache.get(str(src))
+        assert run.is_complete
+        np.testing.assert_array_equal(run.raw_data_df['63Cu'], df['63Cu'])
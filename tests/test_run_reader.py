@@ -0,0 +1,57 @@
+"""Tests for header sniffing and column-projected reading."""
+
+import numpy as np
+import pytest
+
+from uiGenerator.models.run_reader import (
+    analyte_columns, read_run_csv, resolve_analytes, sniff_header,
+)
+
+
+def _write_semicolon_run(path):
+    path.write_text(
+        "Exported by instrument\n"
+        "Time 56Fe;56Fe;Time 115In | 115In;115In | 115In\n"
+        "0;100;0;500\n"
+        "1;150;1;510\n"
+        "2;200;2;520\n"
+    )
+
+
+class TestRunReader:
+    """Test suite for the projected run reader."""
+
+    def test_sniff_header_skips_preamble(self, tmp_path):
+        """The header is the first line mentioning Time; separator is detected."""
+        src = tmp_path / 'run.csv'
+        _write_semicolon_run(src)
+        header = sniff_header(str(src))
+
+        assert header.header_row == 1
+        assert header.sep == ';'
+        assert header.elements == ['56Fe', '115In | 115In']
+
+    def test_resolve_analytes_matches_base_isotope(self):
+        """'115In' resolves to the TQ-mode analyte; unknown names are dropped."""
+        elements = ['56Fe', '115In | 115In']
+        assert resolve_analytes(elements, ['115In', '63Cu', '56Fe']) == [
+            '115In | 115In', '56Fe',
+        ]
+
+    def test_read_run_csv_parses_only_requested_columns(self, tmp_path):
+        """Only the requested analyte and its time column are returned."""
+        src = tmp_path / 'run.csv'
+        _write_semicolon_run(src)
+        header = sniff_header(str(src))
+        columns = analyte_columns(header, ['115In | 115In'])
+
+        df = read_run_csv(str(src), columns, header)
+        assert list(df.columns) == ['Time 115In | 115In', '115In | 115In']
+        np.testing.assert_array_equal(df['115In | 115In'], [500, 510, 520])
+
+    def test_missing_header_raises(self, tmp_path):
+        """A file without a Time header is rejected."""
+        src = tmp_path / 'run.csv'
+        src.write_text("a,b\n1,2\n")
+        with pytest.raises(ValueError):
+            sniff_header(str(src))
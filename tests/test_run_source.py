@@ -0,0 +1,83 @@
+"""Tests for reading compressed and archived runs."""
+
+import gzip
+import lzma
+import os
+import zipfile
+
+import numpy as np
+import pytest
+
+from uiGenerator.models.directory_index import summarize_run
+from uiGenerator.models.run_cache import load_run
+from uiGenerator.models.run_source import is_packed, iter_runs, open_run, split_member
+
+CSV_TEXT = (
+    "Time 56Fe,56Fe,Time 115In,115In\n"
+    "0,100,0,500\n"
+    "1,150,1,510\n"
+    "2,200,2,520\n"
+)
+
+
+def _is_csv(name):
+    return '.csv' in name
+
+
+@pytest.fixture
+def packed_runs(tmp_path):
+    """The same run as plain, .gz, .xz and a zip member."""
+    (tmp_path / 'run.csv').write_text(CSV_TEXT)
+    with gzip.open(tmp_path / 'run.csv.gz', 'wt') as f:
+        f.write(CSV_TEXT)
+    with lzma.open(tmp_path / 'run.csv.xz', 'wt') as f:
+        f.write(CSV_TEXT)
+    with zipfile.ZipFile(tmp_path / 'seq.zip', 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('day1/run.csv', CSV_TEXT)
+        zf.writestr('readme.txt', 'x')
+    return tmp_path
+
+
+class TestRunSource:
+    """Test suite for run_source and the loaders that use it."""
+
+    def test_split_member_and_is_packed(self, packed_runs):
+        """Only paths through an existing .zip file are archive members."""
+        member = os.path.join(str(packed_runs), 'seq.zip', 'day1', 'run.csv')
+        assert split_member(member) == (str(packed_runs / 'seq.zip'), 'day1/run.csv')
+        assert split_member(str(packed_runs / 'run.csv'))[1] is None
+        assert is_packed(member) and is_packed(str(packed_runs / 'run.csv.gz'))
+        assert not is_packed(str(packed_runs / 'run.csv'))
+
+    def test_iter_runs_lists_archive_members(self, packed_runs):
+        """Zip members appear as <archive>/<member> when archives are on."""
+        assert sorted(iter_runs(str(packed_runs), _is_csv)) == [
+            'run.csv', 'run.csv.gz', 'run.csv.xz',
+        ]
+        assert sorted(iter_runs(str(packed_runs), _is_csv, archives=True)) == [
+            'run.csv', 'run.csv.gz', 'run.csv.xz', 'seq.zip/day1/run.csv',
+        ]
+
+    @pytest.mark.parametrize('name', ['run.csv.gz', 'run.csv.xz', 'seq.zip/day1/run.csv'])
+    @pytest.mark.parametrize('analytes', [None, ['115In']])
+    def test_load_run_matches_plain_file(self, packed_runs, name, analytes):
+        """Full and projected loads stream the same values as the plain CSV."""
+        plain = load_run(str(packed_runs / 'run.csv'), analytes=analytes)
+        packed = load_run(os.path.join(str(packed_runs), name), analytes=analytes)
+
+        assert packed.elements == plain.elements == ['56Fe', '115In']
+        for col in plain.data.columns:
+            np.testing.assert_array_equal(packed.data.column(col), plain.data.column(col))
+
+    def test_missing_member_raises_file_not_found(self, packed_runs):
+        """A name that is not in the archive behaves like a missing file."""
+        with pytest.raises(FileNotFoundError):
+            with open_run(os.path.join(str(packed_runs), 'seq.zip', 'nope.csv')):
+                pass
+
+    def test_summarize_compressed_run(self, packed_runs):
+        """The directory index reads compressed runs without seeking."""
+        summary = summarize_run(str(packed_runs / 'run.csv.gz'))
+        assert summary.n_samples == 3
+        assert summary.duration == 2.0
+        assert summary.mean_115in == pytest.approx(510.0)
@@ -0,0 +1,70 @@
+"""Tests for following a run file while it is being written."""
+
+import numpy as np
+
+from uiGenerator.models.run_tail import RunTailer
+
+
+HEADER = "Time 56Fe,56Fe,Time 63Cu,63Cu\n"
+
+
+def _append(path, text):
+    with open(path, 'a', newline='') as f:
+        f.write(text)
+
+
+class TestRunTailer:
+    """Test suite for RunTailer."""
+
+    def test_appended_rows_are_parsed_incrementally(self, tmp_path):
+        """Each poll parses only the rows written since the previous one."""
+        src = tmp_path / 'live.csv'
+        src.write_text("Acquired on instrument\n" + HEADER + "0.1,10,0.2,20\n")
+        tailer = RunTailer(str(src))
+
+        assert tailer.poll() == 1
+        assert tailer.poll() == 0
+
+        for i in range(2, 6000):
+            _append(src, f"{i * 0.1:.1f},{10 * i},{i * 0.1 + 0.1:.1f},{20 * i}\n")
+        assert tailer.poll() == 5998
+        assert len(tailer) == 5999
+
+        np.testing.assert_allclose(tailer.column('56Fe')[-1], 59990)
+        run = tailer.snapshot()
+        assert run.n_time_bases == 1
+        np.testing.assert_allclose(run.time('63Cu')[:2], [0.2, 0.3])
+
+    def test_partial_last_line_waits_for_newline(self, tmp_path):
+        """A half-written row is not parsed until its line is complete."""
+        src = tmp_path / 'live.csv'
+        src.write_text(HEADER + "0.1,10,0.2,20\n0.2,1")
+        tailer = RunTailer(str(src))
+
+        assert tailer.poll() == 1
+        _append(src, "1,0.3")
+        assert tailer.poll() == 0
+        _append(src, ",21\n0.3,12,0.4,22\n")
+        assert tailer.poll() == 2
+        np.testing.assert_array_equal(tailer.column('56Fe'), [10, 11, 12])
+
+    def test_rewritten_file_is_reread(self, tmp_path):
+        """A file truncated and rewritten from the start is re-read."""
+        src = tmp_path / 'live.csv'
+        src.write_text(HEADER + "0.1,10,0.2,20\n0.2,11,0.3,21\n")
+        tailer = RunTailer(str(src))
+        assert tailer.poll() == 2
+
+        src.write_text(HEADER + "0.1,5,0.2,6\n")
+        assert tailer.poll() == 1
+        np.testing.assert_array_equal(tailer.column('63Cu'), [6])
+
+    def test_ragged_row_does_not_shift_columns(self, tmp_path):
+        """A row with an extra field keeps the other rows' columns aligned."""
+        src = tmp_path / 'live.csv'
+        src.write_text(HEADER + "0.1,10,0.2,20,99\n0.2,11,0.3,21\n")
+        tailer = RunTailer(str(src))
+
+        assert tailer.poll() == 2
+        np.testing.assert_array_equal(tailer.column('56Fe'), [10, 11])
+        np.testing.assert_array_equal(tailer.column('63Cu'), [20, 21])
@@ -1,21 +1,27 @@
 """LC-ICP-MS Data Viewer - A PyQt6 application for analyzing LC-ICP-MS chromatography data."""
 
+import importlib
+
 __version__ = '1.0.9'
 __author__ = 'Christian Dewey'
 
-# Import main classes for easy access
-from .ui import PyLCICPMSUi, Calibration
-from .controllers import PyLCICPMSCtrl, CalCtrlFunctions
-from .models import LICPMSfunctions, CalibrateFunctions
-from .plotting import plotChroma, ICPMS_Data_Class
+# Main classes for easy access. Imported on first use, so the headless
+# command line (cli.py) never loads Qt.
+_EXPORTS = {
+    'PyLCICPMSUi': '.ui',
+    'Calibration': '.ui',
+    'PyLCICPMSCtrl': '.controllers',
+    'CalCtrlFunctions': '.controllers',
+    'LICPMSfunctions': '.models',
+    'CalibrateFunctions': '.models',
+    'plotChroma': '.plotting',
+    'ICPMS_Data_Class': '.plotting',
+}
+
+__all__ = list(_EXPORTS)
+
 
-__all__ = [
-    'PyLCICPMSUi',
-    'Calibration',
-    'PyLCICPMSCtrl',
-    'CalCtrlFunctions',
-    'LICPMSfunctions',
-    'CalibrateFunctions',
-    'plotChroma',
-    'ICPMS_Data_Class',
-]
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -1,19 +1,30 @@
-"""Entry point for LC-ICP-MS UI application."""
+"""Entry point for LC-ICP-MS UI application.
 
-import sys
-from PyQt6.QtCore import Qt
-from PyQt6.QtWidgets import QApplication
+``lcicpms-ui`` starts the GUI; ``lcicpms-ui integrate ...`` runs the headless
+batch integration in cli.py (no Qt, no display needed).
+"""
 
-from .ui.main_window import PyLCICPMSUi
-from .controllers.main_controller import PyLCICPMSCtrl
-from .models.data_processor import LICPMSfunctions
-from .ui.calibration_window import Calibration
-from .controllers.calibration_controller import CalCtrlFunctions
-from .models.calibration import CalibrateFunctions
+import sys
 
 
-def main():
+def main(argv=None):
     """Main application entry point."""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in ('integrate', '-h', '--help'):
+        from .cli import main as cli_main
+        sys.exit(cli_main(argv))
+
+    # Qt is only imported for the GUI, so the command line works headless.
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtWidgets import QApplication
+
+    from .ui.main_window import PyLCICPMSUi
+    from .controllers.main_controller import PyLCICPMSCtrl
+    from .models.data_processor import LICPMSfunctions
+    from .ui.calibration_window import Calibration
+    from .controllers.calibration_controller import CalCtrlFunctions
+    from .models.calibration import CalibrateFunctions
+
     # Create an instance of QApplication
     app = QApplication(sys.argv)
 
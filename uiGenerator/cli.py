@@ -0,0 +1,286 @@
+"""Headless batch integration: ``lcicpms-ui integrate ...``.
+
+Integrates every run of a directory (or glob, or list of files) over one or
+more time windows with the same math as the GUI's Integrate and Peak Table
+actions (models.batch and models.peak_table), and writes the CSV
+layout of Save Integration. Runs are spread over a multiprocessing pool.
+Nothing here imports Qt, so it runs on machines without a display.
+
+Example::
+
+    lcicpms-ui integrate /data/seq_0412 --window Fe=3.5,5.2 --window 6,9 \\
+        --calib /data/seq_0412/cal.calib --baseline \\
+        --indium-reference /data/seq_0412/std_01.csv -o seq_0412.csv
+"""
+
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+
+from .models.baseline import BASELINE_METHODS, baseline_model
+from .models.batch import integrate_job, integration_settings
+from .models.dataset_registry import get_registry
+from .models.internal_standard import (
+    DEFAULT_ISOTOPE, DEFAULT_WINDOW, internal_standard, standard_column,
+)
+from .models.peak_detection import DEFAULT_MIN_SNR
+from .models.peak_table import read_peak_windows
+from .models.results import ResultTable, save_integration_csv
+from .models.run_source import iter_runs
+
+
+def _is_run(name):
+    # Same rule as the run list in the main window.
+    return '.csv' in name
+
+
+def parse_window(text):
+    '''Parse ``[NAME=]START,STOP`` (minutes) into (name, start, stop).'''
+    name, _, span = text.rpartition('=')
+    try:
+        start, stop = (float(v) for v in span.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f'window must be [NAME=]START,STOP in minutes, not {text!r}'
+        ) from None
+    return (name or f'{start:g}-{stop:g}', start, stop)
+
+
+def parse_parameter(text):
+    '''Parse ``NAME=VALUE`` (a number) into (name, value).'''
+    name, sep, value = text.partition('=')
+    try:
+        if not sep:
+            raise ValueError
+        return name.strip(), float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'parameter must be NAME=NUMBER, not {text!r}') from None
+
+
+def find_runs(inputs, archives=False):
+    '''Run paths for directories, glob patterns and file paths, in order.
+
+    Directories contribute their runs (sorted by name, members of zip
+    archives too with ``archives``); duplicates are dropped.
+    '''
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            names = sorted(iter_runs(item, _is_run, archives), key=str.lower)
+            found = [os.path.join(item, name) for name in names]
+        elif glob.has_magic(item):
+            found = sorted(p for p in glob.glob(item) if _is_run(os.path.basename(p)))
+        else:
+            found = [item]
+        for path in found:
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+def indium_reference(path, isotope=DEFAULT_ISOTOPE):
+    '''Average internal-standard signal of a reference run (as "Choose reference file…").'''
+    data = get_registry().load(path, analytes=[isotope]).data
+    column = standard_column(data, isotope)
+    if column is None:
+        raise ValueError(f'{isotope} column not found in {path}')
+    return float(np.nanmean(np.asarray(data[column], dtype=float)))
+
+
+def run_batch(paths, settings, jobs=None, progress=None):
+    '''Integrate ``paths`` over a process pool (see models.batch).
+
+    Returns (ResultTable in input order, {path: error message}).
+    ``progress`` is called as progress(done, total, path, error) after each
+    run.
+    '''
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    work = [(index, path, settings) for index, path in enumerate(paths)]
+    results, errors = ResultTable(), {}
+
+    def collect(finished):
+        for done, (_, path, run_results, error) in enumerate(finished, 1):
+            if error is not None:
+                errors[path] = error
+            results.extend(run_results)
+            if progress is not None:
+                progress(done, len(work), path, error)
+
+    if jobs <= 1 or len(work) <= 1:
+        collect(map(integrate_job, work))
+    else:
+        with multiprocessing.Pool(min(jobs, len(work))) as pool:
+            collect(pool.imap(integrate_job, work))
+    return results, errors
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='lcicpms-ui',
+        description='LC-ICP-MS data viewer. Without a command, starts the GUI.',
+    )
+    commands = parser.add_subparsers(dest='command')
+    integrate = commands.add_parser(
+        'integrate',
+        help='integrate runs without the GUI',
+        description='Integrate runs over time windows and write one CSV, '
+                    'like Save Integration in the GUI.',
+    )
+    integrate.add_argument(
+        'inputs', nargs='+', metavar='RUNS',
+        help='run directories, glob patterns (quoted) or run files',
+    )
+    integrate.add_argument(
+        '-w', '--window', action='append', type=parse_window, default=[],
+        metavar='[NAME=]START,STOP', help='integration window in minutes (repeatable)',
+    )
+    integrate.add_argument(
+        '--windows', metavar='CSV',
+        help='peak table of windows: name, start, stop (minutes) per row',
+    )
+    integrate.add_argument(
+        '--detect-peaks', action='store_true',
+        help='integrate the peaks detected in each run instead of fixed windows',
+    )
+    integrate.add_argument(
+        '--min-snr', type=float, default=DEFAULT_MIN_SNR, metavar='RATIO',
+        help=f'peak detection threshold, prominence over noise (default: {DEFAULT_MIN_SNR:g})',
+    )
+    integrate.add_argument(
+        '-a', '--analytes', nargs='+', metavar='ANALYTE',
+        help='analytes to integrate (default: all in each run except 115In and the internal standard)',
+    )
+    integrate.add_argument('--calib', metavar='FILE', help='.calib file for concentrations')
+    integrate.add_argument(
+        '--baseline', action='store_true', help='subtract the trapezoid baseline of each window',
+    )
+    integrate.add_argument(
+        '--baseline-method', choices=tuple(BASELINE_METHODS), metavar='METHOD',
+        help='baseline model to subtract instead: ' + ', '.join(BASELINE_METHODS)
+             + ' (implies --baseline)',
+    )
+    integrate.add_argument(
+        '--baseline-region', action='append', type=parse_window, default=[],
+        metavar='START,STOP', help='baseline-only region in minutes for the polynomial baseline (repeatable)',
+    )
+    integrate.add_argument(
+        '--baseline-param', action='append', type=parse_parameter, default=[],
+        metavar='NAME=VALUE',
+        help='baseline model parameter, e.g. window=90 (rolling_min), lam=1e7, p=0.005 (als), '
+             'degree=2 (polynomial)',
+    )
+    indium = integrate.add_mutually_exclusive_group()
+    indium.add_argument(
+        '--indium-reference', metavar='CSV',
+        help='correct for drift of the internal standard, using this run\'s average '
+             'internal standard as the reference',
+    )
+    indium.add_argument(
+        '--indium-average', type=float, metavar='COUNTS',
+        help='correct for drift of the internal standard with this reference average',
+    )
+    integrate.add_argument(
+        '--internal-standard', default=DEFAULT_ISOTOPE, metavar='ISOTOPE',
+        help=f'internal-standard isotope for the correction (default: {DEFAULT_ISOTOPE})',
+    )
+    integrate.add_argument(
+        '--drift-window', type=float, default=DEFAULT_WINDOW, metavar='SECONDS',
+        help='smoothing window of the internal-standard trace '
+             f'(default: {DEFAULT_WINDOW:g} s; 0 follows it sample by sample)',
+    )
+    integrate.add_argument(
+        '--archives', action='store_true', help='also integrate runs inside .zip archives',
+    )
+    integrate.add_argument(
+        '--layout', choices=('wide', 'long'), default='wide',
+        help='wide: columns per element (default); long: one row per element',
+    )
+    integrate.add_argument(
+        '-o', '--output', metavar='CSV',
+        help='output file (default: integration_<date>_<time>.csv)',
+    )
+    integrate.add_argument(
+        '-j', '--jobs', type=int, default=None,
+        help='worker processes (default: number of CPUs)',
+    )
+    return parser
+
+
+def integrate_command(args):
+    windows = list(args.window)
+    if args.windows:
+        windows.extend(read_peak_windows(args.windows))
+    if args.detect_peaks:
+        if windows:
+            raise ValueError('--detect-peaks replaces --window / --windows')
+        windows = None
+    elif not windows:
+        raise ValueError('no integration window given (use --window, --windows or --detect-peaks)')
+
+    cal_curves = {}
+    if args.calib:
+        with open(args.calib) as f:
+            cal_curves = json.load(f)
+
+    baseline = args.baseline
+    if args.baseline_method or args.baseline_region or args.baseline_param:
+        parameters = dict(args.baseline_param)
+        if args.baseline_region:
+            parameters['regions'] = [(start, stop) for _, start, stop in args.baseline_region]
+        baseline = baseline_model(args.baseline_method or 'trapezoid', **parameters)
+        if baseline['method'] == 'polynomial' and not baseline['regions']:
+            raise ValueError('the polynomial baseline needs --baseline-region')
+
+    standard = None
+    reference = args.indium_average
+    if args.indium_reference:
+        reference = indium_reference(args.indium_reference, args.internal_standard)
+    if reference is not None:
+        standard = internal_standard(reference, args.internal_standard, args.drift_window)
+
+    output = args.output or f'integration_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
+    # Writing the results into the run directory must not make them a run.
+    paths = [
+        p for p in find_runs(args.inputs, archives=args.archives)
+        if os.path.abspath(p) != os.path.abspath(output)
+    ]
+    if not paths:
+        raise ValueError('no runs found')
+
+    # The GUI's mass table holds mass numbers, which is also the fallback.
+    settings = integration_settings(
+        windows, analytes=args.analytes, cal_curves=cal_curves,
+        baseline=baseline, internal_standard=standard, min_snr=args.min_snr,
+    )
+
+    def progress(done, total, path, error):
+        status = f'skipped ({error})' if error else 'ok'
+        print(f'[{done}/{total}] {path}: {status}', file=sys.stderr)
+
+    results, errors = run_batch(paths, settings, jobs=args.jobs, progress=progress)
+    if len(results):
+        save_integration_csv(results, output, layout=args.layout)
+        print(f'Wrote {len(results)} row(s) from {len(paths) - len(errors)} run(s) to {output}',
+              file=sys.stderr)
+    return 1 if errors else 0
+
+
+def main(argv=None):
+    '''Run a command-line command; returns the exit status.'''
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command != 'integrate':
+        parser.print_help()
+        return 2
+    try:
+        return integrate_command(args)
+    except (OSError, ValueError) as e:
+        print(f'lcicpms-ui integrate: error: {e}', file=sys.stderr)
+        return 1
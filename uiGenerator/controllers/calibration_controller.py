@@ -3,6 +3,12 @@ from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import *
 import pyqtgraph as pg
 import os
+import numpy as np
+
+from ..models.auto_calibration import average_indium, find_blank, normalize_standards
+from ..utils.auto_calibration import AutoCalibrationThread
+from ..utils.calibration_report import CalibrationReportThread
+from ..utils.directory_scanner import DirectoryListing
 
 
 __version__ = '0.2'
@@ -36,6 +42,17 @@ class CalCtrlFunctions:
 		self._xMax = 0
 		self._minAssigned = False
 		self._integrationEnabled = False
+		self._reportThreads = set()  # CalibrationReportThreads still rendering
+		self._autoThread = None  # AutoCalibrationThread while standards integrate
+
+		# Calibration file list: scanned off the GUI thread and kept in sync
+		# with the directory by a filesystem watcher.
+		self._listing = DirectoryListing(
+			self._calview.listwidget,
+			match=lambda name: name.lower().endswith('.csv'),
+			parent=self._calview,
+		)
+		self._listing.scan_finished.connect(self._onListingFinished)
 
 		# Connect signals and slots
 		self._connectSignals()
@@ -102,20 +119,9 @@ class CalCtrlFunctions:
 			return
 
 		try:
-			all_files = os.listdir(cal_dir)
-			print(f"  Total files in directory: {len(all_files)}")
-
-			i = 0
-			for name in sorted(all_files):
-				if name.lower().endswith('.csv'):
-					self._calview.listwidget.insertItem(i, name)
-					i = i + 1
-
-			print(f"  Found {i} CSV files")
-
-			# Enable Add Standard button when files are loaded
-			if i > 0:
-				self._calview.addStandardBtn.setEnabled(True)
+			# Listed on a worker thread; Add Standard is enabled once the
+			# scan reports files (see _onListingFinished).
+			self._listing.setDirectory(cal_dir)
 
 			# Re-connect signals after populating (in case they weren't connected properly)
 			try:
@@ -136,6 +142,13 @@ class CalCtrlFunctions:
 			import traceback
 			traceback.print_exc()
 
+	def _onListingFinished(self, count):
+		"""Scan of the calibration directory finished with ``count`` CSV files."""
+		print(f"  Found {count} CSV files")
+		# Enable Add Standard button when files are loaded
+		if count > 0:
+			self._calview.addStandardBtn.setEnabled(True)
+
 	def _onFileClicked(self, item):
 		"""Handle file click in list widget."""
 		try:
@@ -286,6 +299,7 @@ class CalCtrlFunctions:
 		# Integrate button - enabled if range is selected and row is selected
 		has_range = len(self._intRange) >= 2
 		self._calview.integrateButtons['Integrate'].setEnabled(has_range and has_selection)
+		self._calview.integrateButtons['Integrate Peaks'].setEnabled(has_selection)
 
 	def _onTableSelectionChanged(self):
 		"""Handle table selection changes."""
@@ -350,8 +364,6 @@ class CalCtrlFunctions:
 
 	def _Integrate(self):
 		'''Perform integration and store peak area in selected table row.'''
-		from PyQt6.QtWidgets import QMessageBox
-
 		selected_row = self._calview.standardsTable.currentRow()
 		if selected_row < 0:
 			print("Please select a standard in the table")
@@ -361,6 +373,38 @@ class CalCtrlFunctions:
 			print("Please select integration range on plot")
 			return
 
+		if not self._confirmOverwrite(selected_row):
+			print('Integration cancelled by user')
+			return
+
+		# Perform integration
+		self._model.integrate(self._intRange)
+		self._storeIntegration(selected_row)
+
+	def _integratePeaks(self):
+		'''Integrate every detected peak of each element into the selected row.'''
+		selected_row = self._calview.standardsTable.currentRow()
+		if selected_row < 0:
+			print("Please select a standard in the table")
+			return
+		if getattr(self._model, '_data', None) is None:
+			print("Please select a file first")
+			return
+		if not self._confirmOverwrite(selected_row):
+			print('Integration cancelled by user')
+			return
+
+		detected = self._model.integratePeaks()
+		for element, peaks in detected.items():
+			print(f"  {element}: {len(peaks)} peak(s) " + ', '.join(
+				f'{p.start:.2f}-{p.stop:.2f} min (S/N {p.snr:.0f})' for p in peaks
+			))
+		self._storeIntegration(selected_row)
+
+	def _confirmOverwrite(self, selected_row):
+		'''Ask before overwriting a row's area or integrating another file into it.'''
+		from PyQt6.QtWidgets import QMessageBox
+
 		# Warn if the currently loaded sample doesn't match the selected row,
 		# or the selected row already has a peak area — integrating would
 		# overwrite the existing standard's area.
@@ -393,12 +437,11 @@ class CalCtrlFunctions:
 			)
 			msg.setDefaultButton(QMessageBox.StandardButton.Cancel)
 			if msg.exec() != QMessageBox.StandardButton.Ok:
-				print('Integration cancelled by user')
-				return
-
-		# Perform integration
-		self._model.integrate(self._intRange)
+				return False
+		return True
 
+	def _storeIntegration(self, selected_row):
+		'''Put the model's last areas in the table row and reset the range.'''
 		# Store peak area in table
 		peak_area_dict = self._calview.n_area
 		self._calview.setStandardPeakArea(selected_row, peak_area_dict)
@@ -504,12 +547,55 @@ class CalCtrlFunctions:
 		print(f"Calculating calibration curve from {len(valid_standards)} standards (all table data, no selection required)")
 
 		# Pass data to model for calculation
-		summary = self._model.calcLinearRegression(valid_standards)
+		summary = self._model.calcLinearRegression(
+			valid_standards,
+			model=self._calview.fitModelBox.currentData(),
+			weighting=self._calview.fitWeightingBox.currentData(),
+		)
+		if summary and summary.get('report'):
+			self._renderReport(summary['report'], summary['pdf_path'])
 		self._showCalCurveSummary(summary, missing_info)
 		# Main window's Calibrate button should no longer be highlighted now
-		# that a calibration exists.
+		# that a calibration exists, results in memory get the new curves and
+		# the new .calib files are registered for Load Cal. / Cal. History.
 		if self._mainctrl is not None:
-			self._mainctrl._updateCalibrateButtonStyle()
+			if summary:
+				self._mainctrl._calibrationSaved(summary)
+			self._mainctrl._calibrationChanged()
+
+	def _renderReport(self, report, path):
+		'''Render the PDF report in worker processes, progress in the status bar.'''
+		statusBar = self._calview.statusBar
+		name = os.path.basename(path)
+		thread = CalibrationReportThread(report, path, parent=self._calview)
+
+		def on_page_done(done, total):
+			statusBar.showMessage(f'Rendering {name}: page {done} of {total}…')
+
+		def on_finished(path, error):
+			self._reportThreads.discard(thread)
+			if error:
+				print(f'Calibration report failed: {error}')
+				statusBar.showMessage(f'Could not write {name}: {error}', 10000)
+			else:
+				print(f'Saved calibration report to {path}')
+				statusBar.showMessage(f'Saved calibration report {name}', 10000)
+
+		thread.page_done.connect(on_page_done)
+		thread.report_finished.connect(on_finished)
+		thread.finished.connect(thread.deleteLater)
+		self._reportThreads.add(thread)
+		statusBar.showMessage(f'Rendering {name}…')
+		thread.start()
+
+	def stopWorkers(self):
+		'''Cancel and join the auto-calibration and report threads still running (on close).'''
+		if self._autoThread is not None:
+			self._autoThread.cancel()
+			self._autoThread.wait()
+		for thread in list(self._reportThreads):
+			thread.cancel()
+			thread.wait()
 
 	def _showCalCurveSummary(self, summary, missing_info):
 		"""Popup summarizing the Calculate Curve run: what fit, what didn't,
@@ -564,12 +650,17 @@ class CalCtrlFunctions:
 			             + ''.join(f'<li>{el} — {reason}</li>'
 			                       for el, reason in skipped) + '</ul>')
 
-		# Fit table
+		# Fit table; uncertainties need more standards than parameters.
+		def _number(value, fmt):
+			return format(value, fmt) if np.isfinite(value) else '—'
+
 		rows = ''.join(
 			f'<tr>'
 			f'<td>{f["element"]}</td>'
 			f'<td align="right">{f["slope"]:.3e}</td>'
-			f'<td align="right">{f["r2"]:.4f}</td>'
+			f'<td align="right">{_number(f["slope_se"], ".2e")}</td>'
+			f'<td align="right">{_number(f["r2"], ".4f")}</td>'
+			f'<td align="right">{_number(f["lod"], ".3g")}</td>'
 			f'<td align="right">{f["n"]}</td>'
 			f'</tr>'
 			for f in fitted
@@ -580,14 +671,19 @@ class CalCtrlFunctions:
 			'<tr style="background:#4682b4;color:white">'
 			'<th align="left">Element</th>'
 			'<th>Slope (ppb/count)</th>'
+			'<th>Slope SE</th>'
 			'<th>R²</th>'
+			'<th>LOD (ppb)</th>'
 			'<th>N</th>'
 			'</tr>' + rows + '</table>'
 		)
 		lines.append(table_html)
 
 		if pdf_path:
-			lines.append(f'<b>PDF report:</b> {os.path.basename(pdf_path)}')
+			lines.append(
+				f'<b>PDF report:</b> {os.path.basename(pdf_path)} '
+				'(rendering in the background; progress in the status bar)'
+			)
 		if calib_path:
 			lines.append(f'<b>Calibration file:</b> {os.path.basename(calib_path)}')
 		if archived:
@@ -608,12 +704,7 @@ class CalCtrlFunctions:
 
 	def _reorderListWidget(self, key):
 		'''Re-sort the cal file list in place using the provided key fn.'''
-		lw = self._calview.listwidget
-		names = [lw.item(i).text() for i in range(lw.count())]
-		names.sort(key=key)
-		lw.clear()
-		for name in names:
-			lw.insertItem(lw.count(), name)
+		self._listing.setSortKey(key)
 
 	def _sortListByName(self):
 		'''Alphabetical (case-insensitive) sort.'''
@@ -694,8 +785,7 @@ class CalCtrlFunctions:
 		"""
 		from PyQt6.QtWidgets import QMessageBox, QDialog, QVBoxLayout, QTableWidget, \
 			QTableWidgetItem, QDialogButtonBox, QLabel
-		from lcicpms.raw_icpms_data import RawICPMSData
-		import numpy as np
+		from ..models.dataset_registry import get_registry
 
 		standards = self._calview.getStandardsData()
 		if not standards:
@@ -719,29 +809,14 @@ class CalCtrlFunctions:
 				print(f'  115In norm: file not found: {path}')
 				return None, None
 			try:
-				raw = RawICPMSData(path)
-				df = raw.raw_data_df
+				raw = get_registry().load(path, analytes=['115In'])
 			except Exception as e:
 				print(f'  115In norm: error reading {filename}: {e}')
 				return None, None
-			col = next(
-				(c for c in df.columns if c.startswith('115In') and 'Time' not in c),
-				None,
-			)
-			if col is None:
-				return None, None
-			values = df[col].dropna()
-			if len(values) == 0:
-				return None, col
-			return float(np.mean(values)), col
+			return average_indium(raw.data)
 
 		# Identify the blank row (concentration == 0 or name contains "blank")
-		blank_idx = None
-		for i, std in enumerate(standards):
-			name = (std.get('name') or '').lower()
-			if std.get('concentration') == 0 or 'blank' in name or 'blk' in name:
-				blank_idx = i
-				break
+		blank_idx = find_blank(standards)
 
 		if blank_idx is None:
 			QMessageBox.warning(
@@ -879,6 +954,145 @@ class CalCtrlFunctions:
 		layout.addWidget(buttons)
 		dlg.exec()
 
+	def _autoCalibrate(self):
+		"""Build the calibration from every standard in the calibration directory.
+
+		Standards are the CSV files whose names give a concentration (see
+		_extractConcentrationFromFilename on the window). The integration
+		range is suggested on the most concentrated standard, which is
+		plotted with it; all standards are then integrated over that range
+		and their 115In averaged in worker processes (utils.auto_calibration).
+		_onStandardsIntegrated fills the table and calculates the curves.
+		"""
+		from PyQt6.QtWidgets import QMessageBox, QProgressDialog
+
+		if self._autoThread is not None:
+			return
+
+		cal_dir = self._calview.calibrationDir
+		if not cal_dir or not os.path.isdir(cal_dir):
+			QMessageBox.warning(
+				self._calview,
+				'No Directory',
+				'Select the directory of calibration standards first.',
+				QMessageBox.StandardButton.Ok,
+			)
+			return
+
+		standards = []
+		unparsed = []
+		for filename in sorted(os.listdir(cal_dir), key=str.lower):
+			if not filename.lower().endswith('.csv'):
+				continue
+			conc, name = self._calview._extractConcentrationFromFilename(filename)
+			if conc is None:
+				unparsed.append(filename)
+				continue
+			standards.append({'filename': filename, 'name': name, 'concentration': conc})
+		standards.sort(key=lambda std: std['concentration'])
+
+		if len(standards) < 2:
+			QMessageBox.warning(
+				self._calview,
+				'Insufficient Standards',
+				f'Found {len(standards)} file(s) with a concentration in the name; '
+				'at least 2 are needed. Name standards like "10ppb.csv" or "Blank.csv".',
+				QMessageBox.StandardButton.Ok,
+			)
+			return
+
+		# The range is found where the peaks stand out most: the top standard.
+		top = standards[-1]['filename']
+		items = self._calview.listwidget.findItems(top, Qt.MatchFlag.MatchExactly)
+		if items:
+			blocked = self._calview.listwidget.blockSignals(True)
+			self._calview.listwidget.setCurrentItem(items[0])
+			self._calview.listwidget.blockSignals(blocked)
+			self._importAndActivatePlotting()
+		else:
+			# Not listed yet (directory scan still running)
+			self._model.importData(top)
+			self._calview.setDisplayText(top)
+			self._model.plotActiveElements()
+			self._intRange = []
+		self._showDefaultRange()
+
+		if getattr(self._model, '_data', None) is None or len(self._intRange) < 2:
+			QMessageBox.warning(
+				self._calview,
+				'No Integration Range',
+				f"Could not find an integration range on '{top}'. "
+				'Check the file and the selected elements.',
+				QMessageBox.StandardButton.Ok,
+			)
+			return
+
+		window = (self._intRange[0], self._intRange[1])
+		paths = [os.path.join(cal_dir, std['filename']) for std in standards]
+		print(f"Auto calibration: {len(paths)} standards over {window[0]:.2f} - {window[1]:.2f} min "
+			f"(range from {top})")
+
+		progress = QProgressDialog(
+			f'Integrating {len(paths)} standards…', 'Cancel', 0, len(paths), self._calview,
+		)
+		progress.setWindowTitle('Auto Calibrate')
+		progress.setWindowModality(Qt.WindowModality.WindowModal)
+		progress.setMinimumDuration(0)
+		progress.setAutoClose(False)
+		progress.setAutoReset(False)
+		progress.setValue(0)
+
+		thread = AutoCalibrationThread(
+			paths, self._calview.elements_in_stdfile, window, parent=self._calview,
+		)
+		progress.canceled.connect(thread.cancel)
+
+		def on_standard_done(done, total, path, error):
+			if error:
+				print(f'  Skipping {os.path.basename(path)}: {error}')
+			progress.setLabelText(f'Integrated {done} of {total} standards…')
+			progress.setValue(done)
+
+		thread.standard_done.connect(on_standard_done)
+		thread.standards_finished.connect(
+			lambda results, errors, cancelled: self._onStandardsIntegrated(
+				standards, results, cancelled, unparsed, progress,
+			)
+		)
+		thread.finished.connect(thread.deleteLater)
+		self._autoThread = thread
+		self._calview.integrateButtons['Auto Calibrate'].setEnabled(False)
+		thread.start()
+
+	def _onStandardsIntegrated(self, standards, results, cancelled, unparsed, progress):
+		'''Fill the table with the normalized areas of the standards and fit them.'''
+		self._autoThread = None
+		progress.close()
+		self._calview.integrateButtons['Auto Calibrate'].setEnabled(True)
+		if cancelled:
+			self._calview.statusBar.showMessage('Auto calibration cancelled', 5000)
+			return
+
+		for std, result in zip(standards, results):
+			std.update(result or {'areas': None, 'avg_in': None, 'in_col': None})
+		areas, in_norm = normalize_standards(standards)
+		if in_norm is None:
+			print('Auto calibration: no blank with a 115In signal, areas not normalized')
+		if unparsed:
+			print(f"Auto calibration: no concentration in file name, not used: {', '.join(unparsed)}")
+
+		# Rows of files that could not be integrated stay without a peak
+		# area, so Calculate Curve lists them as incomplete.
+		self._calview.clearStandardsTable()
+		for std, std_areas in zip(standards, areas):
+			row = self._calview.addStandardRow(std['filename'])
+			if std_areas is not None:
+				self._calview.setStandardPeakArea(row, std_areas)
+		self._updateButtonStates()
+
+		self._model._in_norm_results = in_norm
+		self._calcCurve()
+
 	def _connectSignals(self):
 		"""Connect signals and slots."""
 		print("Connecting calibration signals...")
@@ -905,10 +1119,12 @@ class CalCtrlFunctions:
 		self._calview.buttons['Reset'].clicked.connect(self._clearForm)
 		self._calview.buttons['Clear Plot'].clicked.connect(self._clearPlot)
 		self._calview.integrateButtons['Integrate'].clicked.connect(self._Integrate)
+		self._calview.integrateButtons['Integrate Peaks'].clicked.connect(self._integratePeaks)
 		self._calview.integrateButtons['Suggest Range'].clicked.connect(self._suggestRange)
 		self._calview.integrateButtons['Reset Integration'].clicked.connect(self._resetIntegration)
 		self._calview.integrateButtons['Calculate Curve'].clicked.connect(self._calcCurve)
 		self._calview.integrateButtons['Normalize In'].clicked.connect(self._normalizeIn)
+		self._calview.integrateButtons['Auto Calibrate'].clicked.connect(self._autoCalibrate)
 		print("  - Action button signals connected")
 
 		print("All calibration signals connected")
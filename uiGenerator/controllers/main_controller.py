@@ -11,6 +11,18 @@ import json
 from ..ui.calibration_window import Calibration
 from ..controllers.calibration_controller import CalCtrlFunctions
 from ..models.calibration import CalibrateFunctions
+from ..models.calibration_registry import CalibrationRegistry
+from ..models.alignment import align_windows
+from ..models.baseline import BASELINE_METHODS, DEFAULT_PARAMETERS, baseline_model
+from ..models.batch import integrate_run, integration_settings
+from ..models.dataset_registry import get_registry
+from ..models.internal_standard import standard_column
+from ..models.peak_table import read_peak_windows
+from ..models.results import METRICS, ResultTable
+from ..models.run_source import is_packed
+from ..utils.batch_integration import BatchIntegrationThread
+from ..utils.directory_scanner import DirectoryIndexer, DirectoryListing
+from ..utils.prefetch import RunPrefetcher
 from PTBuilder.PTView import PTView
 from PTBuilder.PTCtrl import PTCtrl
 from PTBuilder.PTModel import PTModel
@@ -42,8 +54,42 @@ class PyLCICPMSCtrl:
 		self._xMax = 0
 		self.button_is_checked = False
 		self._update_thread = None  # Store update checker thread
+		self._batchThread = None  # BatchIntegrationThread of a multi-file Integrate
 		self._calibrationPending = False  # Flag for calibration element selection
 		self._click_proxy = None  # SignalProxy for plot clicks (set up once)
+		# Parses the files either side of the selection in the background so
+		# arrow-key stepping through a sequence doesn't block on the parser.
+		self._prefetcher = RunPrefetcher()
+		# Intensity storage is a user setting (Settings > Intensity Storage);
+		# integration casts back to float64 in every mode.
+		get_registry().configure(intensity_storage=self._view.intensityStorage)
+		# Follow mode: poll the selected file for appended rows while it is
+		# still being acquired.
+		self._followTimer = QTimer()
+		self._followTimer.setInterval(1000)
+		self._followTimer.timeout.connect(self._pollFollow)
+		# Run list: filled from a worker thread, kept up to date by a
+		# filesystem watcher, tooltips built on hover. '.csv' in the name also
+		# takes .csv.gz / .csv.xz; runs inside .zip archives are listed as
+		# "<archive>.zip/<member>" and streamed by the loader.
+		self._listing = DirectoryListing(
+			self._view.listwidget, match=lambda name: '.csv' in name, archives=True,
+			parent=self._view,
+		)
+		# Run metadata index (analytes, duration, acquisition time, mean
+		# 115In) kept in a sidecar next to the runs; drives the analyte
+		# filter, date sort and the directory view of the periodic table.
+		self._indexer = DirectoryIndexer(
+			match=lambda name: '.csv' in name, archives=True, parent=self._view,
+		)
+		self._sortField = None  # run index field the list is sorted by, if any
+		# Every .calib under the directory (timestamp, analytes, fit stats,
+		# paired report), indexed in the background: Load Cal. takes the
+		# newest, Cal. History picks an older one.
+		self._calIndexer = DirectoryIndexer(factory=CalibrationRegistry, parent=self._view)
+		# Controllers of the calibration windows opened, whose worker threads
+		# are stopped when the main window closes.
+		self._calControllers = []
 
 		# Connect signals and slots
 		self._connectSignals()
@@ -59,6 +105,8 @@ class PyLCICPMSCtrl:
 		QTimer.singleShot(1000, self._selectDirectory)
 
 	def _selectDirectory(self):
+		self._prefetcher.cancel()
+		self._view.buttons['Follow'].setChecked(False)
 		self._view.homeDir = ''
 		self._view.listwidget.clear()
 		dialog = QFileDialog()
@@ -77,41 +125,54 @@ class PyLCICPMSCtrl:
 			self._createListbox()
 			self._view.integrateButtons['Calibrate'].setEnabled(True)
 			self._view.integrateButtons['Load Cal.'].setEnabled(True)
+			self._view.integrateButtons['Cal. History'].setEnabled(True)
 			self._view.integrateButtons['115In Correction'].setEnabled(True)
 
 	def _createListbox(self):
-
-		self._view.listwidget.clear()
-
-		test_dir = self._view.homeDir #'/Users/christiandewey/presentations/DOE-PI-22/day6/day6/'
-		i = 0
-		for name in sorted(os.listdir(test_dir)):
-			if '.csv' in name:
-				# Add item to list
-				self._view.listwidget.insertItem(i, name)
-
-				# Add tooltip with file information
-				try:
-					file_path = os.path.join(test_dir, name)
-					file_size = os.path.getsize(file_path)
-					mod_time = os.path.getmtime(file_path)
-					from datetime import datetime
-					mod_date = datetime.fromtimestamp(mod_time).strftime('%Y-%m-%d %H:%M')
-
-					# Format file size
-					if file_size < 1024:
-						size_str = f"{file_size} B"
-					elif file_size < 1024 * 1024:
-						size_str = f"{file_size / 1024:.1f} KB"
-					else:
-						size_str = f"{file_size / (1024 * 1024):.1f} MB"
-
-					tooltip = f"Path: {file_path}\nSize: {size_str}\nModified: {mod_date}"
-					self._view.listwidget.item(i).setToolTip(tooltip)
-				except:
-					pass
-
-				i = i + 1
+		'''Lists the run files of homeDir in the background (see DirectoryListing).'''
+		self._listing.setFilter(None)
+		self._listing.setDirectory(self._view.homeDir)
+		self._view.directoryAnalytes = {}
+		self._view.analyteFilter.setCurrentIndex(0)
+		self._indexer.setDirectory(self._view.homeDir)
+		self._calIndexer.setDirectory(self._view.homeDir)
+
+	def _onIndexUpdated(self, changed):
+		'''Refresh everything derived from the run index after entries changed.'''
+		index = self._indexer.index
+		if index is None:
+			return
+		self._view.directoryAnalytes = index.analyte_counts()
+
+		combo = self._view.analyteFilter
+		current = combo.currentData()
+		blocked = combo.blockSignals(True)
+		combo.clear()
+		combo.addItem('All analytes', None)
+		for analyte in sorted(self._view.directoryAnalytes):
+			combo.addItem(f'{analyte} ({self._view.directoryAnalytes[analyte]})', analyte)
+		row = combo.findData(current)
+		combo.setCurrentIndex(row if row >= 0 else 0)
+		combo.blockSignals(blocked)
+
+		self._filterByAnalyte()
+		if self._sortField is not None:
+			self._listing.setSortKey(index.sort_key(self._sortField))
+
+	def _setIntensityStorage(self, mode, checked=True):
+		"""Hold resident runs' intensities as ``mode`` from now on (reloads them)."""
+		self._view.setIntensityStorage(mode)
+		get_registry().configure(intensity_storage=mode)
+		self._view.statusBar.showMessage(f'Intensity storage: {mode}', 3000)
+
+	def _filterByAnalyte(self, *args):
+		'''Only list runs the index says contain the analyte picked in the filter.'''
+		analyte = self._view.analyteFilter.currentData()
+		if analyte is None or self._indexer.index is None:
+			self._listing.setFilter(None)
+			return
+		names = set(self._indexer.index.runs_with(analyte))
+		self._listing.setFilter(lambda name: name in names)
 
 	def _buildExpression(self, sub_exp):
 		"""Build expression - no longer needed with display removed."""
@@ -143,9 +204,10 @@ class PyLCICPMSCtrl:
 			self._view.compareFilesBtn.setChecked(False)
 
 		# Drop any accumulated integration results and disable Save button.
-		self._view.integrationResults = []
+		self._view.integrationResults = ResultTable()
 		if 'Save Integration' in self._view.integrateButtons:
 			self._view.integrateButtons['Save Integration'].setEnabled(False)
+			self._view.integrateButtons['Re-quantify'].setEnabled(False)
 
 		# Deselect current file so clicking it again will reload
 		self._view.listwidget.setCurrentItem(None)
@@ -160,6 +222,8 @@ class PyLCICPMSCtrl:
 
 			# Clear integration results when selecting a new file
 			self._view.hideIntegrationResults()
+			# Following is tied to one file; selecting another stops it
+			self._view.buttons['Follow'].setChecked(False)
 
 			# Normal single file mode
 			filename = self._view.listwidget.currentItem().text()
@@ -179,11 +243,54 @@ class PyLCICPMSCtrl:
 			self._makePlot()
 			self._view.buttons['Reset'].setEnabled(True)
 			self._view.buttons['Export Plot'].setEnabled(True)
+			# Compressed / archived runs are finished; there is nothing to tail.
+			self._view.buttons['Follow'].setEnabled(not is_packed(file_path))
 			self._view.listwidget.setFocus()
+			self._prefetchNeighbours()
 
 			# Update compare button state (now that elements are loaded)
 			self._updateCompareButtons()
 
+	def _toggleFollow(self, checked):
+		'''Follow the selected file while it is being written (live tail mode).'''
+		if not checked:
+			self._followTimer.stop()
+			self._model.stopFollow()
+			return
+		if self._view.compareMode or self._view.listwidget.currentItem() is None:
+			self._view.buttons['Follow'].setChecked(False)
+			return
+		try:
+			self._model.startFollow()
+		except (OSError, ValueError) as e:
+			self._view.statusBar.showMessage(f'Cannot follow file: {e}', 5000)
+			self._view.buttons['Follow'].setChecked(False)
+			return
+		self._followTimer.start()
+		self._view.statusBar.showMessage('Following file: new rows are plotted as they are written', 3000)
+
+	def _pollFollow(self):
+		'''Timer slot: append rows written since the last poll to the plot.'''
+		try:
+			new_rows = self._model.pollFollow()
+		except (OSError, ValueError) as e:
+			self._view.statusBar.showMessage(f'Stopped following: {e}', 5000)
+			self._view.buttons['Follow'].setChecked(False)
+			return
+		if new_rows:
+			self._view.statusBar.showMessage(f'Following: {new_rows} new row(s)', 2000)
+
+	def _prefetchNeighbours(self):
+		'''Queue the files either side of the current row for background parsing.'''
+		lw = self._view.listwidget
+		rows = RunPrefetcher.neighbour_rows(
+			lw.currentRow(), lw.count(), self._prefetcher.radius,
+		)
+		self._prefetcher.prefetch(
+			[os.path.join(self._view.homeDir, lw.item(r).text()) for r in rows],
+			analytes=self._model.projection(),
+		)
+
 	def _mouseover(self, pos):
 		''' selects range for integration'''
 		act_pos = self._view.chroma.mapFromScene(pos)
@@ -216,6 +323,10 @@ class PyLCICPMSCtrl:
 				5000,
 			)
 			self._model.plotHighRange(self._act_pos.x(), self._n)
+			if self._model.region is not None:
+				self._model.region.sigRegionChanged.connect(self._onRegionDragged)
+				self._model.region.sigRegionChangeFinished.connect(self._onRegionDropped)
+				self._onRegionDragged()
 			self._view.integrateButtons['Integrate'].setEnabled(True)
 			self._view.integrateButtons['Integrate'].setStyleSheet(
 				'background-color: red'
@@ -224,6 +335,31 @@ class PyLCICPMSCtrl:
 
 		self.n_clicks = 1
 
+	def _onRegionDragged(self, *args):
+		'''Live peak areas while the integration region's edges are dragged.
+
+		The range follows the region; areas come from the run's cached
+		cumulative integrals, so this is cheap enough for every mouse move.
+		Not shown in comparison mode (Integrate reports per file there).
+		'''
+		region = self._model.region
+		if region is None:
+			return
+		lo, hi = region.getRegion()
+		self._intRange = [lo, hi]
+		if self._view.compareMode or self._model._data is None:
+			return
+		results = self._model.liveResults(self._intRange)
+		self._displayIntegrationResults(
+			results, len(self._view.calCurves) > 0, title='Live',
+		)
+
+	def _onRegionDropped(self, *args):
+		lo, hi = self._intRange
+		self._view.statusBar.showMessage(
+			f'Integration range: {lo:.2f} - {hi:.2f} min ({hi - lo:.2f} min)', 3000,
+		)
+
 	def _enablePlotClicks(self):
 		'''Bind mouse clicks on the plot to _onClick, once.
 
@@ -274,6 +410,7 @@ class PyLCICPMSCtrl:
 				return
 
 			# Enable comparison mode
+			self._view.buttons['Follow'].setChecked(False)
 			self._view.compareMode = True
 			self._loadComparisonFiles()
 
@@ -283,6 +420,7 @@ class PyLCICPMSCtrl:
 			self._view.compareMode = False
 			self._view.comparisonFiles = []
 			self._view.comparisonData = []
+			self._view.comparisonShifts = {}
 
 			self._view.statusBar.showMessage('Comparison mode disabled', 2000)
 
@@ -447,7 +585,6 @@ class PyLCICPMSCtrl:
 	def _loadComparisonFiles(self):
 		"""Load all files from comparison list and update plot."""
 		from PyQt6.QtWidgets import QMessageBox
-		from lcicpms.raw_icpms_data import RawICPMSData
 		import os
 
 		try:
@@ -465,17 +602,19 @@ class PyLCICPMSCtrl:
 			self._view.comparisonFiles = []
 			self._view.comparisonData = []
 
+			registry = get_registry()
+			analytes = self._model.projection()
+			runs = []
 			for filename in filenames:
 				file_path = os.path.join(self._view.homeDir, filename)
-				raw_data = RawICPMSData(file_path)
+				raw_data = registry.load(file_path, analytes=analytes)
+				runs.append(raw_data)
 				self._view.comparisonFiles.append(filename)
-				self._view.comparisonData.append(raw_data.raw_data_df)
+				self._view.comparisonData.append(raw_data.data)
 
-			# Load first file as main data
-			file_path = os.path.join(self._view.homeDir, filenames[0])
-			raw_data = RawICPMSData(file_path)
-			self._model._data = raw_data.raw_data_df
-			self._view._elements_in_file = raw_data.elements
+			# First file doubles as the main data (same shared run object)
+			self._model._data = runs[0].data
+			self._view._elements_in_file = list(runs[0].elements)
 
 			# Update window title
 			num_files = len(filenames)
@@ -500,6 +639,25 @@ class PyLCICPMSCtrl:
 				QMessageBox.StandardButton.Ok
 			)
 
+	def _toggleAlignment(self, checked):
+		'''Align (or stop aligning) the comparison runs' retention times'''
+		self._view.alignComparison = bool(checked)
+		if not (self._view.compareMode and self._view.comparisonData):
+			return
+		x_limits, y_limits = self._view.plotSpace.viewRange()
+		self._makePlot()
+		self._view.plotSpace.setXRange(*x_limits, padding=0)
+		self._view.plotSpace.setYRange(*y_limits, padding=0)
+		shifts = self._view.comparisonShifts
+		if checked and shifts:
+			largest = max(shifts.values(), key=abs)
+			self._view.statusBar.showMessage(
+				f'Aligned {len(shifts)} files on {self._view.activeElements[0]} '
+				f'(largest shift {largest:+.1f} s)', 5000,
+			)
+		elif checked:
+			self._view.statusBar.showMessage('Could not align the comparison files', 5000)
+
 	def _baselineSubtraction(self,checked):
 		'''select integration range'''
 		if self._view.baseSubtractBox.isChecked() == True:
@@ -538,10 +696,7 @@ class PyLCICPMSCtrl:
 			# 115In is never integrated and never needs a cal curve, so it
 			# shouldn't count against "unmatched" here even if the user
 			# selected it for plotting.
-			active_elements = {
-				el for el in self._view.activeElements
-				if not el.startswith('115In')
-			}
+			active_elements = set(self._model.integratedElements())
 			matched = cal_elements & active_elements
 			unmatched = active_elements - cal_elements
 			if matched:
@@ -553,13 +708,18 @@ class PyLCICPMSCtrl:
 					5000,
 				)
 
-		new_records = []
-		display_results = {}  # short_name -> results dict (for display)
+		new_results = ResultTable()
+		labels = []  # row labels for display (comparison mode)
 
 		# --- Comparison mode --------------------------------------------
 		if self._view.compareMode and self._view.comparisonData:
-			for compare_data, filename in zip(
-				self._view.comparisonData, self._view.comparisonFiles,
+			# Pick up 115In if the correction was just switched on
+			self._model.loadActiveColumns()
+			# Aligned runs integrate the range moved by their retention shift
+			shifts = [self._view.comparisonShifts.get(f, 0.0) for f in self._view.comparisonFiles]
+			ranges = align_windows(np.asarray(self._intRange) * 60, shifts) / 60
+			for compare_data, filename, file_range in zip(
+				self._view.comparisonData, self._view.comparisonFiles, ranges,
 			):
 				if filename in self._view.comparisonLabels:
 					short_name = self._view.comparisonLabels[filename]
@@ -570,14 +730,13 @@ class PyLCICPMSCtrl:
 				else:
 					short_name = filename.replace('.csv', '')
 
-				record = self._model.integrate(
-					self._intRange,
+				new_results.extend(self._model.integrate(
+					(float(file_range[0]), float(file_range[1])),
 					has_calibration=has_calibration,
 					data=compare_data,
 					filename=filename,
-				)
-				new_records.append(record)
-				display_results[short_name] = record['results']
+				))
+				labels.append(short_name)
 
 			source_label = 'comparison mode'
 
@@ -587,45 +746,44 @@ class PyLCICPMSCtrl:
 			multi = len(selected_items) > 1
 
 			if multi:
-				for item in selected_items:
-					filename = item.text()
-					path = os.path.join(self._view.homeDir, filename)
-					try:
-						df = self._model.importData_generic(fdir=path)
-					except Exception as e:
-						print(f'  Skipping {filename}: {e}')
-						continue
-					record = self._model.integrate(
-						self._intRange,
-						has_calibration=has_calibration,
-						data=df,
-						filename=filename,
-					)
-					new_records.append(record)
-					display_results[filename] = record['results']
-
-				source_label = f'{len(display_results)} selected file(s)'
+				# Parsed and integrated in worker processes; the results
+				# come back through _onBatchIntegrated.
+				self._startBatchIntegration(
+					[os.path.join(self._view.homeDir, item.text()) for item in selected_items],
+					self._integrationSettings(
+						[('', self._intRange[0], self._intRange[1])], has_calibration,
+						named_windows=False,
+					),
+					has_calibration,
+				)
+				return
 			else:
 				# Single-file: uses the currently-loaded dataset.
-				record = self._model.integrate(
+				new_results = self._model.integrate(
 					self._intRange, has_calibration=has_calibration,
 				)
-				new_records.append(record)
-				display_results[record['filename']] = record['results']
 				# Inline panel gets the quick-glance version as well.
-				self._displayIntegrationResults(record['results'], has_calibration)
+				self._displayIntegrationResults(new_results.results(0), has_calibration)
 				source_label = 'single file'
 
-		# Stash records in memory *before* the popup opens so its Save button
+		self._finishIntegration(new_results, has_calibration, source_label, labels=labels or None)
+
+	def _finishIntegration(self, new_results, has_calibration, source_label, labels=None):
+		'''Keep new integration results (a ResultTable) and show the summary popup.'''
+		# Stash results in memory *before* the popup opens so its Save button
 		# has data to write, then show the summary.
-		self._view.integrationResults.extend(new_records)
-		if new_records:
+		self._view.integrationResults.extend(new_results)
+		if len(new_results):
+			# Rows of detected peaks carry their window names.
+			windows = [w for w in dict.fromkeys(new_results.column('window')) if w]
 			self._showMultiFileResultsDialog(
-				display_results, has_calibration, source=source_label,
+				new_results, has_calibration, source=source_label,
+				windows=windows or None, labels=labels,
 			)
 			self._view.integrateButtons['Save Integration'].setEnabled(True)
+			self._view.integrateButtons['Re-quantify'].setEnabled(True)
 			self._view.statusBar.showMessage(
-				f'Integrated {len(new_records)} file(s). '
+				f'Integrated {len(new_results)} file(s). '
 				f'{len(self._view.integrationResults)} record(s) in memory.',
 				6000,
 			)
@@ -634,19 +792,201 @@ class PyLCICPMSCtrl:
 			'background-color: light gray'
 		)
 
+	def _integratePeakTable(self):
+		'''Integrate the windows of a peak-table CSV in every selected file.
+
+		The CSV lists one window per row: name, start, stop (minutes). All
+		files, windows and active elements are integrated in one pass (see
+		LICPMSfunctions.integratePeakTable); the records join the in-memory
+		results like the ones from Integrate.
+		'''
+		from PyQt6.QtWidgets import QMessageBox, QFileDialog
+
+		items = self._view.listwidget.selectedItems()
+		if not items and self._view.listwidget.currentItem() is not None:
+			items = [self._view.listwidget.currentItem()]
+		active = self._model.integratedElements()
+		if not items or not active:
+			QMessageBox.information(
+				self._view,
+				'Peak Table',
+				'Select one or more files and the elements to integrate first.',
+				QMessageBox.StandardButton.Ok,
+			)
+			return
+
+		path, _ = QFileDialog.getOpenFileName(
+			self._view, 'Select Peak Table', self._view.homeDir,
+			'CSV Files (*.csv);;All Files (*)',
+		)
+		if not path:
+			return
+		try:
+			windows = read_peak_windows(path)
+		except (OSError, ValueError) as e:
+			QMessageBox.critical(
+				self._view, 'Peak Table', f'Could not read peak table:\n\n{e}',
+				QMessageBox.StandardButton.Ok,
+			)
+			return
+
+		if not self._promptIntegrationOptions():
+			return
+		has_calibration = len(self._view.calCurves) > 0
+
+		files = [os.path.join(self._view.homeDir, item.text()) for item in items]
+		try:
+			table = self._model.integratePeakTable(
+				windows, files, has_calibration=has_calibration,
+			)
+		except Exception as e:
+			QMessageBox.critical(
+				self._view, 'Peak Table', f'Integration failed:\n\n{e}',
+				QMessageBox.StandardButton.Ok,
+			)
+			return
+
+		results = table.results()
+		self._view.integrationResults.extend(results)
+		self._showMultiFileResultsDialog(
+			results, has_calibration,
+			source=f'{len(files)} file(s) × {len(windows)} window(s)',
+			windows=windows,
+		)
+		self._view.integrateButtons['Save Integration'].setEnabled(True)
+		self._view.integrateButtons['Re-quantify'].setEnabled(True)
+		self._view.statusBar.showMessage(
+			f'Integrated {len(windows)} window(s) in {len(files)} file(s). '
+			f'{len(self._view.integrationResults)} record(s) in memory.',
+			6000,
+		)
+
+	def _integrationSettings(self, windows, has_calibration, named_windows=True):
+		'''models.batch settings for the active elements and current options.
+
+		``windows`` None integrates the peaks detected in each file.
+		'''
+		return integration_settings(
+			windows,
+			analytes=self._model.integratedElements(),
+			cal_curves=self._view.calCurves if has_calibration else None,
+			masses=self._view.masses,
+			baseline=self._model.baselineModel() or False,
+			internal_standard=self._model.internalStandard(),
+			named_windows=named_windows,
+		)
+
+	def _integrateDetectedPeaks(self):
+		'''Detect and integrate every significant peak in the selected files.
+
+		Peaks are found per element (models.peak_detection); co-eluting
+		peaks of different elements share one window, and every active
+		element is integrated over every window of its file.
+		'''
+		from PyQt6.QtWidgets import QMessageBox
+
+		items = self._view.listwidget.selectedItems()
+		if not items and self._view.listwidget.currentItem() is not None:
+			items = [self._view.listwidget.currentItem()]
+		active = self._model.integratedElements()
+		if not items or not active:
+			QMessageBox.information(
+				self._view,
+				'Find Peaks',
+				'Select one or more files and the elements to integrate first.',
+				QMessageBox.StandardButton.Ok,
+			)
+			return
+		if not self._promptIntegrationOptions():
+			return
+		has_calibration = len(self._view.calCurves) > 0
+		settings = self._integrationSettings(None, has_calibration)
+		paths = [os.path.join(self._view.homeDir, item.text()) for item in items]
+
+		if len(paths) > 1:
+			self._startBatchIntegration(paths, settings, has_calibration)
+			return
+		try:
+			results = integrate_run(paths[0], settings)
+		except Exception as e:
+			QMessageBox.critical(
+				self._view, 'Find Peaks', f'Integration failed:\n\n{e}',
+				QMessageBox.StandardButton.Ok,
+			)
+			return
+		if not len(results):
+			self._view.statusBar.showMessage('No significant peaks found', 5000)
+			return
+		self._finishIntegration(
+			results, has_calibration, f'{len(results)} detected peak(s)',
+		)
+
+	def _startBatchIntegration(self, paths, settings, has_calibration):
+		'''Integrate ``paths`` with models.batch ``settings`` in a process pool.
+
+		A progress dialog tracks finished files and can cancel the rest;
+		records of finished files are kept, in selection order.
+		'''
+		progress = QProgressDialog(
+			f'Integrating {len(paths)} files…', 'Cancel', 0, len(paths), self._view,
+		)
+		progress.setWindowTitle('Integration')
+		progress.setWindowModality(Qt.WindowModality.WindowModal)
+		progress.setMinimumDuration(0)
+		progress.setAutoClose(False)
+		progress.setAutoReset(False)
+		progress.setValue(0)
+
+		thread = BatchIntegrationThread(paths, settings, parent=self._view)
+		progress.canceled.connect(thread.cancel)
+
+		def on_run_done(done, total, path, error):
+			if error:
+				print(f'  Skipping {os.path.basename(path)}: {error}')
+			progress.setLabelText(f'Integrated {done} of {total} files…')
+			progress.setValue(done)
+
+		thread.run_done.connect(on_run_done)
+		thread.batch_finished.connect(
+			lambda records, errors, cancelled: self._onBatchIntegrated(
+				records, errors, cancelled, len(paths), has_calibration, progress,
+			)
+		)
+		thread.finished.connect(thread.deleteLater)
+		self._batchThread = thread
+		self._view.integrateButtons['Integrate'].setEnabled(False)
+		thread.start()
+
+	def _onBatchIntegrated(self, results, errors, cancelled, n_files, has_calibration, progress):
+		self._batchThread = None
+		progress.close()
+		self._view.integrateButtons['Integrate'].setEnabled(len(self._intRange) == 2)
+		n_done = len(set(results.column('file')))
+		source_label = f'{n_done} selected file(s)'
+		if cancelled:
+			source_label += f' (cancelled, {n_files - n_done - len(errors)} not integrated)'
+		if errors:
+			source_label += f', {len(errors)} skipped'
+		if cancelled and not len(results):
+			self._view.statusBar.showMessage('Integration cancelled', 5000)
+		self._finishIntegration(results, has_calibration, source_label)
+
 	def _promptIntegrationOptions(self):
 		'''Modal popup shown at the start of every Integrate action.
 
 		Lets the user toggle:
 		  * Baseline subtraction  (sets self._view.baseSubtract)
-		  * 115In normalization   (sets self._view.normAvIndium via file pick)
+		  * Baseline model        (sets self._view.baselineModel)
+		  * Internal standard     (sets self._view.normAvIndium via file pick,
+		                           and self._view.internalStandard)
 
 		Returns True if integration should proceed, False if the user
 		cancelled.
 		'''
 		from PyQt6.QtWidgets import (
 			QDialog, QVBoxLayout, QHBoxLayout, QCheckBox, QLabel, QPushButton,
-			QDialogButtonBox,
+			QDialogButtonBox, QComboBox, QStackedWidget, QFormLayout, QDoubleSpinBox,
+			QSpinBox, QLineEdit, QWidget,
 		)
 
 		dlg = QDialog(self._view)
@@ -658,16 +998,136 @@ class PyLCICPMSCtrl:
 		base_box = QCheckBox('Subtract baseline')
 		base_box.setChecked(bool(self._view.baseSubtract))
 		base_box.setToolTip(
-			'Subtract a trapezoidal baseline (drawn between the intensities '
-			'at the start and end of the integration range) from every '
-			'element\'s peak area.'
+			'Subtract a baseline from every element\'s peak area: by default '
+			'the trapezoid drawn between the intensities at the start and end '
+			'of the integration range, or one of the models below.'
 		)
 		layout.addWidget(base_box)
 
-		# --- 115In correction ---
+		# --- Baseline model: one page of parameters per method ---
+		current = self._view.baselineModel or baseline_model()
+
+		def params(method):
+			return current if current['method'] == method else DEFAULT_PARAMETERS[method]
+
+		method_box = QComboBox()
+		for method, label in BASELINE_METHODS.items():
+			method_box.addItem(label, method)
+		method_box.setToolTip(
+			'Rolling minimum, asymmetric least squares and polynomial baselines '
+			'are fitted to the whole trace and drawn dashed on the plot.'
+		)
+		pages = QStackedWidget()
+		pages.addWidget(QWidget())  # trapezoid: nothing to set
+
+		rolling_page = QWidget()
+		rolling_form = QFormLayout(rolling_page)
+		rolling_window = QDoubleSpinBox()
+		rolling_window.setRange(1, 3600)
+		rolling_window.setSuffix(' s')
+		rolling_window.setValue(params('rolling_min')['window'])
+		rolling_window.setToolTip('Wider than the widest peak')
+		rolling_form.addRow('Window:', rolling_window)
+		pages.addWidget(rolling_page)
+
+		als_page = QWidget()
+		als_form = QFormLayout(als_page)
+		als_lam = QSpinBox()
+		als_lam.setRange(1, 12)
+		als_lam.setPrefix('10^')
+		als_lam.setValue(int(round(np.log10(params('als')['lam']))))
+		als_lam.setToolTip('Stiffness λ of the baseline; larger is smoother')
+		als_p = QDoubleSpinBox()
+		als_p.setDecimals(3)
+		als_p.setRange(0.001, 0.5)
+		als_p.setSingleStep(0.005)
+		als_p.setValue(params('als')['p'])
+		als_p.setToolTip('Weight of samples above the baseline (peaks)')
+		als_form.addRow('Smoothness λ:', als_lam)
+		als_form.addRow('Asymmetry p:', als_p)
+		pages.addWidget(als_page)
+
+		poly_page = QWidget()
+		poly_form = QFormLayout(poly_page)
+		poly_degree = QSpinBox()
+		poly_degree.setRange(0, 5)
+		poly_degree.setValue(params('polynomial')['degree'])
+		poly_regions = QLineEdit(
+			'; '.join(f'{a:g}-{b:g}' for a, b in params('polynomial')['regions'])
+		)
+		poly_regions.setPlaceholderText('e.g. 1-2.5; 14-16 (min)')
+		poly_regions.setToolTip('Baseline-only stretches of the run, in minutes')
+		add_region = QPushButton('Add current range')
+		add_region.setToolTip('Append the range marked on the plot as a baseline region')
+		add_region.setEnabled(len(self._intRange) == 2)
+
+		def _add_region():
+			lo, hi = sorted(self._intRange)
+			text = poly_regions.text().strip()
+			poly_regions.setText(f'{text}; {lo:.2f}-{hi:.2f}' if text else f'{lo:.2f}-{hi:.2f}')
+
+		add_region.clicked.connect(_add_region)
+		poly_form.addRow('Degree:', poly_degree)
+		poly_form.addRow('Regions:', poly_regions)
+		poly_form.addRow('', add_region)
+		pages.addWidget(poly_page)
+
+		method_row = QHBoxLayout()
+		method_row.addWidget(QLabel('Baseline:'))
+		method_row.addWidget(method_box, 1)
+		layout.addLayout(method_row)
+		layout.addWidget(pages)
+		method_box.currentIndexChanged.connect(pages.setCurrentIndex)
+		method_box.setCurrentIndex(list(BASELINE_METHODS).index(current['method']))
+		pages.setCurrentIndex(method_box.currentIndex())
+
+		def _refresh_baseline_ui():
+			method_box.setEnabled(base_box.isChecked())
+			pages.setEnabled(base_box.isChecked())
+
+		_refresh_baseline_ui()
+		base_box.stateChanged.connect(lambda _s: _refresh_baseline_ui())
+
+		def _chosen_model():
+			method = method_box.currentData()
+			if method == 'rolling_min':
+				return baseline_model(method, window=rolling_window.value())
+			if method == 'als':
+				return baseline_model(method, lam=10.0 ** als_lam.value(), p=als_p.value())
+			if method == 'polynomial':
+				return baseline_model(
+					method, degree=poly_degree.value(),
+					regions=self._parseRegions(poly_regions.text()),
+				)
+			return baseline_model()
+
+		# --- Internal-standard (drift) correction ---
 		in_row = QHBoxLayout()
-		in_box = QCheckBox('Apply 115In normalization')
+		in_box = QCheckBox('Apply internal-standard correction')
+		in_box.setToolTip(
+			'Divide every trace by the smoothed internal-standard trace over '
+			'its average in a reference file, point by point, to correct '
+			'for drift during the run.'
+		)
 		in_row.addWidget(in_box)
+		isotope_box = QComboBox()
+		isotope_box.setEditable(True)
+		isotope_box.addItems(list(dict.fromkeys(
+			[self._view.internalStandard['isotope']] + list(self._view._elements_in_file)
+		)))
+		isotope_box.setToolTip('Internal-standard isotope')
+		in_row.addWidget(isotope_box)
+		in_row.addWidget(QLabel('smoothing'))
+		drift_window = QDoubleSpinBox()
+		drift_window.setRange(0.0, 3600.0)
+		drift_window.setDecimals(0)
+		drift_window.setSuffix(' s')
+		drift_window.setValue(self._view.internalStandard['window'])
+		drift_window.setToolTip(
+			'Rolling median / mean window of the internal-standard trace; '
+			'0 follows it sample by sample.'
+		)
+		in_row.addWidget(drift_window)
 		layout.addLayout(in_row)
 
 		in_status = QLabel()
@@ -676,24 +1136,29 @@ class PyLCICPMSCtrl:
 
 		pick_btn = QPushButton('Choose reference file…')
 		pick_btn.setToolTip(
-			'Pick a CSV whose average 115In signal will be used as the '
-			'normalization reference.'
+			'Pick a CSV whose average internal-standard signal will be used '
+			'as the correction reference.'
 		)
 		layout.addWidget(pick_btn)
 
 		# Local state so cancel doesn't mutate view.normAvIndium.
-		state = {'norm_avg': self._view.normAvIndium if self._view.normAvIndium > 0 else None}
+		state = {
+			'norm_avg': self._view.normAvIndium if self._view.normAvIndium > 0 else None,
+			'isotope': self._view.internalStandard['isotope'],
+		}
 
 		def _refresh_in_ui():
 			has_ref = state['norm_avg'] is not None
 			if has_ref:
 				in_status.setText(
-					f'Reference loaded: avg 115In = {state["norm_avg"]:.1f} counts'
+					f'Reference loaded: avg {state["isotope"]} = {state["norm_avg"]:.1f} counts'
 				)
 			else:
 				in_status.setText('<i>No reference file loaded.</i>')
 				in_status.setTextFormat(Qt.TextFormat.RichText)
 			pick_btn.setEnabled(in_box.isChecked())
+			isotope_box.setEnabled(in_box.isChecked())
+			drift_window.setEnabled(in_box.isChecked())
 			in_status.setVisible(True)
 
 		# Pre-check the box if a reference is already loaded from a prior run.
@@ -701,29 +1166,36 @@ class PyLCICPMSCtrl:
 		_refresh_in_ui()
 		in_box.stateChanged.connect(lambda _s: _refresh_in_ui())
 
+		def _isotope_changed(text):
+			# A reference average belongs to one isotope.
+			if text.strip() != state['isotope']:
+				state['norm_avg'] = None
+				state['isotope'] = text.strip()
+				_refresh_in_ui()
+
+		isotope_box.currentTextChanged.connect(_isotope_changed)
+
 		def _pick_reference():
 			from PyQt6.QtWidgets import QFileDialog
+			isotope = isotope_box.currentText().strip()
 			path, _ = QFileDialog.getOpenFileName(
-				dlg, 'Select 115In Normalization File',
+				dlg, f'Select {isotope} Reference File',
 				self._view.homeDir, 'CSV Files (*.csv);;All Files (*)',
 			)
 			if not path:
 				return
 			try:
-				df = self._model.importData_generic(fdir=path)
+				df = self._model.importData_generic(fdir=path, analytes=[isotope])
 			except Exception as e:
 				in_status.setText(f'<span style="color:#a04040">Error: {e}</span>')
 				return
-			indium_col = next(
-				(c for c in df.columns
-				 if c.startswith('115In') and 'Time' not in c),
-				None,
-			)
+			indium_col = standard_column(df, isotope)
 			if indium_col is None:
 				in_status.setText(
-					'<span style="color:#a04040">115In column not found in that file.</span>'
+					f'<span style="color:#a04040">{isotope} column not found in that file.</span>'
 				)
 				return
+			state['isotope'] = isotope
 			state['norm_avg'] = float(np.average(df[indium_col].dropna()))
 			_refresh_in_ui()
 
@@ -733,7 +1205,20 @@ class PyLCICPMSCtrl:
 			QDialogButtonBox.StandardButton.Ok
 			| QDialogButtonBox.StandardButton.Cancel,
 		)
-		buttons.accepted.connect(dlg.accept)
+		chosen = {}
+
+		def _accept():
+			if base_box.isChecked():
+				try:
+					chosen['model'] = _chosen_model()
+					if chosen['model']['method'] == 'polynomial' and not chosen['model']['regions']:
+						raise ValueError('Mark at least one baseline region.')
+				except ValueError as e:
+					QMessageBox.warning(dlg, 'Baseline', str(e))
+					return
+			dlg.accept()
+
+		buttons.accepted.connect(_accept)
 		buttons.rejected.connect(dlg.reject)
 		layout.addWidget(buttons)
 
@@ -742,39 +1227,59 @@ class PyLCICPMSCtrl:
 
 		# Apply choices to the view.
 		self._view.baseSubtract = base_box.isChecked()
+		if 'model' in chosen:
+			self._view.baselineModel = chosen['model']
+		self._model.showBaselines()
 		if in_box.isChecked() and state['norm_avg'] is not None:
 			self._view.normAvIndium = state['norm_avg']
+			self._view.internalStandard = {
+				'isotope': state['isotope'], 'window': drift_window.value(),
+			}
 		else:
 			# Not requested (or requested but no file selected) — turn off.
 			self._view.normAvIndium = -999.99
 		return True
 
-	def _showMultiFileResultsDialog(self, all_results, has_calibration, source=''):
+	@staticmethod
+	def _parseRegions(text):
+		'''[(start, stop), ...] from "1-2.5; 14-16" (minutes); ValueError if malformed'''
+		regions = []
+		for part in text.replace(',', ';').split(';'):
+			if not part.strip():
+				continue
+			try:
+				start, stop = (float(v) for v in part.split('-'))
+			except ValueError:
+				raise ValueError(f'Baseline region must be START-STOP in minutes, not {part.strip()!r}') from None
+			regions.append((start, stop))
+		return regions
+
+	def _showMultiFileResultsDialog(self, results, has_calibration, source='', windows=None, labels=None):
 		'''Show a scrollable popup table with per-file, per-element results.
 
-		all_results: dict of {file_or_label: {element: {peak_area, conc_ppb, conc_uM}}}
+		results: ResultTable, one table row per row of the popup
+		windows: peak-table windows the rows come from (default: the current range)
+		labels: row labels (default: "file · window", see ResultTable.labels)
 		'''
 		from PyQt6.QtWidgets import (
 			QDialog, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
 			QDialogButtonBox, QHeaderView,
 		)
 
-		if not all_results:
+		if not len(results):
 			return
+		if labels is None:
+			labels = results.labels()
 
-		# Ordered, de-duplicated list of elements across all files.
-		element_order = []
-		for res in all_results.values():
-			for el in res:
-				if el not in element_order:
-					element_order.append(el)
-
-		# Show a Baseline column when any element in any file had a
-		# baseline subtracted (i.e. the user checked "Subtract baseline").
-		show_baseline = any(
-			(data or {}).get('baseline_area') is not None
-			for res in all_results.values() for data in res.values()
-		)
+		# Elements with a peak area in any row, in table order.
+		areas = results.metric('peak_area')
+		present = np.isfinite(areas).any(axis=0)
+		element_order = [el for el, keep in zip(results.analytes, present) if keep]
+		values = results.values[:, present]
+
+		# Show a Baseline column when any row had a baseline subtracted
+		# (i.e. the user checked "Subtract baseline").
+		show_baseline = results.has_baseline
 
 		sub_headers = ['Peak area']
 		if show_baseline:
@@ -787,10 +1292,16 @@ class PyLCICPMSCtrl:
 		dlg.resize(1000, 520)
 		layout = QVBoxLayout(dlg)
 
-		range_min, range_max = self._intRange[0], self._intRange[1]
+		ranges = set(zip(results.column('start').tolist(), results.column('stop').tolist()))
+		if windows:
+			rows, span = 'row(s)', f'{len(windows)} window(s)'
+		elif len(ranges) == 1:
+			(start, stop), = ranges
+			rows, span = 'file(s)', f'{start:.2f} – {stop:.2f} min'
+		else:
+			rows, span = 'file(s)', f'{len(ranges)} ranges'
 		summary = QLabel(
-			f'<b>{len(all_results)} file(s)</b> integrated over '
-			f'{range_min:.2f} – {range_max:.2f} min'
+			f'<b>{len(results)} {rows}</b> integrated over {span}'
 			+ (f'  ·  source: {source}' if source else '')
 			+ ('' if has_calibration else '  ·  <i>no calibration</i>')
 		)
@@ -802,7 +1313,7 @@ class PyLCICPMSCtrl:
 		table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
 		total_cols = 1 + len(element_order) * len(sub_headers)
 		table.setColumnCount(total_cols)
-		table.setRowCount(len(all_results))
+		table.setRowCount(len(results))
 
 		# Two-row header via horizontalHeader by concatenating labels.
 		headers = ['File']
@@ -818,32 +1329,27 @@ class PyLCICPMSCtrl:
 		)
 
 		def _fmt_area(v):
-			if v is None:
+			if not np.isfinite(v):
 				return '—'
 			return f'{v:.2e}' if abs(v) >= 1e5 else f'{v:.0f}'
 
 		def _fmt(v, digits):
-			return '—' if v is None else f'{v:.{digits}f}'
+			return '—' if not np.isfinite(v) else f'{v:.{digits}f}'
 
-		for r_idx, (fname, res) in enumerate(all_results.items()):
-			table.setItem(r_idx, 0, QTableWidgetItem(fname))
+		# Numbers are formatted here, for display only; the table keeps floats.
+		metrics = [('peak_area', _fmt_area)]
+		if show_baseline:
+			metrics.append(('baseline_area', _fmt_area))
+		if has_calibration:
+			metrics.extend([('conc_ppb', lambda v: _fmt(v, 3)), ('conc_uM', lambda v: _fmt(v, 3))])
+		columns = [(METRICS.index(name), fmt) for name, fmt in metrics]
+		for r_idx, (label, row) in enumerate(zip(labels, values)):
+			table.setItem(r_idx, 0, QTableWidgetItem(str(label)))
 			col = 1
-			for el in element_order:
-				data = res.get(el)
-				if data is None:
-					for _ in sub_headers:
-						table.setItem(r_idx, col, QTableWidgetItem('—'))
-						col += 1
-					continue
-				table.setItem(r_idx, col, QTableWidgetItem(_fmt_area(data['peak_area'])))
-				col += 1
-				if show_baseline:
-					table.setItem(r_idx, col, QTableWidgetItem(_fmt_area(data.get('baseline_area'))))
-					col += 1
-				if has_calibration:
-					table.setItem(r_idx, col, QTableWidgetItem(_fmt(data['conc_ppb'], 3)))
-					col += 1
-					table.setItem(r_idx, col, QTableWidgetItem(_fmt(data['conc_uM'], 3)))
+			for data in row:
+				missing = not np.isfinite(data[0])
+				for m, fmt in columns:
+					table.setItem(r_idx, col, QTableWidgetItem('—' if missing else fmt(data[m])))
 					col += 1
 
 		layout.addWidget(table)
@@ -895,8 +1401,13 @@ class PyLCICPMSCtrl:
 		default_name = f'integration_{_dt.now().strftime("%Y%m%d_%H%M%S")}.csv'
 		default_path = os.path.join(start_dir, default_name) if start_dir else default_name
 
-		file_path, _ = QFileDialog.getSaveFileName(
-			self._view, 'Save Integration', default_path, 'CSV Files (*.csv)',
+		# Wide: one row per file (and window); long: one row per analyte too.
+		layouts = {
+			'Wide CSV, columns per element (*.csv)': 'wide',
+			'Long CSV, one row per element (*.csv)': 'long',
+		}
+		file_path, selected = QFileDialog.getSaveFileName(
+			self._view, 'Save Integration', default_path, ';;'.join(layouts),
 		)
 		if not file_path:
 			return
@@ -906,6 +1417,7 @@ class PyLCICPMSCtrl:
 		try:
 			self._model.saveIntegration(
 				self._view.integrationResults, file_path,
+				layout=layouts.get(selected, 'wide'),
 			)
 			written = [file_path]
 		except Exception as e:
@@ -921,8 +1433,9 @@ class PyLCICPMSCtrl:
 
 		# Clear in-memory records now that they've been persisted, and
 		# disable Save Integration until the user integrates something new.
-		self._view.integrationResults = []
+		self._view.integrationResults = ResultTable()
 		self._view.integrateButtons['Save Integration'].setEnabled(False)
+		self._view.integrateButtons['Re-quantify'].setEnabled(False)
 
 		msg = QMessageBox(self._view)
 		msg.setIcon(QMessageBox.Icon.Information)
@@ -936,7 +1449,7 @@ class PyLCICPMSCtrl:
 		msg.setStandardButtons(QMessageBox.StandardButton.Ok)
 		msg.exec()
 
-	def _displayIntegrationResults(self, results, has_calibration):
+	def _displayIntegrationResults(self, results, has_calibration, title='Integration'):
 		"""Display integration results in the results panel."""
 		if not results:
 			return
@@ -959,7 +1472,7 @@ class PyLCICPMSCtrl:
 
 		# Add integration range info
 		range_min, range_max = self._intRange[0], self._intRange[1]
-		header = f"<b>Integration</b> ({range_min:.2f} - {range_max:.2f} min)"
+		header = f"<b>{title}</b> ({range_min:.2f} - {range_max:.2f} min)"
 		if not has_calibration:
 			header += " <i>[No calibration]</i>"
 
@@ -1015,36 +1528,49 @@ class PyLCICPMSCtrl:
 		'''Opens the calibration window. Element selection happens inside the window.'''
 		self.calWindow = Calibration(view=self._view)
 		calmodel = CalibrateFunctions(calview=self.calWindow, mainview=self._view)
-		CalCtrlFunctions(
+		self._calControllers.append(CalCtrlFunctions(
 			model=calmodel, mainview=self._view, view=self.calWindow, mainctrl=self,
-		)
+		))
 		self.calWindow.show()
 
 	def _showPeriodicTable(self):
 		''' opens periodic table for element selection '''
+		if not self._view._analytes_by_element and self._indexer.index is not None:
+			# Nothing loaded yet: offer the analytes found across the directory.
+			by_element = self._indexer.index.analytes_by_element()
+			self._view._analytes_by_element = by_element
+			self._view._elements_in_file = [a for analytes in by_element.values() for a in analytes]
 		self._ptview = PTView(mainview=self._view)
 		ptmodel = PTModel(ptview=self._ptview, mainview=self._view, maincontrol=self)
 		PTCtrl(model=ptmodel, mainview=self._view, ptview=self._ptview, mainctrl=self)
 		self._ptview.show()
 
 	def _reorderListWidget(self, key):
-		'''Re-sort the file listwidget in place using the provided key fn.'''
-		lw = self._view.listwidget
-		names = [lw.item(i).text() for i in range(lw.count())]
-		names.sort(key=key)
-		lw.clear()
-		for name in names:
-			lw.insertItem(lw.count(), name)
+		'''Re-sort the file listwidget in place using the provided key fn.
+
+		The key is kept, so files that appear later are inserted in order.
+		'''
+		self._listing.setSortKey(key)
 
 	def _sortListByName(self):
 		'''Alphabetical (case-insensitive) sort.'''
+		self._sortField = None
 		self._reorderListWidget(lambda fn: fn.lower())
 
+	def _sortListByDate(self):
+		'''Sort by acquisition time from the run index; runs not indexed yet
+		go last and move into place as the index fills in.'''
+		if self._indexer.index is None:
+			return
+		self._sortField = 'acquired'
+		self._reorderListWidget(self._indexer.index.sort_key('acquired'))
+
 	def _sortListByNumber(self):
 		'''Sort by the trailing "_XX" number so 1, 2, ..., 10 come out
 		numerically. Items without that suffix sort alphabetically after
 		all numbered ones.'''
 		import re as _re
+		self._sortField = None
 		num_re = _re.compile(r'_(\d+)\.csv$', _re.IGNORECASE)
 
 		def key(fn):
@@ -1063,24 +1589,64 @@ class PyLCICPMSCtrl:
 		else:
 			btn.setStyleSheet(self._view._calibrateHighlightStyle)
 
-	def _loadCalFile(self):
-		''' loads cal file and saves to self._view.calCurves '''
+	def _calibrationChanged(self):
+		'''After a calibration is loaded or fitted: restyle Calibrate and
+		re-quantify the integration results already in memory.'''
+		self._updateCalibrateButtonStyle()
+		if len(self._view.integrationResults) and self._view.calCurves:
+			self._requantify(show=False)
+
+	def _requantify(self, show=True):
+		'''Apply the current calCurves to every in-memory integration result.
+
+		Concentrations come from the stored (corrected, baseline-subtracted)
+		areas in one array operation, without reading any run again. The
+		results popup is shown again unless show is False.
+		'''
+		results = self._view.integrationResults
+		if not len(results):
+			self._view.statusBar.showMessage('No integration results in memory to re-quantify', 5000)
+			return
+		self._view.integrationResults = self._model.requantify(results)
+		has_calibration = self._view.integrationResults.has_calibration
+		windows = [w for w in dict.fromkeys(self._view.integrationResults.column('window')) if w]
+		self._view.statusBar.showMessage(
+			f'Re-quantified {len(results)} record(s) with the current calibration'
+			if has_calibration else f'No calibration matches; cleared concentrations of {len(results)} record(s)',
+			6000,
+		)
+		if show:
+			self._showMultiFileResultsDialog(
+				self._view.integrationResults, has_calibration, source='re-quantified',
+				windows=windows or None,
+			)
+
+	def _loadCalFile(self, calfile=None):
+		''' loads cal file (default: the newest in the calibration registry) and saves to self._view.calCurves '''
 		self._view.integrateButtons['Load Cal.'].setStyleSheet("background-color: light gray")
 
-		# Search for calibration file
-		calfile = None
-		for root, dirs, files in os.walk(self._view.homeDir):
-			for ff in files:
-				if ff.endswith('.calib'):
-					calfile = os.path.join(root, ff)
-					break
-			if calfile:
-				break
+		registry = self._calIndexer.index
+		if calfile is None and registry is not None:
+			latest = registry.latest()
+			# Files deleted since the last index update are dropped here.
+			while latest is not None and not os.path.exists(registry.path_of(latest[0])):
+				registry.update([latest[0]])
+				latest = registry.latest()
+			if latest is not None:
+				calfile = registry.path_of(latest[0])
+		elif calfile is not None and not os.path.exists(calfile):
+			if registry is not None:
+				registry.update([calfile])
+			self._view.statusBar.showMessage(f'{os.path.basename(calfile)} no longer exists', 5000)
+			return
 
 		if calfile is None:
-			self._view.statusBar.showMessage('No calibration file (.calib) found in directory', 5000)
-			self._view.calib_label.setText('No calibration')
-			print('ERROR: No .calib file found in directory')
+			if self._calIndexer.updating:
+				self._view.statusBar.showMessage('Still indexing calibration files; try again shortly', 5000)
+			else:
+				self._view.statusBar.showMessage('No calibration file (.calib) found in directory', 5000)
+				self._view.calib_label.setText('No calibration')
+				print('ERROR: No .calib file found in directory')
 			return
 
 		try:
@@ -1095,12 +1661,117 @@ class PyLCICPMSCtrl:
 			num_elements = len(self._view.calCurves)
 			self._view.statusBar.showMessage(f'Loaded calibration file: {os.path.basename(calfile)} ({num_elements} elements)', 5000)
 			self._view.calib_label.setText(f'Calibration loaded ({num_elements} elements)')
-			self._updateCalibrateButtonStyle()
+			self._calibrationChanged()
 		except Exception as e:
 			self._view.statusBar.showMessage(f'Error loading calibration: {str(e)}', 5000)
 			self._view.calib_label.setText('Calibration error')
 			print(f'ERROR loading calibration file: {e}')
 
+	def _pickCalFile(self):
+		'''Dialog listing every indexed .calib, newest first; loads the chosen one.'''
+		from datetime import datetime
+		from PyQt6.QtWidgets import (
+			QDialog, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
+			QDialogButtonBox, QHeaderView, QAbstractItemView,
+		)
+		from PyQt6.QtGui import QDesktopServices
+		from PyQt6.QtCore import QUrl
+		from ..models.calibration_fit import FIT_MODELS, WEIGHTINGS
+
+		registry = self._calIndexer.index
+		entries = registry.entries() if registry is not None else []
+		if not entries:
+			self._view.statusBar.showMessage(
+				'Still indexing calibration files; try again shortly' if self._calIndexer.updating
+				else 'No calibration file (.calib) found in directory', 5000,
+			)
+			return
+
+		dlg = QDialog(self._view)
+		dlg.setWindowTitle('Calibration History')
+		dlg.resize(900, 420)
+		layout = QVBoxLayout(dlg)
+		label = QLabel(f'<b>{len(entries)}</b> calibration file(s) under {registry.root}')
+		label.setTextFormat(Qt.TextFormat.RichText)
+		layout.addWidget(label)
+
+		headers = ['Created', 'File', 'Elements', 'Model', 'Mean R²', 'Report']
+		table = QTableWidget(len(entries), len(headers))
+		table.setHorizontalHeaderLabels(headers)
+		table.setAlternatingRowColors(True)
+		table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+		table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+		table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+		table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+		for row, (name, entry) in enumerate(entries):
+			r2 = entry.mean_r2()
+			model = FIT_MODELS.get(entry.model, entry.model)
+			if entry.weighting != 'none':
+				model += f', {WEIGHTINGS.get(entry.weighting, entry.weighting)}'
+			cells = [
+				datetime.fromtimestamp(entry.created).strftime('%Y-%m-%d %H:%M'),
+				name,
+				', '.join(entry.analytes),
+				model,
+				'—' if r2 is None else f'{r2:.4f}',
+				entry.report or '—',
+			]
+			for col, text in enumerate(cells):
+				item = QTableWidgetItem(text)
+				item.setToolTip(text)
+				table.setItem(row, col, item)
+		table.selectRow(0)
+		layout.addWidget(table)
+
+		buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Cancel)
+		load_btn = buttons.addButton('Load', QDialogButtonBox.ButtonRole.AcceptRole)
+		load_btn.setDefault(True)
+		report_btn = buttons.addButton('Open Report', QDialogButtonBox.ButtonRole.ActionRole)
+		layout.addWidget(buttons)
+
+		def _selected():
+			rows = table.selectionModel().selectedRows()
+			return entries[rows[0].row()][0] if rows else None
+
+		def _on_selection():
+			name = _selected()
+			report = registry.report_path(name) if name else None
+			report_btn.setEnabled(bool(report) and os.path.exists(report))
+
+		def _open_report():
+			report = registry.report_path(_selected())
+			if report:
+				QDesktopServices.openUrl(QUrl.fromLocalFile(report))
+
+		table.itemSelectionChanged.connect(_on_selection)
+		table.itemDoubleClicked.connect(lambda item: dlg.accept())
+		report_btn.clicked.connect(_open_report)
+		buttons.accepted.connect(dlg.accept)
+		buttons.rejected.connect(dlg.reject)
+		_on_selection()
+
+		if dlg.exec() == QDialog.DialogCode.Accepted and _selected() is not None:
+			self._loadCalFile(registry.path_of(_selected()))
+
+	def _calibrationSaved(self, summary):
+		'''Register the .calib files a Calculate Curve just wrote (and the
+		ones it archived) in the calibration registry, without walking.'''
+		registry = self._calIndexer.index
+		if registry is None:
+			return
+
+		def inside(path):
+			return os.path.abspath(path).startswith(registry.root + os.sep)
+
+		pdf_path = summary.get('pdf_path')
+		for path in filter(inside, summary.get('calib_paths', [])):
+			# The report is still being rendered, so it is paired by name.
+			paired = pdf_path and os.path.dirname(pdf_path) == os.path.dirname(path)
+			registry.add(path, report=os.path.basename(pdf_path) if paired else None)
+		archived = list(filter(inside, summary.get('archived_calibs', [])))
+		if archived:
+			registry.update(archived)
+
 	def _selectInNormFile(self):
 		''' opens window to select normalization file for 115In correction; saves average 115In signal from norm file'''
 		filepath, _ = QFileDialog.getOpenFileName(
@@ -1108,19 +1779,17 @@ class PyLCICPMSCtrl:
 		)
 		if not filepath:
 			return
+		isotope = self._view.internalStandard['isotope']
 		try:
-			normData = self._model.importData_generic(fdir=filepath)
+			normData = self._model.importData_generic(fdir=filepath, analytes=[isotope])
 		except Exception as e:
 			self._view.statusBar.showMessage(f'Error reading normalization file: {e}', 5000)
 			print(f'ERROR reading normalization file: {e}')
 			return
-		indium_col = next(
-			(col for col in normData.columns if col.startswith('115In') and 'Time' not in col),
-			None,
-		)
+		indium_col = standard_column(normData, isotope)
 		if indium_col is None:
-			self._view.statusBar.showMessage('115In not found in normalization file', 5000)
-			print('ERROR: 115In column not found in normalization file')
+			self._view.statusBar.showMessage(f'{isotope} not found in normalization file', 5000)
+			print(f'ERROR: {isotope} column not found in normalization file')
 			print(f'  Columns available: {list(normData.columns)}')
 			return
 		indium_values = normData[indium_col].dropna()
@@ -1130,30 +1799,28 @@ class PyLCICPMSCtrl:
 		median_in = float(np.median(indium_values))
 
 		self._view.normAvIndium = avg_in
-		print(f'115In normalization loaded: avg = {avg_in:.2f} (column: {indium_col})')
+		print(f'{isotope} normalization loaded: avg = {avg_in:.2f} (column: {indium_col})')
 		self._view.statusBar.showMessage(
-			f'115In correction loaded (avg = {avg_in:.2f})', 4000
+			f'{isotope} correction loaded (avg = {avg_in:.2f})', 4000
 		)
 		self._view.integrateButtons['115In Correction'].setEnabled(False)
 
 		msg = QMessageBox(self._view)
 		msg.setIcon(QMessageBox.Icon.Information)
-		msg.setWindowTitle("115In Normalization Loaded")
-		msg.setText("115In normalization reference has been set.")
+		msg.setWindowTitle(f"{isotope} Normalization Loaded")
+		msg.setText(f"{isotope} normalization reference has been set.")
 		msg.setInformativeText(
 			f"<b>File:</b> {os.path.basename(filepath)}<br>"
 			f"<b>Column used:</b> {indium_col}<br>"
 			f"<b>Data points:</b> {n_points}<br><br>"
-			f"<b>Mean 115In:</b> {avg_in:.2f} counts<br>"
-			f"<b>Median 115In:</b> {median_in:.2f} counts<br>"
+			f"<b>Mean {isotope}:</b> {avg_in:.2f} counts<br>"
+			f"<b>Median {isotope}:</b> {median_in:.2f} counts<br>"
 			f"<b>Std dev:</b> {std_in:.2f} counts "
 			f"({(std_in / avg_in * 100) if avg_in else 0:.1f}% RSD)<br><br>"
 			"<b>How the correction is applied:</b><br>"
-			"For each integrated sample, a correction factor is computed as "
-			"<i>avg(sample 115In) / avg(reference 115In)</i>. "
-			"All element intensities are divided by this factor before integration. "
-			"For sample files with &gt; 2000 points, only rows 550&ndash;2500 are "
-			"averaged to avoid transient regions; shorter files use all rows."
+			f"Each sample's {isotope} trace is smoothed and divided by this mean, "
+			"giving a correction curve over time; every element is divided by "
+			"that curve point by point before integration."
 		)
 		msg.setStandardButtons(QMessageBox.StandardButton.Ok)
 		msg.exec()
@@ -1321,7 +1988,9 @@ class PyLCICPMSCtrl:
 			# Get data
 			time_col = f'Time {element}'
 			if time_col in compare_data.columns:
-				icpms_time = compare_data[time_col] / 60
+				# On the reference run's time axis when aligned
+				shift = self._view.comparisonShifts.get(filename, 0.0)
+				icpms_time = (compare_data[time_col] - shift) / 60
 				icpms_signal = compare_data[element]
 
 				# Plot
@@ -1546,7 +2215,9 @@ class PyLCICPMSCtrl:
 
 				time_col = f'Time {element}'
 				if time_col in compare_data.columns:
-					data_dict[f'Time_{short_name}_min'] = compare_data[time_col] / 60
+					# Aligned times, as plotted
+					shift = self._view.comparisonShifts.get(filename, 0.0)
+					data_dict[f'Time_{short_name}_min'] = (compare_data[time_col] - shift) / 60
 					data_dict[f'{element}_{short_name}'] = compare_data[element]
 
 			# Save to CSV
@@ -1686,6 +2357,7 @@ plt.show()
 		# without first choosing a directory and pick elements from within.
 		self._view.integrateButtons['Calibrate'].setEnabled(True)
 		self._view.integrateButtons['Load Cal.'].setEnabled(False)
+		self._view.integrateButtons['Cal. History'].setEnabled(False)
 		self._view.integrateButtons['Integrate'].setEnabled(False)
 		self._view.integrateButtons['115In Correction'].setEnabled(False)
 
@@ -1698,16 +2370,33 @@ plt.show()
 
 		self._view.intbox.stateChanged.connect(self._selectIntRange)
 		self._view.compareFilesBtn.clicked.connect(self._toggleCompareMode)
+		self._view.buttons['Follow'].toggled.connect(self._toggleFollow)
 
 		self._view.buttons['Reset'].clicked.connect(self._confirmReset)
 		self._view.buttons['Export Plot'].clicked.connect(self._exportPlot)
 		self._view.buttons['Sort By Name'].clicked.connect(self._sortListByName)
 		self._view.buttons['Sort By Number'].clicked.connect(self._sortListByNumber)
+		self._view.buttons['Sort By Date'].clicked.connect(self._sortListByDate)
+		self._view.analyteFilter.currentIndexChanged.connect(self._filterByAnalyte)
+		self._indexer.index_updated.connect(self._onIndexUpdated)
+		for mode, action in self._view.storageActions.items():
+			action.triggered.connect(partial(self._setIntensityStorage, mode))
+		# The watcher's rescans report added / removed runs; re-check the index.
+		self._listing.files_added.connect(lambda names: self._indexer.refresh())
+		self._listing.files_removed.connect(lambda names: self._indexer.refresh())
+		# .calib files written, copied in or deleted by others are not runs;
+		# the calibration registry is re-walked when .calib files or folders
+		# come or go, not on other changes such as its own sidecar write.
+		self._listing.directory_changed.connect(partial(self._calIndexer.refresh, if_changed=True))
 
 		self._view.integrateButtons['Calibrate'].clicked.connect(self._showCalWindow)
-		self._view.integrateButtons['Load Cal.'].clicked.connect(self._loadCalFile)
+		self._view.integrateButtons['Load Cal.'].clicked.connect(lambda: self._loadCalFile())
+		self._view.integrateButtons['Cal. History'].clicked.connect(self._pickCalFile)
 		self._view.integrateButtons['Integrate'].clicked.connect(self._Integrate)
 		self._view.integrateButtons['Save Integration'].clicked.connect(self._saveIntegration)
+		self._view.integrateButtons['Re-quantify'].clicked.connect(lambda: self._requantify())
+		self._view.integrateButtons['Peak Table'].clicked.connect(self._integratePeakTable)
+		self._view.integrateButtons['Find Peaks'].clicked.connect(self._integrateDetectedPeaks)
 		self._view.integrateButtons['Reset Integration'].clicked.connect(self._resetIntegrate)
 
 		# Comparison list buttons and interactions
@@ -1718,6 +2407,7 @@ plt.show()
 		self._view.compareListWidget.itemSelectionChanged.connect(self._updateCompareButtons)
 		self._view.compareListWidget.itemSelectionChanged.connect(self._updateComparisonPlot)
 		self._view.compareListWidget.itemDoubleClicked.connect(self._editComparisonLabel)
+		self._view.alignCompareBox.toggled.connect(self._toggleAlignment)
 
 
 
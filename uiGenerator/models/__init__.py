@@ -1,6 +1,18 @@
 """Data models and business logic for LC-ICP-MS data viewer."""
 
-from .data_processor import LICPMSfunctions
-from .calibration import CalibrateFunctions
+import importlib
 
-__all__ = ['LICPMSfunctions', 'CalibrateFunctions']
+# Both import Qt; loaded on first use so the Qt-free models (integration,
+# peak_table, run_reader, ...) can be used headless.
+_EXPORTS = {
+	'LICPMSfunctions': '.data_processor',
+	'CalibrateFunctions': '.calibration',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+	if name in _EXPORTS:
+		return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+	raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
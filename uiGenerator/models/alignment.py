@@ -0,0 +1,107 @@
+"""Retention-time alignment of comparison runs.
+
+Retention drifts a little between injections, so runs overlaid in compare
+mode don't line up and one integration window doesn't fit them all.
+``estimate_shifts`` puts one analyte's trace of every run on a common time
+grid and cross-correlates them all with the reference run at once: one
+batched real FFT over the (runs, samples) array, the product with the
+reference's conjugate, one inverse FFT, then the best lag per run within
+``max_shift`` (refined between samples by a parabola through the peak).
+
+A run's shift is how much later it elutes than the reference, in seconds:
+its time minus the shift is on the reference's axis (for plotting), and the
+reference's window plus the shift is its integration window
+(``align_windows``).
+"""
+
+import numpy as np
+
+from .compact_run import trace
+
+
+def _grid_trace(data, analyte):
+	'''(time, intensity) of ``analyte``, cut where a padded tail starts.'''
+	time, intensity = trace(data, analyte, dtype=float)
+	backwards = np.flatnonzero(~(np.diff(time) > 0))
+	n = backwards[0] + 1 if len(backwards) else len(time)
+	time, intensity = time[:n], intensity[:n]
+	keep = np.isfinite(time) & np.isfinite(intensity)
+	return time[keep], intensity[keep]
+
+
+def estimate_shifts(runs, analyte, reference=0, max_shift=None):
+	'''Retention shift (seconds) of each run relative to ``runs[reference]``.
+
+	Args:
+		runs: runs (CompactRun or DataFrame) holding ``analyte``
+		analyte: trace to align on, e.g. the plotted element
+		reference: index of the reference run (shift 0)
+		max_shift: largest shift searched, in seconds (default: a quarter
+			of the common time span)
+
+	Returns:
+		array of shifts, one per run; NaN for runs without the analyte (or
+		with fewer than 3 samples of it).
+	'''
+	traces = []
+	for data in runs:
+		try:
+			traces.append(_grid_trace(data, analyte))
+		except KeyError:
+			traces.append((np.empty(0), np.empty(0)))
+	usable = np.array([len(t) >= 3 for t, _ in traces])
+	shifts = np.full(len(runs), np.nan)
+	if not usable[reference]:
+		raise ValueError(f'reference run has no {analyte} trace to align on')
+
+	# Common grid: the union of the time spans at the median sampling step.
+	steps = np.concatenate([np.diff(t) for (t, _), ok in zip(traces, usable) if ok])
+	step = float(np.median(steps))
+	start = min(t[0] for (t, _), ok in zip(traces, usable) if ok)
+	stop = max(t[-1] for (t, _), ok in zip(traces, usable) if ok)
+	grid = start + step * np.arange(int(np.floor((stop - start) / step)) + 1)
+	n = len(grid)
+
+	# Outside its own span a run is flat at its median, so the edges don't
+	# correlate; each row is scaled to unit deviation.
+	indices = np.flatnonzero(usable)
+	rows = np.empty((len(indices), n))
+	for row, i in zip(rows, indices):
+		time, intensity = traces[i]
+		level = np.median(intensity)
+		row[:] = np.interp(grid, time, intensity, left=level, right=level) - level
+	rows /= np.maximum(rows.std(axis=1, keepdims=True), np.finfo(float).tiny)
+
+	# Zero padding to 2n makes the circular correlation a linear one.
+	n_fft = 1 << int(np.ceil(np.log2(2 * n)))
+	spectra = np.fft.rfft(rows, n_fft, axis=1)
+	ref_row = int(np.flatnonzero(indices == reference)[0])
+	correlation = np.fft.irfft(spectra * np.conj(spectra[ref_row]), n_fft, axis=1)
+
+	max_lag = n // 4 if max_shift is None else int(round(max_shift / step))
+	max_lag = max(1, min(max_lag, n - 1))
+	lags = np.arange(-max_lag, max_lag + 1)
+	window = correlation[:, lags % n_fft]
+	best = np.argmax(window, axis=1)
+	# Parabola through the peak and its neighbours (not at the search edge).
+	inner = (best > 0) & (best < len(lags) - 1)
+	rows_at = np.arange(len(indices))
+	left = window[rows_at, np.clip(best - 1, 0, len(lags) - 1)]
+	peak = window[rows_at, best]
+	right = window[rows_at, np.clip(best + 1, 0, len(lags) - 1)]
+	curvature = left - 2 * peak + right
+	curvature = np.where(inner & (curvature < 0), curvature, np.inf)
+	offset = 0.5 * (left - right) / curvature
+	shifts[indices] = (lags[best] + offset) * step
+	shifts[reference] = 0.0
+	return shifts
+
+
+def align_windows(window, shifts):
+	'''The reference ``window`` (start, stop) moved by each run's shift.
+
+	``window`` and ``shifts`` share a unit; NaN shifts count as 0. Returns
+	an array of shape (runs, 2).
+	'''
+	shifts = np.nan_to_num(np.asarray(shifts, dtype=float))
+	return np.asarray(window, dtype=float).reshape(1, 2) + shifts[:, None]
@@ -0,0 +1,154 @@
+"""Building a calibration from a directory of standards in one pass.
+
+The calibration window's Auto Calibrate takes every standard whose file name
+gives a concentration, finds the integration window on the most
+concentrated one (``suggest_window``, what Suggest Range shows), then
+integrates all standards over that window and averages their 115In in a
+process pool (``standard_job``, driven by utils.auto_calibration). The
+areas are 115In-normalised to the blank like Normalize to 115In
+(``normalize_standards``) and go into the standards table for Calculate
+Curve. Nothing here imports Qt, so it runs in pool workers.
+"""
+
+import numpy as np
+
+from .compact_run import trace
+from .dataset_registry import get_registry
+from .integration import integrator_for
+from .peak_detection import DEFAULT_MIN_SNR, detect_peaks
+
+# Padding added on both sides of the detected window, as a fraction of its span.
+WINDOW_PADDING = 0.05
+
+INDIUM = '115In'
+
+
+def suggest_window(data, elements, min_snr=DEFAULT_MIN_SNR):
+	'''Integration window (start_min, stop_min) spanning the dominant peak feature.
+
+	For each element the most prominent peak found by models.peak_detection
+	is taken; its bounds are where the signal drops back to 5% of the
+	peak's prominence above its base. The window is the union of these
+	bounds, padded by WINDOW_PADDING of its span and kept within the trace.
+	115In (the internal standard) is ignored unless it is all there is.
+	Without any peak the interior of the trace is returned; None if the
+	trace is too short.
+	'''
+	analytes = [e for e in elements if not e.startswith(INDIUM)] or list(elements)
+	detected = detect_peaks(data, analytes, min_snr=min_snr)
+	dominant = [max(found, key=lambda p: p.prominence) for found in detected.values() if found]
+	time = trace(data, analytes[0], dtype=float)[0] / 60
+
+	if not dominant:
+		if len(time) < 3:
+			return None
+		return (float(time[0]), float(time[-2]))
+
+	start = min(p.start for p in dominant)
+	stop = max(p.stop for p in dominant)
+	pad = WINDOW_PADDING * max(stop - start, 0.05)
+	start = max(float(time[0]), start - pad)
+	stop = min(float(np.nanmax(time)), stop + pad)
+	return (float(start), float(stop))
+
+
+def average_indium(data):
+	'''(mean 115In intensity over the whole trace, its column), or (None, column).'''
+	column = next(
+		(c for c in data.columns if c.startswith(INDIUM) and 'Time' not in c),
+		None,
+	)
+	if column is None:
+		return None, None
+	values = data[column].dropna()
+	if len(values) == 0:
+		return None, column
+	return float(np.mean(values)), column
+
+
+def find_blank(standards):
+	'''Index of the blank among ``standards`` (concentration 0 or named blank/blk), or None.'''
+	for i, std in enumerate(standards):
+		name = (std.get('name') or '').lower()
+		if std.get('concentration') == 0 or 'blank' in name or 'blk' in name:
+			return i
+	return None
+
+
+def integrate_standard(path, analytes, window):
+	'''Areas of ``analytes`` over ``window`` (minutes) and the mean 115In of one standard.
+
+	Returns {'areas': {analyte: area}, 'avg_in': float or None,
+	'in_col': column or None}; analytes missing from the file are left out.
+	'''
+	wanted = list(analytes)
+	if not any(a.startswith(INDIUM) for a in wanted):
+		wanted.append(INDIUM)
+	run = get_registry().load(path, analytes=wanted).data
+	present = [a for a in analytes if a in run.columns]
+	areas = {}
+	if present:
+		values = integrator_for(run).areas(present, [(window[0] * 60, window[1] * 60)])[0]
+		areas = {a: float(v) for a, v in zip(present, values)}
+	avg_in, in_col = average_indium(run)
+	return {'areas': areas, 'avg_in': avg_in, 'in_col': in_col}
+
+
+def standard_job(job):
+	'''Pool worker: (index, path, analytes, window) -> (index, path, result, error).
+
+	Errors are returned as text, so one bad file doesn't stop the others.
+	'''
+	index, path, analytes, window = job
+	try:
+		return index, path, integrate_standard(path, analytes, window), None
+	except Exception as e:
+		return index, path, None, f'{type(e).__name__}: {e}'
+
+
+def normalize_standards(standards):
+	'''115In-normalise the areas of integrated standards to the blank's 115In.
+
+	``standards`` are dicts with 'name', 'filename', 'concentration',
+	'areas' and 'avg_in' (None where the file failed or has no 115In).
+	Each standard's areas are multiplied by blank_avg / std_avg; standards
+	without 115In keep their raw areas and are listed as skipped.
+
+	Returns (areas per standard, details) where details has the layout
+	calcLinearRegression reports (blank_name, blank_avg_in, blank_col,
+	results, skipped), or None when there is no blank with 115In.
+	'''
+	areas = [std['areas'] for std in standards]
+	blank = find_blank(standards)
+	if blank is None or not standards[blank]['avg_in'] or standards[blank]['avg_in'] <= 0:
+		return areas, None
+
+	blank_avg = standards[blank]['avg_in']
+	results = []
+	skipped = []
+	for i, std in enumerate(standards):
+		if std['areas'] is None:
+			continue
+		if i == blank:
+			factor = 1.0
+		elif std['avg_in'] is None or std['avg_in'] <= 0:
+			skipped.append(f"{std['name']} ({std['filename']}): no 115In signal")
+			continue
+		else:
+			factor = blank_avg / std['avg_in']
+		areas[i] = {el: area * factor for el, area in std['areas'].items()}
+		results.append({
+			'name': std['name'],
+			'avg_in': std['avg_in'],
+			'factor': factor,
+			'raw': std['areas'],
+			'normalized': areas[i],
+			'is_blank': i == blank,
+		})
+	return areas, {
+		'blank_name': standards[blank]['name'],
+		'blank_avg_in': blank_avg,
+		'blank_col': standards[blank].get('in_col'),
+		'results': results,
+		'skipped': skipped,
+	}
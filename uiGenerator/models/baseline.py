@@ -0,0 +1,186 @@
+"""Baseline models for peak integration.
+
+The trapezoid baseline joins the two ends of the integration window, so it
+depends on the window and is computed by ``CumulativeTrace.baseline``. The
+models here estimate a baseline for the whole trace instead:
+
+``rolling_min``
+	rolling minimum over ``window`` seconds, smoothed by a rolling mean of
+	the same width (scipy.ndimage filters); the window should be wider than
+	the widest peak.
+``als``
+	asymmetric least squares (Eilers & Boelens): a smooth curve, stiffness
+	``lam``, fitted with weight ``p`` to samples above it and ``1 - p`` below,
+	re-weighted ``iterations`` times. Each pass is one pentadiagonal solve
+	(scipy.linalg.solveh_banded), linear in the number of samples.
+``polynomial``
+	polynomial of ``degree`` fitted to the samples inside the marked
+	``regions`` (start, stop in minutes), evaluated over the whole trace.
+
+A model is a plain dict, ``{'method': ..., **parameters}``, so it can be
+saved in workspaces and sent to worker processes; ``baseline_model`` builds
+one with the defaults filled in. The baseline area of a window is the
+integral of the baseline curve over it, and RunIntegrator caches the curve
+per (analyte, model), so switching models or windows doesn't recompute it.
+"""
+
+import numpy as np
+
+
+BASELINE_METHODS = {
+	'trapezoid': 'Trapezoid between the range ends',
+	'rolling_min': 'Rolling minimum',
+	'als': 'Asymmetric least squares',
+	'polynomial': 'Polynomial through baseline regions',
+}
+
+DEFAULT_PARAMETERS = {
+	'trapezoid': {},
+	'rolling_min': {'window': 120.0},
+	'als': {'lam': 1e8, 'p': 0.01, 'iterations': 10},
+	'polynomial': {'degree': 1, 'regions': []},
+}
+
+
+def baseline_model(method='trapezoid', **parameters):
+	'''Baseline model dict for ``method``, defaults filled in.
+
+	Raises ValueError for unknown methods or parameters.
+	'''
+	if method not in DEFAULT_PARAMETERS:
+		raise ValueError(
+			f'unknown baseline method {method!r} (choose from {", ".join(BASELINE_METHODS)})'
+		)
+	unknown = set(parameters) - set(DEFAULT_PARAMETERS[method])
+	if unknown:
+		raise ValueError(f'{method} baseline has no parameter {", ".join(sorted(unknown))}')
+	model = {'method': method, **DEFAULT_PARAMETERS[method], **parameters}
+	if method == 'polynomial':
+		model['degree'] = int(model['degree'])
+		regions = sorted((float(start), float(stop)) for start, stop in model['regions'])
+		if any(stop <= start for start, stop in regions):
+			raise ValueError('baseline regions must end after they start')
+		model['regions'] = [list(region) for region in regions]
+	elif method == 'als':
+		model['iterations'] = int(model['iterations'])
+		if model['iterations'] < 1:
+			raise ValueError('ALS needs at least one iteration')
+		if not 0 < model['p'] < 1:
+			raise ValueError('ALS asymmetry p must be between 0 and 1')
+	return model
+
+
+def is_trapezoid(model):
+	'''Whether ``model`` is the window-endpoint trapezoid (None counts too).'''
+	return model is None or model['method'] == 'trapezoid'
+
+
+def _frozen(value):
+	'''``value`` with lists turned into tuples, recursively.'''
+	if isinstance(value, (list, tuple)):
+		return tuple(_frozen(v) for v in value)
+	return value
+
+
+def model_key(model):
+	'''Hashable form of a model, for caches.'''
+	return (model['method'],) + tuple(
+		(name, _frozen(value)) for name, value in sorted(model.items()) if name != 'method'
+	)
+
+
+def describe(model):
+	'''Short label of a model, e.g. "ALS (lam 1e+08, p 0.01)".'''
+	method = model['method']
+	if method == 'rolling_min':
+		return f'rolling minimum ({model["window"]:g} s)'
+	if method == 'als':
+		return f'ALS (lam {model["lam"]:.0e}, p {model["p"]:g})'
+	if method == 'polynomial':
+		return f'polynomial, degree {model["degree"]}, {len(model["regions"])} region(s)'
+	return 'trapezoid'
+
+
+def _finite(intensity):
+	'''Float copy of ``intensity`` with NaNs interpolated from their neighbours.'''
+	y = np.asarray(intensity, dtype=float)
+	finite = np.isfinite(y)
+	if finite.all() or not finite.any():
+		return y.copy()
+	return np.interp(np.arange(len(y)), np.flatnonzero(finite), y[finite])
+
+
+def rolling_min_baseline(time, intensity, window=120.0):
+	'''Rolling minimum over ``window`` seconds, smoothed by a rolling mean.'''
+	from scipy.ndimage import minimum_filter1d, uniform_filter1d
+
+	y = _finite(intensity)
+	steps = np.diff(np.asarray(time, dtype=float))
+	steps = steps[np.isfinite(steps) & (steps > 0)]
+	if len(y) < 3 or len(steps) == 0:
+		return y
+	size = int(max(3, round(window / np.median(steps))) | 1)
+	return uniform_filter1d(minimum_filter1d(y, size, mode='nearest'), size, mode='nearest')
+
+
+def als_baseline(intensity, lam=1e8, p=0.01, iterations=10):
+	'''Asymmetric least squares baseline (Eilers & Boelens, 2005).'''
+	from scipy.linalg import solveh_banded
+
+	if iterations < 1:
+		raise ValueError('ALS needs at least one iteration')
+	y = _finite(intensity)
+	n = len(y)
+	if n < 3:
+		return y
+	# lam * D'D for second differences D, in upper banded storage.
+	penalty = np.zeros((3, n))
+	penalty[0, 2:] = lam
+	penalty[1, 1:-1] -= 2 * lam
+	penalty[1, 2:] -= 2 * lam
+	penalty[2, :-2] += lam
+	penalty[2, 1:-1] += 4 * lam
+	penalty[2, 2:] += lam
+
+	weights = np.ones(n)
+	banded = penalty.copy()
+	for _ in range(iterations):
+		banded[2] = penalty[2] + weights
+		z = solveh_banded(banded, weights * y, check_finite=False)
+		updated = np.where(y > z, p, 1 - p)
+		if np.array_equal(updated, weights):
+			break
+		weights = updated
+	return z
+
+
+def polynomial_baseline(time, intensity, regions, degree=1):
+	'''Polynomial fitted to the samples inside ``regions`` (minutes).'''
+	time = np.asarray(time, dtype=float)
+	y = np.asarray(intensity, dtype=float)
+	if not len(regions):
+		raise ValueError('polynomial baseline needs at least one baseline region')
+	minutes = time / 60
+	inside = np.zeros(len(time), dtype=bool)
+	for start, stop in regions:
+		inside |= (minutes >= start) & (minutes <= stop)
+	inside &= np.isfinite(y) & np.isfinite(time)
+	if inside.sum() <= degree:
+		raise ValueError(
+			f'baseline regions hold {inside.sum()} sample(s); '
+			f'a degree {degree} polynomial needs at least {degree + 1}'
+		)
+	fit = np.polynomial.Polynomial.fit(time[inside], y[inside], degree)
+	return fit(time)
+
+
+def baseline_trace(time, intensity, model):
+	'''Baseline of a whole trace (same length) under a non-trapezoid model.'''
+	method = model['method']
+	if method == 'rolling_min':
+		return rolling_min_baseline(time, intensity, model['window'])
+	if method == 'als':
+		return als_baseline(intensity, model['lam'], model['p'], model['iterations'])
+	if method == 'polynomial':
+		return polynomial_baseline(time, intensity, model['regions'], model['degree'])
+	raise ValueError(f'{method} baseline depends on the integration window, not the trace')
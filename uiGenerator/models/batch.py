@@ -0,0 +1,110 @@
+"""Integrating one run per call, for process pools.
+
+``integrate_run`` loads a run and integrates it over a list of windows with
+the peak-table engine (models.peak_table), returning a ResultTable like
+``LICPMSfunctions.integrate`` gives; without windows it integrates the
+peaks it detects in the run (models.peak_detection). Everything it needs
+travels in a plain ``settings`` dict and nothing here imports Qt, so it runs
+in pool workers: the headless command (cli.py) and the GUI's multi-file
+integration (utils.batch_integration) both use it.
+"""
+
+import os
+import sys
+
+from .dataset_registry import get_registry
+from .integration import integrator_for
+from .internal_standard import is_internal_standard
+from .peak_detection import DEFAULT_MIN_SNR, detect_peaks, peak_windows
+from .peak_table import build_peak_table, calibration_arrays
+from .results import COLUMNS, ResultTable
+from .run_reader import sniff_header
+
+
+def integration_settings(windows, analytes=None, cal_curves=None, masses=None,
+		baseline=False, internal_standard=None, named_windows=True, min_snr=DEFAULT_MIN_SNR):
+	'''Settings dict for integrate_run.
+
+	Args:
+		windows: (name, start_min, stop_min) tuples, or None to integrate
+			the peaks detected in each run (models.peak_detection)
+		analytes: analytes to integrate (None: every analyte in each run
+			except 115In and the internal standard)
+		cal_curves: {analyte: {'m', 'b'[, 'q']}} as loaded from a .calib file
+		masses: {analyte: mass} for ppb -> uM (missing: the mass number)
+		baseline: subtract a baseline: True for the trapezoid of each
+			window, or a baseline model (models.baseline)
+		internal_standard: internal-standard correction settings
+			(models.internal_standard; None: no correction)
+		named_windows: keep the window names in the results (False gives
+			rows like integrate()'s, for single-range integration)
+		min_snr: detection threshold when ``windows`` is None
+	'''
+	return {
+		'windows': None if windows is None else list(windows),
+		'analytes': None if analytes is None else list(analytes),
+		'cal_curves': dict(cal_curves or {}),
+		'masses': dict(masses or {}),
+		'baseline': baseline if isinstance(baseline, dict) else bool(baseline),
+		'internal_standard': internal_standard,
+		'named_windows': named_windows,
+		'min_snr': min_snr,
+	}
+
+
+def integrate_run(path, settings):
+	'''ResultTable of one run, one row per window (see integration_settings).'''
+	analytes = settings['analytes']
+	standard = settings['internal_standard']
+	if analytes is None:
+		analytes = [
+			el for el in sniff_header(path).elements
+			if not el.startswith('115In')
+			and not (standard is not None and is_internal_standard(el, standard['isotope']))
+		]
+	wanted = list(analytes)
+	if standard is not None:
+		wanted.append(standard['isotope'])
+	run = get_registry().load(path, analytes=wanted).data
+
+	if standard is not None and integrator_for(run).correction(standard) is None:
+		print(f"Warning: {standard['isotope']} not found in {path}, no correction applied", file=sys.stderr)
+
+	windows = settings['windows']
+	if windows is None:
+		# Co-eluting peaks of different analytes share one window.
+		windows = peak_windows(detect_peaks(run, analytes, min_snr=settings['min_snr']))
+		if not windows:
+			return ResultTable()
+
+	calibration = None
+	if settings['cal_curves']:
+		calibration = calibration_arrays(analytes, settings['cal_curves'], settings['masses'])
+	table = build_peak_table(
+		[run],
+		[os.path.basename(path).split(',')[0]],
+		windows,
+		analytes,
+		baseline=settings['baseline'],
+		calibration=calibration,
+		internal_standard=standard,
+	)
+	results = table.results()
+	if not settings['named_windows']:
+		results = ResultTable(
+			results.analytes, results.values,
+			**{name: results.column(name) for name in COLUMNS if name != 'window'},
+		)
+	return results
+
+
+def integrate_job(job):
+	'''Pool worker: (index, path, settings) -> (index, path, results, error).
+
+	Errors are returned as text, so one bad file doesn't stop the batch.
+	'''
+	index, path, settings = job
+	try:
+		return index, path, integrate_run(path, settings), None
+	except Exception as e:
+		return index, path, ResultTable(), f'{type(e).__name__}: {e}'
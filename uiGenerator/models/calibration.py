@@ -8,12 +8,13 @@ import os
 import pandas as pd
 import numpy as np
 import seaborn as sns
-from sklearn import linear_model
-from sklearn.metrics import mean_squared_error, r2_score
 import json
-import matplotlib.pyplot as plt
-from lcicpms.raw_icpms_data import RawICPMSData
-from lcicpms.integrate import Integrate
+from .auto_calibration import suggest_window
+from .calibration_fit import DEFAULT_MODEL, DEFAULT_WEIGHTING, fit_calibrations
+from .calibration_report import report_data
+from .dataset_registry import get_registry
+from .integration import integrator_for
+from .peak_detection import DEFAULT_MIN_SNR, detect_peaks
 from ..plotting.static import ICPMS_Data_Class
 from ..plotting.interactive import plotChroma
 import csv
@@ -42,19 +43,22 @@ class CalibrateFunctions:
 		# calcLinearRegression to include a section in the PDF report.
 		self._in_norm_results = None
 		
-	def importData(self):
-		'''imports cal .csv file using lcicpms.RawICPMSData'''
+	def importData(self, filename=None):
+		'''imports cal .csv file using lcicpms.RawICPMSData (via the dataset registry)
+
+		``filename`` defaults to the file selected in the list.
+		'''
 		print("importData called")
 
 		# Build file path - ensure proper path joining
 		cal_dir = self._calview.calibrationDir
 		print(f"  Calibration dir: '{cal_dir}'")
 
-		if self._calview.listwidget.currentItem() is None:
-			print("  ERROR: No file selected in listwidget")
-			return
-
-		filename = self._calview.listwidget.currentItem().text()
+		if filename is None:
+			if self._calview.listwidget.currentItem() is None:
+				print("  ERROR: No file selected in listwidget")
+				return
+			filename = self._calview.listwidget.currentItem().text()
 		print(f"  Filename: '{filename}'")
 
 		fdir = os.path.join(cal_dir, filename)
@@ -66,8 +70,12 @@ class CalibrateFunctions:
 			return
 
 		try:
-			raw_data = RawICPMSData(fdir)
-			self._data = raw_data.raw_data_df
+			# Projected loading: only the selected analytes' columns are parsed
+			analytes = None
+			if self._mainview.projectedLoading is True and self._mainview.activeElements:
+				analytes = list(self._mainview.activeElements)
+			raw_data = get_registry().load(fdir, analytes=analytes)
+			self._data = raw_data.data  # CompactRun: shared time axes, read-only
 			print(f"  Data loaded: {self._data.shape[0]} rows, {self._data.shape[1]} columns")
 
 			all_elements = raw_data.elements.copy()
@@ -114,11 +122,9 @@ class CalibrateFunctions:
 	def suggestIntegrationRange(self):
 		"""Suggest an integration range that spans the dominant peak feature.
 
-		For each active element, finds the max signal, estimates a baseline from
-		the first and last 10% of the trace, and walks outward from the peak until
-		the signal drops to baseline + 5% of the peak-above-baseline height. The
-		returned range is the union of per-element bounds (with a small padding),
-		so it spans the feature across all elements.
+		The union of each active element's most prominent peak, with a small
+		padding (see models.auto_calibration.suggest_window), so it spans the
+		feature across all elements.
 
 		Returns: (start_time_min, end_time_min) or None if no data.
 		"""
@@ -126,68 +132,10 @@ class CalibrateFunctions:
 			return None
 
 		try:
-			elements = self._calview.elements_in_stdfile
-			# Ignore 115In (internal standard) when detecting the analyte peak.
-			# Handles both '115In' and TQ-mode variants like '115In | 115In.16O'.
-			analyte_elements = [e for e in elements if not e.startswith('115In')] or elements
-
-			starts = []
-			ends = []
-			fallback_time = None
-
-			for element in analyte_elements:
-				time_seconds = self._data['Time ' + element].values
-				intensity = self._data[element].values
-				time_minutes = time_seconds / 60
-				n = len(time_minutes)
-				if fallback_time is None:
-					fallback_time = time_minutes
-				if n < 5:
-					continue
-
-				edge = max(1, n // 10)
-				baseline = float(np.median(
-					np.concatenate([intensity[:edge], intensity[-edge:]])
-				))
-				peak_idx = int(np.argmax(intensity))
-				peak_val = float(intensity[peak_idx])
-				height = peak_val - baseline
-				if height <= 0:
-					continue
-				# Skip weak/noisy traces: peak should be well above baseline
-				if peak_val < baseline * 1.5 and height < 3 * float(np.std(intensity[:edge])):
-					continue
-
-				threshold = baseline + 0.05 * height
-
-				left = peak_idx
-				while left > 0 and intensity[left] > threshold:
-					left -= 1
-				right = peak_idx
-				while right < n - 1 and intensity[right] > threshold:
-					right += 1
-
-				starts.append(time_minutes[left])
-				ends.append(time_minutes[right])
-
-			if not starts:
-				# No clear peak — fall back to a conservative interior range
-				if fallback_time is None or len(fallback_time) < 3:
-					return None
-				return (float(fallback_time[0]), float(fallback_time[-2]))
-
-			start_time = min(starts)
-			end_time = max(ends)
-
-			# Add small padding (5% of span) but stay within the trace
-			pad = 0.05 * max(end_time - start_time, 0.05)
-			t_min = float(fallback_time[0])
-			t_max = float(fallback_time[-1])
-			start_time = max(t_min, start_time - pad)
-			end_time = min(t_max, end_time + pad)
-
-			print(f"  Suggested integration range: {start_time:.2f} - {end_time:.2f} min")
-			return (float(start_time), float(end_time))
+			window = suggest_window(self._data, self._calview.elements_in_stdfile)
+			if window is not None:
+				print(f"  Suggested integration range: {window[0]:.2f} - {window[1]:.2f} min")
+			return window
 
 		except Exception as e:
 			print(f"  Error getting integration range: {e}")
@@ -223,26 +171,41 @@ class CalibrateFunctions:
 			traceback.print_exc()
 
 	def integrate(self, intRange):
-		'''integrates over specified x range using lcicpms.Integrate'''
+		'''integrates over specified x range from the run's cumulative integrals (see models.integration)'''
 		self.intRange = intRange
+		elements = list(self._calview.elements_in_stdfile)
+		# Range in minutes; time columns are in seconds
+		window = [(self.intRange[0] * 60, self.intRange[1] * 60)]
+		areas = integrator_for(self._data).areas(elements, window)[0]
+		self._storeAreas(dict(zip(elements, areas)))
+
+	def integratePeaks(self, min_snr=DEFAULT_MIN_SNR):
+		'''integrates every detected peak of each element (see models.peak_detection)
+
+		Each element's area is the sum over its own peaks, each within its own
+		bounds, so standards with several species need no common range.
+		Elements without a significant peak get 0. Returns the peaks.
+		'''
+		elements = list(self._calview.elements_in_stdfile)
+		detected = detect_peaks(self._data, elements, min_snr=min_snr)
+		integrator = integrator_for(self._data)
+		areas = {}
+		for element in elements:
+			peaks = detected.get(element, [])
+			windows = [(p.start * 60, p.stop * 60) for p in peaks]
+			areas[element] = integrator.areas([element], windows)[:, 0].sum() if peaks else 0.0
+		self._storeAreas(areas)
+		return detected
+
+	def _storeAreas(self, areas):
+		'''sets n_area and appends the areas to calibration_areas.txt'''
 		pa_dict = {}
-		for element in self._calview.elements_in_stdfile:
-			# Get time and intensity arrays
-			time_seconds = self._data['Time ' + element].values
-			intensity = self._data[element].values
-
-			# Set up time range (convert minutes to seconds for lcicpms)
-			range_min = self.intRange[0]  # minutes
-			range_max = self.intRange[1]  # minutes
-			time_range_seconds = (range_min * 60, range_max * 60)
-
-			# Use lcicpms Integrate.integrate() for peak area calculation
-			summed_area = Integrate.integrate(intensity, time_seconds, time_range=time_range_seconds)
+		for element, summed_area in areas.items():
+			summed_area = float(summed_area)
 			print(element + ': ' + str(summed_area))
-
 			pa_dict[element] = summed_area
 
-			self._calview.n_area = pa_dict
+		self._calview.n_area = pa_dict
 
 		filename = os.path.join(self._calview.calibrationDir, 'calibration_areas.txt')
 		with open(filename, 'a', newline='') as csvfile:
@@ -269,8 +232,8 @@ class CalibrateFunctions:
 		maxline = pg.InfiniteLine(xmax, pen=pen, angle=90)
 		self._calview.plotSpace.addItem(maxline)
 
-	def calcLinearRegression(self, standards_data):
-		"""Calculate linear regression calibration curves from standards data.
+	def calcLinearRegression(self, standards_data, model=DEFAULT_MODEL, weighting=DEFAULT_WEIGHTING):
+		"""Calculate calibration curves from standards data.
 
 		Args:
 			standards_data: List of dicts with keys:
@@ -278,12 +241,15 @@ class CalibrateFunctions:
 				- 'name': standard name (e.g., 'Blank', 'Std 1')
 				- 'concentration': concentration in ppb
 				- 'peak_areas': dict mapping element to peak area
-
-		Writes a single multi-page PDF report containing a summary table and
-		one calibration plot per element (115In is skipped — it's the internal
-		standard and no cal curve is needed for it).
+			model: 'origin', 'linear' or 'quadratic' (models.calibration_fit)
+			weighting: 'none', '1/x' or '1/x2'
+
+		All elements are fitted at once by calibration_fit.fit_calibrations.
+		Writes the .calib file and returns a summary; its 'report' (see
+		models.calibration_report) is rendered to 'pdf_path' by the caller: a
+		summary table and one calibration plot per element (115In is skipped
+		— it's the internal standard and no cal curve is needed for it).
 		"""
-		from matplotlib.backends.backend_pdf import PdfPages
 		from datetime import datetime
 
 		saveDict = {}
@@ -303,42 +269,34 @@ class CalibrateFunctions:
 				print(f"Found blank: {std['name']}")
 				break
 
-		fit_rows = []  # (element, slope, r2, mse, n_points, X, y, y_pred, blank_value)
-		for m in elements:
-			pas = []
-			concs = []
-
-			blank_value = blank_dict.get(m, 0) if blank_dict else 0
-			if blank_value:
-				print(f'Blank PA for {m} = {blank_value:.2f}')
-
-			for std in standards_data:
-				if std['peak_areas'] is None or m not in std['peak_areas']:
-					continue
-				peak_area = std['peak_areas'][m] - blank_value
-				concentration = std['concentration']
-				if concentration > 0:
-					pas.append(peak_area)
-					concs.append(concentration)
-
-			if len(pas) < 2:
-				reason = f'only {len(pas)} standard(s) with peak areas'
-				print(f"Skipping {m}: insufficient data points ({len(pas)})")
+		# (standards, elements) blank-subtracted areas, NaN where missing.
+		blanks = np.array([blank_dict.get(m, 0) if blank_dict else 0 for m in elements], dtype=float)
+		concs = np.array([std['concentration'] for std in standards_data], dtype=float)
+		areas = np.array([
+			[(std['peak_areas'] or {}).get(m, np.nan) for m in elements] for std in standards_data
+		], dtype=float).reshape(len(standards_data), len(elements)) - blanks
+		fits = fit_calibrations(areas, concs, elements, model, weighting)
+		min_points = 3 if model == 'quadratic' else 2
+
+		fit_rows = []  # (element, curve, X, y, blank_value)
+		for j, m in enumerate(elements):
+			if blanks[j]:
+				print(f'Blank PA for {m} = {blanks[j]:.2f}')
+			if not fits.fitted[j]:
+				n = int(fits.n[j])
+				reason = (
+					f'only {n} standard(s) with peak areas' if n < min_points
+					else 'standards have no spread in peak area'
+				)
+				print(f"Skipping {m}: {reason}")
 				skipped_elements.append((m, reason))
 				continue
 
-			X = np.array(pas).reshape(-1, 1)
-			y = np.array(concs)
-			regr = linear_model.LinearRegression(fit_intercept=False)
-			regr.fit(X, y)
-			y_pred = regr.predict(X)
-			mse = mean_squared_error(y, y_pred)
-			r2 = r2_score(y, y_pred)
-
-			print(f"{m}: slope={regr.coef_[0]:.4e}, r2={r2:.4f}, mse={mse:.2f}")
-
-			saveDict[m] = {'m': regr.coef_[0], 'b': regr.intercept_, 'r2': r2, 'mse': mse}
-			fit_rows.append((m, regr.coef_[0], r2, mse, len(pas), X, y, y_pred, blank_value))
+			used = np.isfinite(areas[:, j]) & (concs > 0)
+			curve = fits.curve(j)
+			print(f"{m}: slope={curve['m']:.4e}, r2={curve['r2']:.4f}, mse={curve['mse']:.2f}")
+			saveDict[m] = curve
+			fit_rows.append((m, curve, areas[used, j], concs[used], blanks[j]))
 
 		self._mainview.calCurves = saveDict
 
@@ -347,244 +305,18 @@ class CalibrateFunctions:
 		in_norm = self._in_norm_results
 		self._in_norm_results = None
 
-		# Build the PDF report ------------------------------------------------
+		# The PDF report is rendered off the GUI thread
+		# (utils.calibration_report); here only its contents and path.
+		report = None
 		if fit_rows:
-			from ..utils.analyte_formatter import format_analyte_latex
 			timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-			pdf_path = os.path.join(
+			pdf_path_out = os.path.join(
 				self._calview.calibrationDir, f'calibration_report_{timestamp}.pdf'
 			)
-			pdf_path_out = pdf_path
-
-			PAGE_W, PAGE_H = 8.5, 11  # portrait letter
-			HEADER_COLOR = '#4682b4'
-			ROW_ALT = '#f2f6fa'
-			TITLE_FS = 22
-			BODY_FS = 11  # everything except the title uses this size
-
-			def _pretty(analyte):
-				"""LaTeX-formatted isotope label, robust to ' | ' separators."""
-				return format_analyte_latex(analyte.replace(' ', ''))
-
-			def _style_table(tbl, n_rows, n_cols):
-				tbl.auto_set_font_size(False)
-				tbl.set_fontsize(BODY_FS)
-				# Vertical scale gives cells breathing room so wrapped headers
-				# and body text don't collide with borders.
-				tbl.scale(1, 2.0)
-				# Header row
-				for c in range(n_cols):
-					cell = tbl[0, c]
-					cell.set_facecolor(HEADER_COLOR)
-					cell.set_text_props(color='white', fontweight='bold')
-					cell.set_edgecolor('white')
-				# Body rows
-				for r in range(1, n_rows + 1):
-					bg = ROW_ALT if r % 2 == 0 else 'white'
-					for c in range(n_cols):
-						cell = tbl[r, c]
-						cell.set_facecolor(bg)
-						cell.set_edgecolor('#d0d0d0')
-
-			# Left-aligned layout: everything hangs off a single left margin at
-			# x = LEFT. No centered text, no centered tables. Body text is a
-			# single font size (BODY_FS); only the title is larger.
-			LEFT = 0.08
-			RIGHT = 0.94
-			WIDTH = RIGHT - LEFT
-
-			with PdfPages(pdf_path) as pdf:
-				# ---- Page 1: header + summary table ----------------------
-				fig = plt.figure(figsize=(PAGE_W, PAGE_H))
-				fig.text(
-					LEFT, 0.955, 'LC-ICP-MS Calibration Report',
-					ha='left', va='top', fontsize=TITLE_FS, fontweight='bold',
-				)
-				meta_lines = [
-					f"Generated:            {datetime.now().strftime('%Y-%m-%d %H:%M')}",
-					f"Standards used:       {len(standards_data)}",
-					f"Elements fitted:      {len(fit_rows)}   (115In excluded)",
-				]
-				if blank_name:
-					meta_lines.append(f"Blank reference:      {blank_name}")
-				meta_lines.append(
-					f"115In normalization:  {'applied' if in_norm else 'not applied'}"
-				)
-				fig.text(
-					LEFT, 0.885, '\n'.join(meta_lines),
-					ha='left', va='top', fontsize=BODY_FS, family='monospace',
-					linespacing=1.5,
-				)
-
-				# Section heading above the table (same body font size,
-				# just bold — no larger font size).
-				fig.text(
-					LEFT, 0.720,
-					'Calibration curves (linear, zero intercept)',
-					ha='left', va='top', fontsize=BODY_FS, fontweight='bold',
-				)
-
-				# Table area — plenty of space, well below the heading.
-				ax = fig.add_axes([LEFT, 0.10, WIDTH, 0.58])
-				ax.axis('off')
-
-				# Plain-ASCII headers so all fonts render cleanly.
-				col_labels = ['Element', 'Slope', 'R2', 'MSE', 'N', 'Blank PA']
-				# Widths sum ≤ 1.0, giving each header room to fit its label.
-				col_widths = [0.20, 0.24, 0.12, 0.14, 0.10, 0.18]
-
-				cell_text = []
-				for (m, slope, r2, mse, n, _, _, _, blank_v) in fit_rows:
-					cell_text.append([
-						_pretty(m),
-						f'{slope:.3e}',
-						f'{r2:.4f}',
-						f'{mse:.2f}',
-						f'{n}',
-						f'{blank_v:.0f}' if blank_v else '—',
-					])
-
-				tbl = ax.table(
-					cellText=cell_text,
-					colLabels=col_labels,
-					colWidths=col_widths,
-					loc='upper left',
-					cellLoc='left',
-					colLoc='left',
-				)
-				_style_table(tbl, len(cell_text), len(col_labels))
-
-				# Small footnote so 'Slope' units aren't ambiguous.
-				fig.text(
-					LEFT, 0.07,
-					'Slope units: ppb / count.  N = number of non-blank '
-					'standards used in the fit.',
-					ha='left', va='top', fontsize=BODY_FS, style='italic',
-					color='#555',
-				)
-				pdf.savefig(fig)
-				plt.close(fig)
-
-				# ---- Optional page: 115In normalization details ----------
-				if in_norm:
-					fig = plt.figure(figsize=(PAGE_W, PAGE_H))
-					fig.text(
-						LEFT, 0.955, '115In Normalization',
-						ha='left', va='top', fontsize=TITLE_FS, fontweight='bold',
-					)
-					blurb = (
-						f"Reference:     blank '{in_norm['blank_name']}'\n"
-						f"Avg 115In:     {in_norm['blank_avg_in']:.1f} counts\n"
-						"Each standard's peak areas were scaled by "
-						"(blank_avg / std_avg) before fitting."
-					)
-					fig.text(
-						LEFT, 0.885, blurb, ha='left', va='top',
-						fontsize=BODY_FS, family='monospace', linespacing=1.5,
-					)
-					next_y = 0.760
-					if in_norm.get('skipped'):
-						fig.text(
-							LEFT, 0.780,
-							'Skipped: ' + '; '.join(in_norm['skipped']),
-							ha='left', va='top', fontsize=BODY_FS,
-							color='#a04040',
-						)
-						next_y = 0.730
-
-					fig.text(
-						LEFT, next_y, 'Correction factors',
-						ha='left', va='top', fontsize=BODY_FS, fontweight='bold',
-					)
-					ax = fig.add_axes([LEFT, 0.08, WIDTH, next_y - 0.10])
-					ax.axis('off')
-
-					norm_rows = []
-					for r in in_norm['results']:
-						label = r['name'] + (' (ref)' if r['is_blank'] else '')
-						norm_rows.append([
-							label,
-							f"{r['avg_in']:.1f}",
-							f"{r['factor']:.4f}",
-						])
-					tbl = ax.table(
-						cellText=norm_rows,
-						colLabels=['Standard', 'Avg 115In (counts)',
-						           'Correction factor'],
-						colWidths=[0.44, 0.28, 0.24],
-						loc='upper left',
-						cellLoc='left',
-						colLoc='left',
-					)
-					_style_table(tbl, len(norm_rows), 3)
-					pdf.savefig(fig)
-					plt.close(fig)
-
-				# ---- One calibration plot per element (portrait) ---------
-				for (m, slope, r2, mse, n, X, y, y_pred, blank_v) in fit_rows:
-					fig = plt.figure(figsize=(PAGE_W, PAGE_H))
-					fig.text(
-						LEFT, 0.955, _pretty(m),
-						ha='left', va='top', fontsize=TITLE_FS, fontweight='bold',
-					)
-					fig.text(
-						LEFT, 0.895, 'Calibration curve',
-						ha='left', va='top', fontsize=BODY_FS, color='#555',
-					)
-
-					# Plot in the upper portion, well clear of the header and
-					# the stats block below. Leave enough room under the ax
-					# for the xlabel and tick labels before the stats heading.
-					ax = fig.add_axes([LEFT, 0.50, WIDTH, 0.34])
-					Xk = (X / 1000).ravel()
-					x_line = np.linspace(0, Xk.max() * 1.05, 100)
-					y_line = slope * (x_line * 1000)
-					ax.plot(
-						x_line, y_line, color=HEADER_COLOR, linewidth=2.5,
-						label='Linear fit  (y = m·x)', zorder=2,
-					)
-					ax.scatter(
-						Xk, y, s=90, facecolor='white', edgecolor='black',
-						linewidth=1.5, zorder=3, label='Standards',
-					)
-					ax.set_xlabel(
-						r'Peak Area  ($10^{3}$ ICP-MS counts)',
-						fontsize=BODY_FS,
-					)
-					ax.set_ylabel('Concentration  (ppb)', fontsize=BODY_FS)
-					ax.set_xlim(left=0, right=Xk.max() * 1.08)
-					ax.set_ylim(bottom=0, top=max(y) * 1.15)
-					ax.grid(True, linestyle='--', alpha=0.4)
-					ax.tick_params(axis='both', which='major', labelsize=BODY_FS)
-					for spine in ('top', 'right'):
-						ax.spines[spine].set_visible(False)
-					ax.legend(loc='upper left', frameon=True, fontsize=BODY_FS)
-
-					# Stats heading + block, both same body font size.
-					fig.text(
-						LEFT, 0.40, 'Fit statistics',
-						ha='left', va='top', fontsize=BODY_FS, fontweight='bold',
-					)
-					stats = [
-						f'Slope         =  {slope:.4e}  ppb / count',
-						f'R2            =  {r2:.4f}',
-						f'MSE           =  {mse:.2f}',
-						f'N             =  {n}',
-					]
-					if blank_v:
-						stats.append(f'Blank PA      =  {blank_v:.0f}  (subtracted)')
-					if in_norm:
-						stats.append('115In norm.   =  applied')
-					fig.text(
-						LEFT, 0.35, '\n'.join(stats),
-						ha='left', va='top', fontsize=BODY_FS, family='monospace',
-						linespacing=1.6,
-					)
-
-					pdf.savefig(fig)
-					plt.close(fig)
-
-			print(f"Saved calibration report to {pdf_path}")
+			report = report_data(
+				fit_rows, len(standards_data), model, weighting,
+				blank_name=blank_name, in_norm=in_norm,
+			)
 
 		# Save calibration file. If a calibration_curve.calib already exists in
 		# the target directory, rename it to
@@ -613,6 +345,7 @@ class CalibrateFunctions:
 		# Only overwrite the .calib file when we actually calculated curves —
 		# a failed run should not archive and replace a valid historic file.
 		savefile = None
+		calib_paths = []
 		if saveDict:
 			if self._mainview.homeDir:
 				home_dir = self._mainview.homeDir.rstrip('/\\')
@@ -620,6 +353,7 @@ class CalibrateFunctions:
 				_archive_existing_calib(home_savefile)
 				with open(home_savefile, 'w') as file:
 					file.write(json.dumps(saveDict))
+				calib_paths.append(home_savefile)
 				print(f"Saved calibration to {home_savefile}")
 
 			savefile = os.path.join(
@@ -628,19 +362,28 @@ class CalibrateFunctions:
 			_archive_existing_calib(savefile)
 			with open(savefile, 'w') as file:
 				file.write(json.dumps(saveDict))
+			calib_paths.append(savefile)
 			print(f"Saved calibration to {savefile}")
 
 		# Summary consumed by the calibration controller to show a popup.
 		return {
 			'fitted': [
-				{'element': m, 'slope': slope, 'r2': r2, 'mse': mse, 'n': n}
-				for (m, slope, r2, mse, n, _, _, _, _) in fit_rows
+				{
+					'element': m, 'slope': curve['m'], 'slope_se': curve['slope_se'],
+					'r2': curve['r2'], 'mse': curve['mse'], 'lod': curve['lod'],
+					'loq': curve['loq'], 'n': curve['n'],
+				}
+				for (m, curve, _, _, _) in fit_rows
 			],
 			'skipped': skipped_elements,
 			'pdf_path': pdf_path_out,
+			'report': report,
 			'calib_path': savefile,
+			'calib_paths': calib_paths,
 			'archived_calibs': archived_calibs,
 			'in_norm_applied': in_norm is not None,
 			'blank_name': blank_name,
+			'model': model,
+			'weighting': weighting,
 			'standards_count': len(standards_data),
 		}
@@ -0,0 +1,202 @@
+"""Closed-form calibration fits for every analyte at once.
+
+A calibration maps blank-subtracted peak area to concentration (ppb). The
+standards' areas form a (standards, analytes) array with NaN where a
+standard lacks an analyte; ``fit_calibrations`` solves every analyte's
+weighted least-squares problem in one stacked pseudo-inverse instead of
+one regression object per element. Missing standards get zero weight, so
+analytes with different numbers of usable standards share the batch.
+
+Models:
+	origin      c = m·A                 (the historic zero-intercept curve)
+	linear      c = m·A + b
+	quadratic   c = q·A² + m·A + b
+
+Weighting (by standard concentration c): 'none', '1/x' or '1/x2'; weighted
+fits keep the low standards from being swamped by the top of the range.
+
+Besides the coefficients every fit reports the slope's standard error, R²
+and MSE of the concentrations, and detection limits from the residual
+standard deviation s of the fit (in ppb): LOD = 3.3·s and LOQ = 10·s.
+Curves are stored as plain dicts in .calib files; ``concentration`` and
+``concentrations`` evaluate them, with 'q' absent for linear curves.
+"""
+
+import numpy as np
+
+
+FIT_MODELS = {
+	'origin': 'Linear through origin',
+	'linear': 'Linear with intercept',
+	'quadratic': 'Quadratic',
+}
+
+# Curve formulas for plot legends.
+FORMULAS = {
+	'origin': 'y = m·x',
+	'linear': 'y = m·x + b',
+	'quadratic': 'y = q·x² + m·x + b',
+}
+
+WEIGHTINGS = {
+	'none': 'Unweighted',
+	'1/x': '1/x',
+	'1/x2': '1/x²',
+}
+
+DEFAULT_MODEL = 'origin'
+DEFAULT_WEIGHTING = 'none'
+
+# Multiples of the residual standard deviation for the detection limits.
+LOD_FACTOR = 3.3
+LOQ_FACTOR = 10.0
+
+
+class CalibrationFits:
+	'''Fitted curves of many analytes; every array is over ``analytes``.
+
+	``intercept``, ``slope`` and ``curvature`` are the b, m and q
+	coefficients (0 where the model lacks them); NaN throughout for
+	analytes with too few standards to fit.
+	'''
+
+	def __init__(self, analytes, model, weighting, intercept, slope, curvature,
+			slope_se, r2, mse, lod, loq, n):
+		self.analytes = list(analytes)
+		self.model = model
+		self.weighting = weighting
+		self.intercept = intercept
+		self.slope = slope
+		self.curvature = curvature
+		self.slope_se = slope_se
+		self.r2 = r2
+		self.mse = mse
+		self.lod = lod
+		self.loq = loq
+		self.n = n
+
+	@property
+	def fitted(self):
+		'''Boolean mask of the analytes that have a curve.'''
+		return np.isfinite(self.slope)
+
+	def curve(self, j):
+		'''.calib dict of analyte ``j`` ('q' only for quadratic curves).'''
+		curve = {'m': float(self.slope[j]), 'b': float(self.intercept[j])}
+		if self.model == 'quadratic':
+			curve['q'] = float(self.curvature[j])
+		curve.update({
+			'r2': float(self.r2[j]), 'mse': float(self.mse[j]),
+			'slope_se': float(self.slope_se[j]), 'lod': float(self.lod[j]),
+			'loq': float(self.loq[j]), 'n': int(self.n[j]),
+			'model': self.model, 'weighting': self.weighting,
+		})
+		return curve
+
+	def predict(self, areas):
+		'''Concentrations (ppb) of ``areas`` (..., analytes).'''
+		areas = np.asarray(areas, dtype=float)
+		return (self.curvature * areas + self.slope) * areas + self.intercept
+
+
+def _weights(concentrations, weighting):
+	if weighting == 'none':
+		return np.ones_like(concentrations)
+	if weighting == '1/x':
+		return 1 / concentrations
+	if weighting == '1/x2':
+		return 1 / concentrations ** 2
+	raise ValueError(f'unknown weighting {weighting!r}; expected one of {list(WEIGHTINGS)}')
+
+
+def fit_calibrations(areas, concentrations, analytes=None, model=DEFAULT_MODEL,
+		weighting=DEFAULT_WEIGHTING):
+	'''Fit calibration curves of all analytes in one stacked least squares.
+
+	Args:
+		areas: (standards, analytes) blank-subtracted peak areas, NaN where
+			a standard has no area for an analyte
+		concentrations: (standards,) concentration of each standard (ppb);
+			standards at or below zero (blanks) are not fitted
+		analytes: names of the columns of ``areas``
+		model: 'origin', 'linear' or 'quadratic'
+		weighting: 'none', '1/x' or '1/x2'
+
+	Returns:
+		CalibrationFits; an analyte needs at least two standards (three for
+		a quadratic) and its uncertainties need one more than that.
+	'''
+	if model not in FIT_MODELS:
+		raise ValueError(f'unknown calibration model {model!r}; expected one of {list(FIT_MODELS)}')
+	areas = np.asarray(areas, dtype=float).reshape(len(concentrations), -1)
+	c = np.asarray(concentrations, dtype=float)
+	n_analytes = areas.shape[1]
+	analytes = list(analytes) if analytes is not None else list(range(n_analytes))
+
+	usable = np.isfinite(areas) & (c > 0)[:, None]                         # (S, A)
+	w = np.where(usable, _weights(np.where(c > 0, c, 1.0), weighting)[:, None], 0.0)
+	x = np.where(usable, areas, 0.0)
+	# Areas run to 1e6 and beyond; scaling each analyte to unit range keeps
+	# the quadratic design well conditioned.
+	scale = np.max(np.abs(x), axis=0)
+	scale = np.where(scale > 0, scale, 1.0)
+	u = x / scale
+
+	powers = {'origin': (1,), 'linear': (0, 1), 'quadratic': (0, 1, 2)}[model]
+	design = np.stack([u ** p for p in powers], axis=-1).transpose(1, 0, 2)   # (A, S, P)
+	root_w = np.sqrt(w).T                                                     # (A, S)
+	y = np.where(usable, c[:, None], 0.0).T                                   # (A, S)
+	pinv = np.linalg.pinv(design * root_w[..., None])                         # (A, P, S)
+	beta = np.einsum('aps,as->ap', pinv, root_w * y)                          # (A, P)
+
+	n = usable.sum(axis=0)
+	n_params = len(powers)
+	predicted = np.einsum('asp,ap->as', design, beta)
+	residuals = np.where(usable.T, y - predicted, 0.0)
+	dof = n - n_params
+	with np.errstate(divide='ignore', invalid='ignore'):
+		mse = (residuals ** 2).sum(axis=1) / n
+		mean = (y * usable.T).sum(axis=1) / n
+		total = (np.where(usable.T, y - mean[:, None], 0.0) ** 2).sum(axis=1)
+		r2 = np.where(total > 0, 1 - (residuals ** 2).sum(axis=1) / total, np.nan)
+		# Standard errors from the weighted residual variance; the detection
+		# limits from the unweighted one, which is in ppb.
+		weighted_var = np.where(dof > 0, ((root_w * residuals) ** 2).sum(axis=1) / dof, np.nan)
+		unscaled = np.einsum('aps,aqs->apq', pinv, pinv)                      # (A, P, P)
+		s = np.sqrt(np.where(dof > 0, (residuals ** 2).sum(axis=1) / dof, np.nan))
+
+	coefficients = np.zeros((n_analytes, 3))
+	for k, p in enumerate(powers):
+		coefficients[:, p] = beta[:, k] / scale ** p
+	m = powers.index(1)
+	slope_se = np.sqrt(weighted_var * unscaled[:, m, m]) / scale
+
+	# Too few standards, or all of them at one area: no curve.
+	fitted = (n >= max(2, n_params)) & (np.linalg.matrix_rank(design * root_w[..., None]) == n_params)
+
+	def nan(a):
+		return np.where(fitted, a, np.nan)
+
+	return CalibrationFits(
+		analytes, model, weighting,
+		intercept=nan(coefficients[:, 0]), slope=nan(coefficients[:, 1]),
+		curvature=nan(coefficients[:, 2]), slope_se=nan(slope_se), r2=nan(r2),
+		mse=nan(mse), lod=nan(LOD_FACTOR * s), loq=nan(LOQ_FACTOR * s), n=n,
+	)
+
+
+def concentration(cal_curve, area):
+	'''Concentration (ppb) of ``area`` on a .calib curve dict.'''
+	return (cal_curve.get('q', 0.0) * area + cal_curve['m']) * area + cal_curve['b']
+
+
+def concentrations(areas, calibration):
+	'''Concentrations (ppb) of ``areas`` (..., analytes) under ``calibration``.
+
+	``calibration`` is (slopes, intercepts, masses[, curvatures]) over the
+	analytes, as from peak_table.calibration_arrays.
+	'''
+	slopes, intercepts = (np.asarray(c, dtype=float) for c in calibration[:2])
+	curvatures = np.asarray(calibration[3], dtype=float) if len(calibration) > 3 else 0.0
+	areas = np.asarray(areas, dtype=float)
+	return (curvatures * areas + slopes) * areas + intercepts
@@ -0,0 +1,324 @@
+"""Index of the calibration files under a directory, kept in a sidecar file.
+
+Every Calculate Curve writes ``calibration_curve.calib`` and archives the
+previous one as ``calibration_curve_<YYYYMMDD_HHMMSS>.calib``, so curves pile
+up across the data tree. The registry records for each ``.calib`` its
+timestamp (the file's mtime, which archiving keeps), analytes, fit model
+and per-analyte fit statistics, and the ``calibration_report_<stamp>.pdf``
+written with it. The newest entry is tracked as entries come and go, so
+``latest`` is a lookup; ``entries`` lists the history for a picker.
+
+Like the run index (models.directory_index) entries are keyed by size and
+mtime and only changed files are re-read. ``update`` walks the tree, so it
+belongs on a worker thread (utils.directory_scanner.DirectoryIndexer);
+files written by the app itself are registered directly by name. The
+sidecar is ``REGISTRY_FILENAME`` in the root directory.
+"""
+
+import json
+import os
+import re
+import threading
+from datetime import datetime
+
+
+REGISTRY_FILENAME = '.lcicpms-calibrations.json'
+
+# Bump when the stored fields change; older sidecars are rebuilt.
+REGISTRY_FORMAT = 1
+
+# A report is paired with a .calib written at most this long after it (s).
+REPORT_WINDOW = 600
+
+_REPORT_NAME = re.compile(r'calibration_report_(\d{8}_\d{6})\.pdf$')
+
+
+def _report_time(name):
+	'''Epoch seconds in a report's file name, or None.'''
+	match = _REPORT_NAME.match(name)
+	if match is None:
+		return None
+	return datetime.strptime(match.group(1), '%Y%m%d_%H%M%S').timestamp()
+
+
+def pair_report(directory, created, names=None):
+	'''Name of the report in ``directory`` written with a .calib at ``created``, or None.
+
+	That is the latest report stamped at or up to REPORT_WINDOW seconds
+	before ``created``. ``names`` is the directory listing, if known.
+	'''
+	if names is None:
+		try:
+			names = os.listdir(directory)
+		except OSError:
+			return None
+	best = None
+	for name in names:
+		stamp = _report_time(name)
+		if stamp is None or not created - REPORT_WINDOW <= stamp <= created + 1:
+			continue
+		if best is None or stamp > best[0]:
+			best = (stamp, name)
+	return best[1] if best else None
+
+
+class CalibrationEntry:
+	'''Index entry for one .calib file.
+
+	``created`` is epoch seconds; ``stats`` maps each analyte to what the
+	file records of its fit (r2, lod, n, ...); ``report`` is the paired PDF
+	(a name in the same directory) or None.
+	'''
+
+	FIELDS = ('size', 'mtime_ns', 'created', 'analytes', 'model', 'weighting', 'stats', 'report')
+
+	STAT_KEYS = ('m', 'r2', 'mse', 'slope_se', 'lod', 'loq', 'n')
+
+	def __init__(self, size, mtime_ns, created, analytes, model='origin', weighting='none',
+			stats=None, report=None):
+		self.size = size
+		self.mtime_ns = mtime_ns
+		self.created = created
+		self.analytes = list(analytes)
+		self.model = model
+		self.weighting = weighting
+		self.stats = dict(stats or {})
+		self.report = report
+
+	@classmethod
+	def from_dict(cls, entry):
+		return cls(**{k: entry.get(k) for k in cls.FIELDS})
+
+	def as_dict(self):
+		return {k: getattr(self, k) for k in self.FIELDS}
+
+	def matches(self, st):
+		'''True while the file still has the size and mtime this entry was built from.'''
+		return self.size == st.st_size and self.mtime_ns == st.st_mtime_ns
+
+	def mean_r2(self):
+		'''Mean R² over the analytes that record one, or None.'''
+		values = [s['r2'] for s in self.stats.values() if isinstance(s.get('r2'), (int, float))]
+		values = [v for v in values if v == v]  # NaN
+		return sum(values) / len(values) if values else None
+
+
+def summarize_calibration(path, report=None):
+	'''Build the CalibrationEntry of one .calib file.'''
+	st = os.stat(path)
+	with open(path, encoding='utf-8') as f:
+		curves = json.load(f)
+	if not isinstance(curves, dict):
+		raise ValueError('not a calibration file')
+	first = next(iter(curves.values()), {})
+	stats = {
+		analyte: {k: curve[k] for k in CalibrationEntry.STAT_KEYS if k in curve}
+		for analyte, curve in curves.items() if isinstance(curve, dict)
+	}
+	if report is None:
+		report = pair_report(os.path.dirname(path), st.st_mtime)
+	return CalibrationEntry(
+		st.st_size, st.st_mtime_ns, st.st_mtime, list(curves),
+		model=first.get('model', 'origin'), weighting=first.get('weighting', 'none'),
+		stats=stats, report=report,
+	)
+
+
+class CalibrationRegistry:
+	'''Calibration files under ``root``, persisted in a sidecar there.
+
+	Entry names are paths relative to ``root``.
+	'''
+
+	def __init__(self, root):
+		self.root = os.path.abspath(root)
+		self.path = os.path.join(self.root, REGISTRY_FILENAME)
+		self._lock = threading.Lock()
+		self._entries = {}  # relative path -> CalibrationEntry
+		self._latest = None
+		self._rootListing = None  # _listRoot() at the last walk
+		self.load()
+
+	def load(self):
+		'''Read the sidecar; a missing, unreadable or outdated one is ignored.'''
+		try:
+			with open(self.path, encoding='utf-8') as f:
+				stored = json.load(f)
+		except (OSError, ValueError):
+			return
+		if not isinstance(stored, dict) or stored.get('format') != REGISTRY_FORMAT:
+			return
+		entries = {}
+		for name, entry in stored.get('calibrations', {}).items():
+			try:
+				entries[name] = CalibrationEntry.from_dict(entry)
+			except (TypeError, AttributeError):
+				continue
+		with self._lock:
+			self._entries = entries
+			self._findLatest()
+
+	def save(self):
+		'''Write the sidecar atomically (printed, not raised, on failure).'''
+		with self._lock:
+			calibrations = {name: e.as_dict() for name, e in self._entries.items()}
+		tmp = self.path + '.tmp'
+		try:
+			with open(tmp, 'w', encoding='utf-8') as f:
+				json.dump({'format': REGISTRY_FORMAT, 'calibrations': calibrations}, f)
+			os.replace(tmp, self.path)
+		except OSError as e:
+			print(f'Could not write calibration index {self.path}: {e}')
+
+	def _walk(self, should_stop=None):
+		'''Relative paths of every .calib under the root (hidden directories skipped).'''
+		found = []
+		listing = frozenset()
+		for root, dirs, files in os.walk(self.root):
+			if should_stop is not None and should_stop():
+				return None
+			dirs[:] = [d for d in dirs if not d.startswith('.')]
+			calibs = [f for f in files if f.endswith('.calib')]
+			if root == self.root:
+				listing = self._listRoot()
+			found += [os.path.relpath(os.path.join(root, f), self.root) for f in calibs]
+		self._rootListing = listing
+		return found
+
+	def _listRoot(self):
+		'''Folders and (.calib name, size, mtime) at the root.'''
+		listing = set()
+		try:
+			with os.scandir(self.root) as it:
+				for e in it:
+					if e.name.endswith('.calib') and e.is_file():
+						st = e.stat()
+						listing.add((e.name, st.st_size, st.st_mtime_ns))
+					elif e.is_dir() and not e.name.startswith('.'):
+						listing.add(e.name)
+		except OSError:
+			pass
+		return frozenset(listing)
+
+	def changed(self):
+		'''True if .calib files or folders at the root changed since the last walk.
+
+		A cheap check for a directory watcher: writing the sidecar, or any
+		other file, does not count.
+		'''
+		return self._rootListing is None or self._listRoot() != self._rootListing
+
+	def update(self, names=None, should_stop=None):
+		'''Bring the entries up to date and save if anything changed.
+
+		``names`` limits the check to those files (relative or absolute
+		paths); by default the whole tree is walked and entries of deleted
+		files are dropped. ``should_stop`` is polled to abandon the update.
+		Returns the names whose entries were added, rebuilt or removed.
+		'''
+		full = names is None
+		if full:
+			names = self._walk(should_stop)
+			if names is None:
+				return []
+		else:
+			names = [self.name(n) for n in names]
+		changed = []
+		for name in names:
+			if should_stop is not None and should_stop():
+				full = False
+				break
+			path = os.path.join(self.root, name)
+			try:
+				st = os.stat(path)
+			except OSError:
+				if self._discard(name):
+					changed.append(name)
+				continue
+			current = self.get(name)
+			if current is not None and current.matches(st):
+				continue
+			try:
+				self._put(name, summarize_calibration(path))
+			except (OSError, ValueError) as e:
+				print(f'Could not index {path}: {e}')
+				continue
+			changed.append(name)
+		if full:
+			listed = set(names)
+			for name in [n for n in self.names() if n not in listed]:
+				self._discard(name)
+				changed.append(name)
+		if changed:
+			self.save()
+		return changed
+
+	def add(self, path, report=None):
+		'''Register a .calib just written, with the report written for it.'''
+		name = self.name(path)
+		self._put(name, summarize_calibration(os.path.join(self.root, name), report=report))
+		self.save()
+		return name
+
+	def name(self, path):
+		'''Entry name of ``path`` (absolute, or already relative to the root).'''
+		if os.path.isabs(path):
+			return os.path.relpath(path, self.root)
+		return os.path.normpath(path)
+
+	def _put(self, name, entry):
+		with self._lock:
+			self._entries[name] = entry
+			latest = self._entries.get(self._latest)
+			if latest is None or entry.created >= latest.created:
+				self._latest = name
+
+	def _discard(self, name):
+		with self._lock:
+			removed = self._entries.pop(name, None) is not None
+			if name == self._latest:
+				self._findLatest()
+			return removed
+
+	def _findLatest(self):
+		self._latest = max(self._entries, key=lambda n: self._entries[n].created, default=None)
+
+	def latest(self):
+		'''(name, CalibrationEntry) of the newest calibration, or None.'''
+		with self._lock:
+			if self._latest is None:
+				return None
+			return self._latest, self._entries[self._latest]
+
+	def entries(self):
+		'''(name, CalibrationEntry) pairs, newest first.'''
+		with self._lock:
+			items = list(self._entries.items())
+		return sorted(items, key=lambda item: item[1].created, reverse=True)
+
+	def get(self, name):
+		with self._lock:
+			return self._entries.get(name)
+
+	def names(self):
+		with self._lock:
+			return list(self._entries)
+
+	def __contains__(self, name):
+		with self._lock:
+			return name in self._entries
+
+	def __len__(self):
+		with self._lock:
+			return len(self._entries)
+
+	def path_of(self, name):
+		'''Absolute path of entry ``name``.'''
+		return os.path.join(self.root, name)
+
+	def report_path(self, name):
+		'''Absolute path of the report paired with entry ``name``, or None.'''
+		entry = self.get(name)
+		if entry is None or not entry.report:
+			return None
+		return os.path.join(self.root, os.path.dirname(name), entry.report)
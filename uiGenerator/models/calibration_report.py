@@ -0,0 +1,352 @@
+"""Calibration PDF report, rendered page by page for process pools.
+
+The report of a Calculate Curve run is a plain dict (``report_data``) so it
+travels to worker processes. Every page (the summary table, the optional
+115In normalization page and one page per element) is drawn on its own
+matplotlib Figure with the pdf backend, never pyplot, and returned as a
+one-page vector PDF by ``render_page``; ``write_report`` then merges the
+pages into one PDF with pypdf. Nothing here imports Qt, so workers spawn cheaply:
+utils.calibration_report renders a report off the GUI thread, and
+``build_report`` renders one in the calling process.
+"""
+
+import io
+import os
+from datetime import datetime
+
+import numpy as np
+
+from .calibration_fit import FIT_MODELS, FORMULAS, WEIGHTINGS, concentration
+
+
+PAGE_W, PAGE_H = 8.5, 11  # portrait letter
+HEADER_COLOR = '#4682b4'
+ROW_ALT = '#f2f6fa'
+TITLE_FS = 22
+BODY_FS = 11  # everything except the title uses this size
+
+# Left-aligned layout: everything hangs off a single left margin at
+# x = LEFT. No centered text, no centered tables. Body text is a
+# single font size (BODY_FS); only the title is larger.
+LEFT = 0.08
+RIGHT = 0.94
+WIDTH = RIGHT - LEFT
+
+
+def report_data(fit_rows, standards_count, model, weighting, blank_name=None, in_norm=None):
+	'''Everything the report shows, as a picklable dict.
+
+	Args:
+		fit_rows: (element, curve, X, y, blank_value) per fitted element;
+			``curve`` is the .calib dict, X and y the fitted areas and
+			concentrations
+		standards_count: number of standards used
+		model, weighting: calibration_fit model and weighting keys
+		blank_name: name of the blank standard, if any
+		in_norm: 115In normalization details, if applied
+	'''
+	return {
+		'generated': datetime.now().strftime('%Y-%m-%d %H:%M'),
+		'rows': list(fit_rows),
+		'standards_count': standards_count,
+		'model': model,
+		'weighting': weighting,
+		'blank_name': blank_name,
+		'in_norm': in_norm,
+	}
+
+
+def report_pages(report):
+	'''Page jobs of a report: ('summary', None), ('normalization', None), ('element', i).'''
+	pages = [('summary', None)]
+	if report['in_norm']:
+		pages.append(('normalization', None))
+	pages += [('element', i) for i in range(len(report['rows']))]
+	return pages
+
+
+def _pretty(analyte):
+	"""LaTeX-formatted isotope label, robust to ' | ' separators."""
+	from ..utils.analyte_formatter import format_analyte_latex
+	return format_analyte_latex(analyte.replace(' ', ''))
+
+
+def _number(value, fmt):
+	return format(value, fmt) if np.isfinite(value) else '—'
+
+
+def _figure():
+	from matplotlib.figure import Figure
+	return Figure(figsize=(PAGE_W, PAGE_H))
+
+
+def _style_table(tbl, n_rows, n_cols):
+	tbl.auto_set_font_size(False)
+	tbl.set_fontsize(BODY_FS)
+	# Vertical scale gives cells breathing room so wrapped headers
+	# and body text don't collide with borders.
+	tbl.scale(1, 2.0)
+	# Header row
+	for c in range(n_cols):
+		cell = tbl[0, c]
+		cell.set_facecolor(HEADER_COLOR)
+		cell.set_text_props(color='white', fontweight='bold')
+		cell.set_edgecolor('white')
+	# Body rows
+	for r in range(1, n_rows + 1):
+		bg = ROW_ALT if r % 2 == 0 else 'white'
+		for c in range(n_cols):
+			cell = tbl[r, c]
+			cell.set_facecolor(bg)
+			cell.set_edgecolor('#d0d0d0')
+
+
+def summary_page(report):
+	'''Header and summary table.'''
+	fig = _figure()
+	in_norm = report['in_norm']
+	fig.text(
+		LEFT, 0.955, 'LC-ICP-MS Calibration Report',
+		ha='left', va='top', fontsize=TITLE_FS, fontweight='bold',
+	)
+	meta_lines = [
+		f"Generated:            {report['generated']}",
+		f"Standards used:       {report['standards_count']}",
+		f"Elements fitted:      {len(report['rows'])}   (115In excluded)",
+	]
+	if report['blank_name']:
+		meta_lines.append(f"Blank reference:      {report['blank_name']}")
+	meta_lines.append(
+		f"115In normalization:  {'applied' if in_norm else 'not applied'}"
+	)
+	fig.text(
+		LEFT, 0.885, '\n'.join(meta_lines),
+		ha='left', va='top', fontsize=BODY_FS, family='monospace',
+		linespacing=1.5,
+	)
+
+	# Section heading above the table (same body font size,
+	# just bold — no larger font size).
+	fig.text(
+		LEFT, 0.720,
+		f"Calibration curves ({FIT_MODELS[report['model']].lower()}, "
+		f"{WEIGHTINGS[report['weighting']].lower()})",
+		ha='left', va='top', fontsize=BODY_FS, fontweight='bold',
+	)
+
+	# Table area — plenty of space, well below the heading.
+	ax = fig.add_axes([LEFT, 0.10, WIDTH, 0.58])
+	ax.axis('off')
+
+	# Plain-ASCII headers so all fonts render cleanly.
+	col_labels = ['Element', 'Slope', 'Slope SE', 'R2', 'LOD', 'N', 'Blank PA']
+	# Widths sum ≤ 1.0, giving each header room to fit its label.
+	col_widths = [0.17, 0.17, 0.15, 0.11, 0.13, 0.08, 0.16]
+
+	cell_text = []
+	for (m, curve, _, _, blank_v) in report['rows']:
+		cell_text.append([
+			_pretty(m),
+			f"{curve['m']:.3e}",
+			_number(curve['slope_se'], '.2e'),
+			_number(curve['r2'], '.4f'),
+			_number(curve['lod'], '.3g'),
+			f"{curve['n']}",
+			f'{blank_v:.0f}' if blank_v else '—',
+		])
+
+	tbl = ax.table(
+		cellText=cell_text,
+		colLabels=col_labels,
+		colWidths=col_widths,
+		loc='upper left',
+		cellLoc='left',
+		colLoc='left',
+	)
+	_style_table(tbl, len(cell_text), len(col_labels))
+
+	# Small footnote so 'Slope' units aren't ambiguous.
+	fig.text(
+		LEFT, 0.07,
+		'Slope units: ppb / count.  LOD (ppb) = 3.3 x residual SD.  '
+		'N = number of non-blank\nstandards used in the fit.',
+		ha='left', va='top', fontsize=BODY_FS, style='italic',
+		color='#555',
+	)
+	return fig
+
+
+def normalization_page(report):
+	'''115In normalization details.'''
+	fig = _figure()
+	in_norm = report['in_norm']
+	fig.text(
+		LEFT, 0.955, '115In Normalization',
+		ha='left', va='top', fontsize=TITLE_FS, fontweight='bold',
+	)
+	blurb = (
+		f"Reference:     blank '{in_norm['blank_name']}'\n"
+		f"Avg 115In:     {in_norm['blank_avg_in']:.1f} counts\n"
+		"Each standard's peak areas were scaled by "
+		"(blank_avg / std_avg) before fitting."
+	)
+	fig.text(
+		LEFT, 0.885, blurb, ha='left', va='top',
+		fontsize=BODY_FS, family='monospace', linespacing=1.5,
+	)
+	next_y = 0.760
+	if in_norm.get('skipped'):
+		fig.text(
+			LEFT, 0.780,
+			'Skipped: ' + '; '.join(in_norm['skipped']),
+			ha='left', va='top', fontsize=BODY_FS,
+			color='#a04040',
+		)
+		next_y = 0.730
+
+	fig.text(
+		LEFT, next_y, 'Correction factors',
+		ha='left', va='top', fontsize=BODY_FS, fontweight='bold',
+	)
+	ax = fig.add_axes([LEFT, 0.08, WIDTH, next_y - 0.10])
+	ax.axis('off')
+
+	norm_rows = []
+	for r in in_norm['results']:
+		label = r['name'] + (' (ref)' if r['is_blank'] else '')
+		norm_rows.append([
+			label,
+			f"{r['avg_in']:.1f}",
+			f"{r['factor']:.4f}",
+		])
+	tbl = ax.table(
+		cellText=norm_rows,
+		colLabels=['Standard', 'Avg 115In (counts)',
+		           'Correction factor'],
+		colWidths=[0.44, 0.28, 0.24],
+		loc='upper left',
+		cellLoc='left',
+		colLoc='left',
+	)
+	_style_table(tbl, len(norm_rows), 3)
+	return fig
+
+
+def element_page(report, i):
+	'''Calibration plot and fit statistics of the ``i``-th element.'''
+	fig = _figure()
+	m, curve, X, y, blank_v = report['rows'][i]
+	model = report['model']
+	fig.text(
+		LEFT, 0.955, _pretty(m),
+		ha='left', va='top', fontsize=TITLE_FS, fontweight='bold',
+	)
+	fig.text(
+		LEFT, 0.895, 'Calibration curve',
+		ha='left', va='top', fontsize=BODY_FS, color='#555',
+	)
+	# Plot in the upper portion, well clear of the header and
+	# the stats block below. Leave enough room under the ax
+	# for the xlabel and tick labels before the stats heading.
+	ax = fig.add_axes([LEFT, 0.50, WIDTH, 0.34])
+	Xk = (np.asarray(X) / 1000).ravel()
+	x_line = np.linspace(0, Xk.max() * 1.05, 100)
+	y_line = concentration(curve, x_line * 1000)
+	ax.plot(
+		x_line, y_line, color=HEADER_COLOR, linewidth=2.5,
+		label=f'{FIT_MODELS[model]}  ({FORMULAS[model]})', zorder=2,
+	)
+	ax.scatter(
+		Xk, y, s=90, facecolor='white', edgecolor='black',
+		linewidth=1.5, zorder=3, label='Standards',
+	)
+	ax.set_xlabel(
+		r'Peak Area  ($10^{3}$ ICP-MS counts)',
+		fontsize=BODY_FS,
+	)
+	ax.set_ylabel('Concentration  (ppb)', fontsize=BODY_FS)
+	ax.set_xlim(left=0, right=Xk.max() * 1.08)
+	ax.set_ylim(bottom=0, top=max(y) * 1.15)
+	ax.grid(True, linestyle='--', alpha=0.4)
+	ax.tick_params(axis='both', which='major', labelsize=BODY_FS)
+	for spine in ('top', 'right'):
+		ax.spines[spine].set_visible(False)
+	ax.legend(loc='upper left', frameon=True, fontsize=BODY_FS)
+
+	# Stats heading + block, both same body font size.
+	fig.text(
+		LEFT, 0.40, 'Fit statistics',
+		ha='left', va='top', fontsize=BODY_FS, fontweight='bold',
+	)
+	stats = [f"Slope         =  {curve['m']:.4e}  ppb / count"]
+	if np.isfinite(curve['slope_se']):
+		stats.append(f"Slope SE      =  {curve['slope_se']:.4e}")
+	if model != 'origin':
+		stats.append(f"Intercept     =  {curve['b']:.4g}  ppb")
+	if 'q' in curve:
+		stats.append(f"Curvature     =  {curve['q']:.4e}  ppb / count²")
+	stats += [
+		f"R2            =  {_number(curve['r2'], '.4f')}",
+		f"MSE           =  {curve['mse']:.2f}",
+		f"LOD / LOQ     =  {_number(curve['lod'], '.3g')} / "
+		f"{_number(curve['loq'], '.3g')}  ppb",
+		f"Weighting     =  {WEIGHTINGS[report['weighting']]}",
+		f"N             =  {curve['n']}",
+	]
+	if blank_v:
+		stats.append(f'Blank PA      =  {blank_v:.0f}  (subtracted)')
+	if report['in_norm']:
+		stats.append('115In norm.   =  applied')
+	fig.text(
+		LEFT, 0.35, '\n'.join(stats),
+		ha='left', va='top', fontsize=BODY_FS, family='monospace',
+		linespacing=1.6,
+	)
+	return fig
+
+
+_PAGES = {'summary': summary_page, 'normalization': normalization_page, 'element': element_page}
+
+
+def render_page(report, page):
+	'''One-page PDF bytes of a page job (see report_pages), drawn as vectors.'''
+	from matplotlib.backends.backend_pdf import FigureCanvasPdf
+
+	kind, arg = page
+	fig = _PAGES[kind](report) if arg is None else _PAGES[kind](report, arg)
+	FigureCanvasPdf(fig)
+	buffer = io.BytesIO()
+	fig.savefig(buffer, format='pdf')
+	return buffer.getvalue()
+
+
+def render_job(job):
+	'''Pool worker: (index, report, page) -> (index, pdf bytes, error or None).'''
+	index, report, page = job
+	try:
+		return index, render_page(report, page), None
+	except Exception as e:
+		return index, None, f'{type(e).__name__}: {e}'
+
+
+def write_report(pages, path):
+	'''Merge one-page PDFs, in order, into one PDF at ``path``.
+
+	Written next to ``path`` and moved into place, so a report is never
+	seen half written.
+	'''
+	from pypdf import PdfReader, PdfWriter
+
+	writer = PdfWriter()
+	for page in pages:
+		writer.append(PdfReader(io.BytesIO(page)))
+	partial = path + '.part'
+	with open(partial, 'wb') as f:
+		writer.write(f)
+	os.replace(partial, path)
+	return path
+
+
+def build_report(report, path):
+	'''Render every page in this process and write the PDF.'''
+	return write_report([render_page(report, page) for page in report_pages(report)], path)
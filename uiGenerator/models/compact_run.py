@@ -0,0 +1,228 @@
+"""Compact in-memory representation of a parsed run.
+
+RawICPMSData keeps a separate ``Time X`` float64 column for every analyte,
+but those columns are usually identical or differ only by a constant dwell
+offset. CompactRun stores each distinct time axis once, as a base vector, and
+every time column as (base, offset). Intensity columns are kept as float64 or,
+with a narrower storage mode, as float32 / uint32 counts (see
+``INTENSITY_STORAGE``); integration casts back to float64 before summing.
+It answers the column lookups the models and plotting code make on a
+DataFrame (``run['Time 56Fe']``, ``run.columns``, ``len(run)``), so it can be
+passed wherever a run's DataFrame was used. All arrays are read-only.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Largest difference (seconds) between a time column and base + offset for
+# the column to share that base.
+TIME_TOLERANCE = 1e-9
+
+# Intensity storage modes: full precision, single precision, or uint32 for
+# columns holding whole non-negative counts (float32 otherwise).
+INTENSITY_STORAGE = ('float64', 'float32', 'counts')
+
+_UINT32_MAX = np.iinfo(np.uint32).max
+
+
+def is_time_label(column):
+	'''Same rule lcicpms uses to tell time columns from analytes.'''
+	return 'Time' in column or 'time' in column
+
+
+def _read_only(values):
+	values = np.asarray(values)
+	if values.flags.writeable:
+		values = values.view()
+		values.flags.writeable = False
+	return values
+
+
+def _is_counts(values):
+	if values.size == 0:
+		return False
+	if np.issubdtype(values.dtype, np.integer):
+		return values.min() >= 0 and values.max() <= _UINT32_MAX
+	if not np.all(np.isfinite(values)):
+		return False
+	return values.min() >= 0 and values.max() <= _UINT32_MAX and np.all(values == np.floor(values))
+
+
+def check_storage(storage):
+	'''Raise ValueError unless ``storage`` is one of INTENSITY_STORAGE.'''
+	if storage not in INTENSITY_STORAGE:
+		raise ValueError(
+			f'Unknown intensity storage {storage!r}; expected one of {INTENSITY_STORAGE}'
+		)
+
+
+def store_intensity(values, storage='float64'):
+	'''Intensity column converted to the dtype of ``storage``.'''
+	check_storage(storage)
+	values = np.asarray(values)
+	if storage == 'float64' or not np.issubdtype(values.dtype, np.number):
+		return values
+	if storage == 'counts' and _is_counts(values):
+		return values.astype(np.uint32, copy=False)
+	return values.astype(np.float32, copy=False)
+
+
+def _offset_from(base, values):
+	'''Constant offset such that values == base + offset, or None.'''
+	base_nan = np.isnan(base)
+	if not np.array_equal(base_nan, np.isnan(values)):
+		return None
+	if np.array_equal(base, values, equal_nan=True):
+		return 0.0
+	valid = ~base_nan
+	if not valid.any():
+		return 0.0
+	diff = values[valid] - base[valid]
+	offset = float(diff[0])
+	if np.all(np.abs(diff - offset) <= TIME_TOLERANCE):
+		return offset
+	return None
+
+
+class CompactRun:
+	'''Read-only columnar run with de-duplicated time axes.
+
+	Build one with ``from_frame`` or ``from_columns``; ``merged`` returns a
+	new run sharing this one's arrays, so runs handed out by the registry
+	are never modified. ``intensity_storage`` picks how non-time columns
+	are held (one of ``INTENSITY_STORAGE``).
+	'''
+
+	def __init__(self, intensity_storage='float64'):
+		check_storage(intensity_storage)
+		self.intensity_storage = intensity_storage
+		self._n_rows = 0
+		self._columns = []
+		self._bases = []     # distinct time vectors
+		self._times = {}     # time label -> (index into _bases, offset)
+		self._signals = {}   # any other column -> values
+
+	@classmethod
+	def from_frame(cls, df, intensity_storage='float64'):
+		'''Compact a DataFrame (e.g. RawICPMSData.raw_data_df).'''
+		return cls.from_columns(
+			((str(c), df[c].to_numpy()) for c in df.columns), intensity_storage,
+		)
+
+	@classmethod
+	def from_columns(cls, items, intensity_storage='float64'):
+		'''Build from (name, values) pairs, in column order.'''
+		run = cls(intensity_storage)
+		for name, values in items:
+			run._add(name, values)
+		return run
+
+	def merged(self, other, order=None):
+		'''New run holding this run's columns plus ``other``'s.
+
+		``order`` (e.g. the file header) sets the column order; columns it
+		doesn't list keep their relative order at the end.
+		'''
+		run = CompactRun(self.intensity_storage)
+		run._n_rows = self._n_rows
+		run._columns = list(self._columns)
+		run._bases = list(self._bases)
+		run._times = dict(self._times)
+		run._signals = dict(self._signals)
+		for name in other.columns:
+			if name not in run:
+				run._add(name, other.column(name))
+		if order is not None:
+			rank = {c: i for i, c in enumerate(order)}
+			run._columns.sort(key=lambda c: rank.get(c, len(rank)))
+		return run
+
+	def _add(self, name, values):
+		if self._columns and len(values) != self._n_rows:
+			raise ValueError(
+				f'Column {name!r} has {len(values)} rows, expected {self._n_rows}'
+			)
+		self._n_rows = len(values)
+		self._columns.append(name)
+		if is_time_label(name) and np.issubdtype(np.asarray(values).dtype, np.floating):
+			values = np.asarray(values)
+			for i, base in enumerate(self._bases):
+				offset = _offset_from(base, values)
+				if offset is not None:
+					self._times[name] = (i, offset)
+					return
+			self._bases.append(_read_only(values))
+			self._times[name] = (len(self._bases) - 1, 0.0)
+		else:
+			self._signals[name] = _read_only(store_intensity(values, self.intensity_storage))
+
+	@property
+	def columns(self):
+		return pd.Index(self._columns)
+
+	@property
+	def shape(self):
+		return (self._n_rows, len(self._columns))
+
+	@property
+	def nbytes(self):
+		'''Bytes held by the stored arrays.'''
+		return int(
+			sum(b.nbytes for b in self._bases)
+			+ sum(v.nbytes for v in self._signals.values())
+		)
+
+	@property
+	def n_time_bases(self):
+		'''Number of distinct time axes actually stored.'''
+		return len(self._bases)
+
+	def __len__(self):
+		return self._n_rows
+
+	def __contains__(self, name):
+		return name in self._times or name in self._signals
+
+	def column(self, name):
+		'''Read-only numpy array for any column (KeyError if absent).'''
+		if name in self._times:
+			i, offset = self._times[name]
+			if offset == 0.0:
+				return self._bases[i]
+			return _read_only(self._bases[i] + offset)
+		return self._signals[name]
+
+	def time(self, analyte):
+		'''Time axis (seconds) of ``analyte``'s trace.'''
+		return self.column('Time ' + analyte)
+
+	def signal(self, analyte):
+		'''Intensity trace of ``analyte``.'''
+		return self.column(analyte)
+
+	def __getitem__(self, name):
+		return pd.Series(self.column(name), name=name, copy=False)
+
+	def get(self, name, default=None):
+		return self[name] if name in self else default
+
+	def to_frame(self, columns=None):
+		'''Materialise a DataFrame of ``columns`` (default: all).'''
+		names = self._columns if columns is None else list(columns)
+		return pd.DataFrame({c: self.column(c) for c in names}, columns=names)
+
+
+def trace(data, analyte, dtype=None):
+	'''(time_seconds, intensity) arrays of ``analyte`` from a CompactRun or DataFrame.
+
+	Pass ``dtype=float`` to get float64 intensities whatever the storage
+	mode (integration accumulates in float64).
+	'''
+	if isinstance(data, CompactRun):
+		time, signal = data.time(analyte), data.signal(analyte)
+	else:
+		time, signal = data['Time ' + analyte].to_numpy(), data[analyte].to_numpy()
+	if dtype is not None:
+		signal = np.asarray(signal, dtype=dtype)
+	return time, signal
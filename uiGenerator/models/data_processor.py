@@ -1,6 +1,5 @@
 from curses import meta
 import time
-from datetime import datetime
 from datetime import timedelta
 import sys
 from PyQt6.QtCore import Qt
@@ -12,9 +11,17 @@ import os
 import pandas as pd
 import numpy as np
 import seaborn as sns
-import csv
-from lcicpms.raw_icpms_data import RawICPMSData
-from lcicpms.integrate import Integrate
+from .alignment import estimate_shifts
+from .baseline import baseline_model
+from .calibration_fit import concentration
+from .dataset_registry import get_registry
+from .integration import integrator_for
+from .internal_standard import internal_standard, is_internal_standard
+from .peak_table import (
+	build_peak_table, calibration_arrays, calibration_key, element_mass,
+)
+from .results import METRICS, ResultTable, save_integration_csv
+from .run_tail import RunTailer
 from ..plotting.static import ICPMS_Data_Class
 from ..plotting.interactive import plotChroma
 
@@ -39,16 +46,22 @@ class LICPMSfunctions:
 		self.minline = None
 		self.maxline = None
 		self.region = None
+		self._chroma = None   # plotChroma of the current plot (curves for follow mode)
+		self._tailer = None   # RunTailer while following a file being acquired
+		self._alignment = None  # (runs, element, shifts) of the last comparison alignment
 		
 	def importData(self):
-		'''imports LCICPMS .csv file using lcicpms.RawICPMSData'''
+		'''imports LCICPMS .csv file using lcicpms.RawICPMSData (via the dataset registry)'''
 		print(self._view.listwidget.currentItem().text())
 		if self._view.listwidget.currentItem() is not None:
 			self.fdir = self._view.homeDir + self._view.listwidget.currentItem().text()
 			try:
-				# Use lcicpms RawICPMSData for intelligent CSV parsing
-				raw_data = RawICPMSData(self.fdir)
-				self._data = raw_data.raw_data_df
+				# Use lcicpms RawICPMSData for intelligent CSV parsing. The
+				# shared registry parses each file at most once per session
+				# (and the run cache memory-maps files parsed in earlier ones).
+				# With projected loading only the active analytes are parsed.
+				raw_data = get_registry().load(self.fdir, analytes=self.projection())
+				self._data = raw_data.data  # CompactRun: shared time axes, read-only
 				self._raw_icpms = raw_data  # Store for later use
 
 				# Populate _elements_in_file from RawICPMSData (these are full analyte names)
@@ -84,10 +97,17 @@ class LICPMSfunctions:
 				print(f'Error reading file {self.fdir}: {e}')
 				raise
 
-	def importData_generic(self,fdir):
-		'''imports LCICPMS .csv file using lcicpms.RawICPMSData'''
+	def importData_generic(self,fdir,analytes=None):
+		'''imports LCICPMS .csv file using lcicpms.RawICPMSData (via the dataset registry)
+
+		With projected loading on, only the columns of ``analytes`` are
+		guaranteed to be present; ``analytes`` None loads the whole file.
+		The returned DataFrame is shared with other windows — do not modify it.
+		'''
+		if self._view.projectedLoading is not True:
+			analytes = None
 		try:
-			raw_data = RawICPMSData(fdir)
+			raw_data = get_registry().load(fdir, analytes=analytes)
 			return raw_data.raw_data_df
 		except FileNotFoundError:
 			print(f'Error: File not found: {fdir}')
@@ -99,6 +119,77 @@ class LICPMSfunctions:
 			print(f'Error reading file {fdir}: {e}')
 			raise 
 
+	def projection(self, elements=None):
+		'''analytes to parse for the current view, or None for the whole file
+
+		The active elements (or ``elements``) plus the internal standard when
+		the correction is on. None when projected loading is off or nothing is selected yet.
+		'''
+		if self._view.projectedLoading is not True:
+			return None
+		wanted = list(self._view.activeElements if elements is None else elements)
+		if not wanted:
+			return None
+		standard = self.internalStandard()
+		if standard is not None:
+			wanted.append(standard['isotope'])
+		return wanted
+
+	def loadActiveColumns(self):
+		'''parses columns the active elements need but the loaded run(s) lack
+
+		Called before plotting and integrating, so elements picked in the
+		periodic table after the file was opened are read on demand.
+		'''
+		wanted = self.projection()
+		if not wanted or self._tailer is not None:
+			return
+		registry = get_registry()
+		if self._view.compareMode and self._view.comparisonFiles:
+			self._view.comparisonData = [
+				registry.load(os.path.join(self._view.homeDir, f), analytes=wanted).data
+				for f in self._view.comparisonFiles
+			]
+			self._data = self._view.comparisonData[0]
+		elif getattr(self, 'fdir', None):
+			self._raw_icpms = registry.load(self.fdir, analytes=wanted)
+			self._data = self._raw_icpms.data
+
+	def startFollow(self):
+		'''starts following the current file while it is still being written
+
+		The file is read once through a RunTailer (all columns, so elements
+		can still be picked in the periodic table); afterwards only appended
+		rows are parsed by pollFollow().
+		'''
+		self._tailer = RunTailer(self.fdir)
+		self._tailer.poll()
+		self._data = self._tailer.snapshot()
+		self.plotActiveElements()
+
+	def pollFollow(self):
+		'''parses rows appended to the followed file and extends the plotted traces
+
+		Returns the number of new rows (0 if nothing complete was appended).
+		'''
+		if self._tailer is None:
+			return 0
+		new_rows = self._tailer.poll()
+		if new_rows:
+			self._data = self._tailer.snapshot()
+			if self._chroma is not None:
+				self._chroma.updateData(self._data)
+				self.showBaselines()
+		return new_rows
+
+	def stopFollow(self):
+		'''stops following; the next load goes through the registry again'''
+		self._tailer = None
+
+	@property
+	def following(self):
+		return self._tailer is not None
+
 	def plotActiveElementsMP(self):
 		'''plots active elements for selected file'''
 		activeElementsPlot = ICPMS_Data_Class(self._data,self._view.activeElements)
@@ -106,25 +197,170 @@ class LICPMSfunctions:
 	
 	def plotActiveElements(self):
 		'''plots active elements for selected file'''
+		self.loadActiveColumns()
 		# Pass comparison data if in compare mode (now supports multiple files)
 		compare_data_list = self._view.comparisonData if self._view.compareMode else None
 		compare_files_list = self._view.comparisonFiles if self._view.compareMode else None
 		compare_labels = self._view.comparisonLabels if self._view.compareMode else None
+		compare_shifts = self.alignComparison() if self._view.compareMode else None
 
-		self._view.chroma = plotChroma(
+		self._chroma = plotChroma(
 			self._view,
 			self._view.elementOptions,
 			self._data,
 			self._view.activeElements,
 			compare_data=compare_data_list,
 			compare_files=compare_files_list,
-			compare_labels=compare_labels
-		)._plotChroma()
+			compare_labels=compare_labels,
+			compare_shifts=compare_shifts,
+		)
+		self._view.chroma = self._chroma._plotChroma()
+		self.showBaselines()
 
 		if self.minline != None:
 			self._view.plotSpace.addItem(self.minline)
 		if self.maxline != None:
 			self._view.plotSpace.addItem(self.maxline)
+		if self.region != None:
+			self._view.plotSpace.addItem(self.region)
+
+	def alignComparison(self):
+		'''Retention shifts (s) of the comparison runs, {filename: shift}
+
+		Each run's plotted element is cross-correlated with the first run's
+		(models.alignment); runs without it are left out. Recomputed only
+		when the runs or the element change, and stored in
+		view.comparisonShifts. Empty when view.alignComparison is off.
+		'''
+		self._view.comparisonShifts = {}
+		elements = self.integratedElements()
+		if not (self._view.alignComparison and self._view.comparisonData and elements):
+			self._alignment = None
+			return self._view.comparisonShifts
+		runs, element = tuple(self._view.comparisonData), elements[0]
+		cached = self._alignment
+		if (cached is None or cached[1] != element or len(cached[0]) != len(runs)
+				or any(a is not b for a, b in zip(cached[0], runs))):
+			try:
+				self._alignment = (runs, element, estimate_shifts(runs, element))
+			except ValueError as e:
+				print(f'Warning: comparison runs not aligned: {e}')
+				self._alignment = None
+				return self._view.comparisonShifts
+		self._view.comparisonShifts = {
+			filename: float(shift)
+			for filename, shift in zip(self._view.comparisonFiles, self._alignment[2])
+			if np.isfinite(shift)
+		}
+		return self._view.comparisonShifts
+
+	def internalStandard(self):
+		'''Internal-standard correction settings (models.internal_standard), or None when off
+
+		The reference average is normAvIndium; the isotope and smoothing
+		window come from view.internalStandard.
+		'''
+		if not self._view.normAvIndium > 0:
+			return None
+		return internal_standard(self._view.normAvIndium, **self._view.internalStandard)
+
+	def integratedElements(self):
+		'''active elements to integrate: all but 115In and the internal standard'''
+		isotope = self._view.internalStandard['isotope']
+		return [
+			el for el in self._view.activeElements
+			if not is_internal_standard(el) and not is_internal_standard(el, isotope)
+		]
+
+	def correctionFactor(self, data, windows, verbose=True):
+		'''Average internal-standard correction over each window (seconds)
+
+		The traces themselves are corrected point by point (see
+		models.internal_standard); this is the factor reported with the
+		results. 1 when the correction is off or the run lacks the standard.
+		'''
+		standard = self.internalStandard()
+		factors = integrator_for(data).corrections(windows, standard)
+		if standard is None:
+			return factors
+		if integrator_for(data).correction(standard) is None:
+			if verbose:
+				print(f"\nWarning: {standard['isotope']} not found in file, no correction applied")
+		elif verbose:
+			print('\ncorrection factor: ' + ', '.join('%.4f' % f for f in factors))
+		return factors
+
+	def calibrationFor(self, element):
+		'''Key of the calibration curve for element, or None
+
+		Exact match first, then the base isotope (handles "56Fe | 56Fe.16O").
+		'''
+		return calibration_key(element, self._view.calCurves)
+
+	def massOf(self, element):
+		'''(mass, guessed) of element for ppb -> uM
+
+		Looked up in view.masses (exact, then base isotope); otherwise the mass
+		number of the isotope name ("238U | 238U.16O2" -> 238) with guessed True.
+		'''
+		return element_mass(element, self._view.masses)
+
+	def baselineModel(self):
+		'''Baseline model to subtract (models.baseline), or None when off
+
+		view.baselineModel, or the window-endpoint trapezoid if none is set.
+		'''
+		if self._view.baseSubtract != True:
+			return None
+		return self._view.baselineModel or baseline_model()
+
+	def showBaselines(self):
+		'''Overlays the baseline curves of the plotted elements (if any)'''
+		if self._chroma is not None:
+			self._chroma.showBaselines(self.baselineModel())
+
+	def liveResults(self, intRange, data=None):
+		'''Peak areas and concentrations over intRange, without recording them
+
+		For the readout while the integration region is dragged: each call is
+		a few lookups on the run's cached cumulative integrals. Same shape as
+		integrate().results(0); uses the current baseline / internal-standard settings.
+		'''
+		data = self._data if data is None else data
+		if data is None:
+			return {}
+		elements = [el for el in self.integratedElements() if el in data]
+		if not elements:
+			return {}
+		window = [(intRange[0] * 60, intRange[1] * 60)]
+		integrator = integrator_for(data)
+		standard = self.internalStandard()
+		areas = integrator.areas(elements, window, standard)[0]
+		baselines = None
+		model = self.baselineModel()
+		if model is not None:
+			baselines = integrator.baselines(elements, window, model, standard)[0]
+
+		results = {}
+		for j, element in enumerate(elements):
+			peak_area = float(areas[j])
+			baseline_area = None
+			if baselines is not None:
+				baseline_area = float(baselines[j])
+				peak_area = max(peak_area - baseline_area, 0)
+			conc_ppb = conc_uM = None
+			cal_element = self.calibrationFor(element)
+			if cal_element is not None:
+				cal_curve = self._view.calCurves[cal_element]
+				conc_ppb = concentration(cal_curve, peak_area)
+				conc_uM = conc_ppb / self.massOf(element)[0]
+			results[element] = {
+				'peak_area': peak_area,
+				'conc_ppb': conc_ppb,
+				'conc_uM': conc_uM,
+				'baseline_area': baseline_area,
+			}
+		return results
 
 	def integrate(self, intRange, has_calibration=True, data=None, filename=None):
 		'''integrates over specified x range
@@ -136,191 +372,89 @@ class LICPMSfunctions:
 			filename: optional filename for the data (for comparison mode)
 
 		Returns:
-			dict:
-				'results':     {element: {'peak_area', 'conc_ppb', 'conc_uM'}}
-				'peakAreas':   flat dict for CSV export (peak areas per element)
-				'elementConcs':      flat dict for CSV export (uM concentrations)
-				'elementConcs_ppb':  flat dict for CSV export (ppb concentrations)
-				'corr_factor': 115In correction factor applied
-				'filename':    basename of the file that was integrated
-				'timestamp':   human-readable timestamp
-				'has_calibration': whether calibration was available
-				'range': (start_min, stop_min)
+			ResultTable (models.results) with one row: peak area, baseline
+			area, ppb and uM per element (NaN where not computed), the file
+			name, range, internal-standard correction (average over the
+			range) and baseline method.
+			.results(0) gives {element: {'peak_area', 'conc_ppb', ...}}.
 
 		This method no longer writes any CSV files. Persistence is done via
 		saveIntegration() when the user explicitly saves.
 		'''
 		self.intRange = intRange
+		if data is None:
+			# The internal standard may have been switched on since the file was loaded
+			self.loadActiveColumns()
 
 		# Use provided data or default to loaded data
 		integrate_data = data if data is not None else self._data
 
-		# Seed the output dicts from the elements that will actually be
-		# integrated (activeElements minus 115In). No hardcoded element list —
-		# so 238U, TQ-mode analytes, etc. all end up in the CSV. No timestamp
-		# column either (per user request; the save filename carries the date).
-		integrated_elements = [
-			el for el in self._view.activeElements
-			if not el.startswith('115In')
-		]
-		element_dict = {key: None for key in integrated_elements}
-		meta = {'start_time': 0, 'stop_time': 0, 'correction': None}
-		elementConcs = {**meta, **element_dict}      # uM concentrations
-		elementConcs_ppb = {**meta, **element_dict}  # ppb concentrations
-		peakAreas = {**meta, **element_dict}
-		# Per-element baseline area subtracted (counts·s); None when disabled.
-		baselineAreas = {**meta, **element_dict}
-
-		# Results to return for display
-		results = {}
-
-		if self._view.normAvIndium > 0:
-			# Find indium column (handles both '115In' and '115In | 115In' formats)
-			indium_col = None
-			for col in integrate_data.columns:
-				if col.startswith('115In') and 'Time' not in col:
-					indium_col = col
-					break
-
-			if indium_col:
-				indium_col_ind = integrate_data.columns.get_loc(indium_col)
-				time_col = 'Time ' + indium_col
-				if len(integrate_data[time_col]) > 2000:
-					corr_factor = np.average(integrate_data.iloc[550:2500,indium_col_ind]) / self._view.normAvIndium
-				else:
-					corr_factor = np.average(integrate_data.iloc[:,indium_col_ind]) / self._view.normAvIndium
-				print('\ncorrection factor: %.4f' % corr_factor)
+		# The elements that will actually be integrated (activeElements minus
+		# 115In and the internal standard). No hardcoded element list — so
+		# 238U, TQ-mode analytes, etc. all end up in the CSV.
+		integrated_elements = self.integratedElements()
+		# peak area, baseline area, ppb, uM per element; NaN until computed
+		values = np.full((1, len(integrated_elements), len(METRICS)), np.nan)
+
+		# Set up time range for integration (minutes; the time columns are in seconds)
+		range_min = self.intRange[0]
+		range_max = self.intRange[1]
+		window = [(range_min * 60, range_max * 60)]
+
+		# Cumulative trapezoid integrals are built once per run and trace
+		# (see models.integration), so every element's area for this window
+		# is two lookups and a subtraction. With the internal-standard
+		# correction on, they are integrals of the drift-corrected traces,
+		# cached per run and reference like the plain ones.
+		integrator = integrator_for(integrate_data)
+		standard = self.internalStandard()
+		corr_factor = float(self.correctionFactor(integrate_data, window)[0])
+		areas = integrator.areas(integrated_elements, window, standard)[0]
+		# Baseline: by default the trapezoid under the straight line between
+		# the samples closest to the range endpoints; other models
+		# (models.baseline) are whole-trace curves cached per run. Areas in
+		# counts·seconds like the peak areas.
+		baselines = None
+		model = self.baselineModel()
+		if model is not None:
+			baselines = integrator.baselines(integrated_elements, window, model, standard)[0]
+			values[0, :, 1] = baselines
+			areas = np.maximum(areas - baselines, 0)  # NaN stays NaN
+		values[0, :, 0] = areas
+
+		for j, element in enumerate(integrated_elements):
+			summed_area = float(areas[j])
+
+			# Only calculate concentrations if calibration is loaded
+			# Try exact match first, then try base isotope (handles "56Fe | 56Fe.16O" format)
+			cal_element = self.calibrationFor(element) if has_calibration else None
+			if cal_element is not None and cal_element != element:
+				print(f'  Using calibration for {cal_element} (matched from {element})')
+
+			if cal_element is not None:
+				cal_curve = self._view.calCurves[cal_element]
+				conc_ppb = concentration(cal_curve, summed_area)
+
+				mass, guessed = self.massOf(element)
+				if guessed:
+					print(f"Warning: Mass not found for {element}, using {mass}")
+
+				conc_uM = conc_ppb / mass
+				values[0, j, 2] = conc_ppb
+				values[0, j, 3] = conc_uM
+
+				print(f'\n{element}:')
+				print(f'  Peak area: {summed_area:.2e} counts')
+				print(f'  Concentration: {conc_ppb:.3f} ppb | {conc_uM:.3f} uM')
 			else:
-				print('\nWarning: 115In not found in file, no correction applied')
-				corr_factor = 1
-		else:
-			corr_factor = 1
-
-		for element in self._view.activeElements:
-			# Skip indium (handles both '115In' and '115In | 115In' formats)
-			if not element.startswith('115In'):
-				# Get time and intensity arrays (time in seconds, convert to minutes for range)
-				time_seconds = integrate_data['Time ' + element].values
-				time_minutes = time_seconds / 60
-				intensity = integrate_data[element].values / corr_factor  # Apply correction factor
-
-				# Set up time range for integration (convert minutes to seconds for lcicpms)
-				range_min = self.intRange[0]  # minutes
-				range_max = self.intRange[1]  # minutes
-				time_range_seconds = (range_min * 60, range_max * 60)  # convert to seconds
-
-				# Store metadata
-				elementConcs['start_time'] = '%.2f' % range_min
-				elementConcs['stop_time'] = '%.2f' % range_max
-				elementConcs_ppb['start_time'] = '%.2f' % range_min
-				elementConcs_ppb['stop_time'] = '%.2f' % range_max
-				peakAreas['start_time'] = '%.2f' % range_min
-				peakAreas['stop_time'] = '%.2f' % range_max
-				elementConcs['correction'] = '%.3f' % corr_factor
-				elementConcs_ppb['correction'] = '%.3f' % corr_factor
-				peakAreas['correction'] = '%.3f' % corr_factor
-
-				# Use lcicpms Integrate.integrate() for peak area calculation
-				summed_area = Integrate.integrate(intensity, time_seconds, time_range=time_range_seconds)
-
-				# Baseline subtraction (if enabled).
-				# summed_area comes out in counts·seconds because Integrate.integrate
-				# is called with `time_seconds`, so the trapezoidal baseline area we
-				# subtract must also be in counts·seconds — previously it was
-				# divided by 60 (counts·minutes), so it was 60× too small and had
-				# essentially no effect.
-				baseline_area = None
-				if self._view.baseSubtract == True:
-					# Find the sample indices closest to the selected range endpoints
-					min_delta = min(abs(time_minutes - range_min))
-					max_delta = min(abs(time_minutes - range_max))
-					i_tmin = int(np.where(abs(time_minutes - range_min) == min_delta)[0][0])
-					i_tmax = int(np.where(abs(time_minutes - range_max) == max_delta)[0][0])
-
-					h1 = intensity[i_tmin]
-					h2 = intensity[i_tmax]
-					dt_seconds = time_seconds[i_tmax] - time_seconds[i_tmin]
-
-					# Trapezoidal area under the straight line between (t_min, h1)
-					# and (t_max, h2), in counts·seconds — matches summed_area units.
-					baseline_area = 0.5 * (h1 + h2) * dt_seconds
-
-					summed_area = max(summed_area - baseline_area, 0)
-				# Record the baseline (or None if not used) so it flows into
-				# both the popup and the saved CSV.
-				baselineAreas[element] = (
-					'%.1f' % baseline_area if baseline_area is not None else None
-				)
-					
-
-				peakAreas[element] = '%.1f' % summed_area
-
-				# Only calculate concentrations if calibration is loaded
-				# Try exact match first, then try base isotope (handles "56Fe | 56Fe.16O" format)
-				cal_element = None
-				if has_calibration:
-					if element in self._view.calCurves:
-						cal_element = element
-					else:
-						# Try base isotope (before " | ")
-						base_isotope = element.split(' | ')[0].strip() if ' | ' in element else element
-						if base_isotope in self._view.calCurves:
-							cal_element = base_isotope
-							print(f'  Using calibration for {base_isotope} (matched from {element})')
-
-				if cal_element is not None:
-					cal_curve = self._view.calCurves[cal_element]
-					slope = cal_curve['m']
-					intercept = cal_curve['b']
-					conc_ppb = slope * summed_area + intercept
-
-					# Extract base isotope from element name (handle "238U | 238U.16O2" format)
-					base_isotope = element.split(' | ')[0].strip() if ' | ' in element else element
-					# Look up mass - try exact match first, then base isotope
-					if element in self._view.masses:
-						mass = self._view.masses[element]
-					elif base_isotope in self._view.masses:
-						mass = self._view.masses[base_isotope]
-					else:
-						# Try to extract mass number from isotope name (e.g., "238U" -> 238)
-						import re
-						match = re.match(r'(\d+)', base_isotope)
-						mass = int(match.group(1)) if match else 1
-						print(f"Warning: Mass not found for {element}, using {mass}")
-
-					conc_uM = conc_ppb / mass
-
-					elementConcs[element] = '%.3f' % conc_uM
-					elementConcs_ppb[element] = '%.3f' % conc_ppb
-
-					# Store results for display
-					results[element] = {
-						'peak_area': summed_area,
-						'conc_ppb': conc_ppb,
-						'conc_uM': conc_uM,
-						'baseline_area': baseline_area,
-					}
-
-					print(f'\n{element}:')
-					print(f'  Peak area: {summed_area:.2e} counts')
-					print(f'  Concentration: {conc_ppb:.3f} ppb | {conc_uM:.3f} uM')
+				# No calibration match - just report peak area in scientific notation
+				print(f'\n{element}:')
+				print(f'  Peak area: {summed_area:.2e} counts')
+				if not has_calibration:
+					print(f'  (No calibration loaded - concentrations not calculated)')
 				else:
-					# No calibration match - just report peak area in scientific notation
-					# Store results for display (peak area only)
-					results[element] = {
-						'peak_area': summed_area,
-						'conc_ppb': None,
-						'conc_uM': None,
-						'baseline_area': baseline_area,
-					}
-
-					print(f'\n{element}:')
-					print(f'  Peak area: {summed_area:.2e} counts')
-					if not has_calibration:
-						print(f'  (No calibration loaded - concentrations not calculated)')
-					else:
-						base_isotope = element.split(' | ')[0].strip() if ' | ' in element else element
-						print(f'  (No calibration found for {element} or {base_isotope} - concentrations not calculated)')
+					base_isotope = element.split(' | ')[0].strip() if ' | ' in element else element
+					print(f'  (No calibration found for {element} or {base_isotope} - concentrations not calculated)')
 
 		# Resolve the filename we integrated: prefer explicit arg (comparison
 		# mode), otherwise use the currently-loaded file's basename.
@@ -331,93 +465,88 @@ class LICPMSfunctions:
 		else:
 			base_name = 'unknown.csv'
 
-		return {
-			'results': results,
-			'peakAreas': peakAreas,
-			'elementConcs': elementConcs,
-			'elementConcs_ppb': elementConcs_ppb,
-			'baselineAreas': baselineAreas,
-			'baseline_applied': bool(self._view.baseSubtract),
-			'corr_factor': corr_factor,
-			'filename': base_name,
-			'timestamp': datetime.now().strftime("%d-%b-%Y (%H:%M:%S)"),
-			'has_calibration': has_calibration,
-			'range': (self.intRange[0], self.intRange[1]),
-		}
+		return ResultTable(
+			integrated_elements, values,
+			file=base_name,
+			start=range_min,
+			stop=range_max,
+			correction=corr_factor,
+			baseline_method='' if model is None else model['method'],
+			calibrated=has_calibration,
+		)
+
+	def integratePeakTable(self, windows, files, has_calibration=True):
+		'''integrates several named windows over several files at once
+
+		Every (file, window, analyte) area comes from the runs' cumulative
+		integrals, and concentrations are computed on the whole array, so
+		this is much cheaper than calling integrate() per file and window.
+		Uses the current active elements, baseline and internal-standard
+		settings.
+
+		Args:
+			windows: list of (name, start_min, stop_min)
+			files: paths of the runs to integrate
+			has_calibration: whether to compute concentrations from calCurves
+
+		Returns:
+			PeakTable: dense (file, window, analyte) arrays; .results() gives
+			a ResultTable like integrate()'s (plus window names) for display
+			and saveIntegration().
+		'''
+		analytes = self.integratedElements()
+		if not analytes:
+			raise ValueError('No elements selected to integrate')
+		registry = get_registry()
+		wanted = self.projection()
+		runs = [registry.load(path, analytes=wanted).data for path in files]
+
+		calibration = None
+		if has_calibration:
+			calibration = calibration_arrays(analytes, self._view.calCurves, self._view.masses)
+
+		return build_peak_table(
+			runs,
+			[os.path.basename(path).split(',')[0] for path in files],
+			windows,
+			analytes,
+			baseline=self.baselineModel() or False,
+			internal_standard=self.internalStandard(),
+			calibration=calibration,
+		)
+
+	def requantify(self, results):
+		'''results (a ResultTable) with concentrations from the current calCurves
+
+		Only the stored areas are used (see ResultTable.requantify), so this
+		takes milliseconds for any number of files. Concentrations are
+		cleared when no curve matches any analyte.
+		'''
+		calibration = None
+		if self._view.calCurves:
+			calibration = calibration_arrays(results.analytes, self._view.calCurves, self._view.masses)
+		return results.requantify(calibration)
+
+	def saveIntegration(self, results, output_path, layout='wide'):
+		'''Write accumulated integration results to a single CSV.
 
-	def saveIntegration(self, records, output_path):
-		'''Write accumulated integration records to a single wide CSV that
-		mirrors the multi-file results popup: one row per file, grouped
-		columns per element (Peak area / ppb / µM if calibrated). Metadata
-		columns (range, 115In correction) are also included.
+		The 'wide' layout mirrors the multi-file results popup: one row per
+		result row, grouped columns per element (Peak area / ppb / µM if
+		calibrated). The 'long' layout has one row per result row and
+		element, with an 'analyte' column. Metadata columns (range, 115In
+		correction, and the window name for peak-table rows) are included in
+		both. Numbers are formatted here, not when integrating.
 
 		Args:
-			records:     list of dicts produced by integrate()
+			results:     ResultTable from integrate(), PeakTable.results()
+			             or several of them combined
 			output_path: full path of the CSV to write
+			layout:      'wide' or 'long'
 
 		Returns:
 			list of paths written (single entry).
 		'''
-		if not records:
-			return []
-
-		out_dir = os.path.dirname(output_path)
-		if out_dir:
-			os.makedirs(out_dir, exist_ok=True)
-
-		# Union of integrated elements across records, preserving first-seen
-		# order. 115In is already excluded upstream.
-		META_COLS = {'start_time', 'stop_time', 'correction'}
-		element_order = []
-		for rec in records:
-			for k in rec['peakAreas']:
-				if k not in META_COLS and k not in element_order:
-					element_order.append(k)
-
-		has_any_cal = any(r.get('has_calibration') for r in records)
-		# Include a baseline column per element whenever any record used it,
-		# so the user can see what was subtracted.
-		has_any_baseline = any(r.get('baseline_applied') for r in records)
-
-		# Header row: 'File', metadata, then per-element groups.
-		sub_headers = ['peak_area']
-		if has_any_baseline:
-			sub_headers.append('baseline')
-		if has_any_cal:
-			sub_headers.extend(['ppb', 'uM'])
-
-		header = ['file', 'start_min', 'stop_min', '115In_correction']
-		if has_any_baseline:
-			header.append('baseline_subtracted')
-		for el in element_order:
-			for sub in sub_headers:
-				header.append(f'{el}_{sub}')
-
-		with open(output_path, 'w', newline='') as csvfile:
-			fwriter = csv.writer(csvfile)
-			fwriter.writerow(header)
-			for rec in records:
-				start = rec['peakAreas'].get('start_time', '')
-				stop = rec['peakAreas'].get('stop_time', '')
-				corr = rec.get('corr_factor', 1)
-				row = [rec['filename'], start, stop, f'{corr:.3f}']
-				if has_any_baseline:
-					row.append('yes' if rec.get('baseline_applied') else 'no')
-				pa = rec['peakAreas']
-				ec_uM = rec.get('elementConcs') or {}
-				ec_ppb = rec.get('elementConcs_ppb') or {}
-				baselines = rec.get('baselineAreas') or {}
-				has_cal = rec.get('has_calibration', False)
-				for el in element_order:
-					row.append(pa.get(el, ''))
-					if has_any_baseline:
-						row.append(baselines.get(el, ''))
-					if has_any_cal:
-						row.append(ec_ppb.get(el, '') if has_cal else '')
-						row.append(ec_uM.get(el, '') if has_cal else '')
-				fwriter.writerow(row)
-
-		return [output_path]
+		return save_integration_csv(results, output_path, layout=layout)
 
 	def plotLowRange(self, xmin, n):
 		'''plots integration range'''
@@ -436,17 +565,22 @@ class LICPMSfunctions:
 		self.maxline = pg.InfiniteLine(xmax, pen=pen, angle=90)
 		self._view.plotSpace.addItem(self.maxline)
 
-		# Add shaded region between min and max lines
+		# Replace the two lines by a draggable shaded region; its edges carry
+		# the range colour and can be moved to adjust the window.
 		if self.minline is not None:
 			xmin = self.minline.value()
-			# Create LinearRegionItem with semi-transparent fill
 			self.region = pg.LinearRegionItem(
 				values=(xmin, xmax),
 				orientation='vertical',
 				brush=pg.mkBrush(r, g, b, 50),  # Semi-transparent
-				pen=pg.mkPen(None),  # No border lines (we already have the InfiniteLines)
-				movable=False  # Make it non-movable
+				pen=pen,
+				hoverBrush=pg.mkBrush(r, g, b, 80),
+				movable=True,
 			)
+			self._view.plotSpace.removeItem(self.minline)
+			self._view.plotSpace.removeItem(self.maxline)
+			self.minline = None
+			self.maxline = None
 			self._view.plotSpace.addItem(self.region)
 
 	def removeIntRange(self):
@@ -456,5 +590,9 @@ class LICPMSfunctions:
 			self._view.plotSpace.removeItem(self.minline)
 		if self.region is not None:
 			self._view.plotSpace.removeItem(self.region)
+		# Forget them too, so the next replot doesn't put them back
+		self.minline = None
+		self.maxline = None
+		self.region = None
 
 
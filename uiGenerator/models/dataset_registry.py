@@ -0,0 +1,157 @@
+"""Session-wide registry of parsed runs.
+
+Every window (main viewer, comparison mode, calibration, the 115In pickers)
+asks the registry for a run instead of parsing the CSV itself, so a file is
+parsed at most once per session. Entries are keyed by absolute path and
+re-validated against the file's size and mtime on every lookup; the least
+recently used entries are dropped once the registry exceeds its memory budget.
+
+Runs handed out by the registry are shared between callers and must be
+treated as read-only. A resident run may hold only the analytes asked for
+so far; asking for more merges them in (see ``load``).
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+from .compact_run import check_storage
+from .run_cache import file_key, load_run
+
+
+# Default in-memory budget for resident runs (bytes).
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def run_nbytes(run):
+	'''Approximate resident size of a parsed run.'''
+	return run.data.nbytes
+
+
+class DatasetRegistry:
+	'''LRU registry handing out one parsed run per file path.'''
+
+	def __init__(self, max_bytes=DEFAULT_MAX_BYTES, cache=None, intensity_storage='float64'):
+		check_storage(intensity_storage)
+		self.max_bytes = max_bytes
+		self.intensity_storage = intensity_storage
+		self._cache = cache
+		self._lock = threading.RLock()
+		# abspath -> (file_key, run, nbytes), oldest first
+		self._entries = OrderedDict()
+		# abspath -> threading.Event for loads currently in progress
+		self._loading = {}
+
+	def configure(self, max_bytes=None, intensity_storage=None):
+		'''Change the memory budget and/or intensity storage mode.
+
+		Evicts immediately if now over budget. Changing the storage mode
+		drops resident runs so they are reloaded in the new dtype.
+		'''
+		with self._lock:
+			if max_bytes is not None:
+				self.max_bytes = max_bytes
+			if intensity_storage is not None and intensity_storage != self.intensity_storage:
+				check_storage(intensity_storage)
+				self.intensity_storage = intensity_storage
+				self._entries.clear()
+			self._evict()
+
+	def load(self, path, analytes=None):
+		'''Return the parsed run for ``path``, parsing it only if needed.
+
+		With ``analytes`` only those analytes' columns are guaranteed to be
+		loaded (projected loading); columns missing from a resident run are
+		parsed and merged into it. ``analytes`` None loads the whole file.
+		Raises FileNotFoundError if the file does not exist, and re-raises
+		any parse error from the loader.
+		'''
+		key = file_key(path)
+		abspath = key[0]
+		while True:
+			with self._lock:
+				entry = self._entries.get(abspath)
+				base = None
+				if entry is not None and entry[0] == key:
+					run = entry[1]
+					if run.is_complete or (analytes is not None and not run.missing(analytes)):
+						self._entries.move_to_end(abspath)
+						return run
+					base = run
+				pending = self._loading.get(abspath)
+				if pending is None:
+					if base is None:
+						# Stale (file changed on disk) or missing: we load it.
+						self._entries.pop(abspath, None)
+					done = threading.Event()
+					self._loading[abspath] = done
+					break
+			# Another thread is parsing this file; wait and re-check.
+			pending.wait()
+
+		try:
+			run = load_run(
+				abspath, cache=self._cache, analytes=analytes, base=base,
+				intensity_storage=self.intensity_storage,
+			)
+			with self._lock:
+				self._entries[abspath] = (key, run, run_nbytes(run))
+				self._entries.move_to_end(abspath)
+				self._evict(keep=abspath)
+			return run
+		finally:
+			with self._lock:
+				self._loading.pop(abspath, None)
+			done.set()
+
+	def peek(self, path):
+		'''Return the resident run for ``path`` without loading, or None.'''
+		abspath = os.path.abspath(path)
+		with self._lock:
+			entry = self._entries.get(abspath)
+			return entry[1] if entry is not None else None
+
+	def discard(self, path):
+		'''Forget the resident run for ``path`` (if any).'''
+		with self._lock:
+			self._entries.pop(os.path.abspath(path), None)
+
+	def clear(self):
+		'''Forget every resident run.'''
+		with self._lock:
+			self._entries.clear()
+
+	@property
+	def nbytes(self):
+		'''Total approximate size of resident runs.'''
+		with self._lock:
+			return sum(entry[2] for entry in self._entries.values())
+
+	def __len__(self):
+		with self._lock:
+			return len(self._entries)
+
+	def __contains__(self, path):
+		return self.peek(path) is not None
+
+	def _evict(self, keep=None):
+		total = sum(entry[2] for entry in self._entries.values())
+		for abspath in list(self._entries):
+			if total <= self.max_bytes:
+				break
+			if abspath == keep:
+				continue
+			total -= self._entries.pop(abspath)[2]
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+	'''The process-wide DatasetRegistry shared by all windows.'''
+	global _registry
+	with _registry_lock:
+		if _registry is None:
+			_registry = DatasetRegistry()
+		return _registry
@@ -0,0 +1,321 @@
+"""Per-directory index of run metadata, kept in a sidecar file.
+
+For every run file the index records the analytes, number of samples, run
+duration, acquisition timestamp and mean 115In signal, so the run list can be
+filtered and sorted and the periodic table can show what a directory holds
+without opening the runs. Entries are built from the header and the first
+and last data rows (plain files are seeked to their end); only the 115In
+column (when present) is parsed. Each entry is keyed by file size and
+mtime, so ``update`` only re-reads files that changed. The sidecar is
+``INDEX_FILENAME`` in the run directory; if it can't be written the index
+still works for the session.
+"""
+
+import csv
+import json
+import os
+import re
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from .run_reader import read_run_csv, resolve_analytes, sniff_header
+from .run_source import is_packed, iter_runs, open_run, run_stat
+
+
+INDEX_FILENAME = '.lcicpms-index.json'
+
+# Bump when the stored fields change; older sidecars are rebuilt.
+INDEX_FORMAT = 1
+
+# Bytes read from the end of a file to find its last complete row.
+TAIL_BYTES = 64 * 1024
+
+# Timestamps instrument exports put above the header (ISO and US styles).
+_TIMESTAMP_PATTERNS = (
+	(re.compile(r'\d{4}-\d{2}-\d{2}[ T]\d{1,2}:\d{2}:\d{2}'), ('%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S')),
+	(re.compile(r'\d{1,2}/\d{1,2}/\d{4} \d{1,2}:\d{2}:\d{2}(?: [AP]M)?'), ('%m/%d/%Y %I:%M:%S %p', '%m/%d/%Y %H:%M:%S')),
+)
+
+
+def element_symbol(analyte):
+	'''Element symbol of an analyte name ('Fe' for '56Fe' or '56Fe | 56Fe.16O').'''
+	match = re.search(r'(\d+)([A-Z][a-z]?)', analyte.split(' | ')[0])
+	return match.group(2) if match else None
+
+
+def _preamble_timestamp(preamble):
+	'''First date-time found in the lines above the header, as epoch seconds.'''
+	for line in preamble:
+		for pattern, formats in _TIMESTAMP_PATTERNS:
+			found = pattern.search(line)
+			if found is None:
+				continue
+			for fmt in formats:
+				try:
+					return datetime.strptime(found.group(0), fmt).timestamp()
+				except ValueError:
+					continue
+	return None
+
+
+def _row_time(line, header, column):
+	try:
+		values = next(csv.reader([line], delimiter=header.sep))
+		return float(values[column])
+	except (StopIteration, IndexError, ValueError):
+		return None
+
+
+def _decode(line):
+	return line.decode('utf-8', errors='replace').rstrip('\r\n')
+
+
+def _data_rows(path, header):
+	'''(first two data lines, last data line) from the head and tail of a run.
+
+	Plain files are seeked to their last TAIL_BYTES. Compressed runs can't
+	be seeked, so their stream is read through keeping only its end.
+	'''
+	with open_run(path) as f:
+		for _ in range(header.header_row + 1):
+			f.readline()
+		head = [f.readline(), f.readline()]
+		if is_packed(path):
+			tail = b''
+			for block in iter(lambda: f.read(1 << 20), b''):
+				tail = (tail + block)[-TAIL_BYTES:]
+		else:
+			start = f.tell()
+			f.seek(0, os.SEEK_END)
+			f.seek(max(start, f.tell() - TAIL_BYTES))
+			tail = f.read()
+	first = [_decode(line) for line in head if line.strip()]
+	rows = [line for line in (b''.join(head) + tail).splitlines() if line.strip()]
+	return first, _decode(rows[-1]) if rows else ''
+
+
+class RunSummary:
+	'''Index entry for one run file.
+
+	``duration`` is in the file's time unit (seconds); ``acquired`` is epoch
+	seconds, from a timestamp above the header or else the file's mtime.
+	Fields that could not be read are None.
+	'''
+
+	FIELDS = ('size', 'mtime_ns', 'analytes', 'n_samples', 'duration', 'acquired', 'mean_115in')
+
+	def __init__(self, size, mtime_ns, analytes, n_samples=None, duration=None,
+			acquired=None, mean_115in=None):
+		self.size = size
+		self.mtime_ns = mtime_ns
+		self.analytes = list(analytes)
+		self.n_samples = n_samples
+		self.duration = duration
+		self.acquired = acquired
+		self.mean_115in = mean_115in
+
+	@classmethod
+	def from_dict(cls, entry):
+		return cls(**{k: entry.get(k) for k in cls.FIELDS})
+
+	def as_dict(self):
+		return {k: getattr(self, k) for k in self.FIELDS}
+
+	def matches(self, st):
+		'''True while the file still has the size and mtime this entry was built from.'''
+		return self.size == st.st_size and self.mtime_ns == st.st_mtime_ns
+
+
+def summarize_run(path):
+	'''Build the RunSummary of one run file without parsing all of it.
+
+	Duration and sample count come from the first two and the last data
+	rows, assuming a steady sampling interval; only the 115In column is
+	parsed, and its length gives the exact count when present.
+	'''
+	st = run_stat(path)
+	header = sniff_header(path)
+	first, last = _data_rows(path, header)
+
+	n_samples = len(first)
+	duration = None
+	if header.time_labels and first:
+		column = header.columns.index(header.time_labels[0])
+		t0, t1 = _row_time(first[0], header, column), _row_time(last, header, column)
+		if t0 is not None and t1 is not None:
+			duration = t1 - t0
+			step = _row_time(first[-1], header, column)
+			if step is not None and step > t0:
+				n_samples = int(round(duration / (step - t0))) + 1
+
+	mean_115in = None
+	indium = resolve_analytes(header.elements, ['115In'])
+	if indium:
+		values = read_run_csv(path, [indium[0]], header)[indium[0]].to_numpy(dtype=float)
+		n_samples = len(values)
+		if np.isfinite(values).any():
+			mean_115in = float(np.nanmean(values))
+
+	acquired = _preamble_timestamp(header.preamble)
+	return RunSummary(
+		st.st_size, st.st_mtime_ns, header.elements,
+		n_samples=n_samples,
+		duration=duration,
+		acquired=acquired if acquired is not None else st.st_mtime,
+		mean_115in=mean_115in,
+	)
+
+
+class DirectoryIndex:
+	'''Run metadata for the files of one directory, persisted next to them.
+
+	Args:
+		directory (str): Run directory
+		match (callable): name -> bool, which files to index (default: .csv)
+		archives (bool): Also index runs inside zip archives (see run_source)
+	'''
+
+	def __init__(self, directory, match=None, archives=False):
+		self.directory = os.path.abspath(directory)
+		self.path = os.path.join(self.directory, INDEX_FILENAME)
+		self._match = match if match is not None else (lambda name: name.lower().endswith('.csv'))
+		self._archives = archives
+		self._lock = threading.Lock()
+		self._entries = {}  # file name -> RunSummary
+		self.load()
+
+	def load(self):
+		'''Read the sidecar; a missing, unreadable or outdated one is ignored.'''
+		try:
+			with open(self.path, encoding='utf-8') as f:
+				stored = json.load(f)
+		except (OSError, ValueError):
+			return
+		if not isinstance(stored, dict) or stored.get('format') != INDEX_FORMAT:
+			return
+		entries = {}
+		for name, entry in stored.get('runs', {}).items():
+			try:
+				entries[name] = RunSummary.from_dict(entry)
+			except (TypeError, AttributeError):
+				continue
+		with self._lock:
+			self._entries = entries
+
+	def save(self):
+		'''Write the sidecar atomically (printed, not raised, on failure).'''
+		with self._lock:
+			runs = {name: s.as_dict() for name, s in self._entries.items()}
+		tmp = self.path + '.tmp'
+		try:
+			with open(tmp, 'w', encoding='utf-8') as f:
+				json.dump({'format': INDEX_FORMAT, 'runs': runs}, f)
+			os.replace(tmp, self.path)
+		except OSError as e:
+			print(f'Could not write run index {self.path}: {e}')
+
+	def update(self, names=None, should_stop=None):
+		'''Bring the entries up to date and save if anything changed.
+
+		``names`` limits the check to those files (default: every matching
+		file in the directory, and entries of deleted files are dropped).
+		``should_stop`` is polled between files to abandon the update.
+		Returns the names whose entries were added, rebuilt or removed.
+		'''
+		full = names is None
+		if full:
+			try:
+				names = list(iter_runs(self.directory, self._match, self._archives))
+			except OSError:
+				names = []
+		changed = []
+		for name in names:
+			if should_stop is not None and should_stop():
+				break
+			path = os.path.join(self.directory, name)
+			try:
+				st = run_stat(path)
+			except OSError:
+				if self._discard(name):
+					changed.append(name)
+				continue
+			current = self.get(name)
+			if current is not None and current.matches(st):
+				continue
+			try:
+				summary = summarize_run(path)
+			except (OSError, ValueError) as e:
+				print(f'Could not index {path}: {e}')
+				continue
+			with self._lock:
+				self._entries[name] = summary
+			changed.append(name)
+		if full:
+			listed = set(names)
+			for name in [n for n in self.names() if n not in listed]:
+				self._discard(name)
+				changed.append(name)
+		if changed:
+			self.save()
+		return changed
+
+	def _discard(self, name):
+		with self._lock:
+			return self._entries.pop(name, None) is not None
+
+	def get(self, name):
+		with self._lock:
+			return self._entries.get(name)
+
+	def names(self):
+		with self._lock:
+			return list(self._entries)
+
+	def __contains__(self, name):
+		with self._lock:
+			return name in self._entries
+
+	def __len__(self):
+		with self._lock:
+			return len(self._entries)
+
+	def analyte_counts(self):
+		'''{analyte: number of indexed runs containing it}.'''
+		counts = {}
+		with self._lock:
+			for summary in self._entries.values():
+				for analyte in summary.analytes:
+					counts[analyte] = counts.get(analyte, 0) + 1
+		return counts
+
+	def analytes_by_element(self):
+		'''{element symbol: analytes}, across every indexed run.'''
+		by_element = {}
+		for analyte in sorted(self.analyte_counts()):
+			symbol = element_symbol(analyte)
+			if symbol is not None:
+				by_element.setdefault(symbol, []).append(analyte)
+		return by_element
+
+	def runs_with(self, analyte):
+		'''Names of indexed runs that contain ``analyte`` (base isotope matches too).'''
+		with self._lock:
+			return [
+				name for name, s in self._entries.items()
+				if resolve_analytes(s.analytes, [analyte])
+			]
+
+	def sort_key(self, field):
+		'''Sort key (name -> sortable) on a RunSummary field, for DirectoryListing.
+
+		Files not indexed yet, or without a value, sort after the others.
+		'''
+		def key(name):
+			summary = self.get(name)
+			value = getattr(summary, field) if summary is not None else None
+			if value is None:
+				return (1, 0, name.lower())
+			return (0, value, name.lower())
+		return key
@@ -0,0 +1,216 @@
+"""Peak-area integration from cumulative trapezoid integrals.
+
+``Integrate.integrate`` from lcicpms walks the samples of a window in a
+Python loop, once per element and per window. Here the trapezoid integral of
+each trace is accumulated once per run; the area of any window is then the
+difference of two cumulative values, found with ``searchsorted``. The window
+ends snap to the sample closest to the requested time, first one on ties, as
+lcicpms does, so areas are the same as ``Integrate.integrate`` gives (up to
+floating-point summation order).
+
+The internal-standard correction (models.internal_standard) varies along
+the run, so it is applied to the traces: with correction settings, every
+integral is built from the corrected traces of the run, all analytes
+divided by the correction curve in one broadcast operation, and cached per
+settings next to the uncorrected ones. Baselines other than the
+window-endpoint trapezoid (models.baseline) are curves over the whole
+trace; each is computed once per run, analyte, model and correction, and
+its window areas come from its own cumulative integral.
+"""
+
+import threading
+import weakref
+
+import numpy as np
+
+from .baseline import baseline_trace, is_trapezoid, model_key
+from .compact_run import CompactRun, trace
+from .internal_standard import drift_correction, settings_key
+
+
+class CumulativeTrace:
+	'''Cumulative trapezoid integral of one (time, intensity) trace.
+
+	Segments with a non-finite area (NaN samples) add nothing to the sum;
+	a window spanning one gets a NaN area instead of poisoning every later
+	window.
+	'''
+
+	def __init__(self, time, intensity):
+		self.time = np.asarray(time, dtype=float)
+		self.intensity = np.asarray(intensity, dtype=float)
+		segments = 0.5 * (self.intensity[1:] + self.intensity[:-1]) * np.diff(self.time)
+		bad = ~np.isfinite(segments)
+		self._cumulative = np.concatenate(([0.0], np.cumsum(np.where(bad, 0.0, segments))))
+		self._bad = np.concatenate(([0], np.cumsum(bad)))
+		# Closest-sample lookup by bisection needs a sorted time axis; files
+		# padded with zeros or NaNs at the end fall back to a linear scan.
+		self._sorted = bool(np.all(np.diff(self.time) >= 0))
+
+	def __len__(self):
+		return len(self.time)
+
+	def index(self, t):
+		'''Index of the sample closest to each time in ``t`` (first on ties).'''
+		t = np.asarray(t, dtype=float)
+		if len(self.time) == 0:
+			raise ValueError('Cannot integrate an empty trace')
+		if not self._sorted:
+			flat = np.abs(self.time[None, :] - t.reshape(-1, 1))
+			return np.nanargmin(flat, axis=1).reshape(t.shape)
+		last = len(self.time) - 1
+		right = np.clip(np.searchsorted(self.time, t, side='left'), 0, last)
+		left = np.clip(right - 1, 0, last)
+		pick_left = np.abs(t - self.time[left]) <= np.abs(self.time[right] - t)
+		closest = np.where(pick_left, left, right)
+		# With repeated time values the first occurrence wins, as in lcicpms.
+		return np.searchsorted(self.time, self.time[closest], side='left')
+
+	def area(self, start, stop):
+		'''Trapezoid area between the samples closest to ``start`` and ``stop``.
+
+		Zero when ``stop`` snaps to the same or an earlier sample than
+		``start``. Both may be arrays (one area per window).
+		'''
+		i0, i1 = self.index(start), self.index(stop)
+		area = np.where(i1 > i0, self._cumulative[i1] - self._cumulative[i0], 0.0)
+		spans_bad = (i1 > i0) & (self._bad[i1] - self._bad[i0] > 0)
+		return np.where(spans_bad, np.nan, area)
+
+	def baseline(self, start, stop):
+		'''Area under the straight line joining the window's end samples.'''
+		i0, i1 = self.index(start), self.index(stop)
+		return 0.5 * (self.intensity[i0] + self.intensity[i1]) * (self.time[i1] - self.time[i0])
+
+
+class RunIntegrator:
+	'''Cumulative integrals of a run's traces, built on first use per analyte.
+
+	Use ``integrator_for`` to share one per run. Methods taking a
+	``standard`` use the traces corrected under those internal-standard
+	settings (models.internal_standard); runs without the standard are
+	integrated uncorrected (see ``correction``).
+	'''
+
+	def __init__(self, data):
+		self._data = data
+		self._traces = {}
+		self._baselines = {}
+		self._corrections = {}
+
+	def correction(self, standard):
+		'''DriftCorrection of the run under ``standard`` settings, built once;
+		None without settings or when the run lacks the internal standard.'''
+		if standard is None:
+			return None
+		key = settings_key(standard)
+		if key not in self._corrections:
+			self._corrections[key] = drift_correction(self._data, standard)
+		return self._corrections[key]
+
+	def _key(self, analyte, standard):
+		correction = self.correction(standard)
+		return analyte if correction is None else (analyte, settings_key(standard))
+
+	def trace(self, analyte, standard=None):
+		'''CumulativeTrace of ``analyte`` (KeyError if the run lacks it).'''
+		key = self._key(analyte, standard)
+		cumulative = self._traces.get(key)
+		if cumulative is None:
+			self._build([analyte], standard)
+			cumulative = self._traces[key]
+		return cumulative
+
+	def _build(self, analytes, standard):
+		'''Builds the missing CumulativeTraces of ``analytes``.
+
+		Corrected traces of equal length are stacked and divided by the
+		correction curve in one broadcast operation.
+		'''
+		correction = self.correction(standard)
+		missing = [a for a in analytes if self._key(a, standard) not in self._traces]
+		if not missing:
+			return
+		raw = [trace(self._data, a, dtype=float) for a in missing]
+		if correction is None:
+			for analyte, (time, intensity) in zip(missing, raw):
+				self._traces[analyte] = CumulativeTrace(time, intensity)
+			return
+		if len({len(time) for time, _ in raw}) == 1:
+			times = np.stack([time for time, _ in raw])
+			corrected = correction.apply(times, np.stack([intensity for _, intensity in raw]))
+		else:
+			times = [time for time, _ in raw]
+			corrected = [correction.apply(time, intensity) for time, intensity in raw]
+		for analyte, time, intensity in zip(missing, times, corrected):
+			self._traces[self._key(analyte, standard)] = CumulativeTrace(time, intensity)
+
+	def areas(self, analytes, windows, standard=None):
+		'''Peak areas, shape (len(windows), len(analytes)).
+
+		``windows`` are (start, stop) pairs in the run's time unit (seconds).
+		'''
+		windows = np.asarray(windows, dtype=float).reshape(-1, 2)
+		self._build(analytes, standard)
+		out = np.empty((len(windows), len(analytes)))
+		for j, analyte in enumerate(analytes):
+			out[:, j] = self.trace(analyte, standard).area(windows[:, 0], windows[:, 1])
+		return out
+
+	def baseline(self, analyte, model, standard=None):
+		'''CumulativeTrace of the ``model`` baseline of ``analyte``, built once.
+
+		Its ``intensity`` is the baseline curve (for plotting).
+		'''
+		key = (self._key(analyte, standard), model_key(model))
+		curve = self._baselines.get(key)
+		if curve is None:
+			signal = self.trace(analyte, standard)
+			curve = CumulativeTrace(signal.time, baseline_trace(signal.time, signal.intensity, model))
+			self._baselines[key] = curve
+		return curve
+
+	def baselines(self, analytes, windows, model=None, standard=None):
+		'''Baseline areas, same shape as ``areas``.
+
+		``model`` is a models.baseline model; None (or 'trapezoid') is the
+		straight line between each window's end samples.
+		'''
+		windows = np.asarray(windows, dtype=float).reshape(-1, 2)
+		self._build(analytes, standard)
+		out = np.empty((len(windows), len(analytes)))
+		for j, analyte in enumerate(analytes):
+			if is_trapezoid(model):
+				out[:, j] = self.trace(analyte, standard).baseline(windows[:, 0], windows[:, 1])
+			else:
+				out[:, j] = self.baseline(analyte, model, standard).area(windows[:, 0], windows[:, 1])
+		return out
+
+	def corrections(self, windows, standard):
+		'''Average correction factor over each window (1 when uncorrected).'''
+		windows = np.asarray(windows, dtype=float).reshape(-1, 2)
+		correction = self.correction(standard)
+		if correction is None:
+			return np.ones(len(windows))
+		return correction.mean(windows[:, 0], windows[:, 1])
+
+
+# CompactRuns are read-only and replaced (not modified) when columns are
+# added, so an integrator stays valid for as long as its run is alive.
+_integrators = weakref.WeakKeyDictionary()
+_integrators_lock = threading.Lock()
+
+
+def integrator_for(data):
+	'''RunIntegrator of a run, shared per CompactRun.
+
+	DataFrames can be modified in place, so they get a fresh integrator.
+	'''
+	if not isinstance(data, CompactRun):
+		return RunIntegrator(data)
+	with _integrators_lock:
+		integrator = _integrators.get(data)
+		if integrator is None:
+			integrator = RunIntegrator(data)
+			_integrators[data] = integrator
+		return integrator
@@ -0,0 +1,130 @@
+"""Time-resolved internal-standard (drift) correction.
+
+Instrument sensitivity drifts during a run, and the internal standard
+(115In by default, any isotope the runs carry) drifts with it. Instead of
+dividing a run by one average of the standard, its trace is smoothed (a
+rolling median over ``window`` seconds, then a rolling mean of the same
+width) and divided by the reference average, giving a correction factor at
+every sample time. Analyte intensities are divided by that curve, read at
+their own sample times, before they are integrated:
+``DriftCorrection.apply`` does it for all analytes of a run in one
+broadcast division.
+
+Settings are a plain dict, ``{'isotope', 'reference', 'window'}``, like
+baseline models (models.baseline), so they travel to worker processes and
+into workspaces; ``internal_standard`` builds one. RunIntegrator caches the
+curve and the corrected integrals per run and settings, so repeated
+integrations only look them up.
+"""
+
+import numpy as np
+
+from .baseline import _finite
+from .compact_run import trace
+
+
+DEFAULT_ISOTOPE = '115In'
+
+# Smoothing window (seconds) of the internal-standard trace.
+DEFAULT_WINDOW = 60.0
+
+
+def internal_standard(reference, isotope=DEFAULT_ISOTOPE, window=DEFAULT_WINDOW):
+	'''Correction settings dict; ValueError for a non-positive reference.
+
+	Args:
+		reference: average internal-standard signal of the reference run
+		isotope: internal-standard analyte, e.g. '115In' or '103Rh'
+		window: smoothing window of the internal-standard trace (seconds)
+	'''
+	if not reference > 0:
+		raise ValueError(f'internal-standard reference must be positive, not {reference}')
+	if not window >= 0:
+		raise ValueError(f'smoothing window must not be negative, not {window}')
+	return {'isotope': str(isotope), 'reference': float(reference), 'window': float(window)}
+
+
+def settings_key(settings):
+	'''Hashable form of correction settings, for caches.'''
+	return (settings['isotope'], settings['reference'], settings['window'])
+
+
+def is_internal_standard(analyte, isotope=DEFAULT_ISOTOPE):
+	'''Whether ``analyte`` is the internal standard ('115In', '115In | 115In', ...).'''
+	return analyte.startswith(isotope)
+
+
+def standard_column(data, isotope=DEFAULT_ISOTOPE):
+	'''Name of the internal-standard column of a run, or None.'''
+	return next(
+		(c for c in data.columns if is_internal_standard(c, isotope) and 'Time' not in c), None,
+	)
+
+
+def smooth_standard(time, intensity, window=DEFAULT_WINDOW):
+	'''Rolling median then rolling mean of a trace over ``window`` seconds.'''
+	from scipy.ndimage import median_filter, uniform_filter1d
+
+	y = _finite(intensity)
+	steps = np.diff(np.asarray(time, dtype=float))
+	steps = steps[np.isfinite(steps) & (steps > 0)]
+	if len(y) < 3 or len(steps) == 0 or window <= 0:
+		return y
+	size = int(max(1, round(window / np.median(steps))) | 1)
+	return uniform_filter1d(median_filter(y, size, mode='nearest'), size, mode='nearest')
+
+
+class DriftCorrection:
+	'''Pointwise correction factor of one run (internal standard / reference).
+
+	``time`` is the internal standard's sample times (seconds), ``factor``
+	the smoothed standard over the reference at those times; outside them
+	the factor holds its end values.
+	'''
+
+	def __init__(self, time, factor):
+		self.time = np.asarray(time, dtype=float)
+		self.factor = np.asarray(factor, dtype=float)
+
+	def at(self, time):
+		'''Correction factor at ``time`` (any shape).'''
+		return np.interp(time, self.time, self.factor)
+
+	def apply(self, time, intensity):
+		'''Corrected intensities; ``time`` and ``intensity`` broadcast, e.g.
+		(analytes, samples) for every trace of a run at once.'''
+		return np.asarray(intensity, dtype=float) / self.at(time)
+
+	def mean(self, start, stop):
+		'''Average factor over each (start, stop) window in seconds, for the
+		results' correction column.'''
+		start = np.atleast_1d(np.asarray(start, dtype=float))
+		stop = np.atleast_1d(np.asarray(stop, dtype=float))
+		cumulative = np.concatenate((
+			[0.0], np.cumsum(0.5 * (self.factor[1:] + self.factor[:-1]) * np.diff(self.time)),
+		))
+		span = stop - start
+		area = np.interp(stop, self.time, cumulative) - np.interp(start, self.time, cumulative)
+		# Parts of a window outside the standard's span count at the end values.
+		area += self.factor[0] * np.clip(np.minimum(stop, self.time[0]) - start, 0, None)
+		area += self.factor[-1] * np.clip(stop - np.maximum(start, self.time[-1]), 0, None)
+		return np.where(span > 0, area / np.where(span > 0, span, 1), self.at(start))
+
+
+def drift_correction(data, settings):
+	'''DriftCorrection of a run under ``settings``, or None if it lacks the standard.'''
+	column = standard_column(data, settings['isotope'])
+	if column is None:
+		return None
+	time, intensity = trace(data, column, dtype=float)
+	# Files padded at the end (time back to zero) are cut at the padding.
+	backwards = np.flatnonzero(~(np.diff(time) > 0))
+	n = backwards[0] + 1 if len(backwards) else len(time)
+	time, intensity = time[:n], intensity[:n]
+	if not np.isfinite(intensity).any():
+		return None
+	smoothed = smooth_standard(time, intensity, settings['window'])
+	factor = np.where(smoothed > 0, smoothed / settings['reference'], np.nan)
+	if not np.isfinite(factor).any():
+		return None
+	return DriftCorrection(time, _finite(factor))
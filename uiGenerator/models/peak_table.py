@@ -0,0 +1,198 @@
+"""Peak-table integration: several named windows, analytes and files at once.
+
+A peak table is a list of named time windows (minutes). ``build_peak_table``
+integrates every window for every analyte of every run from the runs'
+cumulative integrals (see models.integration), giving dense
+(file, window, analyte) arrays of areas, baselines and concentrations.
+``PeakTable.results`` turns them into a ResultTable (models.results), like
+the one ``LICPMSfunctions.integrate`` returns (plus window names), so they
+are shown and saved the same way.
+Nothing here needs Qt, so the headless batch command (cli.py) shares it.
+"""
+
+import csv
+import re
+
+import numpy as np
+
+from .calibration_fit import concentrations
+from .integration import integrator_for
+from .results import METRICS, ResultTable
+
+
+def read_peak_windows(path):
+	'''Read (name, start_min, stop_min) windows from a CSV file.
+
+	Three columns: name, start, stop (minutes). A header row is skipped if
+	its start/stop fields aren't numbers. Raises ValueError on malformed
+	rows or when no window is found.
+	'''
+	windows = []
+	with open(path, newline='', encoding='utf-8-sig') as f:
+		for n, row in enumerate(csv.reader(f)):
+			row = [c.strip() for c in row]
+			if not any(row):
+				continue
+			if len(row) < 3:
+				raise ValueError(f'{path}, line {n + 1}: expected name, start, stop')
+			try:
+				start, stop = float(row[1]), float(row[2])
+			except ValueError:
+				if not windows and n == 0:
+					continue  # header
+				raise ValueError(f'{path}, line {n + 1}: start/stop must be numbers') from None
+			windows.append((row[0] or f'peak {len(windows) + 1}', start, stop))
+	if not windows:
+		raise ValueError(f'No windows found in {path}')
+	return windows
+
+
+class PeakTable:
+	'''Dense results of a peak-table integration.
+
+	Arrays have shape (files, windows, analytes); NaN where an analyte is
+	missing from a file or, for concentrations, has no calibration.
+	``baselines`` is None when no baseline was subtracted, otherwise
+	``baseline_method`` names the model (models.baseline) that gave them.
+	'''
+
+	def __init__(self, files, windows, analytes, areas, baselines, conc_ppb, conc_uM,
+			corrections, calibrated, baseline_method=None):
+		self.files = list(files)
+		self.windows = list(windows)       # (name, start_min, stop_min)
+		self.analytes = list(analytes)
+		self.areas = areas
+		self.baselines = baselines
+		self.conc_ppb = conc_ppb
+		self.conc_uM = conc_uM
+		self.corrections = corrections     # correction factor per (file, window)
+		self.calibrated = calibrated       # bool per analyte
+		self.baseline_method = baseline_method if baselines is not None else None
+
+	@property
+	def shape(self):
+		return self.areas.shape
+
+	def results(self):
+		'''ResultTable with one row per (file, window), files outermost.'''
+		n_files, n_windows, n_analytes = self.shape
+		baselines = np.full_like(self.areas, np.nan) if self.baselines is None else self.baselines
+		values = np.stack([self.areas, baselines, self.conc_ppb, self.conc_uM], axis=-1)
+		names = [w[0] for w in self.windows]
+		return ResultTable(
+			self.analytes,
+			values.reshape(n_files * n_windows, n_analytes, len(METRICS)),
+			file=np.repeat(np.asarray(self.files, dtype=str), n_windows),
+			window=np.tile(np.asarray(names, dtype=str), n_files),
+			start=np.tile([w[1] for w in self.windows], n_files),
+			stop=np.tile([w[2] for w in self.windows], n_files),
+			correction=np.asarray(self.corrections, dtype=float).reshape(-1),
+			baseline_method=self.baseline_method or '',
+			calibrated=bool(np.any(self.calibrated)),
+		)
+
+
+def calibration_key(element, cal_curves):
+	'''Key of the calibration curve for ``element`` in ``cal_curves``, or None.
+
+	Exact match first, then the base isotope (handles "56Fe | 56Fe.16O").
+	'''
+	if element in cal_curves:
+		return element
+	base_isotope = element.split(' | ')[0].strip() if ' | ' in element else element
+	if base_isotope in cal_curves:
+		return base_isotope
+	return None
+
+
+def element_mass(element, masses):
+	'''(mass, guessed) of ``element`` for ppb -> uM.
+
+	Looked up in ``masses`` (exact, then base isotope); otherwise the mass
+	number of the isotope name ("238U | 238U.16O2" -> 238) with guessed True.
+	'''
+	base_isotope = element.split(' | ')[0].strip() if ' | ' in element else element
+	if element in masses:
+		return masses[element], False
+	if base_isotope in masses:
+		return masses[base_isotope], False
+	match = re.match(r'(\d+)', base_isotope)
+	return (int(match.group(1)) if match else 1), True
+
+
+def calibration_arrays(analytes, cal_curves, masses):
+	'''(slopes, intercepts, masses, curvatures) over ``analytes`` for build_peak_table.
+
+	NaN slope and intercept where an analyte has no curve; None when none has.
+	Curvatures are 0 for linear curves.
+	'''
+	slopes, intercepts, mass_list, curvatures = [], [], [], []
+	for element in analytes:
+		key = calibration_key(element, cal_curves)
+		cal_curve = cal_curves[key] if key is not None else None
+		slopes.append(cal_curve['m'] if cal_curve is not None else np.nan)
+		intercepts.append(cal_curve['b'] if cal_curve is not None else np.nan)
+		curvatures.append(cal_curve.get('q', 0.0) if cal_curve is not None else np.nan)
+		mass_list.append(element_mass(element, masses)[0])
+	if not np.isfinite(slopes).any():
+		return None
+	return slopes, intercepts, mass_list, curvatures
+
+
+def build_peak_table(runs, files, windows, analytes, corrections=None, baseline=False,
+		calibration=None, internal_standard=None):
+	'''Integrate every window for every analyte of every run.
+
+	Args:
+		runs: one run (CompactRun or DataFrame) per entry of ``files``
+		files: names to report for the runs
+		windows: (name, start_min, stop_min) tuples
+		analytes: analytes to integrate; missing ones give NaN
+		corrections: constant correction factor per run (areas are divided
+			by it)
+		baseline: subtract a baseline: True for the trapezoid of each
+			window, or a baseline model (models.baseline)
+		calibration: (slopes, intercepts, masses[, curvatures]) arrays over
+			``analytes``, NaN slope where an analyte has no calibration curve
+		internal_standard: internal-standard settings
+			(models.internal_standard): traces are divided by each run's
+			drift correction curve before integrating
+
+	Returns:
+		PeakTable
+	'''
+	n_files, n_windows, n_analytes = len(runs), len(windows), len(analytes)
+	seconds = np.array([(w[1] * 60, w[2] * 60) for w in windows], dtype=float).reshape(-1, 2)
+	factors = np.ones(n_files) if corrections is None else np.asarray(corrections, dtype=float)
+	corrections = np.repeat(factors[:, None], n_windows, axis=1)
+
+	areas = np.full((n_files, n_windows, n_analytes), np.nan)
+	model = None if baseline is True or not baseline else baseline
+	baselines = np.full_like(areas, np.nan) if baseline else None
+	for f, run in enumerate(runs):
+		present = [a for a, analyte in enumerate(analytes) if analyte in run]
+		if not present:
+			continue
+		integrator = integrator_for(run)
+		names = [analytes[a] for a in present]
+		areas[f][:, present] = integrator.areas(names, seconds, internal_standard) / factors[f]
+		if baseline:
+			baselines[f][:, present] = (
+				integrator.baselines(names, seconds, model, internal_standard) / factors[f]
+			)
+		corrections[f] *= integrator.corrections(seconds, internal_standard)
+	if baseline:
+		areas = np.maximum(areas - baselines, 0)  # NaN stays NaN
+
+	if calibration is None:
+		conc_ppb = np.full_like(areas, np.nan)
+		conc_uM = np.full_like(areas, np.nan)
+		calibrated = np.zeros(n_analytes, dtype=bool)
+	else:
+		conc_ppb = concentrations(areas, calibration)   # broadcasts over the analyte axis
+		conc_uM = conc_ppb / np.asarray(calibration[2], dtype=float)
+		calibrated = np.isfinite(np.asarray(calibration[0], dtype=float))
+	return PeakTable(
+		files, windows, analytes, areas, baselines, conc_ppb, conc_uM, corrections, calibrated,
+		baseline_method='trapezoid' if model is None else model['method'],
+	)
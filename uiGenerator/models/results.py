@@ -0,0 +1,278 @@
+"""Integration results as a typed, columnar table.
+
+A ResultTable holds one row per integrated (file, window): the numbers in
+one float array of shape (rows, analytes, metrics), NaN where absent, and
+the metadata in one numpy array per column. Numbers stay numbers until
+they are shown or written (``save_integration_csv``), so large result sets
+are cheap to combine, sort and export again. Tables are appended to by
+queueing the new rows; they are concatenated once, on the next read.
+"""
+
+import csv
+import os
+from datetime import datetime
+
+import numpy as np
+
+from .calibration_fit import concentrations
+
+
+METRICS = ('peak_area', 'baseline_area', 'conc_ppb', 'conc_uM')
+
+COLUMNS = {
+	'file': str,                    # file name
+	'window': str,                  # window name ('' for a plain range)
+	'start': float,                 # window start (min)
+	'stop': float,                  # window stop (min)
+	'correction': float,            # 115In factor the areas were divided by
+	'baseline_method': str,         # models.baseline method ('' if none)
+	'calibrated': bool,             # whether calibration curves were applied
+	'timestamp': 'datetime64[s]',   # when the row was integrated
+}
+
+
+class ResultTable:
+	'''Integration results: rows x analytes x METRICS, plus COLUMNS metadata.
+
+	Args:
+		analytes: analyte names, in column order
+		values: float array (rows, len(analytes), len(METRICS)), or None
+			for an empty table
+		**columns: one sequence (or scalar, repeated) per COLUMNS entry;
+			'window' and 'baseline_method' default to '', 'correction' to
+			1, 'calibrated' to False and 'timestamp' to now
+	'''
+
+	def __init__(self, analytes=(), values=None, **columns):
+		unknown = set(columns) - set(COLUMNS)
+		if unknown:
+			raise TypeError(f'unknown result column(s): {", ".join(sorted(unknown))}')
+		self._analytes = list(analytes)
+		if values is None:
+			values = np.empty((0, len(self._analytes), len(METRICS)))
+		values = np.asarray(values, dtype=float)
+		self._values = values.reshape(len(values), len(self._analytes), len(METRICS))
+		n = len(self._values)
+		defaults = {
+			'window': '', 'baseline_method': '', 'correction': 1.0, 'calibrated': False,
+			'timestamp': np.datetime64(datetime.now(), 's'),
+		}
+		self._columns = {}
+		for name, dtype in COLUMNS.items():
+			value = columns.get(name, defaults.get(name))
+			if value is None:
+				if n:
+					raise TypeError(f'result column {name!r} is required')
+				value = []
+			self._columns[name] = np.array(np.broadcast_to(np.asarray(value, dtype=dtype), (n,)))
+		self._pending = []
+
+	@classmethod
+	def concat(cls, tables):
+		'''One table with the rows of ``tables``, in order.'''
+		table = cls()
+		for other in tables:
+			table.extend(other)
+		return table
+
+	def extend(self, other):
+		'''Append the rows of ``other`` (new analytes become new columns).'''
+		if len(other):
+			self._pending.append(other)
+		return self
+
+	def _flush(self):
+		if not self._pending:
+			return
+		tables = [self] + [t._consolidated() for t in self._pending]
+		self._pending = []
+		analytes = list(dict.fromkeys(a for t in tables for a in t._analytes))
+		index = {a: i for i, a in enumerate(analytes)}
+		values = np.full((sum(len(t._values) for t in tables), len(analytes), len(METRICS)), np.nan)
+		offset = 0
+		for t in tables:
+			columns = [index[a] for a in t._analytes]
+			values[offset:offset + len(t._values), columns] = t._values
+			offset += len(t._values)
+		self._columns = {
+			name: np.concatenate([t._columns[name] for t in tables]) for name in COLUMNS
+		}
+		self._analytes = analytes
+		self._values = values
+
+	def _consolidated(self):
+		self._flush()
+		return self
+
+	def __len__(self):
+		return len(self._values) + sum(len(t) for t in self._pending)
+
+	@property
+	def analytes(self):
+		self._flush()
+		return list(self._analytes)
+
+	@property
+	def values(self):
+		'''float array (rows, analytes, metrics)'''
+		self._flush()
+		return self._values
+
+	def column(self, name):
+		'''Metadata column ``name`` (see COLUMNS), one entry per row.'''
+		self._flush()
+		return self._columns[name]
+
+	def metric(self, name):
+		'''(rows, analytes) array of one of METRICS.'''
+		return self.values[:, :, METRICS.index(name)]
+
+	def take(self, rows):
+		'''New table of the given rows (indices or boolean mask).'''
+		self._flush()
+		return ResultTable(
+			self._analytes, self._values[rows],
+			**{name: column[rows] for name, column in self._columns.items()},
+		)
+
+	def sort(self, *keys):
+		'''New table sorted by metadata columns, e.g. sort('file', 'start').'''
+		self._flush()
+		return self.take(np.lexsort([self._columns[k] for k in reversed(keys)]))
+
+	def requantify(self, calibration):
+		'''New table with concentrations recomputed from the stored areas.
+
+		The stored peak areas are already divided by each row's 115In
+		correction and have the baseline subtracted, so new concentrations
+		are one polynomial evaluation over the whole (rows, analytes) array;
+		no run is read again.
+
+		Args:
+			calibration: (slopes, intercepts, masses[, curvatures]) over ``analytes`` (see
+				peak_table.calibration_arrays), NaN slope where an analyte
+				has no curve; None clears the concentrations
+		'''
+		self._flush()
+		values = self._values.copy()
+		ppb, uM = METRICS.index('conc_ppb'), METRICS.index('conc_uM')
+		if calibration is None:
+			values[..., ppb] = values[..., uM] = np.nan
+		else:
+			values[..., ppb] = concentrations(values[..., 0], calibration)
+			values[..., uM] = values[..., ppb] / np.asarray(calibration[2], dtype=float)
+		columns = dict(self._columns, calibrated=calibration is not None)
+		return ResultTable(self._analytes, values, **columns)
+
+	@property
+	def has_baseline(self):
+		return bool(np.any(self.column('baseline_method') != ''))
+
+	@property
+	def has_calibration(self):
+		return bool(np.any(self.column('calibrated')))
+
+	@property
+	def has_windows(self):
+		return bool(np.any(self.column('window') != ''))
+
+	def labels(self):
+		'''Row labels: "file · window", or the file for plain ranges.'''
+		return [
+			f'{f} · {w}' if w else str(f)
+			for f, w in zip(self.column('file'), self.column('window'))
+		]
+
+	def results(self, row):
+		'''{analyte: {metric: float or None}} of one row, for display.
+
+		Analytes without a peak area in that row are left out.
+		'''
+		values = self.values[row]
+		out = {}
+		for analyte, metrics in zip(self._analytes, values):
+			if not np.isfinite(metrics[0]):
+				continue
+			out[analyte] = {
+				name: float(v) if np.isfinite(v) else None for name, v in zip(METRICS, metrics)
+			}
+		return out
+
+
+def _formatted(values, fmt):
+	'''Strings of ``values`` in ``fmt``; '' where not finite.'''
+	values = np.asarray(values, dtype=float)
+	text = np.char.mod(fmt, np.where(np.isfinite(values), values, 0.0))
+	return np.where(np.isfinite(values), text, '')
+
+
+def save_integration_csv(results, output_path, layout='wide'):
+	'''Write a ResultTable to one CSV (see LICPMSfunctions.saveIntegration).
+
+	Args:
+		results:     ResultTable
+		output_path: full path of the CSV to write
+		layout:      'wide' (columns per element) or 'long' (row per element)
+
+	Returns:
+		list of paths written (single entry; empty if there was nothing to write).
+	'''
+	if layout not in ('wide', 'long'):
+		raise ValueError(f"layout must be 'wide' or 'long', not {layout!r}")
+	if not len(results):
+		return []
+
+	out_dir = os.path.dirname(output_path)
+	if out_dir:
+		os.makedirs(out_dir, exist_ok=True)
+
+	# A baseline column per element whenever any row had one subtracted,
+	# so the user can see what was subtracted.
+	has_any_baseline = results.has_baseline
+	has_any_cal = results.has_calibration
+	metrics = ['peak_area'] + (['baseline_area'] if has_any_baseline else [])
+	metrics += ['conc_ppb', 'conc_uM'] if has_any_cal else []
+	sub_headers = {'peak_area': 'peak_area', 'baseline_area': 'baseline', 'conc_ppb': 'ppb', 'conc_uM': 'uM'}
+	formats = {'peak_area': '%.1f', 'baseline_area': '%.1f', 'conc_ppb': '%.3f', 'conc_uM': '%.3f'}
+
+	# Metadata columns, then per-element groups (wide) or one 'analyte'
+	# column and the values (long).
+	header = ['file']
+	meta = [results.column('file').astype(str)]
+	if results.has_windows:
+		header.append('window')
+		meta.append(results.column('window'))
+	header.extend(['start_min', 'stop_min', '115In_correction'])
+	meta.extend([
+		_formatted(results.column('start'), '%.2f'),
+		_formatted(results.column('stop'), '%.2f'),
+		_formatted(results.column('correction'), '%.3f'),
+	])
+	if has_any_baseline:
+		# 'yes' for the trapezoid, as before; other models by name.
+		method = results.column('baseline_method')
+		header.append('baseline_subtracted')
+		meta.append(np.where(method == '', 'no', np.where(method == 'trapezoid', 'yes', method)))
+	meta = np.stack(meta, axis=1)
+
+	cells = np.stack(
+		[_formatted(results.metric(m), formats[m]) for m in metrics], axis=2,
+	)  # (rows, analytes, metrics)
+	analytes = np.array(results.analytes, dtype=str)
+
+	if layout == 'long':
+		header.append('analyte')
+		header.extend(sub_headers[m] for m in metrics)
+		rows, columns = np.nonzero(np.isfinite(results.metric('peak_area')))
+		table = np.concatenate(
+			[meta[rows], analytes[columns][:, None], cells[rows, columns]], axis=1,
+		)
+	else:
+		header.extend(f'{el}_{sub_headers[m]}' for el in results.analytes for m in metrics)
+		table = np.concatenate([meta, cells.reshape(len(cells), -1)], axis=1)
+
+	with open(output_path, 'w', newline='') as csvfile:
+		fwriter = csv.writer(csvfile)
+		fwriter.writerow(header)
+		fwriter.writerows(table.tolist())
+	return [output_path]
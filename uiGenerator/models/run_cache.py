@@ -0,0 +1,352 @@
+"""On-disk cache of parsed LC-ICP-MS runs.
+
+Each parsed run is written as one uncompressed ``.npy`` file per column plus a
+small ``meta.json``, in a directory named after a hash of the source file's
+(absolute path, size, mtime). Re-opening a cached run memory-maps the column
+files instead of re-parsing the CSV. Entries are evicted least-recently-used
+once the cache grows past its size budget.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from lcicpms.raw_icpms_data import RawICPMSData
+
+from .compact_run import CompactRun
+from .run_reader import analyte_columns, read_run_csv, resolve_analytes, sniff_header
+from .run_source import is_packed, run_stat
+
+
+# Default on-disk budget for cached runs (bytes).
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+# Bumped whenever the entry layout changes so stale entries are ignored.
+CACHE_FORMAT = 2
+
+
+def default_cache_dir():
+	'''Per-user cache directory for parsed runs.'''
+	if sys.platform == 'win32':
+		base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+		return os.path.join(base, 'lcicpms-ui', 'Cache', 'runs')
+	if sys.platform == 'darwin':
+		return os.path.expanduser('~/Library/Caches/lcicpms-ui/runs')
+	base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+	return os.path.join(base, 'lcicpms-ui', 'runs')
+
+
+def file_key(path):
+	'''Identity of a file on disk: (absolute path, size, mtime in ns).
+
+	For a member of a zip archive the size and mtime are the archive's.
+	Raises FileNotFoundError if the file does not exist.
+	'''
+	path = os.path.abspath(path)
+	st = run_stat(path)
+	return (path, st.st_size, st.st_mtime_ns)
+
+
+class ParsedRun:
+	'''A parsed run: its columns (as a CompactRun) plus the analyte list.
+
+	Exposes the same two attributes the UI reads off RawICPMSData
+	(``raw_data_df`` and ``elements``), so either can be passed around;
+	``raw_data_df`` is materialised from ``data`` on each access, so
+	hot paths should read ``data`` directly. ``elements`` always lists
+	every analyte in the file; with projected loading ``data`` may hold
+	only some of them (see ``loaded``).
+	'''
+
+	def __init__(self, path, data, elements, header=None, intensity_storage='float64'):
+		if isinstance(data, pd.DataFrame):
+			data = CompactRun.from_frame(data, intensity_storage)
+		self.path = path
+		self.data = data
+		self.elements = list(elements)
+		self.header = list(data.columns) if header is None else list(header)
+		self.loaded = [el for el in self.elements if el in data]
+
+	@property
+	def raw_data_df(self):
+		return self.data.to_frame()
+
+	@property
+	def is_complete(self):
+		'''True if every column of the file is loaded.'''
+		return all(c in self.data for c in self.header)
+
+	def missing(self, analytes):
+		'''Analytes from ``analytes`` that are in the file but not loaded.'''
+		return [a for a in resolve_analytes(self.elements, analytes) if a not in self.loaded]
+
+
+class RunCache:
+	'''LRU on-disk cache of parsed runs, bounded by ``max_bytes``.
+
+	An entry may hold only some of a file's columns (written by projected
+	loads); further columns are added to the same entry as they are parsed.
+	'''
+
+	META = 'meta.json'
+	TMP_PREFIX = '.tmp-'
+
+	def __init__(self, root=None, max_bytes=DEFAULT_MAX_BYTES):
+		self.root = root or default_cache_dir()
+		self.max_bytes = max_bytes
+		self._lock = threading.Lock()
+
+	def _entry_dir(self, key):
+		digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+		return os.path.join(self.root, digest)
+
+	def _read_meta(self, key):
+		try:
+			with open(os.path.join(self._entry_dir(key), self.META)) as f:
+				meta = json.load(f)
+		except (OSError, ValueError):
+			return None
+		if meta.get('format') != CACHE_FORMAT or tuple(meta.get('key', ())) != key:
+			return None
+		return meta
+
+	def get(self, path, columns=None, intensity_storage='float64'):
+		'''Return a ParsedRun for ``path`` from the cache, or None on a miss.
+
+		With ``columns`` only those of them that are stored are returned
+		(check ``ParsedRun.data.columns`` for what was found);
+		otherwise every stored column is. Column arrays are memory-mapped
+		read-only; the cache always holds full precision and
+		``intensity_storage`` narrows intensities on the way out. Raises FileNotFoundError if ``path`` itself no longer exists.
+		'''
+		key = file_key(path)
+		entry = self._entry_dir(key)
+		meta = self._read_meta(key)
+		if meta is None:
+			return None
+
+		stored = meta['stored']
+		wanted = meta['header'] if columns is None else set(columns)
+		names = [c for c in meta['header'] if c in stored and c in wanted]
+		try:
+			arrays = {
+				name: np.load(os.path.join(entry, stored[name]), mmap_mode='r')
+				for name in names
+			}
+		except (OSError, ValueError) as e:
+			print(f'Run cache: dropping unreadable entry for {path}: {e}')
+			shutil.rmtree(entry, ignore_errors=True)
+			return None
+
+		# Touch the entry so eviction treats it as recently used.
+		try:
+			os.utime(os.path.join(entry, self.META), None)
+		except OSError:
+			pass
+
+		data = CompactRun.from_columns(
+			((name, arrays[name]) for name in names), intensity_storage,
+		)
+		return ParsedRun(key[0], data, meta['elements'], header=meta['header'])
+
+	def put(self, path, df, elements, header=None):
+		'''Store the columns of a parsed run. Returns True if they were written.
+
+		``header`` is the file's full column list (defaults to ``df.columns``
+		for a complete run). Columns are added to an existing entry for the
+		same file; runs with non-numeric columns are not cached (they can't
+		be stored as plain .npy without pickling).
+		'''
+		if isinstance(df, CompactRun):
+			df = df.to_frame()
+		if not all(pd.api.types.is_numeric_dtype(df[c]) for c in df.columns):
+			return False
+
+		key = file_key(path)
+		header = [str(c) for c in (df.columns if header is None else header)]
+		os.makedirs(self.root, exist_ok=True)
+		with self._lock:
+			meta = self._read_meta(key)
+			if meta is not None and meta['header'] == header:
+				self._add_columns(key, meta, df)
+			else:
+				self._write_entry(key, header, df, elements)
+		self.evict()
+		return True
+
+	@staticmethod
+	def _column_file(header, column):
+		return f'c{header.index(str(column)):04d}.npy'
+
+	def _write_entry(self, key, header, df, elements):
+		tmp = tempfile.mkdtemp(prefix=self.TMP_PREFIX, dir=self.root)
+		try:
+			stored = {}
+			for col in df.columns:
+				fname = self._column_file(header, col)
+				np.save(os.path.join(tmp, fname), np.ascontiguousarray(df[col].to_numpy()))
+				stored[str(col)] = fname
+			meta = {
+				'format': CACHE_FORMAT,
+				'key': list(key),
+				'header': header,
+				'stored': stored,
+				'elements': list(elements),
+			}
+			with open(os.path.join(tmp, self.META), 'w') as f:
+				json.dump(meta, f)
+
+			entry = self._entry_dir(key)
+			if os.path.isdir(entry):
+				shutil.rmtree(entry, ignore_errors=True)
+			os.replace(tmp, entry)
+		except OSError:
+			shutil.rmtree(tmp, ignore_errors=True)
+			raise
+
+	def _add_columns(self, key, meta, df):
+		entry = self._entry_dir(key)
+		for col in df.columns:
+			if str(col) in meta['stored']:
+				continue
+			fname = self._column_file(meta['header'], col)
+			fd, tmp = tempfile.mkstemp(prefix=self.TMP_PREFIX, suffix='.npy', dir=entry)
+			with os.fdopen(fd, 'wb') as f:
+				np.save(f, np.ascontiguousarray(df[col].to_numpy()))
+			os.replace(tmp, os.path.join(entry, fname))
+			meta['stored'][str(col)] = fname
+		fd, tmp = tempfile.mkstemp(prefix=self.TMP_PREFIX, dir=entry)
+		with os.fdopen(fd, 'w') as f:
+			json.dump(meta, f)
+		os.replace(tmp, os.path.join(entry, self.META))
+
+	def _entries(self):
+		'''List (last_used, size_bytes, path) for every complete entry.'''
+		entries = []
+		try:
+			names = os.listdir(self.root)
+		except OSError:
+			return entries
+		now = time.time()
+		for name in names:
+			entry = os.path.join(self.root, name)
+			if not os.path.isdir(entry):
+				continue
+			if name.startswith(self.TMP_PREFIX):
+				# Leftover from an interrupted write.
+				try:
+					if now - os.path.getmtime(entry) > 3600:
+						shutil.rmtree(entry, ignore_errors=True)
+				except OSError:
+					pass
+				continue
+			try:
+				last_used = os.path.getmtime(os.path.join(entry, self.META))
+				size = sum(
+					os.path.getsize(os.path.join(entry, f)) for f in os.listdir(entry)
+				)
+			except OSError:
+				continue
+			entries.append((last_used, size, entry))
+		return entries
+
+	def size_bytes(self):
+		'''Total size of all cached entries.'''
+		return sum(size for _, size, _ in self._entries())
+
+	def evict(self):
+		'''Drop least-recently-used entries until under ``max_bytes``.'''
+		entries = sorted(self._entries())
+		total = sum(size for _, size, _ in entries)
+		for _, size, entry in entries:
+			if total <= self.max_bytes:
+				break
+			# On Windows a memory-mapped entry can't be removed while open;
+			# it will be retried on the next eviction pass.
+			shutil.rmtree(entry, ignore_errors=True)
+			if not os.path.exists(entry):
+				total -= size
+
+	def clear(self):
+		'''Remove every cached entry.'''
+		shutil.rmtree(self.root, ignore_errors=True)
+
+
+_default_cache = None
+
+
+def default_cache():
+	'''Process-wide RunCache in the user cache directory.'''
+	global _default_cache
+	if _default_cache is None:
+		_default_cache = RunCache()
+	return _default_cache
+
+
+def load_run(path, cache=None, analytes=None, base=None, intensity_storage='float64'):
+	'''Parse ``path``, going through the on-disk cache.
+
+	With ``analytes`` None the whole file is parsed with RawICPMSData
+	(compressed files and archive members are streamed, see run_source).
+	Otherwise only the intensity/time columns of those analytes are read
+	(projected loading), added to the columns already held by ``base`` (a
+	partial ParsedRun of the same, unchanged file). Intensities are held as
+	``intensity_storage`` (see compact_run.INTENSITY_STORAGE); the on-disk
+	cache keeps full precision either way. Returns a ParsedRun. A
+	cache miss parses the CSV and stores the result; failures to write the
+	cache are reported but never block loading.
+	'''
+	cache = default_cache() if cache is None else cache
+	if analytes is None:
+		run = cache.get(path, intensity_storage=intensity_storage)
+		if run is not None and run.is_complete:
+			return run
+		if is_packed(path):
+			# lcicpms only opens plain .csv files; stream every column instead.
+			header = sniff_header(path)
+			df, elements = read_run_csv(path, header.columns, header), header.elements
+		else:
+			raw_data = RawICPMSData(path)
+			df, elements = raw_data.raw_data_df, raw_data.elements
+		_store(cache, path, df, elements, list(df.columns))
+		return ParsedRun(
+			os.path.abspath(path), df, elements, intensity_storage=intensity_storage,
+		)
+
+	header = sniff_header(path)
+	if base is None or base.header != header.columns:
+		base = ParsedRun(
+			os.path.abspath(path), CompactRun(intensity_storage), header.elements,
+			header=header.columns,
+		)
+	missing = base.missing(analytes)
+	if not missing:
+		return base
+
+	columns = [c for c in analyte_columns(header, missing) if c not in base.data]
+	data = base.data
+	cached = cache.get(path, columns, intensity_storage)
+	if cached is not None:
+		data = data.merged(cached.data, order=header.columns)
+	todo = [c for c in columns if c not in data]
+	if todo:
+		parsed = read_run_csv(path, todo, header)
+		_store(cache, path, parsed, header.elements, header.columns)
+		data = data.merged(
+			CompactRun.from_frame(parsed, intensity_storage), order=header.columns,
+		)
+	return ParsedRun(base.path, data, header.elements, header=header.columns)
+
+
+def _store(cache, path, df, elements, header):
+	try:
+		cache.put(path, df, elements, header=header)
+	except OSError as e:
+		print(f'Run cache: could not store {path}: {e}')
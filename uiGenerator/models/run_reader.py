@@ -0,0 +1,123 @@
+"""Header sniffing and column-projected reading of LC-ICP-MS run files.
+
+Follows the same conventions as lcicpms (``get_data_from_csv`` and
+``RawICPMSData``): the header is the first line mentioning ``Time``, analytes
+are the columns without ``Time``/``time``/``Number`` in their name, and each
+analyte pairs with the ``Time <analyte>`` column (or the first time label that
+contains its name). Unlike lcicpms, only the columns that are asked for are
+parsed.
+"""
+
+import csv
+import io
+
+import pandas as pd
+
+from .run_source import open_run
+
+
+# How far into a file to look for the header line.
+HEADER_SCAN_LINES = 50
+
+# Delimiters the instrument software is known to export.
+CANDIDATE_SEPARATORS = ',;\t'
+
+
+class RunHeader:
+	'''Column layout of a run file, sniffed from its first lines.'''
+
+	def __init__(self, columns, header_row, sep, preamble=()):
+		self.columns = list(columns)
+		self.header_row = header_row
+		self.sep = sep
+		self.preamble = list(preamble)  # lines above the header (export info)
+		self.elements = [
+			c for c in self.columns
+			if 'Time' not in c and 'time' not in c and 'Number' not in c
+		]
+		self.time_labels = [c for c in self.columns if 'Time' in c or 'time' in c]
+
+
+def sniff_header(path):
+	'''Find the header line, separator and column names of a run file.
+
+	Raises FileNotFoundError if the file is missing and ValueError if no
+	header line containing "Time" is found.
+	'''
+	with open_run(path) as stream:
+		f = io.TextIOWrapper(stream, encoding='utf-8', errors='replace', newline='')
+		lines = []
+		for _ in range(HEADER_SCAN_LINES):
+			line = f.readline()
+			if not line:
+				break
+			lines.append(line)
+		f.detach()
+	return _parse_header_lines(lines, path)
+
+
+def _parse_header_lines(lines, path=''):
+	for row, line in enumerate(lines):
+		if 'Time' not in line:
+			continue
+		sep = max(CANDIDATE_SEPARATORS, key=line.count)
+		if line.count(sep) == 0:
+			sep = ','
+		columns = next(csv.reader([line.rstrip('\r\n')], delimiter=sep))
+		preamble = [l.rstrip('\r\n') for l in lines[:row]]
+		return RunHeader(columns, row, sep, preamble)
+	raise ValueError(f'No header line containing "Time" found in {path}')
+
+
+def resolve_analytes(elements, wanted):
+	'''Map requested analyte names onto the file's analytes.
+
+	Exact names win; otherwise a name matches the analytes whose base isotope
+	(the part before " | ") equals it, so '115In' finds '115In | 115In' in
+	TQ-mode files. Names not in the file are dropped.
+	'''
+	resolved = []
+	for name in wanted:
+		if name in elements:
+			matches = [name]
+		else:
+			matches = [el for el in elements if el.split(' | ')[0].strip() == name]
+		for el in matches:
+			if el not in resolved:
+				resolved.append(el)
+	return resolved
+
+
+def time_label(header, analyte):
+	'''Name of the time column paired with ``analyte``.'''
+	label = 'Time ' + analyte
+	if label in header.columns:
+		return label
+	return next((t for t in header.time_labels if analyte in t), None)
+
+
+def analyte_columns(header, analytes):
+	'''Intensity and time columns for ``analytes``, in file order.'''
+	wanted = set()
+	for analyte in analytes:
+		wanted.add(analyte)
+		label = time_label(header, analyte)
+		if label is not None:
+			wanted.add(label)
+	return [c for c in header.columns if c in wanted]
+
+
+def read_run_csv(path, columns, header=None):
+	'''Parse only ``columns`` of a run file into a DataFrame.
+
+	Compressed files and archive members are streamed (see run_source).
+	'''
+	header = sniff_header(path) if header is None else header
+	with open_run(path) as stream:
+		return pd.read_csv(
+			stream,
+			sep=header.sep,
+			skiprows=header.header_row,
+			header=0,
+			usecols=list(columns),
+		)[list(columns)]
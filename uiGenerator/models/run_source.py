@@ -0,0 +1,98 @@
+"""Opening run files that are compressed or stored in zip archives.
+
+Finished sequences are often archived as ``.csv.gz`` / ``.csv.xz`` files or
+zipped. Those are read by streaming through the decompressor, never by
+unpacking to a temporary file. A run inside a zip archive is addressed as
+``<archive>.zip/<member>`` (e.g. ``seq_2024.zip/run_01.csv``), which is also
+the name the file list shows for it, so the rest of the code can keep
+joining list names onto the run directory.
+"""
+
+import contextlib
+import gzip
+import lzma
+import os
+import re
+import zipfile
+
+
+# Stream decompressors by file suffix (lower case).
+COMPRESSED_SUFFIXES = {'.gz': gzip.open, '.xz': lzma.open}
+
+ARCHIVE_SUFFIX = '.zip'
+
+_MEMBER_RE = re.compile(r'\.zip[\\/]', re.IGNORECASE)
+
+
+def split_member(path):
+	'''(archive path, member name) for a path into a zip archive, else (path, None).'''
+	for found in _MEMBER_RE.finditer(path):
+		archive = path[:found.end() - 1]
+		if os.path.isfile(archive):
+			return archive, path[found.end():].replace('\\', '/')
+	return path, None
+
+
+def _decompressor(path):
+	return COMPRESSED_SUFFIXES.get(os.path.splitext(path)[1].lower())
+
+
+def is_packed(path):
+	'''True for compressed runs and archive members (no random access, no tailing).'''
+	return split_member(path)[1] is not None or _decompressor(path) is not None
+
+
+def run_stat(path):
+	'''os.stat of the file holding the run (the archive, for a member).'''
+	return os.stat(split_member(path)[0])
+
+
+@contextlib.contextmanager
+def open_run(path):
+	'''Binary stream of a run's CSV text, decompressing on the fly.
+
+	Raises FileNotFoundError if the file, or the member of an archive, is
+	missing.
+	'''
+	archive, member = split_member(path)
+	if member is not None:
+		with zipfile.ZipFile(archive) as zf:
+			try:
+				stream = zf.open(member)
+			except KeyError:
+				raise FileNotFoundError(f'No member {member!r} in {archive}') from None
+			with stream:
+				yield stream
+		return
+	opener = _decompressor(path) or open
+	with opener(path, 'rb') as stream:
+		yield stream
+
+
+def archive_members(archive, match):
+	'''Names of the members of a zip archive accepted by ``match``.'''
+	with zipfile.ZipFile(archive) as zf:
+		return [
+			info.filename for info in zf.infolist()
+			if not info.is_dir() and match(info.filename)
+		]
+
+
+def iter_runs(directory, match, archives=False):
+	'''Yield the run names of ``directory`` accepted by ``match``.
+
+	With ``archives`` the members of zip files are listed too, as
+	``<archive>/<member>``; unreadable archives are skipped.
+	'''
+	with os.scandir(directory) as entries:
+		for entry in entries:
+			if archives and entry.name.lower().endswith(ARCHIVE_SUFFIX):
+				try:
+					members = archive_members(entry.path, match)
+				except (OSError, zipfile.BadZipFile) as e:
+					print(f'Skipping unreadable archive {entry.path}: {e}')
+					continue
+				for member in members:
+					yield f'{entry.name}/{member}'
+			elif match(entry.name):
+				yield entry.name
@@ -0,0 +1,103 @@
+"""Incremental reading of a run file that is still being acquired.
+
+RunTailer remembers how far into the file it has parsed and, on each poll,
+reads only the bytes appended since then. Only complete lines are consumed;
+a partially written last line is left for the next poll. Parsed values are
+kept in growable per-column buffers so the plot can be refreshed with
+``setData`` on views of them instead of re-reading the whole file.
+"""
+
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from .compact_run import CompactRun
+from .run_reader import sniff_header
+
+
+class RunTailer:
+	'''Follows a run file, parsing only rows appended since the last poll.'''
+
+	def __init__(self, path, initial_capacity=4096):
+		self.path = os.path.abspath(path)
+		self._initial_capacity = initial_capacity
+		self._reset()
+
+	def _reset(self):
+		self.header = sniff_header(self.path)
+		with open(self.path, 'rb') as f:
+			for _ in range(self.header.header_row + 1):
+				f.readline()
+			self._offset = f.tell()
+		self._n_rows = 0
+		self._buffers = [
+			np.empty(self._initial_capacity) for _ in self.header.columns
+		]
+
+	def __len__(self):
+		return self._n_rows
+
+	def poll(self):
+		'''Parse complete rows appended since the last poll.
+
+		Returns the number of new rows. If the file shrank (rewritten from
+		the start) everything is re-read and the full row count is returned.
+		'''
+		size = os.path.getsize(self.path)
+		if size < self._offset:
+			self._reset()
+		if size <= self._offset:
+			return 0
+
+		with open(self.path, 'rb') as f:
+			f.seek(self._offset)
+			chunk = f.read(size - self._offset)
+		end = chunk.rfind(b'\n')
+		if end < 0:
+			return 0  # only a partially written line so far
+		chunk = chunk[:end + 1]
+		self._offset += len(chunk)
+
+		ncols = len(self.header.columns)
+		frame = pd.read_csv(
+			io.BytesIO(chunk),
+			sep=self.header.sep,
+			header=None,
+			names=range(ncols),
+			usecols=range(ncols),
+			index_col=False,  # never shift columns into the index on ragged rows
+			on_bad_lines='skip',
+		)
+		if frame.empty:
+			return 0
+		self._append(frame)
+		return len(frame)
+
+	def _append(self, frame):
+		new_rows = len(frame)
+		needed = self._n_rows + new_rows
+		capacity = len(self._buffers[0]) if self._buffers else 0
+		if needed > capacity:
+			capacity = max(needed, 2 * capacity)
+			grown = []
+			for buf in self._buffers:
+				new_buf = np.empty(capacity)
+				new_buf[:self._n_rows] = buf[:self._n_rows]
+				grown.append(new_buf)
+			self._buffers = grown
+		for i, buf in enumerate(self._buffers):
+			values = pd.to_numeric(frame[i], errors='coerce').to_numpy(dtype=float)
+			buf[self._n_rows:needed] = values
+		self._n_rows = needed
+
+	def column(self, name):
+		'''Parsed values of column ``name`` so far (a view; do not modify).'''
+		return self._buffers[self.header.columns.index(name)][:self._n_rows]
+
+	def snapshot(self):
+		'''CompactRun over the rows parsed so far (shares the buffers).'''
+		return CompactRun.from_columns(
+			(name, self.column(name)) for name in self.header.columns if name
+		)
@@ -4,6 +4,9 @@ import seaborn as sns
 from matplotlib.ticker import (MultipleLocator, MaxNLocator,PercentFormatter)
 import pyqtgraph as pg
 from uiGenerator.utils.analyte_formatter import format_analyte_html
+from uiGenerator.models.baseline import is_trapezoid
+from uiGenerator.models.compact_run import trace
+from uiGenerator.models.integration import integrator_for
 
 
 def _drop_zero_time(icpms_time, icpms_signal):
@@ -18,7 +21,7 @@ def _drop_zero_time(icpms_time, icpms_signal):
 	return t[mask], s[mask]
 
 class plotChroma:
-	def __init__(self,view = None,elementList=None,icpms_data=None,activeElements=None,plt_title = None, compare_data=None, compare_files=None, compare_labels=None):
+	def __init__(self,view = None,elementList=None,icpms_data=None,activeElements=None,plt_title = None, compare_data=None, compare_files=None, compare_labels=None, compare_shifts=None):
 		self._view = view
 		self.elementList= elementList
 		self.activeElements = activeElements if activeElements else []
@@ -26,11 +29,12 @@ class plotChroma:
 		self.compare_data_list = compare_data  # List of dataframes (or None)
 		self.compare_files_list = compare_files  # List of filenames (or None)
 		self.compare_labels_dict = compare_labels if compare_labels else {}  # Dictionary of custom labels
+		self.compare_shifts = compare_shifts if compare_shifts else {}  # filename -> retention shift (s)
 
 		# Set default time range, or calculate from first active element if available
 		if self.activeElements and len(self.activeElements) > 0 and self.icpms_data is not None:
 			try:
-				self.max_time = max(self.icpms_data['Time ' + self.activeElements[0]]) / 60
+				self.max_time = np.nanmax(trace(self.icpms_data, self.activeElements[0])[0]) / 60
 			except (KeyError, ValueError):
 				self.max_time = 10  # Default fallback
 		else:
@@ -40,6 +44,9 @@ class plotChroma:
 		self.max_icp = None
 		self.min_icp = 0
 		self.plt_title = plt_title
+		self.curves = {}  # element -> PlotDataItem (normal mode), for updateData
+		self.colors = {}  # element -> RGB of its curve
+		self.baseline_items = []  # baseline overlays (showBaselines)
 
 		# Define line styles for elements (max 2)
 		self.element_line_styles = [
@@ -86,6 +93,9 @@ class plotChroma:
 				# Use file index as suffix if name would be duplicate
 				if short_name in legend_colors:
 					short_name = f"{short_name} ({file_idx + 1})"
+				# Aligned runs show the shift taken off their time axis
+				if self.compare_shifts.get(filename):
+					short_name = f"{short_name} ({self.compare_shifts[filename]:+.1f} s)"
 
 				legend_elements.append(short_name)
 				legend_colors[short_name] = file_colors[file_idx]
@@ -99,9 +109,11 @@ class plotChroma:
 				for file_idx, compare_data in enumerate(self.compare_data_list):
 					try:
 						# Get data for this file and element
-						icpms_time = compare_data['Time ' + element] / 60
-						icpms_signal = compare_data[element]  # Keep in cps, don't divide by 1000
+						icpms_time, icpms_signal = trace(compare_data, element)  # Keep in cps
 						icpms_time, icpms_signal = _drop_zero_time(icpms_time, icpms_signal)
+						# On the reference run's time axis when aligned
+						shift = self.compare_shifts.get(self.compare_files_list[file_idx], 0.0)
+						icpms_time = (icpms_time - shift) / 60
 						if len(icpms_time) == 0:
 							continue
 						self.max_icp = max(icpms_signal) if self.max_icp is None else max(self.max_icp, max(icpms_signal))
@@ -116,8 +128,11 @@ class plotChroma:
 						# Create pen: file determines color, all solid lines
 						pen = pg.mkPen(color=rgb_255, width=4, style=pg.QtCore.Qt.PenStyle.SolidLine)
 
-						# Plot the data
-						chromaPlot = self._view.plotSpace.plot(icpms_time, icpms_signal, pen=pen)
+						# Plot the data (downsampled to the view so long runs redraw quickly)
+						chromaPlot = self._view.plotSpace.plot(
+							icpms_time, icpms_signal, pen=pen,
+							autoDownsample=True,
+						)
 						chromaplots.append(chromaPlot)
 
 					except KeyError:
@@ -152,9 +167,8 @@ class plotChroma:
 			chromaplots = []
 			for m in self.activeElements:
 				# Get data
-				icpms_time = self.icpms_data['Time ' + m] / 60
-				icpms_signal = self.icpms_data[m]  # Keep in cps, don't divide by 1000
-				icpms_time, icpms_signal = _drop_zero_time(icpms_time, icpms_signal)
+				icpms_time, icpms_signal = trace(self.icpms_data, m)  # Keep in cps
+				icpms_time, icpms_signal = _drop_zero_time(icpms_time / 60, icpms_signal)
 				if len(icpms_time) == 0:
 					continue
 				self.max_icp = max(icpms_signal) if self.max_icp is None else max(self.max_icp, max(icpms_signal))
@@ -169,8 +183,13 @@ class plotChroma:
 				# Use solid line, width 4 for single file mode
 				pen = pg.mkPen(color=rgb_255, width=4, style=pg.QtCore.Qt.PenStyle.SolidLine)
 
-				chromaPlot = self._view.plotSpace.plot(icpms_time, icpms_signal, pen=pen)
+				chromaPlot = self._view.plotSpace.plot(
+					icpms_time, icpms_signal, pen=pen,
+					autoDownsample=True,
+				)
 				chromaplots.append(chromaPlot)
+				self.curves[m] = chromaPlot
+				self.colors[m] = rgb_255
 
 			# Set axis ranges from 0 to data max
 			if self.max_icp is not None:
@@ -179,8 +198,58 @@ class plotChroma:
 
 			return chromaplots[0] if chromaplots else None
 
+	def updateData(self, icpms_data):
+		'''Replace the traces of the plotted elements in place (follow mode).
 
-
-
-
-		
+		Uses setData on the existing curves instead of clearing and
+		re-plotting, then widens the axes to the new data extent.
+		'''
+		self.icpms_data = icpms_data
+		for m, curve in self.curves.items():
+			try:
+				icpms_time, icpms_signal = trace(icpms_data, m)
+			except KeyError:
+				continue
+			icpms_time, icpms_signal = _drop_zero_time(icpms_time / 60, icpms_signal)
+			curve.setData(icpms_time, icpms_signal)
+			if len(icpms_time) == 0:
+				continue
+			peak = float(np.nanmax(icpms_signal))
+			self.max_time = max(self.max_time, float(icpms_time[-1]))
+			self.max_icp = peak if self.max_icp is None else max(self.max_icp, peak)
+
+		if self.max_icp is not None:
+			self._view.plotSpace.setYRange(0, self.max_icp * 1.03, padding=0)
+		self._view.plotSpace.setXRange(0, self.max_time, padding=0)
+
+	def showBaselines(self, model):
+		'''Overlay the baseline of each plotted element (normal mode).
+
+		Dashed, in the element's colour, for whole-trace models
+		(models.baseline); the regions of a polynomial baseline are shaded.
+		The curves come from the run's integrator cache, so this costs
+		nothing extra once the areas have been computed. No overlay for the
+		trapezoid (or None), or where the model can't be computed.
+		'''
+		for item in self.baseline_items:
+			self._view.plotSpace.removeItem(item)
+		self.baseline_items = []
+		if is_trapezoid(model) or self.icpms_data is None:
+			return
+		integrator = integrator_for(self.icpms_data)
+		for m in self.curves:
+			try:
+				curve = integrator.baseline(m, model)
+			except (KeyError, ValueError):
+				continue
+			base_time, base_signal = _drop_zero_time(curve.time / 60, curve.intensity)
+			pen = pg.mkPen(color=self.colors[m], width=2, style=pg.QtCore.Qt.PenStyle.DashLine)
+			item = self._view.plotSpace.plot(base_time, base_signal, pen=pen, autoDownsample=True)
+			self.baseline_items.append(item)
+		for start, stop in model.get('regions', []):
+			region = pg.LinearRegionItem(
+				values=(start, stop), movable=False,
+				brush=pg.mkBrush(128, 128, 128, 40), pen=pg.mkPen(None),
+			)
+			self._view.plotSpace.addItem(region)
+			self.baseline_items.append(region)
@@ -6,6 +6,7 @@ import pyqtgraph as pg
 from functools import partial
 import os
 import pandas as pd
+from ..models.calibration_fit import DEFAULT_MODEL, DEFAULT_WEIGHTING, FIT_MODELS, WEIGHTINGS
 
 __version__ = '0.1'
 __author__ = 'Christian Dewey'
@@ -54,6 +55,12 @@ class Calibration(QWidget):
 		self._createPlot()
 		self._createStandardsTable()
 		self._createActionButtons()
+		self._createStatusBar()
+
+	def _createStatusBar(self):
+		self.statusBar = QStatusBar()
+		self.statusBar.setSizeGripEnabled(False)
+		self.generalLayout.addWidget(self.statusBar)
 
 	def _createResizeHandle(self):
 		handle = QSizeGrip(self)
@@ -379,6 +386,14 @@ class Calibration(QWidget):
 		self.integrateButtons['Integrate'].setStyleSheet(buttonStyle)
 		buttonsLayout.addWidget(self.integrateButtons['Integrate'])
 
+		self.integrateButtons['Integrate Peaks'] = QPushButton("Integrate Peaks")
+		self.integrateButtons['Integrate Peaks'].setToolTip(
+			"Detect every significant peak of each element and store the summed peak areas"
+		)
+		self.integrateButtons['Integrate Peaks'].setEnabled(False)
+		self.integrateButtons['Integrate Peaks'].setStyleSheet(buttonStyle)
+		buttonsLayout.addWidget(self.integrateButtons['Integrate Peaks'])
+
 		self.integrateButtons['Suggest Range'] = QPushButton("Suggest Range")
 		self.integrateButtons['Suggest Range'].setToolTip("Reset to default integration range")
 		self.integrateButtons['Suggest Range'].setStyleSheet(buttonStyle)
@@ -402,6 +417,33 @@ class Calibration(QWidget):
 		self.integrateButtons['Normalize In'].setStyleSheet(buttonStyle)
 		buttonsLayout.addWidget(self.integrateButtons['Normalize In'])
 
+		# Calibration model and weighting for Calculate Curve
+		self.fitModelBox = QComboBox()
+		for key, label in FIT_MODELS.items():
+			self.fitModelBox.addItem(label, key)
+		self.fitModelBox.setCurrentIndex(list(FIT_MODELS).index(DEFAULT_MODEL))
+		self.fitModelBox.setToolTip("Calibration curve model")
+		buttonsLayout.addWidget(self.fitModelBox)
+
+		self.fitWeightingBox = QComboBox()
+		for key, label in WEIGHTINGS.items():
+			self.fitWeightingBox.addItem(label, key)
+		self.fitWeightingBox.setCurrentIndex(list(WEIGHTINGS).index(DEFAULT_WEIGHTING))
+		self.fitWeightingBox.setToolTip(
+			"Weight standards by 1/concentration or 1/concentration² so low "
+			"standards are not swamped by the top of the range"
+		)
+		buttonsLayout.addWidget(self.fitWeightingBox)
+
+		self.integrateButtons['Auto Calibrate'] = QPushButton("Auto Calibrate")
+		self.integrateButtons['Auto Calibrate'].setToolTip(
+			"Add every standard in the directory (concentration from the file name), "
+			"integrate them over the range found on the top standard, normalize to "
+			"115In and calculate the curves"
+		)
+		self.integrateButtons['Auto Calibrate'].setStyleSheet(buttonStyle)
+		buttonsLayout.addWidget(self.integrateButtons['Auto Calibrate'])
+
 		# Calculate button (highlighted)
 		self.integrateButtons['Calculate Curve'] = QPushButton("Calculate Curve")
 		self.integrateButtons['Calculate Curve'].setToolTip("Calculate calibration curves from all standards")
@@ -1,12 +1,16 @@
 import sys
 from PyQt6.QtCore import Qt, QSettings
-from PyQt6.QtGui import QKeySequence, QAction
+from PyQt6.QtGui import QKeySequence, QAction, QActionGroup
 from PyQt6.QtWidgets import *
 from pyqtgraph import PlotWidget, plot
 import pyqtgraph as pg
 from functools import partial
 import os
 import pandas as pd
+from ..models.baseline import baseline_model
+from ..models.compact_run import INTENSITY_STORAGE
+from ..models.internal_standard import DEFAULT_ISOTOPE, DEFAULT_WINDOW
+from ..models.results import ResultTable
 
 __version__ = '0.1'
 __author__ = 'Christian Dewey'
@@ -39,23 +43,41 @@ class PyLCICPMSUi(QMainWindow):
 		
 		self.filepath = ''
 		self.normAvIndium = -999.99
+		# Internal standard for the drift correction (models.internal_standard);
+		# normAvIndium is its reference average, the correction is on when > 0.
+		self.internalStandard = {'isotope': DEFAULT_ISOTOPE, 'window': DEFAULT_WINDOW}
 		self.homeDir = '' #/Users/christiandewey/'# '/Users/christiandewey/presentations/DOE-PI-22/day6/day6/'
 		self.activeElements = []
 		self.elementOptions = ['55Mn','56Fe','59Co','60Ni','63Cu','66Zn','111Cd','115In', '208Pb']
 		self._elements_in_file = []
 		self._analytes_by_element = {}  # Maps element symbol to list of available analytes
+		self.directoryAnalytes = {}  # analyte -> number of runs in homeDir holding it (run index)
 		self.baseSubtract = False
-
-		# In-memory integration results. Each entry is a dict returned by
-		# LICPMSfunctions.integrate() (peakAreas / elementConcs / etc.). The
-		# user explicitly saves these via the "Save Integration" button.
-		self.integrationResults = []
+		# Baseline to subtract (models.baseline dict); None is the trapezoid
+		# between the integration range ends.
+		self.baselineModel = None
+		# Parse only the columns of the analytes being viewed (plus the internal
+		# standard when the correction is on); others are loaded when picked in the PT.
+		self.projectedLoading = True
+		# How resident runs hold intensities (models.compact_run.INTENSITY_STORAGE);
+		# the narrower modes save memory in comparison mode, float64 matches
+		# the worker pool and the command line.
+		self.intensityStorage = QSettings("LCICPMS", "DataViewer").value("intensityStorage", "float64")
+		if self.intensityStorage not in INTENSITY_STORAGE:
+			self.intensityStorage = 'float64'
+
+		# In-memory integration results (models.results.ResultTable), one
+		# row per integrated file and window, numbers unformatted. The user
+		# explicitly saves these via the "Save Integration" button.
+		self.integrationResults = ResultTable()
 
 		# File comparison mode (supports up to 12 files)
 		self.compareMode = False
 		self.comparisonFiles = []  # List of filenames
-		self.comparisonData = []  # List of dataframes
+		self.comparisonData = []  # List of runs (CompactRun, one per file)
 		self.comparisonLabels = {}  # Dictionary mapping filename to custom legend label
+		self.comparisonShifts = {}  # filename -> retention shift (s) when aligned
+		self.alignComparison = False  # align comparison runs' retention times
 
 		# Periodic table data structures for PTBuilder
 		self._createPeriodicTableData()
@@ -413,6 +435,20 @@ class PyLCICPMSUi(QMainWindow):
 		self.integrateButtons['Reset Integration'].setStyleSheet(self._buttonStyle)
 		self.intButtonLayout.addWidget(self.integrateButtons['Reset Integration'])
 
+		self.integrateButtons['Peak Table'] = QPushButton("Peak Table…")
+		self.integrateButtons['Peak Table'].setToolTip(
+			"Integrate named windows from a CSV (name, start, stop in min) in the selected files"
+		)
+		self.integrateButtons['Peak Table'].setStyleSheet(self._buttonStyle)
+		self.intButtonLayout.addWidget(self.integrateButtons['Peak Table'])
+
+		self.integrateButtons['Find Peaks'] = QPushButton("Find Peaks")
+		self.integrateButtons['Find Peaks'].setToolTip(
+			"Detect every significant peak in the selected files and integrate them all"
+		)
+		self.integrateButtons['Find Peaks'].setStyleSheet(self._buttonStyle)
+		self.intButtonLayout.addWidget(self.integrateButtons['Find Peaks'])
+
 		# Save is now offered inside the integration summary popup, so the
 		# standalone toolbar button is no longer shown. Kept as a hidden
 		# attribute so existing enable/disable code doesn't need to change.
@@ -427,10 +463,17 @@ class PyLCICPMSUi(QMainWindow):
 
 		# Calibration buttons
 		self.integrateButtons['Load Cal.'] = QPushButton("Load Cal.")
-		self.integrateButtons['Load Cal.'].setToolTip("Load calibration file")
+		self.integrateButtons['Load Cal.'].setToolTip("Load the newest calibration file in the directory")
 		self.integrateButtons['Load Cal.'].setStyleSheet(self._buttonStyle)
 		self.intButtonLayout.addWidget(self.integrateButtons['Load Cal.'])
 
+		self.integrateButtons['Cal. History'] = QPushButton("Cal. History")
+		self.integrateButtons['Cal. History'].setToolTip(
+			"Pick a calibration from every .calib in the directory, newest first"
+		)
+		self.integrateButtons['Cal. History'].setStyleSheet(self._buttonStyle)
+		self.intButtonLayout.addWidget(self.integrateButtons['Cal. History'])
+
 		self.integrateButtons['Calibrate'] = QPushButton("Calibrate")
 		self.integrateButtons['Calibrate'].setToolTip("Open calibration window")
 		# Highlighted (blue) style used when no calibration is loaded yet.
@@ -459,6 +502,14 @@ class PyLCICPMSUi(QMainWindow):
 		self.integrateButtons['Calibrate'].setStyleSheet(self._calibrateHighlightStyle)
 		self.intButtonLayout.addWidget(self.integrateButtons['Calibrate'])
 
+		self.integrateButtons['Re-quantify'] = QPushButton("Re-quantify")
+		self.integrateButtons['Re-quantify'].setToolTip(
+			"Recompute the concentrations of the integration results in memory with the current calibration"
+		)
+		self.integrateButtons['Re-quantify'].setStyleSheet(self._buttonStyle)
+		self.integrateButtons['Re-quantify'].setEnabled(False)
+		self.intButtonLayout.addWidget(self.integrateButtons['Re-quantify'])
+
 		# Separator
 		sep2 = QLabel("|")
 		sep2.setStyleSheet("color: #ccc; margin: 0 4px;")
@@ -475,6 +526,7 @@ class PyLCICPMSUi(QMainWindow):
 		# Right side: view controls
 		self.intButtonLayout.addWidget(self.buttons['Select Elements'])
 		self.intButtonLayout.addWidget(self.compareFilesBtn)
+		self.intButtonLayout.addWidget(self.buttons['Follow'])
 		self.intButtonLayout.addWidget(self.buttons['Export Plot'])
 		self.intButtonLayout.addWidget(self.buttons['Reset'])
 
@@ -571,9 +623,26 @@ class PyLCICPMSUi(QMainWindow):
 		self.buttons['Sort By Number'].setStyleSheet(self._buttonStyle)
 		headerLayout.addWidget(self.buttons['Sort By Number'])
 
+		self.buttons['Sort By Date'] = QPushButton('Sort by date')
+		self.buttons['Sort By Date'].setToolTip(
+			'Sort the file list by acquisition time (from the directory\'s run index).'
+		)
+		self.buttons['Sort By Date'].setStyleSheet(self._buttonStyle)
+		headerLayout.addWidget(self.buttons['Sort By Date'])
+
 		headerLayout.addWidget(self.buttons['Directory'])
 		leftLayout.addLayout(headerLayout)
 
+		# Filter the list to runs containing an analyte (from the run index,
+		# so no file has to be opened).
+		filterLayout = QHBoxLayout()
+		filterLayout.addWidget(QLabel("Show runs with:"))
+		self.analyteFilter = QComboBox()
+		self.analyteFilter.addItem('All analytes', None)
+		self.analyteFilter.setToolTip('Only list runs that contain this analyte.')
+		filterLayout.addWidget(self.analyteFilter, stretch=1)
+		leftLayout.addLayout(filterLayout)
+
 		self.listwidget = QListWidget()
 		self.listwidget.setMinimumHeight(100)  # Ensure minimum visibility
 		# Multi-select so the user can Ctrl/Shift-click multiple files and
@@ -596,6 +665,12 @@ class PyLCICPMSUi(QMainWindow):
 		compareListLabel.setStyleSheet("font-weight: bold;")
 		headerLayout.addWidget(compareListLabel)
 		headerLayout.addStretch()
+		self.alignCompareBox = QCheckBox("Align")
+		self.alignCompareBox.setToolTip(
+			"Align retention times to the first file by cross-correlating the plotted element;\n"
+			"the plot and each file's integration window follow the shifts"
+		)
+		headerLayout.addWidget(self.alignCompareBox)
 		comparisonLayout.addLayout(headerLayout)
 
 		# Transfer buttons (horizontal, more compact)
@@ -689,6 +764,18 @@ class PyLCICPMSUi(QMainWindow):
 		self.buttons['Reset'].setToolTip("Reset plot view")
 		self.buttons['Reset'].setStyleSheet(self._buttonStyle)
 
+		self.buttons['Follow'] = QPushButton("Follow")
+		self.buttons['Follow'].setCheckable(True)
+		self.buttons['Follow'].setToolTip("Follow the selected file while it is being acquired")
+		self.buttons['Follow'].setEnabled(False)
+		self.buttons['Follow'].setStyleSheet(self._buttonStyle + """
+			QPushButton:checked {
+				background-color: #4682b4;
+				color: white;
+				border-color: #4682b4;
+			}
+		""")
+
 		self.buttons['Export Plot'] = QPushButton("Save Plot")
 		self.buttons['Export Plot'].setToolTip("Save plot as PNG, SVG, or PDF")
 		self.buttons['Export Plot'].setStyleSheet(self._buttonStyle)
@@ -1117,6 +1204,22 @@ class PyLCICPMSUi(QMainWindow):
 		exit_action.triggered.connect(self.close)
 		file_menu.addAction(exit_action)
 
+		# Settings menu
+		settings_menu = menubar.addMenu('S&ettings')
+		storage_menu = settings_menu.addMenu('Intensity Storage')
+		storage_group = QActionGroup(self)
+		self.storageActions = {}
+		for mode, label in (
+			('float64', 'float64 (full precision)'),
+			('float32', 'float32 (half the memory)'),
+			('counts', 'Counts (uint32 where whole, else float32)'),
+		):
+			action = QAction(label, self, checkable=True)
+			action.setChecked(mode == self.intensityStorage)
+			storage_group.addAction(action)
+			storage_menu.addAction(action)
+			self.storageActions[mode] = action
+
 	def _updateRecentDirectoriesMenu(self):
 		"""Update the recent directories menu."""
 		self.recent_menu.clear()
@@ -1144,6 +1247,7 @@ class PyLCICPMSUi(QMainWindow):
 			self._controller._createListbox()
 			self.integrateButtons['Calibrate'].setEnabled(True)
 			self.integrateButtons['Load Cal.'].setEnabled(True)
+			self.integrateButtons['Cal. History'].setEnabled(True)
 			self.integrateButtons['115In Correction'].setEnabled(True)
 			self.statusBar.showMessage(f'Loaded directory: {directory}', 3000)
 
@@ -1172,6 +1276,11 @@ class PyLCICPMSUi(QMainWindow):
 		settings.setValue("recentDirectories", recent_dirs)
 		self._updateRecentDirectoriesMenu()
 
+	def setIntensityStorage(self, mode):
+		"""Remember the intensity storage mode for later sessions."""
+		self.intensityStorage = mode
+		QSettings("LCICPMS", "DataViewer").setValue("intensityStorage", mode)
+
 	def _saveWorkspace(self):
 		"""Save current workspace state to a file."""
 		from PyQt6.QtWidgets import QFileDialog, QMessageBox
@@ -1197,6 +1306,8 @@ class PyLCICPMSUi(QMainWindow):
 				'activeElements': self.activeElements,
 				'calCurves': self.calCurves,
 				'baseSubtract': self.baseSubtract,
+				'baselineModel': self.baselineModel,
+				'internalStandard': self.internalStandard,
 			}
 
 			# Add current file if one is selected
@@ -1249,6 +1360,7 @@ class PyLCICPMSUi(QMainWindow):
 					self._controller._createListbox()
 					self.integrateButtons['Calibrate'].setEnabled(True)
 					self.integrateButtons['Load Cal.'].setEnabled(True)
+					self.integrateButtons['Cal. History'].setEnabled(True)
 					self.integrateButtons['115In Correction'].setEnabled(True)
 
 			# Restore selected elements
@@ -1267,14 +1379,24 @@ class PyLCICPMSUi(QMainWindow):
 			# Restore settings
 			if 'baseSubtract' in workspace:
 				self.baseSubtract = workspace['baseSubtract']
+			if workspace.get('baselineModel'):
+				try:
+					self.baselineModel = baseline_model(**workspace['baselineModel'])
+				except (TypeError, ValueError) as e:
+					print(f'Ignoring the workspace baseline model: {e}')
+			if workspace.get('internalStandard'):
+				self.internalStandard = {
+					'isotope': str(workspace['internalStandard'].get('isotope', DEFAULT_ISOTOPE)),
+					'window': float(workspace['internalStandard'].get('window', DEFAULT_WINDOW)),
+				}
 
 			# Restore current file and plot
 			if 'currentFile' in workspace and workspace['currentFile']:
 				# Find and select the file in the list
-				items = self.listwidget.findItems(workspace['currentFile'], Qt.MatchFlag.MatchExactly)
-				if items:
-					self.listwidget.setCurrentItem(items[0])
-					# This will trigger auto-load and plot
+				# The list fills in the background, so select it once listed.
+				# This will trigger auto-load and plot
+				if hasattr(self, '_controller'):
+					self._controller._listing.select(workspace['currentFile'])
 
 			# Restore integration ranges
 			if 'intRange' in workspace and hasattr(self, '_controller'):
@@ -1307,6 +1429,17 @@ class PyLCICPMSUi(QMainWindow):
 		if hasattr(self, '_controller') and self._controller is not None:
 			if hasattr(self._controller, 'calWindow') and self._controller.calWindow is not None:
 				self._controller.calWindow.close()
+			# Don't start parsing queued neighbours while shutting down.
+			self._controller._prefetcher.cancel()
+			self._controller._followTimer.stop()
+			self._controller._listing.stop()
+			self._controller._indexer.stop()
+			self._controller._calIndexer.stop()
+			if self._controller._batchThread is not None:
+				self._controller._batchThread.cancel()
+				self._controller._batchThread.wait()
+			for calCtrl in self._controller._calControllers:
+				calCtrl.stopWorkers()
 
 		event.accept()
 
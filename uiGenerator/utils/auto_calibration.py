@@ -0,0 +1,49 @@
+"""
+Automatic calibration in worker processes for LCICPMS-ui
+Integrates every standard over a common window and averages its 115In in a
+process pool (models.auto_calibration) driven from a QThread, so the
+calibration window stays responsive while a directory of standards is read
+"""
+
+from PyQt6.QtCore import pyqtSignal
+
+from ..models.auto_calibration import standard_job
+from .pool_worker import PoolWorkerThread
+
+
+class AutoCalibrationThread(PoolWorkerThread):
+    """
+    Integrates the standards ``paths`` over ``window`` in a process pool
+
+    Args:
+        paths (list): Standard files
+        analytes (list): Analytes to integrate
+        window (tuple): (start_min, stop_min) shared by all standards
+        processes (int): Worker processes (default: CPUs, at most one per file)
+    """
+    standard_done = pyqtSignal(int, int, str, str)          # (done, total, path, error or '')
+    standards_finished = pyqtSignal(object, object, bool)   # (results, {path: error}, cancelled)
+
+    def __init__(self, paths, analytes, window, processes=None, parent=None):
+        super().__init__(standard_job, processes, parent)
+        self.paths = list(paths)
+        self.analytes = list(analytes)
+        self.window = tuple(window)
+        self._results = [None] * len(self.paths)
+        self._errors = {}
+
+    def jobs(self):
+        return [(i, path, self.analytes, self.window) for i, path in enumerate(self.paths)]
+
+    def collect(self, result, done, total):
+        index, path, standard, error = result
+        self._results[index] = standard
+        if error is not None:
+            self._errors[path] = error
+        self.standard_done.emit(done, total, path, error or '')
+
+    def finish(self, cancelled, error):
+        """Emit the results in input order (None where failed)"""
+        if error:
+            print(f'Auto calibration stopped: {error}')
+        self.standards_finished.emit(self._results, self._errors, cancelled)
@@ -0,0 +1,49 @@
+"""
+Multi-file integration in worker processes for LCICPMS-ui
+Parses and integrates each file in a process pool (models.batch) driven
+from a QThread, so the window stays responsive on large selections. Results
+stream back as files finish and are handed over in the original order
+"""
+
+from PyQt6.QtCore import pyqtSignal
+
+from ..models.batch import integrate_job
+from ..models.results import ResultTable
+from .pool_worker import PoolWorkerThread
+
+
+class BatchIntegrationThread(PoolWorkerThread):
+    """
+    Integrates ``paths`` with models.batch.integrate_run in a process pool
+
+    Args:
+        paths (list): Run files to integrate
+        settings (dict): models.batch.integration_settings(...)
+        processes (int): Worker processes (default: CPUs, at most one per file)
+    """
+    run_done = pyqtSignal(int, int, str, str)          # (done, total, path, error or '')
+    batch_finished = pyqtSignal(object, object, bool)  # (ResultTable, {path: error}, cancelled)
+
+    def __init__(self, paths, settings, processes=None, parent=None):
+        super().__init__(integrate_job, processes, parent)
+        self.paths = list(paths)
+        self.settings = settings
+        self._per_file = [None] * len(self.paths)
+        self._errors = {}
+
+    def jobs(self):
+        return [(i, path, self.settings) for i, path in enumerate(self.paths)]
+
+    def collect(self, result, done, total):
+        index, path, run_results, error = result
+        self._per_file[index] = run_results
+        if error is not None:
+            self._errors[path] = error
+        self.run_done.emit(done, total, path, error or '')
+
+    def finish(self, cancelled, error):
+        """Emit the records of finished files in input order"""
+        if error:
+            print(f'Integration stopped: {error}')
+        results = ResultTable.concat(r for r in self._per_file if r is not None)
+        self.batch_finished.emit(results, self._errors, cancelled)
@@ -0,0 +1,54 @@
+"""
+Calibration PDF report rendering in worker processes for LCICPMS-ui
+Each page of the report (models.calibration_report) is drawn as a one-page
+vector PDF in a process pool driven from a QThread, and the pages are merged
+into the report once all are done, so the .calib file and the summary are available
+while the report is still being drawn
+"""
+
+from PyQt6.QtCore import pyqtSignal
+
+from ..models.calibration_report import render_job, report_pages, write_report
+from .pool_worker import PoolWorkerThread
+
+
+class CalibrationReportThread(PoolWorkerThread):
+    """
+    Renders ``report`` to ``path`` with one pool job per page
+
+    Args:
+        report (dict): models.calibration_report.report_data(...)
+        path (str): PDF file to write
+        processes (int): Worker processes (default: CPUs, at most one per page)
+    """
+    page_done = pyqtSignal(int, int)              # (done, total)
+    report_finished = pyqtSignal(str, str)        # (path, error or '')
+
+    def __init__(self, report, path, processes=None, parent=None):
+        super().__init__(render_job, processes, parent)
+        self.report = report
+        self.path = path
+        self._pages = []
+        self._error = ''
+
+    def jobs(self):
+        pages = report_pages(self.report)
+        self._pages = [None] * len(pages)
+        return [(i, self.report, page) for i, page in enumerate(pages)]
+
+    def collect(self, result, done, total):
+        index, page_pdf, page_error = result
+        if page_error is not None:
+            self._error = self._error or f'page {index + 1}: {page_error}'
+        self._pages[index] = page_pdf
+        self.page_done.emit(done, total)
+
+    def finish(self, cancelled, error):
+        """Write the PDF in page order unless a page failed or it was cancelled"""
+        error = self._error or error or ('cancelled' if cancelled else '')
+        if not error:
+            try:
+                write_report(self._pages, self.path)
+            except Exception as e:
+                error = f'{type(e).__name__}: {e}'
+        self.report_finished.emit(self.path, error)
@@ -0,0 +1,385 @@
+"""
+Non-blocking directory listing for LCICPMS-ui
+Scans run directories on a worker thread, fills file lists in batches,
+builds tooltips only when they are shown, and follows later changes with a
+QFileSystemWatcher instead of rebuilding the whole list. DirectoryIndexer
+keeps a directory's run metadata index (models.directory_index) up to date
+on a worker thread as the listing changes
+"""
+
+import bisect
+import os
+from datetime import datetime
+
+from PyQt6.QtCore import QEvent, QFileSystemWatcher, QObject, QThread, QTimer, pyqtSignal
+
+from ..models.directory_index import DirectoryIndex
+from ..models.run_source import iter_runs, run_stat, split_member
+
+
+def format_size(num_bytes):
+    """Human-readable file size (B / KB / MB)"""
+    if num_bytes < 1024:
+        return f"{num_bytes} B"
+    if num_bytes < 1024 * 1024:
+        return f"{num_bytes / 1024:.1f} KB"
+    return f"{num_bytes / (1024 * 1024):.1f} MB"
+
+
+def file_tooltip(path):
+    """Tooltip text for a run file: path, size and modification date"""
+    st = run_stat(path)
+    mod_date = datetime.fromtimestamp(st.st_mtime).strftime('%Y-%m-%d %H:%M')
+    archive, member = split_member(path)
+    if member is not None:
+        return (f"Archive: {archive}\nMember: {member}\n"
+                f"Archive size: {format_size(st.st_size)}\nModified: {mod_date}")
+    return f"Path: {path}\nSize: {format_size(st.st_size)}\nModified: {mod_date}"
+
+
+class DirectoryScanThread(QThread):
+    """Lists the matching file names of one directory in the background"""
+    batch_found = pyqtSignal(int, list)    # (scan id, names)
+    scan_complete = pyqtSignal(int, list)  # (scan id, every matching name)
+    scan_failed = pyqtSignal(int, str)
+
+    def __init__(self, scan_id, directory, match, batch_size=200, archives=False, parent=None):
+        super().__init__(parent)
+        self.scan_id = scan_id
+        self.directory = directory
+        self.match = match
+        self.batch_size = batch_size
+        self.archives = archives
+
+    def run(self):
+        """Stream names in batches; os.scandir avoids a stat per entry"""
+        names = []
+        batch = []
+        try:
+            for name in iter_runs(self.directory, self.match, self.archives):
+                if self.isInterruptionRequested():
+                    return
+                names.append(name)
+                batch.append(name)
+                if len(batch) >= self.batch_size:
+                    self.batch_found.emit(self.scan_id, batch)
+                    batch = []
+        except OSError as e:
+            self.scan_failed.emit(self.scan_id, str(e))
+            return
+        if batch:
+            self.batch_found.emit(self.scan_id, batch)
+        self.scan_complete.emit(self.scan_id, names)
+
+
+class DirectoryListing(QObject):
+    """
+    Keeps a QListWidget in sync with the matching files of a directory
+
+    Args:
+        listwidget (QListWidget): List to fill
+        match (callable): name -> bool, which directory entries to list
+        batch_size (int): Names inserted per batch from the scan thread
+        archives (bool): Also list matching members of zip archives,
+            as "<archive>.zip/<member>"
+        parent (QObject): Qt parent
+    """
+    scan_finished = pyqtSignal(int)  # number of files listed
+    files_added = pyqtSignal(list)
+    files_removed = pyqtSignal(list)
+    directory_changed = pyqtSignal()  # watcher saw a change (any file, listed or not), debounced
+
+    # Wait for a burst of filesystem events (e.g. a copy) to settle.
+    RESCAN_DELAY_MS = 300
+
+    def __init__(self, listwidget, match, batch_size=200, archives=False, parent=None):
+        super().__init__(parent)
+        self._list = listwidget
+        self._match = match
+        self._batch_size = batch_size
+        self._archives = archives
+        self._directory = ''
+        self._sort_key = None
+        self._filter = None
+        self._keys = []       # sort keys of the listed names, in list order
+        self._names = set()
+        self._scan_id = 0
+        self._threads = {}
+        self._initial = False
+        self._pending_select = None
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._scheduleRescan)
+        self._rescan_timer = QTimer(self)
+        self._rescan_timer.setSingleShot(True)
+        self._rescan_timer.setInterval(self.RESCAN_DELAY_MS)
+        self._rescan_timer.timeout.connect(self._onDirectoryChanged)
+
+        self._list.viewport().installEventFilter(self)
+
+    @property
+    def directory(self):
+        return self._directory
+
+    def setDirectory(self, directory):
+        """Clear the list and start listing ``directory`` in the background"""
+        directory = os.path.normpath(directory) if directory else ''
+        if self._watcher.directories():
+            self._watcher.removePaths(self._watcher.directories())
+        self._directory = directory
+        self._list.clear()
+        self._keys = []
+        self._names = set()
+        if not directory:
+            return
+        if os.path.isdir(directory):
+            self._watcher.addPath(directory)
+        self._initial = True
+        self._startScan()
+
+    def rescan(self):
+        """Re-list the directory and apply only the differences"""
+        if self._directory:
+            self._initial = False
+            self._startScan()
+
+    def select(self, name):
+        """Make ``name`` current now, or as soon as the scan lists it"""
+        if not self._selectNow(name):
+            self._pending_select = name
+
+    def setSortKey(self, key):
+        """Re-sort the list by ``key`` (name -> sortable); None sorts by name"""
+        self._sort_key = key
+        current = self._list.currentItem()
+        current_name = current.text() if current is not None else None
+        names = sorted(self._names, key=self._key)
+        blocked = self._list.blockSignals(True)
+        self._list.clear()
+        self._list.addItems(names)
+        self._keys = [self._key(n) for n in names]
+        if self._filter is not None:
+            for row, name in enumerate(names):
+                self._list.item(row).setHidden(not self._visible(name))
+        if current_name is not None:
+            self._selectNow(current_name)
+        self._list.blockSignals(blocked)
+
+    def setFilter(self, predicate):
+        """Hide the names for which ``predicate`` is false; None shows all"""
+        self._filter = predicate
+        for row in range(self._list.count()):
+            item = self._list.item(row)
+            item.setHidden(not self._visible(item.text()))
+
+    def stop(self):
+        """Stop scanning and watching (on close)"""
+        self._rescan_timer.stop()
+        for thread in list(self._threads.values()):
+            thread.requestInterruption()
+            thread.wait()
+        self._threads.clear()
+        if self._watcher.directories():
+            self._watcher.removePaths(self._watcher.directories())
+
+    def eventFilter(self, obj, event):
+        """Build an item's tooltip the first time it is hovered"""
+        if event.type() == QEvent.Type.ToolTip and self._directory:
+            item = self._list.itemAt(event.pos())
+            if item is not None and not item.toolTip():
+                try:
+                    item.setToolTip(file_tooltip(os.path.join(self._directory, item.text())))
+                except OSError:
+                    pass
+        return False
+
+    def _key(self, name):
+        return self._sort_key(name) if self._sort_key is not None else name
+
+    def _visible(self, name):
+        return self._filter is None or self._filter(name)
+
+    def _startScan(self):
+        self._scan_id += 1
+        for thread in self._threads.values():
+            thread.requestInterruption()
+        thread = DirectoryScanThread(
+            self._scan_id, self._directory, self._match, self._batch_size,
+            self._archives, self,
+        )
+        if self._initial:
+            thread.batch_found.connect(self._onBatch)
+        thread.scan_complete.connect(self._onComplete)
+        thread.scan_failed.connect(self._onFailed)
+        thread.finished.connect(lambda sid=self._scan_id: self._threads.pop(sid, None))
+        self._threads[self._scan_id] = thread
+        thread.start()
+
+    def _onBatch(self, scan_id, names):
+        if scan_id != self._scan_id:
+            return
+        self._insert([n for n in names if n not in self._names])
+
+    def _onComplete(self, scan_id, names):
+        if scan_id != self._scan_id:
+            return
+        listed = set(names)
+        added = [n for n in names if n not in self._names]
+        removed = [n for n in self._names if n not in listed]
+        self._insert(added)
+        self._remove(removed)
+        if not self._initial:
+            if added:
+                self.files_added.emit(added)
+            if removed:
+                self.files_removed.emit(removed)
+        # The watcher may have been dropped if the directory was recreated.
+        if self._directory not in self._watcher.directories() and os.path.isdir(self._directory):
+            self._watcher.addPath(self._directory)
+        self.scan_finished.emit(len(self._names))
+
+    def _onFailed(self, scan_id, message):
+        if scan_id == self._scan_id:
+            print(f"Error listing {self._directory}: {message}")
+            self.scan_finished.emit(len(self._names))
+
+    def _insert(self, names):
+        for name in names:
+            key = self._key(name)
+            row = bisect.bisect_right(self._keys, key)
+            self._keys.insert(row, key)
+            self._names.add(name)
+            self._list.insertItem(row, name)
+            if self._filter is not None:
+                self._list.item(row).setHidden(not self._visible(name))
+        if names and self._pending_select in self._names:
+            self._selectNow(self._pending_select)
+
+    def _remove(self, names):
+        for name in names:
+            row = self._row(name)
+            if row is None:
+                continue
+            self._list.takeItem(row)
+            del self._keys[row]
+            self._names.discard(name)
+
+    def _row(self, name):
+        key = self._key(name)
+        row = bisect.bisect_left(self._keys, key)
+        while row < len(self._keys) and self._keys[row] == key:
+            if self._list.item(row).text() == name:
+                return row
+            row += 1
+        # A key that depends on outside state (e.g. the run index) may have
+        # changed since the name was inserted.
+        for row in range(self._list.count()):
+            if self._list.item(row).text() == name:
+                return row
+        return None
+
+    def _selectNow(self, name):
+        row = self._row(name) if name in self._names else None
+        if row is None:
+            return False
+        self._list.setCurrentRow(row)
+        self._pending_select = None
+        return True
+
+    def _scheduleRescan(self, path):
+        self._rescan_timer.start()
+
+    def _onDirectoryChanged(self):
+        self.rescan()
+        self.directory_changed.emit()
+
+
+class IndexUpdateThread(QThread):
+    """Runs DirectoryIndex.update in the background; with ``if_changed``, only
+    when the index's ``changed()`` says files came or went"""
+    index_updated = pyqtSignal(object, list)  # (index, changed names)
+
+    def __init__(self, index, names=None, if_changed=False, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.names = names
+        self.if_changed = if_changed
+
+    def run(self):
+        if self.if_changed and not self.index.changed():
+            changed = []
+        else:
+            changed = self.index.update(self.names, should_stop=self.isInterruptionRequested)
+        self.index_updated.emit(self.index, changed)
+
+
+class DirectoryIndexer(QObject):
+    """
+    Owns the run metadata index of the listed directory and refreshes it
+    off the GUI thread; the sidecar is loaded as soon as the directory is set
+
+    Args:
+        match (callable): name -> bool, which files to index
+        archives (bool): Also index runs inside zip archives
+        factory (callable): directory -> index with ``names`` and
+            ``update(names, should_stop)`` (and ``changed()`` for
+            ``refresh(if_changed=True)``), e.g. a CalibrationRegistry
+            (default: a DirectoryIndex with ``match`` and ``archives``)
+        parent (QObject): Qt parent
+    """
+    index_updated = pyqtSignal(list)  # names whose entries changed
+
+    def __init__(self, match=None, archives=False, factory=None, parent=None):
+        super().__init__(parent)
+        self._factory = factory or (lambda directory: DirectoryIndex(directory, match, archives))
+        self.index = None
+        self._thread = None
+        self._pending = None  # refresh to run after the current one (its if_changed)
+
+    def setDirectory(self, directory):
+        """Switch to ``directory``'s index and bring it up to date"""
+        self.stop()
+        self.index = self._factory(directory) if directory else None
+        if self.index is not None:
+            self.index_updated.emit(self.index.names())
+            self.refresh()
+
+    def refresh(self, if_changed=False):
+        """Re-check every file (only changed ones are re-read); with
+        ``if_changed``, only if the index's ``changed()`` is true"""
+        if self.index is None:
+            return
+        if self._thread is not None:
+            # An unconditional refresh wins over a conditional one.
+            self._pending = if_changed if self._pending is None else self._pending and if_changed
+            return
+        self._pending = None
+        thread = IndexUpdateThread(self.index, if_changed=if_changed, parent=self)
+        thread.index_updated.connect(self._onUpdated)
+        thread.finished.connect(lambda: self._onFinished(thread))
+        self._thread = thread
+        thread.start()
+
+    @property
+    def updating(self):
+        """True while an update is running"""
+        return self._thread is not None
+
+    def stop(self):
+        """Abandon a running update (on directory change or close)"""
+        self._pending = None
+        if self._thread is not None:
+            self._thread.requestInterruption()
+            self._thread.wait()
+            self._thread = None
+
+    def _onUpdated(self, index, changed):
+        if index is self.index and changed:
+            self.index_updated.emit(changed)
+
+    def _onFinished(self, thread):
+        if thread is not self._thread:
+            return  # stopped and replaced
+        self._thread = None
+        if self._pending is not None:
+            self.refresh(self._pending)
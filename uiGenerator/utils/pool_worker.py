@@ -0,0 +1,77 @@
+"""
+Process-pool work driven from a QThread for LCICPMS-ui
+PoolWorkerThread feeds jobs to a pool of spawned worker processes and hands
+each result to the subclass as it finishes, so the GUI stays responsive and
+long batches can be cancelled. Multi-file integration, automatic
+calibration and the calibration report are built on it
+"""
+
+import multiprocessing
+import os
+
+from PyQt6.QtCore import QThread
+
+
+class PoolWorkerThread(QThread):
+    """
+    Runs ``worker`` over ``jobs()`` in a process pool
+
+    Subclasses provide ``jobs()`` (picklable arguments, one per call),
+    ``collect(result, done, total)`` (called in this thread as each result
+    arrives, in completion order) and ``finish(cancelled, error)`` (called
+    once at the end, typically to emit the collected results)
+
+    Args:
+        worker (callable): Module-level function of one job; its module
+            must not import Qt
+        processes (int): Worker processes (default: CPUs, at most one per job)
+    """
+
+    # Workers are spawned, not forked: forking a process running Qt threads
+    # is unsafe.
+    START_METHOD = 'spawn'
+
+    # Seconds between checks for cancellation while waiting on a result.
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, worker, processes=None, parent=None):
+        super().__init__(parent)
+        self.worker = worker
+        self.processes = processes
+        self._cancelled = False
+
+    def cancel(self):
+        """Stop after the current poll; jobs not finished are dropped"""
+        self._cancelled = True
+
+    def jobs(self):
+        raise NotImplementedError
+
+    def collect(self, result, done, total):
+        raise NotImplementedError
+
+    def finish(self, cancelled, error):
+        raise NotImplementedError
+
+    def run(self):
+        """Collect results as workers finish; ``finish`` gets whether jobs were dropped"""
+        jobs = list(self.jobs())
+        total = len(jobs)
+        done = 0
+        error = ''
+        processes = min(self.processes or os.cpu_count() or 1, max(total, 1))
+        try:
+            context = multiprocessing.get_context(self.START_METHOD)
+            with context.Pool(processes) as pool:
+                results = pool.imap_unordered(self.worker, jobs)
+                while done < total and not self._cancelled:
+                    try:
+                        result = results.next(timeout=self.POLL_INTERVAL)
+                    except multiprocessing.TimeoutError:
+                        continue
+                    done += 1
+                    self.collect(result, done, total)
+                # Leaving the block terminates the pool, dropping queued jobs.
+        except Exception as e:
+            error = f'{type(e).__name__}: {e}'
+        self.finish(self._cancelled and done < total, error)
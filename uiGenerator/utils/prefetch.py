@@ -0,0 +1,84 @@
+"""
+Background prefetching of run files for LCICPMS-ui
+Parses files near the current selection on a QThreadPool so stepping
+through a sequence hits the dataset registry instead of the CSV parser
+"""
+
+from PyQt6.QtCore import QRunnable, QThreadPool
+
+from ..models.dataset_registry import get_registry
+
+
+class PrefetchTask(QRunnable):
+    """Loads one file into the dataset registry on a pool thread"""
+
+    def __init__(self, path, registry, analytes=None):
+        super().__init__()
+        self._path = path
+        self._registry = registry
+        self._analytes = analytes
+
+    def run(self):
+        """Parse the file in background; errors surface when it is opened"""
+        try:
+            self._registry.load(self._path, analytes=self._analytes)
+        except Exception as e:
+            print(f"Prefetch skipped {self._path}: {e}")
+
+
+class RunPrefetcher:
+    """
+    Prefetches the runs either side of the current list position
+
+    Args:
+        radius (int): Number of entries to prefetch before and after
+        max_threads (int): Worker threads parsing concurrently
+        registry (DatasetRegistry): Registry to fill (defaults to the shared one)
+    """
+
+    def __init__(self, radius=3, max_threads=2, registry=None):
+        self.radius = radius
+        self._registry = registry if registry is not None else get_registry()
+        self._pool = QThreadPool()
+        self._pool.setMaxThreadCount(max_threads)
+
+    @staticmethod
+    def neighbour_rows(row, count, radius):
+        """
+        Rows to prefetch around ``row``, nearest first, alternating
+        next/previous so forward and backward stepping are both covered
+
+        Returns:
+            list: Row indices within [0, count)
+        """
+        rows = []
+        for step in range(1, radius + 1):
+            for candidate in (row + step, row - step):
+                if 0 <= candidate < count:
+                    rows.append(candidate)
+        return rows
+
+    def prefetch(self, paths, analytes=None):
+        """
+        Queue ``paths`` for background parsing, replacing anything still
+        queued from a previous position (tasks already running finish)
+
+        ``analytes`` limits parsing to those columns (projected loading);
+        None parses whole files.
+        """
+        self._pool.clear()
+        for path in paths:
+            run = self._registry.peek(path)
+            if run is not None and (
+                run.is_complete if analytes is None else not run.missing(analytes)
+            ):
+                continue
+            self._pool.start(PrefetchTask(path, self._registry, analytes))
+
+    def cancel(self):
+        """Drop queued prefetches"""
+        self._pool.clear()
+
+    def wait(self, msecs=-1):
+        """Block until running prefetches finish (used on shutdown and in tests)"""
+        return self._pool.waitForDone(msecs)